@@ -6,19 +6,22 @@ Compara un CV estructurado con una descripción de trabajo estructurada.
 import json
 import sys
 import os
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Optional, Tuple
 
 # Agregar el directorio padre al path para importar los comparadores
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from comparators.technical_skills_comparator import compare_technical_skills
-from comparators.experience_comparator import compare_experience
-from comparators.education_comparator import compare_education
-from comparators.certifications_comparator import compare_certifications
-from comparators.languages_comparator import compare_languages
-from comparators.location_comparator import compare_locations
-from comparators.responsibilities_comparator import compare_responsibilities
-from comparators.soft_skills_comparator import compare_soft_skills
+from comparators.technical_skills_comparator import compare_technical_skills, local_technical_skills_result
+from comparators.experience_comparator import compare_experience, local_experience_result
+from comparators.education_comparator import compare_education, local_education_result
+from comparators.certifications_comparator import compare_certifications, local_certifications_result
+from comparators.languages_comparator import compare_languages, local_languages_result
+from comparators.location_comparator import compare_locations, local_location_result
+from comparators.responsibilities_comparator import compare_responsibilities, local_responsibilities_result
+from comparators.soft_skills_comparator import compare_soft_skills, local_soft_skills_result
+from comparators.multi_aspect_comparator import compare_all_aspects
+from engines.experience_parser import get_experience_summary
+from engines.prompt_profile import get_prompt_profile
 
 
 class ComparatorMain:
@@ -43,6 +46,86 @@ class ComparatorMain:
             print(f"Error cargando {file_path}: {e}")
             return {}
     
+    def __init__(self, mode: str = None):
+        """
+        Args:
+            mode (str): "per_aspect" (un prompt por aspecto) o "single_prompt" (un solo prompt con los
+                aspectos que no se resuelven sin IA; los que no pasen la validación se evalúan con su comparador individual).
+                Si es None, usa la variable de entorno COMPARISON_MODE.
+        """
+        self.mode = (mode or os.getenv("COMPARISON_MODE", "per_aspect")).lower()
+    
+    def _aspect_comparators(self, cv_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Callable[[], Dict[str, Any]]]:
+        """
+        Comparadores individuales de cada aspecto, listos para ejecutar.
+        
+        Args:
+            cv_data (dict): Datos del CV estructurado
+            job_data (dict): Datos de la descripción de trabajo estructurada
+            
+        Returns:
+            dict: {aspecto: función sin argumentos que devuelve {"score", "reason"}}
+        """
+        cv_skills = cv_data.get('technical_skills', [])
+        job_skills = job_data.get('technical_skills', [])
+        cv_experience = cv_data.get('experience', [])
+        # Textos de prompt del CV, armados una sola vez y compartidos por todos los comparadores
+        cv_profile = get_prompt_profile(cv_data)
+        
+        return {
+            # 1. Habilidades técnicas
+            'technical_skills': lambda: compare_technical_skills(cv_skills, job_skills, cv_profile),
+            # 2. Experiencia
+            'experience': lambda: compare_experience(
+                cv_experience, job_data.get('experience', ''), get_experience_summary(cv_data), cv_profile),
+            # 3. Educación
+            'education': lambda: compare_education(cv_data.get('education', []), job_data.get('education', ''), cv_profile),
+            # 4. Certificaciones (con las habilidades técnicas del job y del CV)
+            'certifications': lambda: compare_certifications(
+                cv_data.get('certifications', []), job_data.get('certifications', []), job_skills, cv_skills, cv_profile),
+            # 5. Idiomas
+            'languages': lambda: compare_languages(cv_data.get('languages', {}), job_data.get('languages', {})),
+            # 6. Ubicación
+            'location': lambda: compare_locations(
+                {'location': cv_data.get('personal', {}).get('location', '')},
+                {'location': job_data.get('location', '')}),
+            # 7. Responsabilidades
+            'responsibilities': lambda: compare_responsibilities(cv_experience, job_data.get('responsibilities', []), cv_profile),
+            # 8. Habilidades blandas
+            'soft_skills': lambda: compare_soft_skills(cv_data.get('soft_skills', []), job_data.get('soft_skills', []), cv_profile)
+        }
+    
+    def _local_resolvers(self, cv_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Callable[[], Optional[Dict[str, Any]]]]:
+        """
+        Resolución sin IA de cada aspecto (las mismas reglas que aplica su comparador antes de la IA:
+        no evaluable, parser de experiencia, motor de educación, catálogo de certificaciones, similitud local).
+        
+        Args:
+            cv_data (dict): Datos del CV estructurado
+            job_data (dict): Datos de la descripción de trabajo estructurada
+            
+        Returns:
+            dict: {aspecto: función sin argumentos que devuelve {"score", "reason"} o None si hace falta la IA}
+        """
+        cv_skills = cv_data.get('technical_skills', [])
+        job_skills = job_data.get('technical_skills', [])
+        cv_experience = cv_data.get('experience', [])
+        
+        return {
+            'technical_skills': lambda: local_technical_skills_result(cv_skills, job_skills),
+            'experience': lambda: local_experience_result(
+                cv_experience, job_data.get('experience', ''), get_experience_summary(cv_data) if cv_experience else None),
+            'education': lambda: local_education_result(cv_data.get('education', []), job_data.get('education', '')),
+            'certifications': lambda: local_certifications_result(
+                cv_data.get('certifications', []), job_data.get('certifications', []), job_skills, cv_skills),
+            'languages': lambda: local_languages_result(cv_data.get('languages', {}), job_data.get('languages', {})),
+            'location': lambda: local_location_result(
+                {'location': cv_data.get('personal', {}).get('location', '')},
+                {'location': job_data.get('location', '')}),
+            'responsibilities': lambda: local_responsibilities_result(cv_experience, job_data.get('responsibilities', [])),
+            'soft_skills': lambda: local_soft_skills_result(cv_data.get('soft_skills', []), job_data.get('soft_skills', []))
+        }
+    
     def run_all_comparisons(self, cv_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Ejecuta todas las comparaciones entre CV y descripción de trabajo.
@@ -54,73 +137,46 @@ class ComparatorMain:
         Returns:
             dict: Resultados de todas las comparaciones
         """
-        results = {}
+        if self.mode == "single_prompt":
+            results, _ = self.run_single_prompt_comparisons(cv_data, job_data)
+            return results
         
-        # 1. Habilidades técnicas
-        cv_skills = cv_data.get('technical_skills', [])
-        job_skills = job_data.get('technical_skills', [])
-        # print("Habilidades técnicas")
-        # print(cv_skills)
-        # print(job_skills)
-        results['technical_skills'] = compare_technical_skills(cv_skills, job_skills)
+        return {aspect: compare() for aspect, compare in self._aspect_comparators(cv_data, job_data).items()}
+    
+    def run_single_prompt_comparisons(self, cv_data: Dict[str, Any], job_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Resuelve sin IA los aspectos que no la necesitan y compara el resto en un solo prompt;
+        cada aspecto cuya respuesta no pase la validación de esquema se evalúa con su comparador individual.
+        
+        Args:
+            cv_data (dict): Datos del CV estructurado
+            job_data (dict): Datos de la descripción de trabajo estructurada
             
-        # 2. Experiencia
-        cv_experience = cv_data.get('experience', [])
-        job_experience = job_data.get('experience', '')
-        # print("Experiencia")
-        # print(cv_experience)
-        # print(job_experience)
-        results['experience'] = compare_experience(cv_experience, job_experience)
-        
-        # 3. Educación
-        cv_education = cv_data.get('education', [])
-        job_education = job_data.get('education', '')
-        # print("Educación")
-        # print(cv_education)
-        # print(job_education)
-        results['education'] = compare_education(cv_education, job_education)
-        
-        # 4. Certificaciones
-        cv_certifications = cv_data.get('certifications', [])
-        job_certifications = job_data.get('certifications', [])
-        # print("Certificaciones")
-        # print(cv_certifications)
-        # print(job_certifications)
-        # Pasar también las habilidades técnicas del job y del CV
-        results['certifications'] = compare_certifications(cv_certifications, job_certifications, job_skills, cv_skills)
-        
-        # 5. Idiomas
-        cv_languages = cv_data.get('languages', {})
-        job_languages = job_data.get('languages', {})   
-        # print("Idiomas")
-        # print(cv_languages)
-        # print(job_languages)
-        results['languages'] = compare_languages(cv_languages, job_languages)
-        
-        # 6. Ubicación
-        cv_location = {'location': cv_data.get('personal', {}).get('location', '')}
-        job_location = {'location': job_data.get('location', '')}
-        # print("Ubicación")
-        # print(cv_location)
-        # print(job_location)
-        results['location'] = compare_locations(cv_location, job_location)
-        
-        # 7. Responsabilidades
-        job_responsibilities = job_data.get('responsibilities', [])
-        # print("Responsabilidades")
-        # print(cv_experience)
-        # print(job_responsibilities)
-        results['responsibilities'] = compare_responsibilities(cv_experience, job_responsibilities)
-        
-        # 8. Habilidades blandas
-        cv_soft_skills = cv_data.get('soft_skills', [])
-        job_soft_skills = job_data.get('soft_skills', [])
-        # print("Habilidades blandas")
-        # print(cv_soft_skills)
-        # print(job_soft_skills)
-        results['soft_skills'] = compare_soft_skills(cv_soft_skills, job_soft_skills)
-        
-        return results
+        Returns:
+            tuple: (resultados en el mismo orden que run_all_comparisons,
+                    {"mode": "single_prompt", "local_aspects": [aspectos resueltos sin IA],
+                     "fallback_aspects": [aspectos evaluados individualmente]})
+        """
+        comparators = self._aspect_comparators(cv_data, job_data)
+        local = {}
+        for aspect, resolve in self._local_resolvers(cv_data, job_data).items():
+            result = resolve()
+            if result is not None:
+                local[aspect] = result
+        pending = [aspect for aspect in comparators if aspect not in local]
+        combined = compare_all_aspects(cv_data, job_data, pending) if pending else {}
+        
+        results = {}
+        fallback_aspects = []
+        for aspect, compare in comparators.items():
+            if aspect in local:
+                results[aspect] = local[aspect]
+            elif aspect in combined:
+                results[aspect] = combined[aspect]
+            else:
+                fallback_aspects.append(aspect)
+                results[aspect] = compare()
+        return results, {"mode": "single_prompt", "local_aspects": list(local), "fallback_aspects": fallback_aspects}
     
     def calculate_final_score(self, results: Dict[str, Any], weights: Dict[str, float] = None) -> Dict[str, Any]:
         """
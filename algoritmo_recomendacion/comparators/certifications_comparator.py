@@ -1,9 +1,16 @@
-import json
+import contextvars
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+
+from engines.certification_catalog import (
+    local_direct_comparison, local_certifications_vs_skills, local_required_vs_cv_skills
+)
+from engines.prompt_profile import format_bullets, format_certifications
+from comparators.llm_client import invoke_structured, degraded_result
+from cliente_llm.structured_output import StructuredOutputError, SCORE_SCHEMA
+from cliente_llm.circuit_breaker import CircuitOpenError
+from cliente_llm.providers import create_chat_model
 
 # Cargar variables de entorno
 load_dotenv()
@@ -15,17 +22,56 @@ deployment = "gpt-4o-mini"
 subscription_key = os.getenv("API_TOKEN")
 api_version = "2024-12-01-preview"
 
-# Inicializar LangChain con Azure OpenAI
-llm = AzureChatOpenAI(
-    azure_deployment=deployment,
-    azure_endpoint=endpoint,
-    api_key=subscription_key,
-    api_version=api_version,
-    temperature=0.1,
-    max_tokens=500
-)
+# Modelo de chat del proveedor configurado (LLM_PROVIDER: Azure OpenAI o stub local)
+llm = create_chat_model(deployment, endpoint, subscription_key, api_version, temperature=0.1, max_tokens=500)
+
+# Instrucciones fijas (primeras en el prompt para la caché de prefijos del proveedor)
+CERTIFICATIONS_VS_SKILLS_PROMPT = """Eres un experto en evaluar certificaciones técnicas. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
+
+Compara las certificaciones del CV con las habilidades técnicas requeridas en el trabajo.
+Evalúa si las certificaciones del CV son relevantes para las habilidades técnicas requeridas. 
+- Si las certificaciones demuestran expertise directamente relacionado con las habilidades técnicas, score debe ser 0.6-1.0
+- Si las certificaciones son parcialmente relevantes o demuestran habilidades transferibles, score debe ser 0.3-0.6
+- Si las certificaciones no son relevantes, score debe ser 0.0-0.3
+
+La razón debe explicar qué certificaciones son relevantes para las habilidades técnicas y por qué.
+
+Responde en JSON sin bloques de código markdown (```json).: {"score": numero entre 0.0-1.0, "reason": "explicación detallada"}"""
+
+DIRECT_PROMPT = """Eres un experto en evaluar relevancia de certificaciones técnicas. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
+
+Compara las certificaciones del CV con las requeridas.
+Evalúa si las certificaciones del CV cumplen con los requerimientos. Si es directamente relevante, score debe ser 1.0. Si es parcialmente relevante, score debe ser 0.1-0.7. Si no es relevante, score debe ser 0.0.
+La razón debe explicar qué certificaciones cumplen con los requerimientos y cuáles faltan.
+
+Responde en JSON sin bloques de código markdown (```json).: {"score": numero entre 0.0-1.0, "reason": "explicación detallada"}"""
+
+REQUIRED_VS_CV_SKILLS_PROMPT = """Eres un experto en evaluar habilidades técnicas. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
+
+Compara las habilidades técnicas del CV con las certificaciones requeridas.
+Evalúa si las habilidades técnicas del CV demuestran conocimiento relacionado con las certificaciones requeridas.
+IMPORTANTE: Las habilidades técnicas NO son equivalentes a certificaciones, así que el score debe ser más conservador.
+- Si las habilidades cubren las áreas de las certificaciones requeridas, score debe ser 0.4-0.7 (NO más alto)
+- Si las habilidades cubren parcialmente, score debe ser 0.2-0.4
+- Si no hay relación, score debe ser 0.0-0.2
 
-def _compare_certifications_with_technical_skills(cv_certifications: list, job_technical_skills: list) -> dict:
+La razón debe explicar qué habilidades técnicas son relevantes para las certificaciones requeridas.
+
+Responde en JSON sin bloques de código markdown (```json).: {"score": numero entre 0.0-1.0, "reason": "explicación detallada"}"""
+
+# Penalización de las habilidades técnicas del CV frente a certificaciones requeridas.
+# El resultado por habilidades nunca supera este valor, así que con un score directo
+# >= SKILLS_PENALTY no puede ganar y no se espera (ni se lanza) esa llamada.
+SKILLS_PENALTY = 0.5
+
+# Las dos sub-comparaciones con IA corren en paralelo
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="certifications")
+
+def _submit(fn, *args):
+    """Envía fn al pool con el contexto actual (el conteo de tokens del análisis sigue en el hilo)"""
+    return _executor.submit(contextvars.copy_context().run, fn, *args)
+
+def _compare_certifications_with_technical_skills(cv_certifications: list, job_technical_skills: list, cv_profile: dict = None) -> dict:
     """
     Compara las certificaciones del CV con las habilidades técnicas requeridas del trabajo.
     Esta función se usa como fallback cuando no hay certificaciones específicas requeridas.
@@ -33,46 +79,35 @@ def _compare_certifications_with_technical_skills(cv_certifications: list, job_t
     Args:
         cv_certifications (list): Certificaciones del CV
         job_technical_skills (list): Habilidades técnicas requeridas en el trabajo
+        cv_profile (dict): Perfil de prompt del CV (engines/prompt_profile.py; opcional)
         
     Returns:
         dict: Resultado de la comparación
     """
+    # Certificaciones del catálogo: habilidades que implican, sin IA
+    local_result = local_certifications_vs_skills(cv_certifications, job_technical_skills)
+    if local_result is not None:
+        return local_result
+    
     try:
         # Preparar texto de certificaciones del CV
-        cv_text = ""
-        for cert in cv_certifications:
-            cv_text += f"- {cert.get('name', '')} ({cert.get('issuer', '')})\n"
+        cv_text = cv_profile["certifications_text"] if cv_profile else format_certifications(cv_certifications)
        
         # Preparar texto de habilidades técnicas
         job_text = "\n".join([f"- {skill}" for skill in job_technical_skills])
         
-        prompt_text = f"""Eres un experto en evaluar certificaciones técnicas. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
-
-Compara estas certificaciones del CV con las habilidades técnicas requeridas en el trabajo:
-
-Certificaciones del CV:
-{cv_text}
-
-Habilidades técnicas requeridas:
-{job_text}
-
-Evalúa si las certificaciones del CV son relevantes para las habilidades técnicas requeridas. 
-- Si las certificaciones demuestran expertise directamente relacionado con las habilidades técnicas, score debe ser 0.6-1.0
-- Si las certificaciones son parcialmente relevantes o demuestran habilidades transferibles, score debe ser 0.3-0.6
-- Si las certificaciones no son relevantes, score debe ser 0.0-0.3
-
-La razón debe explicar qué certificaciones son relevantes para las habilidades técnicas y por qué.
-
-Responde en JSON sin bloques de código markdown (```json).: {{"score": numero entre 0.0-1.0, "reason": "explicación detallada"}}"""
-
-        response = llm.invoke(prompt_text)
         try:
-            result = json.loads(response.content)
+            result = invoke_structured(
+                llm, "certifications.vs_skills", SCORE_SCHEMA, CERTIFICATIONS_VS_SKILLS_PROMPT, f"Certificaciones del CV:\n{cv_text}", f"Habilidades técnicas requeridas:\n{job_text}"
+            )
             return {
                 "score": result.get("score", 0),
                 "reason": f"{result.get('reason', '')}"
             }
-        except json.JSONDecodeError:
+        except CircuitOpenError:
+            # Modo degradado: sin fallback local, el aspecto queda como no evaluable
+            return degraded_result()
+        except StructuredOutputError:
             # Fallback simple
             return {
                 "score": 0.0,
@@ -83,7 +118,33 @@ Responde en JSON sin bloques de código markdown (```json).: {{"score": numero e
         print(f"Error al comparar certificaciones con habilidades técnicas: {e}")
         return {"score": 0.0, "reason": "Error en comparación"}
 
-def compare_certifications(cv_certifications: list, job_certifications: list, job_technical_skills: list = None, cv_technical_skills: list = None) -> dict:
+def local_certifications_result(cv_certifications: list, job_certifications: list, job_technical_skills: list = None, cv_technical_skills: list = None) -> dict:
+    """
+    Resultado sin IA: reglas de no evaluable y coincidencias del catálogo de certificaciones.
+    
+    Returns:
+        dict: Resultado de la comparación, o None si el caso debe ir a la IA
+    """
+    # Si el trabajo no requiere certificaciones específicas
+    if not job_certifications:
+        # Si el CV no tiene certificaciones tampoco
+        if not cv_certifications:
+            return {"score": -1.0, "reason": "No hay certificaciones requeridas ni certificaciones en el CV"}
+        if not job_technical_skills:
+            return {"score": -1.0, "reason": "No hay certificaciones requeridas ni habilidades técnicas para comparar"}
+        # Certificaciones del catálogo: habilidades que implican
+        return local_certifications_vs_skills(cv_certifications, job_technical_skills)
+    
+    if not cv_certifications and not cv_technical_skills:
+        return _combine_certification_results(None, None)
+    
+    # Coincidencia directa con el catálogo; las habilidades técnicas del CV solo cuentan si no la superan
+    cert_result = local_direct_comparison(cv_certifications, job_certifications) if cv_certifications else None
+    if cert_result is not None and (cert_result.get("score", 0) >= SKILLS_PENALTY or not cv_technical_skills):
+        return cert_result
+    return None
+
+def compare_certifications(cv_certifications: list, job_certifications: list, job_technical_skills: list = None, cv_technical_skills: list = None, cv_profile: dict = None) -> dict:
     """
     Compara las certificaciones del CV con las requeridas en la descripción de trabajo.
     Si no hay certificaciones requeridas, compara con las habilidades técnicas del trabajo.
@@ -94,78 +155,85 @@ def compare_certifications(cv_certifications: list, job_certifications: list, jo
         job_certifications (list): Certificaciones requeridas ["certificados aws", "certificados google cloud"]
         job_technical_skills (list, optional): Habilidades técnicas del trabajo (fallback cuando no hay certificaciones)
         cv_technical_skills (list, optional): Habilidades técnicas del CV (alternativa a certificaciones con penalización)
+        cv_profile (dict): Perfil de prompt del CV (engines/prompt_profile.py; opcional)
         
     Returns:
         dict: Resultado de la comparación
     """
-    # Si el trabajo no requiere certificaciones específicas
+    local_result = local_certifications_result(cv_certifications, job_certifications, job_technical_skills, cv_technical_skills)
+    if local_result is not None:
+        return local_result
+    
+    # Si el trabajo no requiere certificaciones específicas: certificaciones del CV vs habilidades técnicas del trabajo
     if not job_certifications:
-        # Si el CV no tiene certificaciones tampoco
-        if not cv_certifications:
-            return {"score": -1.0, "reason": "No hay certificaciones requeridas ni certificaciones en el CV"}
-        # Intentar comparar certificaciones del CV con habilidades técnicas del trabajo
-        if job_technical_skills and len(job_technical_skills) > 0:
-            return _compare_certifications_with_technical_skills(cv_certifications, job_technical_skills)
-        else:
-            return {"score": -1.0, "reason": "No hay certificaciones requeridas ni habilidades técnicas para comparar"}
+        return _compare_certifications_with_technical_skills(cv_certifications, job_technical_skills, cv_profile)
     
     # Si el trabajo SÍ requiere certificaciones
-    # Intentar comparación con certificaciones del CV primero
+    # Comparación directa: primero con el catálogo (sin IA); si no alcanza, con IA en paralelo
+    cert_result, cert_future = None, None
     if cv_certifications:
-        cert_result = _compare_certifications_direct(cv_certifications, job_certifications)
-    else:
-        cert_result = None
+        cert_result = local_direct_comparison(cv_certifications, job_certifications)
+        if cert_result is None:
+            cert_future = _submit(_compare_certifications_direct, cv_certifications, job_certifications, cv_profile)
     
-    # También intentar comparar las certificaciones requeridas con las technical skills del CV (con penalización)
+    # También comparar las certificaciones requeridas con las technical skills del CV (con penalización),
+    # salvo que el score directo ya la haga irrelevante
+    skills_future = None
     if cv_technical_skills and len(cv_technical_skills) > 0:
-        skills_result = _compare_required_certifications_with_cv_technical_skills(job_certifications, cv_technical_skills)
-    else:
-        skills_result = None
+        if not (cert_result and cert_result.get("score", 0) >= SKILLS_PENALTY):
+            skills_future = _submit(
+                _compare_required_certifications_with_cv_technical_skills, job_certifications, cv_technical_skills, cv_profile
+            )
+    
+    if cert_future is not None:
+        cert_result = cert_future.result()
+    
+    skills_result = None
+    if skills_future is not None:
+        if cert_result and cert_result.get("score", 0) >= SKILLS_PENALTY:
+            # Si aún no empezó no se ejecuta; si ya empezó, su resultado se descarta
+            skills_future.cancel()
+        else:
+            skills_result = skills_future.result()
     
     # Combinar resultados
     return _combine_certification_results(cert_result, skills_result)
 
-def _compare_certifications_direct(cv_certifications: list, job_certifications: list) -> dict:
+def _compare_certifications_direct(cv_certifications: list, job_certifications: list, cv_profile: dict = None) -> dict:
     """
     Comparación directa entre certificaciones del CV y certificaciones requeridas.
     
     Args:
         cv_certifications (list): Certificaciones del CV
         job_certifications (list): Certificaciones requeridas
+        cv_profile (dict): Perfil de prompt del CV (engines/prompt_profile.py; opcional)
         
     Returns:
         dict: Resultado de la comparación
     """
+    # Requisitos y certificaciones del catálogo: coincidencia directa sin IA
+    local_result = local_direct_comparison(cv_certifications, job_certifications)
+    if local_result is not None:
+        return local_result
+    
     try:
         # Preparar texto de certificaciones del CV
-        cv_text = ""
-        for cert in cv_certifications:
-            cv_text += f"- {cert.get('name', '')} ({cert.get('issuer', '')})\n"
+        cv_text = cv_profile["certifications_text"] if cv_profile else format_certifications(cv_certifications)
        
         # Preparar texto de certificaciones requeridas
         job_text = "\n".join([f"- {cert}" for cert in job_certifications])
-        prompt_text = f"""Eres un experto en evaluar relevancia de certificaciones técnicas. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
-
-Compara estas certificaciones del CV con las requeridas:
-
-CV:
-{cv_text}
-Requeridas:
-{job_text}
-
-Evalúa si las certificaciones del CV cumplen con los requerimientos. Si es directamente relevante, score debe ser 1.0. Si es parcialmente relevante, score debe ser 0.1-0.7. Si no es relevante, score debe ser 0.0.
-La razón debe explicar qué certificaciones cumplen con los requerimientos y cuáles faltan.
-
-Responde en JSON sin bloques de código markdown (```json).: {{"score": numero entre 0.0-1.0, "reason": "explicación detallada"}}"""
-
-        response = llm.invoke(prompt_text)
         try:
-            result = json.loads(response.content)
+            result = invoke_structured(
+                llm, "certifications.direct", SCORE_SCHEMA, DIRECT_PROMPT, f"CV:\n{cv_text}", f"Requeridas:\n{job_text}"
+            )
             return {
                 "score": result.get("score", 0),
                 "reason": result.get("reason", "")
             }
-        except json.JSONDecodeError:
+        except CircuitOpenError:
+            # Modo degradado: sin fallback local, el aspecto queda como no evaluable
+            return degraded_result()
+        except StructuredOutputError:
             return {
                 "score": 0.0,
                 "reason": "Error en respuesta de IA"
@@ -175,7 +243,7 @@ Responde en JSON sin bloques de código markdown (```json).: {{"score": numero e
         print(f"Error en comparación de certificaciones: {e}")
         return {"score": 0.0, "reason": "Error en comparación"}
 
-def _compare_required_certifications_with_cv_technical_skills(job_certifications: list, cv_technical_skills: list) -> dict:
+def _compare_required_certifications_with_cv_technical_skills(job_certifications: list, cv_technical_skills: list, cv_profile: dict = None) -> dict:
     """
     Compara las certificaciones requeridas del trabajo con las habilidades técnicas del CV.
     Esta es una comparación con penalización (las skills no son tan buenas como certificaciones).
@@ -183,47 +251,40 @@ def _compare_required_certifications_with_cv_technical_skills(job_certifications
     Args:
         job_certifications (list): Certificaciones requeridas en el trabajo
         cv_technical_skills (list): Habilidades técnicas del CV
+        cv_profile (dict): Perfil de prompt del CV (engines/prompt_profile.py; opcional)
         
     Returns:
         dict: Resultado de la comparación (con score penalizado)
     """
+    # Requisitos del catálogo: habilidades que implican contra las del CV, sin IA
+    local_result = local_required_vs_cv_skills(job_certifications, cv_technical_skills)
+    if local_result is not None:
+        return {
+            "score": round(local_result["score"] * SKILLS_PENALTY, 2),
+            "reason": f"[Skills del CV vs certificaciones requeridas - penalizado 50%] {local_result['reason']}"
+        }
+    
     try:
         # Preparar texto de certificaciones requeridas
         job_text = "\n".join([f"- {cert}" for cert in job_certifications])
         
         # Preparar texto de habilidades técnicas del CV
-        cv_text = "\n".join([f"- {skill}" for skill in cv_technical_skills])
+        cv_text = cv_profile["technical_skills_text"] if cv_profile else format_bullets(cv_technical_skills)
         
-        prompt_text = f"""Eres un experto en evaluar habilidades técnicas. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
-
-Compara las habilidades técnicas del CV con las certificaciones requeridas:
-
-Certificaciones requeridas:
-{job_text}
-
-Habilidades técnicas del CV:
-{cv_text}
-
-Evalúa si las habilidades técnicas del CV demuestran conocimiento relacionado con las certificaciones requeridas.
-IMPORTANTE: Las habilidades técnicas NO son equivalentes a certificaciones, así que el score debe ser más conservador.
-- Si las habilidades cubren las áreas de las certificaciones requeridas, score debe ser 0.4-0.7 (NO más alto)
-- Si las habilidades cubren parcialmente, score debe ser 0.2-0.4
-- Si no hay relación, score debe ser 0.0-0.2
-
-La razón debe explicar qué habilidades técnicas son relevantes para las certificaciones requeridas.
-
-Responde en JSON sin bloques de código markdown (```json).: {{"score": numero entre 0.0-1.0, "reason": "explicación detallada"}}"""
-
-        response = llm.invoke(prompt_text)
         try:
-            result = json.loads(response.content)
+            result = invoke_structured(
+                llm, "certifications.required_vs_cv_skills", SCORE_SCHEMA, REQUIRED_VS_CV_SKILLS_PROMPT, f"Habilidades técnicas del CV:\n{cv_text}", f"Certificaciones requeridas:\n{job_text}"
+            )
             # Aplicar penalización adicional del 50% porque son skills, no certificaciones
-            penalized_score = result.get("score", 0) * 0.5
+            penalized_score = result.get("score", 0) * SKILLS_PENALTY
             return {
                 "score": penalized_score,
                 "reason": f"[Skills del CV vs certificaciones requeridas - penalizado 50%] {result.get('reason', '')}"
             }
-        except json.JSONDecodeError:
+        except CircuitOpenError:
+            # Modo degradado: sin fallback local, el aspecto queda como no evaluable
+            return degraded_result()
+        except StructuredOutputError:
             return {
                 "score": 0.0,
                 "reason": "[Skills del CV vs certificaciones requeridas] Error en respuesta de IA"
@@ -1,9 +1,12 @@
-import json
 import os
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+
+from engines.experience_parser import experience_summary, local_experience_comparison, EXPERIENCE_COMPARISON_MODE
+from engines.prompt_profile import experience_prompt_text
+from comparators.llm_client import invoke_structured, degraded_result
+from cliente_llm.structured_output import StructuredOutputError, SCORE_SCHEMA
+from cliente_llm.circuit_breaker import CircuitOpenError
+from cliente_llm.providers import create_chat_model
 
 # Cargar variables de entorno
 load_dotenv()
@@ -15,69 +18,85 @@ deployment = "gpt-4o-mini"
 subscription_key = os.getenv("API_TOKEN")
 api_version = "2024-12-01-preview"
 
-# Inicializar LangChain con Azure OpenAI
-llm = AzureChatOpenAI(
-    azure_deployment=deployment,
-    azure_endpoint=endpoint,
-    api_key=subscription_key,
-    api_version=api_version,
-    temperature=0.1,
-    max_tokens=500
-)
+# Modelo de chat del proveedor configurado (LLM_PROVIDER: Azure OpenAI o stub local)
+llm = create_chat_model(deployment, endpoint, subscription_key, api_version, temperature=0.1, max_tokens=500)
+
+# Instrucción fija (primera en el prompt para la caché de prefijos del proveedor)
+SYSTEM_PROMPT = """Eres un experto en evaluar experiencia laboral. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
+
+Compara la experiencia del CV con la requerida.
+Evalúa si la experiencia del CV cumple con los requerimientos. Considera años de experiencia, posiciones similares, tecnologías, y habilidades mencionadas. Si cumple completamente, score debe ser 1.0. Si cumple parcialmente, score debe ser 0.1-0.7. Si no cumple, score debe ser 0.0.
+La razón debe explicar qué aspectos de la experiencia cumplen con los requerimientos y cuáles faltan.
+
+Responde en JSON sin bloques de código markdown (```json).: {"score": numero entre 0.0-1.0, "reason": "explicación detallada"}"""
+
+def local_experience_result(cv_experience: list, job_experience: str, cv_summary: dict = None) -> dict:
+    """
+    Resultado sin IA: no evaluable si falta un lado, o los casos evidentes por años en modo prefiltro.
+    
+    Returns:
+        dict: Resultado de la comparación, o None si el caso debe ir a la IA
+    """
+    if not job_experience:
+        return {"score": -1.0, "reason": "No hay experiencia requerida"}
+    
+    if not cv_experience:
+        return {"score": -1.0, "reason": "CV no especifica experiencia"}
+    
+    # Prefiltro: años claramente insuficientes, o el Job solo pide años y se cumplen
+    if EXPERIENCE_COMPARISON_MODE == "prefilter":
+        return local_experience_comparison(
+            cv_summary if cv_summary is not None else experience_summary(cv_experience), job_experience)
+    return None
 
-def compare_experience(cv_experience: list, job_experience: str) -> dict:
+def compare_experience(cv_experience: list, job_experience: str, cv_summary: dict = None, cv_profile: dict = None) -> dict:
     """
     Compara la experiencia del CV con la requerida en la descripción de trabajo.
+    Los casos evidentes por años se resuelven sin IA (engines/experience_parser.py).
     
     Args:
         cv_experience (list): Experiencia del CV [{"position": "...", "company": "...", "duration": "...", "description": "..."}]
         job_experience (str): Experiencia requerida "contar con mínimo 4 años trabajando en posiciones similares..."
+        cv_summary (dict): "experience_summary" guardado con el CV (se calcula si no se pasa)
+        cv_profile (dict): Perfil de prompt del CV (engines/prompt_profile.py; opcional)
         
     Returns:
         dict: Resultado de la comparación
     """
-    if not job_experience:
-        return {"score": -1.0, "reason": "No hay experiencia requerida"}
+    if cv_summary is None and cv_experience:
+        cv_summary = experience_summary(cv_experience)
     
-    if not cv_experience:
-        return {"score": -1.0, "reason": "CV no especifica experiencia"}
+    local_result = local_experience_result(cv_experience, job_experience, cv_summary)
+    if local_result is not None:
+        return local_result
     
     try:
-        # Preparar texto de experiencia del CV
-        cv_text = ""
-        for exp in cv_experience:
-            cv_text += f"- {exp.get('position', '')} en {exp.get('company', '')} ({exp.get('duration', '')})\n"
-            cv_text += f"  Descripción: {exp.get('description', '')}\n\n"
-        
-        prompt_text = f"""Eres un experto en evaluar experiencia laboral. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
-
-Compara la experiencia del CV con la requerida:
-
-CV:
-{cv_text}
-Requerida:
-{job_experience}
-
-Evalúa si la experiencia del CV cumple con los requerimientos. Considera años de experiencia, posiciones similares, tecnologías, y habilidades mencionadas. Si cumple completamente, score debe ser 1.0. Si cumple parcialmente, score debe ser 0.1-0.7. Si no cumple, score debe ser 0.0.
-La razón debe explicar qué aspectos de la experiencia cumplen con los requerimientos y cuáles faltan.
-
-Responde en JSON sin bloques de código markdown (```json).: {{"score": numero entre 0.0-1.0, "reason": "explicación detallada"}}"""
-
-        response = llm.invoke(prompt_text)
+        # Preparar texto de experiencia del CV (dentro del presupuesto de tokens del aspecto)
+        cv_text = experience_prompt_text(cv_experience, job_experience, "experience", cv_profile)
         
         try:
-            result = json.loads(response.content)
+            result = invoke_structured(
+                llm, "experience", SCORE_SCHEMA, SYSTEM_PROMPT, f"CV:\n{cv_text}", f"Requerida:\n{job_experience}"
+            )
             return {
                 "score": result.get("score", 0),
                 "reason": result.get("reason", "")
             }
-        except json.JSONDecodeError:
-            # Fallback simple
-            return {
-                "score": 0.0,
-                "reason": "Error en respuesta de IA"
-            }
+        except CircuitOpenError:
+            # Modo degradado: por años si el Job los menciona; si no, no evaluable
+            local_result = local_experience_comparison(cv_summary, job_experience, force=True)
+            return local_result if local_result is not None else degraded_result()
+        except StructuredOutputError:
+            # Fallback por años de experiencia
+            return _fallback_comparison(cv_summary, job_experience, "Error en respuesta de IA")
             
     except Exception as e:
         print(f"Error en comparación de experiencia: {e}")
-        return {"score": 0.0, "reason": "Error en comparación"}
+        return _fallback_comparison(cv_summary, job_experience, "Error en comparación")
+
+def _fallback_comparison(cv_summary: dict, job_experience: str, error_reason: str) -> dict:
+    """
+    Fallback sin IA: score por años si el Job los menciona; si no, el error original.
+    """
+    local_result = local_experience_comparison(cv_summary, job_experience, force=True)
+    return local_result if local_result is not None else {"score": 0.0, "reason": error_reason}
@@ -1,9 +1,10 @@
-import json
 import os
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+
+from comparators.llm_client import invoke_structured
+from cliente_llm.structured_output import StructuredOutputError, object_schema, STRING_SCHEMA
+from cliente_llm.circuit_breaker import CircuitOpenError
+from cliente_llm.providers import create_chat_model
 
 # Cargar variables de entorno
 load_dotenv()
@@ -15,15 +16,21 @@ deployment = "gpt-4o-mini"
 subscription_key = os.getenv("API_TOKEN")
 api_version = "2024-12-01-preview"
 
-# Inicializar LangChain con Azure OpenAI
-llm = AzureChatOpenAI(
-    azure_deployment=deployment,
-    azure_endpoint=endpoint,
-    api_key=subscription_key,
-    api_version=api_version,
-    temperature=0.1,
-    max_tokens=500
-)
+# Modelo de chat del proveedor configurado (LLM_PROVIDER: Azure OpenAI o stub local)
+llm = create_chat_model(deployment, endpoint, subscription_key, api_version, temperature=0.1, max_tokens=500)
+
+# Instrucción fija (primera en el prompt para la caché de prefijos del proveedor)
+SYSTEM_PROMPT = ("Eres un experto en evaluar compatibilidad de niveles de idioma. Compara el nivel de idioma del CV "
+                 "con el requerido y determina si lo cumple. Si el CV cumple o supera el requerido, score debe ser 1.0. "
+                 "Si no cumple, score debe ser 0.0. Responde ÚNICAMENTE con JSON válido que contenga: "
+                 "'compatible' (boolean), 'score' (0-1), 'reason' (string).")
+
+# Esquema de la respuesta
+LANGUAGE_LEVEL_SCHEMA = object_schema({
+    "compatible": {"type": "boolean"},
+    "score": {"type": "number", "minimum": 0, "maximum": 1},
+    "reason": STRING_SCHEMA,
+})
 
 def compare_language_levels(cv_level: str, required_level: str) -> dict:
     """
@@ -37,22 +44,16 @@ def compare_language_levels(cv_level: str, required_level: str) -> dict:
         dict: Resultado de la comparación
     """
     try:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "Eres un experto en evaluar compatibilidad de niveles de idioma. Responde ÚNICAMENTE con JSON válido que contenga: 'compatible' (boolean), 'score' (0-1), 'reason' (string)."),
-            ("human", f"Compara estos niveles de idioma y determina si el nivel del CV cumple con el requerido:\nCV: {cv_level}\nRequerido: {required_level}\n\nSi el CV cumple o supera el requerido, score debe ser 1.0. Si no cumple, score debe ser 0.0. Responde en formato JSON.")
-        ])
-        
-        chain = prompt | llm
-        response = chain.invoke({"cv_level": cv_level, "required_level": required_level})
-        
         try:
-            result = json.loads(response.content)
+            result = invoke_structured(
+                llm, "languages", LANGUAGE_LEVEL_SCHEMA, SYSTEM_PROMPT, f"CV: {cv_level}", f"Requerido: {required_level}"
+            )
             return {
                 "compatible": result.get("compatible", False),
                 "score": result.get("score", 0),
                 "reason": result.get("reason", "")
             }
-        except json.JSONDecodeError:
+        except (StructuredOutputError, CircuitOpenError):
             # Fallback simple
             compatible = cv_level.upper() >= required_level.upper() if cv_level and required_level else False
             return {
@@ -65,6 +66,26 @@ def compare_language_levels(cv_level: str, required_level: str) -> dict:
         print(f"Error en comparación: {e}")
         return {"compatible": False, "score": 0.0, "reason": "Error en comparación"}
 
+def local_languages_result(cv_languages: dict, job_languages: dict) -> dict:
+    """
+    Resultado sin IA: no evaluable si falta un lado, o 0.0 si el CV no tiene ninguno de los idiomas requeridos.
+    
+    Returns:
+        dict: Resultado de la comparación, o None si hay que comparar niveles con IA
+    """
+    if not job_languages:
+        return {"score": -1.0, "reason": "No hay idiomas requeridos"}
+    
+    if not cv_languages:
+        return {"score": -1.0, "reason": "CV no especifica idiomas"}
+    
+    if not any(cv_languages.get(language) for language in job_languages):
+        return {
+            "score": 0.0,
+            "reason": f"No se encontraron coincidencias entre los {len(cv_languages)} idiomas del CV y los {len(job_languages)} requeridos."
+        }
+    return None
+
 def compare_languages(cv_languages: dict, job_languages: dict) -> dict:
     """
     Compara los idiomas del CV con los requeridos en la descripción de trabajo.
@@ -76,11 +97,9 @@ def compare_languages(cv_languages: dict, job_languages: dict) -> dict:
     Returns:
         dict: Resultado de la comparación
     """
-    if not job_languages:
-        return {"score": -1.0, "reason": "No hay idiomas requeridos"}
-    
-    if not cv_languages:
-        return {"score": -1.0, "reason": "CV no especifica idiomas"}
+    local_result = local_languages_result(cv_languages, job_languages)
+    if local_result is not None:
+        return local_result
     
     matched_languages = []
     missing_languages = []
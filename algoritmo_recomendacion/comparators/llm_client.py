@@ -0,0 +1,66 @@
+"""
+Llamada a la IA compartida por los comparadores.
+Arma los mensajes con el orden de engines/prompt_layout.py (instrucción fija, lado compartido,
+lado variable), pide salida estructurada con el esquema del comparador
+(src/cliente_llm/structured_output.py) y registra los tokens cacheados que reporta la respuesta.
+"""
+
+import os
+import sys
+from typing import Any, Dict, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+# Agregar src al path para el cliente de IA compartido con los extractores
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+from cliente_llm.structured_output import generate_structured
+
+from engines.prompt_layout import layout_prompt
+from engines.token_budget import record_llm_usage
+
+_MESSAGE_TYPES = {"system": SystemMessage, "human": HumanMessage}
+
+
+def _usage_tokens(llm_output: Any, message: Any) -> Tuple[int, int]:
+    """(tokens de entrada, tokens cacheados) de una respuesta"""
+    usage_metadata = getattr(message, "usage_metadata", None)
+    if usage_metadata:
+        details = usage_metadata.get("input_token_details") or {}
+        return usage_metadata.get("input_tokens", 0), details.get("cache_read", 0) or 0
+    token_usage = (llm_output or {}).get("token_usage") or {}
+    details = token_usage.get("prompt_tokens_details") or {}
+    return token_usage.get("prompt_tokens", 0), details.get("cached_tokens", 0) or 0
+
+
+def _record_usage(result: Any) -> None:
+    """Registra los tokens de un LLMResult en el conteo del análisis en curso"""
+    generation = result.generations[0][0]
+    record_llm_usage(*_usage_tokens(result.llm_output, getattr(generation, "message", None)))
+
+
+def degraded_result() -> Dict[str, Any]:
+    """Resultado de un aspecto sin fallback local mientras el circuito de la IA está abierto"""
+    return {"score": -1.0, "reason": "IA no disponible (modo degradado): aspecto no evaluado"}
+
+
+def invoke_structured(llm: Any, call_site: str, schema: Dict[str, Any], system: str, cv_section: str, job_section: str) -> Any:
+    """
+    Ejecuta un prompt con el orden apto para la caché de prefijos y salida estructurada.
+
+    Args:
+        llm: Modelo de chat de LangChain
+        call_site (str): Nombre del punto de llamada (contadores de salida estructurada)
+        schema (dict): Esquema JSON de la respuesta
+        system (str): Instrucción de sistema fija del comparador
+        cv_section (str): Datos del CV
+        job_section (str): Datos del Job
+
+    Returns:
+        Respuesta validada contra el esquema
+
+    Raises:
+        StructuredOutputError: Si la respuesta no cumple el esquema tras el reintento
+        CircuitOpenError: Si el circuito del deployment está abierto
+    """
+    messages = [_MESSAGE_TYPES[role](content=content) for role, content in layout_prompt(system, cv_section, job_section)]
+    return generate_structured(llm, call_site, schema, messages, on_result=_record_usage)
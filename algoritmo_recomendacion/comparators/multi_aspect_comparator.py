@@ -0,0 +1,140 @@
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+from dotenv import load_dotenv
+
+from engines.token_budget import INPUT_TOKEN_BUDGETS, fit_experience, record_input
+from comparators.llm_client import invoke_structured
+from cliente_llm.structured_output import StructuredOutputError, object_schema, STRING_SCHEMA
+from cliente_llm.circuit_breaker import CircuitOpenError
+from cliente_llm.providers import create_chat_model
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Configuración de Azure OpenAI
+endpoint = "https://invuniandesai-2.openai.azure.com/"
+model_name = "gpt-4o-mini"
+deployment = "gpt-4o-mini"
+subscription_key = os.getenv("API_TOKEN")
+api_version = "2024-12-01-preview"
+
+# Modelo de chat del proveedor configurado (LLM_PROVIDER), una sola respuesta con los 8 aspectos
+llm = create_chat_model(deployment, endpoint, subscription_key, api_version, temperature=0.1, max_tokens=1500)
+
+# Qué evaluar en cada aspecto (mismos criterios que los comparadores individuales)
+ASPECT_INSTRUCTIONS = {
+    "technical_skills": "habilidades técnicas del CV vs las requeridas; tecnologías relacionadas cuentan aunque no sean iguales",
+    "experience": "experiencia del CV vs la requerida: años, posiciones similares y tecnologías",
+    "education": "educación del CV vs los requisitos educativos: nivel, títulos equivalentes y campos afines",
+    "certifications": "certificaciones del CV vs las requeridas; si el Job no pide certificaciones, su relevancia para las "
+                      "habilidades técnicas del Job; las habilidades técnicas del CV cuentan como alternativa con máximo 0.5",
+    "languages": "idiomas del CV vs los requeridos, considerando el nivel",
+    "location": "ubicación del CV vs la del Job (misma ciudad o área metropolitana)",
+    "responsibilities": "experiencia del CV vs las responsabilidades del cargo",
+    "soft_skills": "habilidades blandas del CV vs las requeridas; sinónimos en español/inglés cuentan"
+}
+
+# Campos precalculados que no aportan al prompt
+_PRECOMPUTED_KEYS = ("canonical_skills", "experience_summary", "prompt_profile")
+
+
+def compact_cv(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """CV sin datos precalculados ni datos personales (solo la ubicación)"""
+    compact = {key: value for key, value in cv_data.items() if key not in _PRECOMPUTED_KEYS and key != "personal"}
+    compact["location"] = (cv_data.get("personal") or {}).get("location", "")
+    return compact
+
+
+def compact_job(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Job sin datos precalculados"""
+    return {key: value for key, value in job_data.items() if key not in _PRECOMPUTED_KEYS}
+
+
+def validate_aspect_result(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    Valida el objeto de un aspecto: {"score": 0-1 o -1.0, "reason": texto no vacío}.
+
+    Returns:
+        dict: {"score", "reason"} normalizado, o None si no cumple el esquema
+    """
+    if not isinstance(value, dict):
+        return None
+    score, reason = value.get("score"), value.get("reason")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        return None
+    if not (0.0 <= score <= 1.0 or score == -1):
+        return None
+    if not isinstance(reason, str) or not reason.strip():
+        return None
+    return {"score": round(float(score), 2), "reason": reason.strip()}
+
+
+def aspects_schema(aspects: Iterable[str]) -> Dict[str, Any]:
+    """
+    Esquema de la respuesta: {aspecto: {"score", "reason"}} para cada aspecto pedido.
+    El rango del score (0-1 o -1.0) se valida por aspecto en validate_aspect_result,
+    para que un aspecto fuera de rango solo haga caer ese aspecto a su comparador individual.
+    """
+    aspect_schema = object_schema({"score": {"type": "number"}, "reason": STRING_SCHEMA})
+    return object_schema({aspect: aspect_schema for aspect in aspects})
+
+
+def compare_all_aspects(cv_data: dict, job_data: dict, aspects: Iterable[str] = None) -> dict:
+    """
+    Compara los aspectos pedidos del CV contra el Job en un solo prompt de IA.
+    Solo recibe los aspectos que no se resolvieron sin IA: ComparatorMain aplica antes las
+    reglas locales de cada comparador (no evaluable, experiencia, educación, catálogo, similitud).
+
+    Args:
+        cv_data (dict): CV estructurado
+        job_data (dict): Job estructurado
+        aspects (list): Aspectos a evaluar (por defecto los 8 de ComparatorMain)
+
+    Returns:
+        dict: {aspecto: {"score", "reason"}} solo con los aspectos que pasan la validación;
+              los que faltan deben evaluarse con su comparador individual
+    """
+    aspects = [aspect for aspect in (aspects or ASPECT_INSTRUCTIONS) if aspect in ASPECT_INSTRUCTIONS]
+    if not aspects:
+        return {}
+
+    try:
+        cv_compact = compact_cv(cv_data)
+        job_text = json.dumps(compact_job(job_data), ensure_ascii=False, separators=(",", ":"))
+        if isinstance(cv_compact.get("experience"), list):
+            cv_compact["experience"], budget_stats = fit_experience(
+                cv_compact["experience"], job_text, INPUT_TOKEN_BUDGETS["experience"])
+            record_input("multi_aspect", budget_stats)
+        cv_text = json.dumps(cv_compact, ensure_ascii=False, separators=(",", ":"))
+        criteria = "\n".join(f"- {aspect}: {ASPECT_INSTRUCTIONS[aspect]}" for aspect in aspects)
+
+        # Instrucción fija (para los mismos aspectos), luego el lado compartido del lote y el variable
+        system = f"""Eres un experto en selección de personal. Responde ÚNICAMENTE con JSON válido.
+
+Compara el CV con la descripción de trabajo en cada aspecto:
+{criteria}
+
+Para cada aspecto: score 1.0 si cumple completamente, 0.1-0.7 si cumple parcialmente, 0.0 si no cumple.
+Si el Job no pide nada de ese aspecto o el CV no tiene información para evaluarlo, score debe ser -1.0.
+La razón debe explicar en máximo dos frases qué cumple y qué falta.
+
+Responde en JSON sin bloques de código markdown (```json), con exactamente estas llaves:
+{{{", ".join(f'"{aspect}": {{"score": numero, "reason": "explicación"}}' for aspect in aspects)}}}"""
+
+        try:
+            result = invoke_structured(llm, "multi_aspect", aspects_schema(aspects), system, f"CV:\n{cv_text}", f"JOB:\n{job_text}")
+        except (StructuredOutputError, CircuitOpenError):
+            print("Sin respuesta válida de IA (multi-aspecto), se usan los comparadores individuales")
+            return {}
+
+        validated = {}
+        for aspect in aspects:
+            value = validate_aspect_result(result.get(aspect))
+            if value is not None:
+                validated[aspect] = value
+        return validated
+
+    except Exception as e:
+        print(f"Error en comparación multi-aspecto: {e}")
+        return {}
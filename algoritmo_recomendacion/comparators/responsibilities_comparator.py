@@ -1,9 +1,11 @@
-import json
 import os
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+
+from engines.prompt_profile import experience_prompt_text
+from comparators.llm_client import invoke_structured, degraded_result
+from cliente_llm.structured_output import StructuredOutputError, SCORE_SCHEMA
+from cliente_llm.circuit_breaker import CircuitOpenError
+from cliente_llm.providers import create_chat_model
 
 # Cargar variables de entorno
 load_dotenv()
@@ -15,66 +17,68 @@ deployment = "gpt-4o-mini"
 subscription_key = os.getenv("API_TOKEN")
 api_version = "2024-12-01-preview"
 
-# Inicializar LangChain con Azure OpenAI
-llm = AzureChatOpenAI(
-    azure_deployment=deployment,
-    azure_endpoint=endpoint,
-    api_key=subscription_key,
-    api_version=api_version,
-    temperature=0.1,
-    max_tokens=500
-)
+# Modelo de chat del proveedor configurado (LLM_PROVIDER: Azure OpenAI o stub local)
+llm = create_chat_model(deployment, endpoint, subscription_key, api_version, temperature=0.1, max_tokens=500)
+
+# Instrucción fija (primera en el prompt para la caché de prefijos del proveedor)
+SYSTEM_PROMPT = """Eres un experto en evaluar compatibilidad entre responsabilidades laborales y experiencia previa. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
+
+Compara la experiencia del CV con las responsabilidades requeridas.
+Evalúa si la experiencia del CV demuestra capacidad para cumplir las responsabilidades. Si la experiencia es directamente relevante, score debe ser 1.0. Si es parcialmente relevante, score debe ser 0.1-0.7. Si no es relevante, score debe ser 0.0.
+La razón debe explicar qué responsabilidades puede cumplir basándose en la experiencia y cuáles faltan.
+
+Responde en JSON sin bloques de código markdown (```json).: {"score": numero entre 0.0-1.0, "reason": "explicación detallada"}"""
 
-def compare_responsibilities(cv_experience: list, job_responsibilities: list) -> dict:
+def local_responsibilities_result(cv_experience: list, job_responsibilities: list) -> dict:
+    """
+    Resultado sin IA: no evaluable si falta un lado.
+    
+    Returns:
+        dict: Resultado de la comparación, o None si el caso debe ir a la IA
+    """
+    if not job_responsibilities:
+        return {"score": -1.0, "reason": "No hay responsabilidades requeridas"}
+    
+    if not cv_experience:
+        return {"score": -1.0, "reason": "CV no especifica experiencia"}
+    return None
+
+def compare_responsibilities(cv_experience: list, job_responsibilities: list, cv_profile: dict = None) -> dict:
     """
     Compara la experiencia del CV con las responsabilidades requeridas en la descripción de trabajo.
     
     Args:
         cv_experience (list): Experiencia del CV [{"position": "...", "company": "...", "duration": "...", "description": "..."}]
         job_responsibilities (list): Responsabilidades requeridas ["supervisar las actividades de planificación...", "monitorear y reportar..."]
+        cv_profile (dict): Perfil de prompt del CV (engines/prompt_profile.py; opcional)
         
     Returns:
         dict: Resultado de la comparación
     """
-    if not job_responsibilities:
-        return {"score": -1.0, "reason": "No hay responsabilidades requeridas"}
-    
-    if not cv_experience:
-        return {"score": -1.0, "reason": "CV no especifica experiencia"}
+    local_result = local_responsibilities_result(cv_experience, job_responsibilities)
+    if local_result is not None:
+        return local_result
     
     try:
-        # Preparar texto de experiencia del CV
-        cv_text = ""
-        for exp in cv_experience:
-            cv_text += f"- {exp.get('position', '')} en {exp.get('company', '')} ({exp.get('duration', '')})\n"
-            cv_text += f"  Descripción: {exp.get('description', '')}\n\n"
+        # Preparar texto de experiencia del CV (dentro del presupuesto de tokens del aspecto)
+        cv_text = experience_prompt_text(
+            cv_experience, "\n".join(str(resp) for resp in job_responsibilities), "responsibilities", cv_profile)
         
         # Preparar texto de responsabilidades requeridas
         job_text = "\n".join([f"- {resp}" for resp in job_responsibilities])
         
-        prompt_text = f"""Eres un experto en evaluar compatibilidad entre responsabilidades laborales y experiencia previa. Responde ÚNICAMENTE con JSON válido que contenga: 'score' IMPORTANTE QUE SEA UN NUMERO ENTRE 0 Y 1, 'reason' (string).
-
-Compara la experiencia del CV con las responsabilidades requeridas:
-
-CV:
-{cv_text}
-Responsabilidades requeridas:
-{job_text}
-
-Evalúa si la experiencia del CV demuestra capacidad para cumplir las responsabilidades. Si la experiencia es directamente relevante, score debe ser 1.0. Si es parcialmente relevante, score debe ser 0.1-0.7. Si no es relevante, score debe ser 0.0.
-La razón debe explicar qué responsabilidades puede cumplir basándose en la experiencia y cuáles faltan.
-
-Responde en JSON sin bloques de código markdown (```json).: {{"score": numero entre 0.0-1.0, "reason": "explicación detallada"}}"""
-
-        response = llm.invoke(prompt_text)
-        
         try:
-            result = json.loads(response.content)
+            result = invoke_structured(
+                llm, "responsibilities", SCORE_SCHEMA, SYSTEM_PROMPT, f"CV:\n{cv_text}", f"Responsabilidades requeridas:\n{job_text}"
+            )
             return {
                 "score": result.get("score", 0),
                 "reason": result.get("reason", "")
             }
-        except json.JSONDecodeError:
+        except CircuitOpenError:
+            # Modo degradado: sin fallback local, el aspecto queda como no evaluable
+            return degraded_result()
+        except StructuredOutputError:
             # Fallback simple
             return {
                 "score": 0.0,
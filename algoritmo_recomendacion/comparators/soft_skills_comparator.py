@@ -1,9 +1,12 @@
-import json
 import os
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+
+from engines.skill_similarity import get_skill_similarity_engine, SKILLS_COMPARISON_MODE, PREFILTER_ACCEPT_SCORE
+from engines.prompt_profile import format_bullets
+from comparators.llm_client import invoke_structured
+from cliente_llm.structured_output import StructuredOutputError, SCORE_SCHEMA
+from cliente_llm.circuit_breaker import CircuitOpenError
+from cliente_llm.providers import create_chat_model
 
 # Cargar variables de entorno
 load_dotenv()
@@ -15,17 +18,43 @@ deployment = "gpt-4o-mini"
 subscription_key = os.getenv("API_TOKEN")
 api_version = "2024-12-01-preview"
 
-# Inicializar LangChain con Azure OpenAI
-llm = AzureChatOpenAI(
-    azure_deployment=deployment,
-    azure_endpoint=endpoint,
-    api_key=subscription_key,
-    api_version=api_version,
-    temperature=0.1,
-    max_tokens=500
-)
+# Modelo de chat del proveedor configurado (LLM_PROVIDER: Azure OpenAI o stub local)
+llm = create_chat_model(deployment, endpoint, subscription_key, api_version, temperature=0.1, max_tokens=500)
+
+# Instrucción fija (primera en el prompt para la caché de prefijos del proveedor)
+SYSTEM_PROMPT = """Eres un experto en evaluar compatibilidad de habilidades blandas.
+Analiza las habilidades blandas del CV y determina cuáles cumplen con los requerimientos del trabajo.
+No Descartes de una analiza si tienen relacion, no tienen que ser exactamente igual para que se relacionen.
+
+Evalúa la compatibilidad general entre las habilidades blandas del CV y las requeridas.
+Score debe ser 1.0 para compatibilidad perfecta, 0.8-0.9 para muy buena, 0.3-0.7 para regular, 0.0-0.2 para baja.
+La razón debe explicar qué habilidades coinciden, cuáles faltan y por qué.
+
+Responde ÚNICAMENTE con JSON válido, sin bloques de código markdown (```json), que contenga:
+- "score": puntaje entre 0-1
+- "reason": explicación detallada de la compatibilidad"""
+
+def local_soft_skills_result(cv_skills: list, job_skills: list) -> dict:
+    """
+    Resultado sin IA: no evaluable si falta un lado, o la similitud local en modo local/prefiltro.
+    
+    Returns:
+        dict: Resultado de la comparación, o None si el caso debe ir a la IA
+    """
+    if not job_skills:
+        return {"score": -1.0, "reason": "No hay habilidades blandas requeridas"}
+    
+    if not cv_skills:
+        return {"score": -1.0, "reason": "CV no especifica habilidades blandas"}
+    
+    # Modo local o prefiltro: similitud sin IA (n-gramas + sinónimos)
+    if SKILLS_COMPARISON_MODE in ("local", "prefilter"):
+        local_result = _fallback_comparison(cv_skills, job_skills)
+        if SKILLS_COMPARISON_MODE == "local" or local_result["score"] >= PREFILTER_ACCEPT_SCORE:
+            return local_result
+    return None
 
-def compare_soft_skills(cv_skills: list, job_skills: list) -> dict:
+def compare_soft_skills(cv_skills: list, job_skills: list, cv_profile: dict = None) -> dict:
     """
     Compara las habilidades blandas del CV con las requeridas en la descripción de trabajo.
     Optimizado para hacer toda la comparación en un solo prompt de IA.
@@ -33,53 +62,24 @@ def compare_soft_skills(cv_skills: list, job_skills: list) -> dict:
     Args:
         cv_skills (list): Lista de habilidades blandas del CV
         job_skills (list): Lista de habilidades blandas requeridas
+        cv_profile (dict): Perfil de prompt del CV (engines/prompt_profile.py; opcional)
         
     Returns:
         dict: Resultado de la comparación
     """
-    if not job_skills:
-        return {"score": -1.0, "reason": "No hay habilidades blandas requeridas"}
-    
-    if not cv_skills:
-        return {"score": -1.0, "reason": "CV no especifica habilidades blandas"}
+    local_result = local_soft_skills_result(cv_skills, job_skills)
+    if local_result is not None:
+        return local_result
     
     try:
         # Crear el prompt para comparar todas las habilidades de una vez
-        cv_skills_str = "\n".join([f"- {skill}" for skill in cv_skills])
+        cv_skills_str = cv_profile["soft_skills_text"] if cv_profile else format_bullets(cv_skills)
         job_skills_str = "\n".join([f"- {skill}" for skill in job_skills])
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """Eres un experto en evaluar compatibilidad de habilidades blandas. 
-            Analiza las habilidades blandas del CV y determina cuáles cumplen con los requerimientos del trabajo.
-            No Descartes de una analiza si tienen relacion, no tienen que ser exactamente igual para que se relacionen.
-            
-            Responde ÚNICAMENTE con JSON válido que contenga:
-            - "score": puntaje entre 0-1
-            - "reason": explicación detallada de la compatibilidad"""),
-            
-            ("human", f"""Compara estas habilidades blandas:
-
-HABILIDADES BLANDAS DEL CV:
-{cv_skills_str}
-
-HABILIDADES BLANDAS REQUERIDAS:
-{job_skills_str}
-
-Evalúa la compatibilidad general entre las habilidades blandas del CV y las requeridas.
-Score debe ser 1.0 para compatibilidad perfecta, 0.8-0.9 para muy buena, 0.3-0.7 para regular, 0.0-0.2 para baja.
-La razón debe explicar qué habilidades coinciden, cuáles faltan y por qué.
-
-Responde en formato JSON. sin bloques de código markdown (```json).""")
-        ])
-        
-        chain = prompt | llm
-        response = chain.invoke({
-            "cv_skills": cv_skills_str, 
-            "job_skills": job_skills_str
-        })
-        
         try:
-            result = json.loads(response.content)
+            result = invoke_structured(
+                llm, "soft_skills", SCORE_SCHEMA, SYSTEM_PROMPT, f"HABILIDADES BLANDAS DEL CV:\n{cv_skills_str}", f"HABILIDADES BLANDAS REQUERIDAS:\n{job_skills_str}"
+            )
             
             # Procesar los resultados
             score = result.get("score", 0)
@@ -90,8 +90,8 @@ Responde en formato JSON. sin bloques de código markdown (```json).""")
                 "reason": reason
             }
             
-        except json.JSONDecodeError:
-            print("Error al parsear JSON de IA, usando fallback simple")
+        except (StructuredOutputError, CircuitOpenError):
+            print("Sin respuesta válida de IA, usando fallback simple")
             return _fallback_comparison(cv_skills, job_skills)
             
     except Exception as e:
@@ -100,49 +100,11 @@ Responde en formato JSON. sin bloques de código markdown (```json).""")
 
 def _fallback_comparison(cv_skills: list, job_skills: list) -> dict:
     """
-    Comparación simple de fallback cuando falla la IA.
+    Comparación local cuando falla la IA (o en modo local/prefiltro).
+    Usa similitud de n-gramas de caracteres y sinónimos, así "Postgres" cubre "PostgreSQL".
     """
-    matched_count = 0
-    total_score = 0
-    matched_details = []
-    
-    for required_skill in job_skills:
-        best_score = 0
-        best_match = ""
-        
-        for cv_skill in cv_skills:
-            cv_lower = cv_skill.lower().strip()
-            required_lower = required_skill.lower().strip()
-            
-            # Comparación simple por texto
-            if cv_lower == required_lower:
-                score = 1.0
-            elif cv_lower in required_lower or required_lower in cv_lower:
-                score = 0.7
-            else:
-                score = 0.0
-            
-            if score > best_score:
-                best_score = score
-                best_match = cv_skill
-        
-        if best_score > 0.5:
-            matched_count += 1
-            matched_details.append(f"{best_match} coincide con {required_skill}")
-        
-        total_score += best_score
-    
-    avg_score = total_score / len(job_skills) if job_skills else 0
-    
-    # Crear razón explicativa
-    if matched_count == 0:
-        reason = f"No se encontraron coincidencias entre las {len(cv_skills)} habilidades blandas del CV y las {len(job_skills)} requeridas."
-    elif matched_count == len(job_skills):
-        reason = f"Todas las {len(job_skills)} habilidades blandas requeridas tienen coincidencias en el CV. {', '.join(matched_details[:3])}."
-    else:
-        reason = f"{matched_count} de {len(job_skills)} habilidades blandas requeridas tienen coincidencias. {', '.join(matched_details[:3])}."
-    
+    result = get_skill_similarity_engine().compare(cv_skills, job_skills, "blandas")
     return {
-        "score": round(avg_score, 2),
-        "reason": reason
+        "score": result["score"],
+        "reason": result["reason"]
     }
@@ -0,0 +1,2 @@
+# Motores locales (sin IA)
+# Proyecto de Tesis - Universidad de los Andes
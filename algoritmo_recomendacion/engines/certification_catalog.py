@@ -0,0 +1,495 @@
+"""
+Catálogo local de certificaciones.
+La mayoría de certificaciones reales salen de un catálogo finito (AWS, Azure, GCP, Scrum,
+PMP, Oracle, Cisco...). Cada una tiene proveedor, familia, nivel, alias y las habilidades
+que implica; los alias se buscan con un trie por palabras, igual que las habilidades.
+
+compare_certifications resuelve con este índice las coincidencias directas y las
+implicadas por habilidades, y solo llama a la IA para nombres fuera del catálogo.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from engines.skill_canonicalizer import build_alias_trie, canonical_skill_key, skill_ids, trie_find
+
+# Niveles dentro de una familia
+FUNDAMENTALS, ASSOCIATE, PROFESSIONAL, EXPERT = 1, 2, 3, 4
+
+
+class Certification(NamedTuple):
+    """Certificación del catálogo"""
+    key: str
+    name: str
+    vendor: str
+    family: str
+    level: int
+    aliases: Tuple[str, ...]
+    skills: Tuple[str, ...]  # la primera es la habilidad principal
+    tags: Tuple[str, ...] = ()  # áreas ("cloud", "security"...)
+
+
+CERTIFICATION_CATALOG = [
+    # AWS
+    Certification("aws-ccp", "AWS Certified Cloud Practitioner", "aws", "aws cloud", FUNDAMENTALS,
+                  ("aws certified cloud practitioner", "aws cloud practitioner", "cloud practitioner", "aws ccp"),
+                  ("aws", "cloud computing"), ("cloud",)),
+    Certification("aws-saa", "AWS Certified Solutions Architect - Associate", "aws", "aws architect", ASSOCIATE,
+                  ("aws certified solutions architect associate", "aws solutions architect associate",
+                   "solutions architect associate", "aws saa", "aws certified solutions architect",
+                   "aws solutions architect"),
+                  ("aws", "cloud computing"), ("cloud",)),
+    Certification("aws-sap", "AWS Certified Solutions Architect - Professional", "aws", "aws architect", PROFESSIONAL,
+                  ("aws certified solutions architect professional", "aws solutions architect professional",
+                   "solutions architect professional", "aws sap"),
+                  ("aws", "cloud computing"), ("cloud",)),
+    Certification("aws-dva", "AWS Certified Developer - Associate", "aws", "aws developer", ASSOCIATE,
+                  ("aws certified developer associate", "aws certified developer", "aws developer associate",
+                   "aws developer", "aws dva"),
+                  ("aws", "cloud computing"), ("cloud",)),
+    Certification("aws-soa", "AWS Certified SysOps Administrator - Associate", "aws", "aws operations", ASSOCIATE,
+                  ("aws certified sysops administrator", "aws sysops administrator", "sysops administrator",
+                   "aws cloudops engineer", "aws soa"),
+                  ("aws", "cloud computing", "linux"), ("cloud",)),
+    Certification("aws-dop", "AWS Certified DevOps Engineer - Professional", "aws", "aws devops", PROFESSIONAL,
+                  ("aws certified devops engineer professional", "aws certified devops engineer",
+                   "aws devops engineer professional", "aws devops engineer", "aws dop"),
+                  ("aws", "devops", "ci/cd", "cloud computing"), ("cloud", "devops")),
+    Certification("aws-scs", "AWS Certified Security - Specialty", "aws", "aws security", EXPERT,
+                  ("aws certified security specialty", "aws security specialty", "aws certified security", "aws scs"),
+                  ("aws", "seguridad informatica", "cloud computing"), ("cloud", "security")),
+    Certification("aws-dea", "AWS Certified Data Engineer - Associate", "aws", "aws data", ASSOCIATE,
+                  ("aws certified data engineer", "aws data engineer", "aws data analytics specialty",
+                   "aws certified data analytics"),
+                  ("aws", "analisis de datos", "sql"), ("cloud", "data")),
+    Certification("aws-mla", "AWS Certified Machine Learning", "aws", "aws machine learning", EXPERT,
+                  ("aws certified machine learning specialty", "aws certified machine learning engineer",
+                   "aws machine learning specialty", "aws certified machine learning", "aws machine learning"),
+                  ("aws", "machine learning", "python"), ("cloud", "data")),
+    # Microsoft
+    Certification("az-900", "Microsoft Azure Fundamentals (AZ-900)", "microsoft", "azure", FUNDAMENTALS,
+                  ("az-900", "az 900", "az900", "azure fundamentals", "microsoft azure fundamentals"),
+                  ("azure", "cloud computing"), ("cloud",)),
+    Certification("az-104", "Microsoft Azure Administrator (AZ-104)", "microsoft", "azure", ASSOCIATE,
+                  ("az-104", "az 104", "az104", "azure administrator", "azure administrator associate"),
+                  ("azure", "cloud computing", "windows"), ("cloud",)),
+    Certification("az-204", "Microsoft Azure Developer (AZ-204)", "microsoft", "azure developer", ASSOCIATE,
+                  ("az-204", "az 204", "az204", "azure developer", "azure developer associate"),
+                  ("azure", "c#", "cloud computing"), ("cloud",)),
+    Certification("az-305", "Microsoft Azure Solutions Architect Expert (AZ-305)", "microsoft", "azure", EXPERT,
+                  ("az-305", "az 305", "az305", "az-303", "az-304", "azure solutions architect",
+                   "azure solutions architect expert"),
+                  ("azure", "cloud computing"), ("cloud",)),
+    Certification("az-400", "Microsoft DevOps Engineer Expert (AZ-400)", "microsoft", "azure devops", EXPERT,
+                  ("az-400", "az 400", "az400", "azure devops engineer", "azure devops engineer expert",
+                   "devops engineer expert"),
+                  ("azure", "devops", "ci/cd"), ("cloud", "devops")),
+    Certification("az-500", "Microsoft Azure Security Engineer (AZ-500)", "microsoft", "azure security", ASSOCIATE,
+                  ("az-500", "az 500", "az500", "azure security engineer", "azure security engineer associate"),
+                  ("azure", "seguridad informatica"), ("cloud", "security")),
+    Certification("dp-900", "Microsoft Azure Data Fundamentals (DP-900)", "microsoft", "azure data", FUNDAMENTALS,
+                  ("dp-900", "dp 900", "dp900", "azure data fundamentals"),
+                  ("azure", "base de datos", "analisis de datos"), ("cloud", "data")),
+    Certification("dp-203", "Microsoft Azure Data Engineer (DP-203)", "microsoft", "azure data", ASSOCIATE,
+                  ("dp-203", "dp 203", "dp203", "azure data engineer", "azure data engineer associate"),
+                  ("azure", "sql", "analisis de datos"), ("cloud", "data")),
+    Certification("ai-900", "Microsoft Azure AI Fundamentals (AI-900)", "microsoft", "azure ai", FUNDAMENTALS,
+                  ("ai-900", "ai 900", "ai900", "azure ai fundamentals"),
+                  ("azure", "inteligencia artificial", "machine learning"), ("cloud", "data")),
+    Certification("pl-300", "Microsoft Power BI Data Analyst (PL-300)", "microsoft", "power platform", ASSOCIATE,
+                  ("pl-300", "pl 300", "pl300", "da-100", "power bi data analyst", "microsoft power bi data analyst",
+                   "power bi certification", "certificacion power bi"),
+                  ("power bi", "analisis de datos", "excel"), ("data",)),
+    # Google Cloud
+    Certification("gcp-cdl", "Google Cloud Digital Leader", "google", "google cloud", FUNDAMENTALS,
+                  ("cloud digital leader", "google cloud digital leader"),
+                  ("gcp", "cloud computing"), ("cloud",)),
+    Certification("gcp-ace", "Google Associate Cloud Engineer", "google", "google cloud", ASSOCIATE,
+                  ("associate cloud engineer", "google associate cloud engineer", "google cloud associate cloud engineer"),
+                  ("gcp", "cloud computing", "linux"), ("cloud",)),
+    Certification("gcp-pca", "Google Professional Cloud Architect", "google", "google cloud", PROFESSIONAL,
+                  ("professional cloud architect", "google professional cloud architect", "google cloud architect"),
+                  ("gcp", "cloud computing"), ("cloud",)),
+    Certification("gcp-pde", "Google Professional Data Engineer", "google", "google cloud data", PROFESSIONAL,
+                  ("professional data engineer", "google professional data engineer", "google cloud data engineer"),
+                  ("gcp", "sql", "analisis de datos"), ("cloud", "data")),
+    Certification("google-da", "Google Data Analytics Professional Certificate", "google", "google data analytics",
+                  FUNDAMENTALS,
+                  ("google data analytics", "google data analytics professional certificate"),
+                  ("analisis de datos", "sql", "excel"), ("data",)),
+    # Oracle
+    Certification("oracle-java-oca", "Oracle Certified Associate, Java SE", "oracle", "oracle java", ASSOCIATE,
+                  ("oracle certified associate java", "oracle certified associate", "oca java", "oca java se"),
+                  ("java",), ()),
+    Certification("oracle-java-ocp", "Oracle Certified Professional, Java SE", "oracle", "oracle java", PROFESSIONAL,
+                  ("oracle certified professional java", "oracle certified professional", "ocp java", "ocp java se",
+                   "ocpjp", "java se programmer", "sun certified java programmer", "scjp"),
+                  ("java",), ()),
+    Certification("oracle-db", "Oracle Database SQL / Administrator", "oracle", "oracle database", ASSOCIATE,
+                  ("oracle database sql", "oracle database administrator", "oracle dba", "oracle certified dba",
+                   "oracle database sql certified associate"),
+                  ("oracle", "sql", "base de datos"), ("data",)),
+    Certification("oci-foundations", "Oracle Cloud Infrastructure Foundations", "oracle", "oracle cloud", FUNDAMENTALS,
+                  ("oracle cloud infrastructure foundations", "oci foundations", "oci foundations associate"),
+                  ("cloud computing", "oracle"), ("cloud",)),
+    # Cisco / redes
+    Certification("ccna", "Cisco Certified Network Associate (CCNA)", "cisco", "cisco networking", ASSOCIATE,
+                  ("ccna", "cisco certified network associate", "ccent"),
+                  ("redes",), ("networking",)),
+    Certification("ccnp", "Cisco Certified Network Professional (CCNP)", "cisco", "cisco networking", PROFESSIONAL,
+                  ("ccnp", "cisco certified network professional"),
+                  ("redes",), ("networking",)),
+    Certification("ccie", "Cisco Certified Internetwork Expert (CCIE)", "cisco", "cisco networking", EXPERT,
+                  ("ccie", "cisco certified internetwork expert"),
+                  ("redes",), ("networking",)),
+    Certification("cisco-cyberops", "Cisco CyberOps Associate", "cisco", "cisco security", ASSOCIATE,
+                  ("cyberops associate", "cisco cyberops", "ccna cyber ops", "ccna cyberops"),
+                  ("seguridad informatica", "redes"), ("security", "networking")),
+    Certification("comptia-network", "CompTIA Network+", "comptia", "comptia networking", ASSOCIATE,
+                  ("comptia network+", "network+"),
+                  ("redes",), ("networking",)),
+    # Seguridad
+    Certification("comptia-security", "CompTIA Security+", "comptia", "comptia security", ASSOCIATE,
+                  ("comptia security+", "security+"),
+                  ("seguridad informatica",), ("security",)),
+    Certification("cissp", "Certified Information Systems Security Professional (CISSP)", "isc2", "isc2 security",
+                  EXPERT,
+                  ("cissp", "certified information systems security professional"),
+                  ("seguridad informatica",), ("security",)),
+    Certification("cism", "Certified Information Security Manager (CISM)", "isaca", "isaca security", EXPERT,
+                  ("cism", "certified information security manager"),
+                  ("seguridad informatica",), ("security",)),
+    Certification("cisa", "Certified Information Systems Auditor (CISA)", "isaca", "isaca audit", PROFESSIONAL,
+                  ("cisa", "certified information systems auditor"),
+                  ("seguridad informatica",), ("security", "audit")),
+    Certification("ceh", "Certified Ethical Hacker (CEH)", "ec-council", "ec-council security", PROFESSIONAL,
+                  ("ceh", "certified ethical hacker"),
+                  ("pentesting", "seguridad informatica"), ("security",)),
+    Certification("oscp", "Offensive Security Certified Professional (OSCP)", "offsec", "offsec security", EXPERT,
+                  ("oscp", "offensive security certified professional"),
+                  ("pentesting", "seguridad informatica", "linux"), ("security",)),
+    Certification("iso-27001", "ISO/IEC 27001 Lead Auditor / Implementer", "iso", "iso 27001", PROFESSIONAL,
+                  ("iso 27001", "iso iec 27001", "iso27001", "iso 27001 lead auditor", "iso 27001 lead implementer",
+                   "iso 27001 auditor interno"),
+                  ("seguridad informatica",), ("security", "audit")),
+    # Gestión de proyectos y ágiles
+    Certification("pmp", "Project Management Professional (PMP)", "pmi", "pmi project management", PROFESSIONAL,
+                  ("pmp", "project management professional"),
+                  ("gestion de proyectos",), ("project management",)),
+    Certification("capm", "Certified Associate in Project Management (CAPM)", "pmi", "pmi project management",
+                  FUNDAMENTALS,
+                  ("capm", "certified associate in project management"),
+                  ("gestion de proyectos",), ("project management",)),
+    Certification("pmi-acp", "PMI Agile Certified Practitioner (PMI-ACP)", "pmi", "agile", PROFESSIONAL,
+                  ("pmi-acp", "pmi acp", "agile certified practitioner"),
+                  ("scrum", "gestion de proyectos"), ("agile", "project management")),
+    Certification("prince2", "PRINCE2", "axelos", "prince2", PROFESSIONAL,
+                  ("prince2", "prince 2", "prince2 foundation", "prince2 practitioner"),
+                  ("gestion de proyectos",), ("project management",)),
+    Certification("psm", "Professional Scrum Master (PSM)", "scrum.org", "scrum master", ASSOCIATE,
+                  ("psm", "psm i", "psm 1", "professional scrum master"),
+                  ("scrum",), ("agile",)),
+    Certification("csm", "Certified ScrumMaster (CSM)", "scrum alliance", "scrum master", ASSOCIATE,
+                  ("csm", "certified scrum master", "certified scrummaster", "scrum master certified", "smc"),
+                  ("scrum",), ("agile",)),
+    Certification("pspo", "Professional Scrum Product Owner (PSPO)", "scrum.org", "product owner", ASSOCIATE,
+                  ("pspo", "professional scrum product owner", "cspo", "certified scrum product owner",
+                   "scrum product owner"),
+                  ("scrum",), ("agile",)),
+    Certification("safe", "SAFe Agilist", "scaled agile", "safe", PROFESSIONAL,
+                  ("safe agilist", "safe 5 agilist", "safe 6 agilist", "scaled agile framework", "leading safe"),
+                  ("scrum",), ("agile",)),
+    Certification("itil-foundation", "ITIL 4 Foundation", "axelos", "itil", FUNDAMENTALS,
+                  ("itil", "itil foundation", "itil 4 foundation", "itil v4", "itil v3", "itil 4"),
+                  ("itil",), ("it service management",)),
+    # Contenedores, infraestructura y plataformas
+    Certification("cka", "Certified Kubernetes Administrator (CKA)", "cncf", "kubernetes", PROFESSIONAL,
+                  ("cka", "certified kubernetes administrator"),
+                  ("kubernetes", "docker", "linux"), ("devops", "cloud")),
+    Certification("ckad", "Certified Kubernetes Application Developer (CKAD)", "cncf", "kubernetes", PROFESSIONAL,
+                  ("ckad", "certified kubernetes application developer"),
+                  ("kubernetes", "docker"), ("devops", "cloud")),
+    Certification("cks", "Certified Kubernetes Security Specialist (CKS)", "cncf", "kubernetes", EXPERT,
+                  ("cks", "certified kubernetes security specialist"),
+                  ("kubernetes", "seguridad informatica"), ("devops", "security")),
+    Certification("terraform-associate", "HashiCorp Certified: Terraform Associate", "hashicorp", "terraform",
+                  ASSOCIATE,
+                  ("terraform associate", "hashicorp certified terraform associate", "hashicorp terraform"),
+                  ("terraform", "devops"), ("devops", "cloud")),
+    Certification("rhcsa", "Red Hat Certified System Administrator (RHCSA)", "redhat", "red hat linux", ASSOCIATE,
+                  ("rhcsa", "red hat certified system administrator"),
+                  ("linux",), ("linux",)),
+    Certification("rhce", "Red Hat Certified Engineer (RHCE)", "redhat", "red hat linux", PROFESSIONAL,
+                  ("rhce", "red hat certified engineer"),
+                  ("linux",), ("linux",)),
+    Certification("lfcs", "Linux Foundation Certified System Administrator (LFCS)", "linux foundation",
+                  "linux foundation", ASSOCIATE,
+                  ("lfcs", "linux foundation certified system administrator", "lpic-1", "lpic 1", "linux+"),
+                  ("linux",), ("linux",)),
+    Certification("salesforce-admin", "Salesforce Certified Administrator", "salesforce", "salesforce", ASSOCIATE,
+                  ("salesforce certified administrator", "salesforce administrator", "salesforce admin"),
+                  ("salesforce",), ()),
+    Certification("sap-associate", "SAP Certified Associate", "sap", "sap", ASSOCIATE,
+                  ("sap certified associate", "sap certified application associate", "sap certified"),
+                  ("sap",), ()),
+]
+
+# Alias de proveedores y áreas: resuelven requisitos genéricos ("certificados aws", "certificación en seguridad")
+TAG_ALIASES = {
+    "aws": ("aws", "amazon web services", "amazon"),
+    "microsoft": ("microsoft",),
+    "azure": ("azure", "microsoft azure"),
+    "google": ("google cloud", "gcp", "google cloud platform"),
+    "oracle": ("oracle",),
+    "cisco": ("cisco",),
+    "comptia": ("comptia",),
+    "isc2": ("isc2", "isc 2"),
+    "isaca": ("isaca",),
+    "pmi": ("pmi", "project management institute"),
+    "axelos": ("axelos",),
+    "scrum": ("scrum", "scrum.org", "scrum alliance"),
+    "cncf": ("cncf", "kubernetes", "k8s"),
+    "hashicorp": ("hashicorp", "terraform"),
+    "redhat": ("red hat", "redhat"),
+    "salesforce": ("salesforce",),
+    "sap": ("sap",),
+    "cloud": ("cloud", "nube", "computacion en la nube", "cloud computing"),
+    "security": ("seguridad", "ciberseguridad", "cybersecurity", "security", "seguridad informatica",
+                 "seguridad de la informacion", "information security"),
+    "networking": ("redes", "networking", "network"),
+    "project management": ("gestion de proyectos", "project management", "gerencia de proyectos"),
+    "agile": ("agile", "agil", "agiles", "metodologias agiles", "metodologia agil"),
+    "devops": ("devops",),
+    "data": ("datos", "data", "analitica"),
+    "linux": ("linux",),
+    "audit": ("auditoria", "audit"),
+    "it service management": ("gestion de servicios", "itsm")
+}
+
+# Habilidad implicada por cada proveedor/área (para requisitos genéricos)
+TAG_SKILLS = {
+    "aws": "aws", "azure": "azure", "google": "gcp", "oracle": "oracle", "cisco": "redes",
+    "scrum": "scrum", "cncf": "kubernetes", "hashicorp": "terraform", "redhat": "linux",
+    "salesforce": "salesforce", "sap": "sap", "cloud": "cloud computing",
+    "security": "seguridad informatica", "networking": "redes", "project management": "gestion de proyectos",
+    "agile": "scrum", "devops": "devops", "data": "analisis de datos", "linux": "linux",
+    "it service management": "itil"
+}
+
+_VENDOR_TAGS = {"aws", "microsoft", "azure", "google", "oracle", "cisco", "comptia", "isc2", "isaca", "pmi",
+                "axelos", "scrum", "cncf", "hashicorp", "redhat", "salesforce", "sap"}
+
+CERTIFICATIONS_BY_KEY = {cert.key: cert for cert in CERTIFICATION_CATALOG}
+
+_CATALOG_TRIE = build_alias_trie(
+    [(alias, ("cert", cert.key)) for cert in CERTIFICATION_CATALOG for alias in cert.aliases]
+    + [(alias, ("tag", tag)) for tag, aliases in TAG_ALIASES.items() for alias in aliases]
+)
+
+
+class Resolution(NamedTuple):
+    """Certificaciones del catálogo y proveedores/áreas de un nombre"""
+    certs: FrozenSet[str]
+    tags: FrozenSet[str]  # incluye los de las certificaciones encontradas
+    mentioned: FrozenSet[str] = frozenset()  # solo los escritos en el nombre ("seguridad")
+
+    @property
+    def known(self) -> bool:
+        return bool(self.certs or self.tags)
+
+
+def _cert_tags(cert: Certification) -> FrozenSet[str]:
+    tags = {cert.vendor, *cert.tags}
+    if cert.family.startswith("azure"):
+        tags.update(("azure", "microsoft"))
+    if cert.family.startswith("google cloud"):
+        tags.add("google")
+    if cert.family in ("scrum master", "product owner", "safe", "agile"):
+        tags.add("scrum")
+    if cert.vendor == "cncf":
+        tags.add("cncf")
+    return frozenset(tags)
+
+
+@lru_cache(maxsize=16384)
+def resolve_certification(name: str, issuer: str = "") -> Resolution:
+    """
+    Resuelve un nombre de certificación contra el catálogo.
+
+    Args:
+        name (str): "AWS Certified Solutions Architect", "certificados aws"
+        issuer (str): Emisor si se conoce ("Amazon")
+
+    Returns:
+        Resolution: Certificaciones exactas encontradas y proveedores/áreas
+    """
+    certs, mentioned = set(), set()
+    for kind, value in trie_find(_CATALOG_TRIE, canonical_skill_key(f"{name} {issuer}")):
+        if kind == "cert":
+            certs.add(value)
+        else:
+            mentioned.add(value)
+    tags = set(mentioned)
+    for key in certs:
+        tags |= _cert_tags(CERTIFICATIONS_BY_KEY[key])
+    return Resolution(frozenset(certs), frozenset(tags), frozenset(mentioned))
+
+
+def _cv_certification(cert: Any) -> Resolution:
+    if isinstance(cert, dict):
+        return resolve_certification(str(cert.get("name") or ""), str(cert.get("issuer") or ""))
+    return resolve_certification(str(cert or ""))
+
+
+def _cert_name(cert: Any) -> str:
+    return str(cert.get("name", "") if isinstance(cert, dict) else cert)
+
+
+@lru_cache(maxsize=16384)
+def implied_skill_ids(resolution: Resolution, primary_only: bool = False) -> FrozenSet[int]:
+    """Ids de las habilidades que implica una certificación resuelta (o su proveedor/área)"""
+    skills = []
+    for key in resolution.certs:
+        cert = CERTIFICATIONS_BY_KEY[key]
+        skills.extend(cert.skills[:1] if primary_only else cert.skills)
+    if not resolution.certs:
+        skills.extend(TAG_SKILLS[tag] for tag in resolution.tags if tag in TAG_SKILLS)
+    return frozenset(skill_id for skill in skills for skill_id in skill_ids(skill))
+
+
+# ==================== COMPARACIONES LOCALES ====================
+
+def _requirement_score(requirement: Resolution, candidate: Resolution) -> Tuple[float, bool]:
+    """
+    Score de una certificación del CV frente a un requisito resuelto.
+
+    Returns:
+        tuple: (score 0-1, ambiguo) — ambiguo si el CV solo se resolvió a proveedor/área
+               y podría ser justo la certificación pedida
+    """
+    if requirement.certs:
+        if requirement.certs & candidate.certs:
+            return 1.0, False
+        best = 0.0
+        for required_key in requirement.certs:
+            required = CERTIFICATIONS_BY_KEY[required_key]
+            for key in candidate.certs:
+                cert = CERTIFICATIONS_BY_KEY[key]
+                if cert.family == required.family:
+                    best = max(best, 1.0 if cert.level >= required.level else 0.7)
+            area_tags = requirement.mentioned - _VENDOR_TAGS
+            if candidate.certs and area_tags & candidate.tags:
+                best = max(best, 0.7)
+            elif required.vendor in candidate.tags or _cert_tags(required) & candidate.tags & _VENDOR_TAGS:
+                best = max(best, 0.4)
+        ambiguous = best < 1.0 and not candidate.certs and bool(candidate.tags & requirement.tags)
+        return best, ambiguous
+
+    overlap = requirement.tags & candidate.tags
+    return round(len(overlap) / len(requirement.tags), 2), False
+
+
+def local_direct_comparison(cv_certifications: List[Any], job_certifications: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Certificaciones del CV contra las requeridas, sin IA.
+
+    Returns:
+        dict: {"score", "reason"} con el promedio de cumplimiento por requisito,
+              o None si algún requisito o certificación relevante está fuera del catálogo
+    """
+    requirements = [(name, resolve_certification(str(name))) for name in job_certifications if name]
+    if not requirements or not all(resolution.known for _, resolution in requirements):
+        return None
+    candidates = [(_cert_name(cert), _cv_certification(cert)) for cert in cv_certifications or []]
+    unknown = [name for name, resolution in candidates if not resolution.known]
+
+    scores, met, partial, missing = [], [], [], []
+    for required_name, requirement in requirements:
+        best, best_name, ambiguous = 0.0, "", False
+        for name, candidate in candidates:
+            if not candidate.known:
+                continue
+            score, is_ambiguous = _requirement_score(requirement, candidate)
+            ambiguous = ambiguous or is_ambiguous
+            if score > best:
+                best, best_name = score, name
+        # Una certificación fuera del catálogo podría cumplir lo que falta: decide la IA
+        if best < 1.0 and (unknown or ambiguous):
+            return None
+        scores.append(best)
+        if best >= 1.0:
+            met.append(f"{best_name} cumple '{required_name}'")
+        elif best > 0:
+            partial.append(f"{best_name} cubre parcialmente '{required_name}'")
+        else:
+            missing.append(required_name)
+
+    score = round(sum(scores) / len(scores), 2)
+    parts = met + partial
+    reason = ". ".join(parts[:4]) if parts else "Ninguna certificación del CV corresponde a las requeridas"
+    if missing:
+        reason += f". Faltan: {', '.join(missing[:5])}"
+    return {"score": score, "reason": reason + "."}
+
+
+def local_certifications_vs_skills(cv_certifications: List[Any], job_technical_skills: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Certificaciones del CV contra las habilidades técnicas del Job (cuando no se piden certificaciones),
+    usando las habilidades que implica cada certificación del catálogo.
+
+    Returns:
+        dict: {"score", "reason"} o None si hay certificaciones fuera del catálogo y ninguna catalogada es relevante
+    """
+    candidates = [(_cert_name(cert), _cv_certification(cert)) for cert in cv_certifications or []]
+    job_skills = [(skill, skill_ids(skill)) for skill in job_technical_skills or [] if isinstance(skill, str)]
+    job_skills = [(skill, ids) for skill, ids in job_skills if ids]
+    if not candidates or not job_skills:
+        return None
+
+    relevant, covered = [], set()
+    for name, resolution in candidates:
+        implied = implied_skill_ids(resolution)
+        hits = [skill for skill, ids in job_skills if ids & implied]
+        if hits:
+            relevant.append(f"{name} respalda {', '.join(hits[:3])}")
+            covered.update(hits)
+
+    if not covered:
+        if any(not resolution.known for _, resolution in candidates):
+            return None
+        return {"score": 0.0, "reason": "Las certificaciones del CV no se relacionan con las habilidades técnicas requeridas."}
+
+    score = round(0.6 + 0.4 * len(covered) / len(job_skills), 2)
+    return {"score": score, "reason": f"{'. '.join(relevant[:4])}."}
+
+
+def local_required_vs_cv_skills(job_certifications: List[str], cv_technical_skills: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Certificaciones requeridas contra las habilidades técnicas del CV, sin IA y sin penalización
+    (la penalización del 50% la aplica el comparador).
+    Habilidad principal de la certificación: 0.7; otra habilidad implicada: 0.4; ninguna: 0.0.
+
+    Returns:
+        dict: {"score", "reason"} o None si algún requisito está fuera del catálogo
+    """
+    requirements = [(name, resolve_certification(str(name))) for name in job_certifications if name]
+    if not requirements or not all(resolution.known for _, resolution in requirements):
+        return None
+    cv_ids = frozenset(
+        skill_id for skill in cv_technical_skills or [] if isinstance(skill, str) for skill_id in skill_ids(skill)
+    )
+
+    scores, details = [], []
+    for name, requirement in requirements:
+        if implied_skill_ids(requirement, primary_only=True) & cv_ids:
+            scores.append(0.7)
+            details.append(f"las habilidades del CV cubren el área de '{name}'")
+        elif implied_skill_ids(requirement) & cv_ids:
+            scores.append(0.4)
+            details.append(f"las habilidades del CV cubren parcialmente '{name}'")
+        else:
+            scores.append(0.0)
+
+    score = round(sum(scores) / len(scores), 2)
+    reason = "; ".join(details) if details else "las habilidades del CV no se relacionan con las certificaciones requeridas"
+    return {"score": score, "reason": reason[0].upper() + reason[1:] + "."}
@@ -0,0 +1,291 @@
+"""
+Educación sin IA.
+Clasifica cada título del CV y el requisito del Job en una escala ordinal
+(bachiller < técnico < tecnólogo < pregrado < especialización < maestría < doctorado)
+y compara el área de estudio por familias de carreras ("sistemas" ~ "informática").
+
+compare_education resuelve con este motor las combinaciones conocidas (memoizadas)
+y solo llama a la IA cuando el requisito es inusual o el CV no se puede clasificar.
+"""
+
+import os
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from engines.skill_canonicalizer import strip_accents
+
+# Modo de compare_education: "prefilter" (por defecto; combinaciones conocidas sin IA)
+# o "llm" (siempre IA; el motor solo como fallback)
+EDUCATION_COMPARISON_MODE = os.getenv("EDUCATION_COMPARISON_MODE", "prefilter").lower()
+
+BACHILLER, TECNICO, TECNOLOGO, PREGRADO, ESPECIALIZACION, MAESTRIA, DOCTORADO = range(1, 8)
+
+LEVEL_NAMES = {
+    BACHILLER: "bachiller",
+    TECNICO: "técnico",
+    TECNOLOGO: "tecnólogo",
+    PREGRADO: "pregrado",
+    ESPECIALIZACION: "especialización",
+    MAESTRIA: "maestría",
+    DOCTORADO: "doctorado"
+}
+
+# Escalera de nivel educativo: prefijos de palabra que indican cada nivel
+EDUCATION_LEVELS = [
+    (BACHILLER, ("bachiller", "secundaria", "high school", "colegio")),
+    (TECNICO, ("tecnic", "technical degree", "technician")),
+    (TECNOLOGO, ("tecnologo", "tecnologa", "tecnologia en", "technologist")),
+    (PREGRADO, ("profesional", "pregrado", "ingenier", "engineer", "licenciad", "licenciatura", "universitari",
+                "carrera", "bachelor", "undergraduate", "b.sc", "bsc", "b.a.", "economista", "abogad",
+                "contador", "administrador")),
+    (ESPECIALIZACION, ("especializacion", "especialista", "postgrado", "posgrado", "postgraduate")),
+    (MAESTRIA, ("maestria", "magister", "master", "msc", "m.sc", "mba")),
+    (DOCTORADO, ("doctorado", "phd", "ph.d", "doctor"))
+]
+_LEVEL_PATTERNS = [
+    (level, re.compile(r"\b(?:" + "|".join(re.escape(stem) for stem in stems) + r")"))
+    for level, stems in EDUCATION_LEVELS
+]
+
+# Familias de carreras (prefijos de palabra) y familias afines entre sí
+FIELD_FAMILIES = {
+    "sistemas": ("sistemas", "systems", "computacion", "informatica", "software", "computer", "telematica",
+                 "tecnologias de la informacion", "information technology", "ciberseguridad", "cybersecurity"),
+    "electronica": ("electronic", "telecomunicacion", "telecommunication", "electric", "mecatronic"),
+    "datos": ("ciencia de datos", "ciencias de datos", "data science", "estadistic", "statistic", "analitica"),
+    "matematicas": ("matematic", "mathematic", "fisica", "physics", "actuari"),
+    "industrial": ("industrial",),
+    "administracion": ("administracion", "business", "negocios", "gerencia", "management"),
+    "economia": ("economi", "finanz", "financ"),
+    "contaduria": ("contadur", "contabil", "contador", "accounting"),
+    "mercadeo": ("mercadeo", "marketing", "publicidad", "advertising"),
+    "comunicacion": ("comunicacion", "communication", "periodismo", "journalism"),
+    "derecho": ("derecho", "law", "juridic", "abogad"),
+    "psicologia": ("psicolog", "psychology"),
+    "diseno": ("diseno", "design"),
+    "civil": ("civil",),
+    "mecanica": ("mecanica", "mechanical"),
+    "quimica": ("quimic", "chemical", "chemistry"),
+    "ambiental": ("ambiental", "environmental"),
+    "arquitectura": ("arquitectura", "architecture"),
+    "salud": ("medicina", "medicine", "enfermeria", "nursing", "odontolog"),
+    "biologia": ("biolog", "microbiolog"),
+    "educacion": ("pedagog", "educacion", "education")
+}
+RELATED_FIELDS = [
+    {"sistemas", "electronica", "datos", "matematicas"},
+    {"administracion", "economia", "contaduria", "industrial", "mercadeo"},
+    {"civil", "mecanica", "ambiental", "arquitectura"},
+    {"quimica", "biologia", "salud", "ambiental"},
+    {"comunicacion", "mercadeo", "diseno"}
+]
+_FIELD_PATTERNS = {
+    family: re.compile(r"\b(?:" + "|".join(re.escape(stem) for stem in stems) + r")")
+    for family, stems in FIELD_FAMILIES.items()
+}
+
+# Títulos profesionales que se llaman "doctor" sin ser doctorado ("Doctor en Medicina", "Doctor en Derecho")
+_PROFESSIONAL_DOCTOR = re.compile(
+    r"\b(?:doctora?|dr\.?|dra\.?) en (?=medicina|derecho|ciencias juridicas|jurisprudencia|odontologia|"
+    r"medicina veterinaria|veterinaria)"
+)
+
+# Títulos compuestos de nivel técnico/tecnológico: "Técnico profesional en ..." no es pregrado
+_PROFESSIONAL_TECHNICAL = re.compile(r"\b(tecnic[oa]s?|tecnolog[oa]s?) profesional(?:es)?\b")
+# "técnica(s)" como adjetivo de otra palabra de formación ("carreras técnicas") no es un nivel
+_TECHNICAL_ADJECTIVE = re.compile(
+    r"\b(carreras?|ingenierias?|formacion|areas?|estudios|programas?|disciplinas?) tecnic(?:a|as|o|os)\b"
+)
+
+_RELATED_MARKERS = re.compile(r"\b(?:afin|afines|relacionad|related|equivalente|similar)")
+_IN_PROGRESS_MARKERS = re.compile(
+    r"\b(?:presente|actual|actualmente|en curso|cursando|estudiante|in progress|current|expected|esperado|semestre)"
+)
+# Requisitos que la escala no cubre: los decide la IA
+_UNUSUAL_MARKERS = re.compile(
+    r"\b(?:estudiante|semestre|tarjeta profesional|matricula profesional|homolog|convalid|exterior|"
+    r"acreditad|promedio|graduad[oa]s? de|egresad[oa]s? de la universidad|student|gpa)"
+)
+
+
+def _normalize(text: Any) -> str:
+    normalized = strip_accents(str(text).lower()) if text else ""
+    normalized = _PROFESSIONAL_TECHNICAL.sub(r"\1", normalized)
+    normalized = _TECHNICAL_ADJECTIVE.sub(r"\1", normalized)
+    return _PROFESSIONAL_DOCTOR.sub("profesional en ", normalized)
+
+
+def education_level(text: Any) -> int:
+    """Nivel educativo más alto mencionado en un texto (0 si no hay ninguno)"""
+    normalized = _normalize(text)
+    level = 0
+    for value, pattern in _LEVEL_PATTERNS:
+        if pattern.search(normalized):
+            level = value
+    return level
+
+
+def required_education_level(text: Any) -> int:
+    """Nivel mínimo pedido por el Job: el más bajo mencionado (0 si no hay ninguno)"""
+    normalized = _normalize(text)
+    levels = [value for value, pattern in _LEVEL_PATTERNS if pattern.search(normalized)]
+    if not levels and field_families(normalized):
+        return PREGRADO  # "ingeniería de sistemas", "administración de empresas": una carrera profesional
+    return min(levels) if levels else 0
+
+
+def field_families(text: Any) -> FrozenSet[str]:
+    """Familias de carreras mencionadas en un texto"""
+    normalized = _normalize(text)
+    return frozenset(family for family, pattern in _FIELD_PATTERNS.items() if pattern.search(normalized))
+
+
+def related_families(families: FrozenSet[str]) -> FrozenSet[str]:
+    """Familias afines a las dadas (incluyéndolas)"""
+    related = set(families)
+    for group in RELATED_FIELDS:
+        if group & families:
+            related |= group
+    return frozenset(related)
+
+
+def _entry_text(edu: Dict[str, Any]) -> str:
+    return f"{edu.get('degree', '')} {edu.get('field', '')}"
+
+
+def entry_level(edu: Dict[str, Any]) -> int:
+    """Nivel de una entrada de education[]; una carrera sin nivel explícito cuenta como pregrado"""
+    level = education_level(_entry_text(edu))
+    if not level and field_families(_entry_text(edu)):
+        return PREGRADO
+    return level
+
+
+def is_in_progress(edu: Dict[str, Any], today: Optional[date] = None) -> bool:
+    """True si la entrada está en curso ("presente", "cursando", año futuro)"""
+    text = _normalize(f"{edu.get('year', '')} {edu.get('degree', '')}")
+    if _IN_PROGRESS_MARKERS.search(text):
+        return True
+    years = [int(year) for year in re.findall(r"\b(?:19|20)\d{2}\b", text)]
+    return bool(years) and max(years) > (today or date.today()).year
+
+
+def cv_education_level(education: Any) -> int:
+    """Nivel más alto de education[] del CV (0 si no hay ninguno)"""
+    if not isinstance(education, list):
+        return 0
+    return max((entry_level(edu) for edu in education if isinstance(edu, dict)), default=0)
+
+
+# ==================== COMPARACIÓN ====================
+
+def _entry_score(level: int, families: FrozenSet[str], required: int,
+                 job_families: FrozenSet[str], accepts_related: bool) -> Tuple[Optional[float], str]:
+    """(score, explicación) de una entrada del CV; score None si el área no se puede decidir"""
+    if not job_families:
+        field_credit, field_note = 1.0, ""
+    elif families & job_families:
+        field_credit, field_note = 1.0, "en el área requerida"
+    elif families & related_families(job_families):
+        field_credit = 0.9 if accepts_related else 0.7
+        field_note = "en un área afín"
+    elif families:
+        field_credit, field_note = 0.0, "en un área distinta"
+    else:
+        return None, ""
+
+    if level >= required:
+        score = field_credit if field_credit else 0.2
+    elif level == required - 1:
+        score = 0.5 * field_credit
+    else:
+        score = 0.2 * field_credit
+    return round(score, 2), field_note
+
+
+@lru_cache(maxsize=8192)
+def _compare_cached(entries: Tuple[Tuple[str, str, str], ...], job_education: str,
+                    year: int, force: bool) -> Optional[Tuple[float, str]]:
+    required = required_education_level(job_education)
+    job_families = field_families(job_education)
+    if not required:
+        return None
+    if _UNUSUAL_MARKERS.search(job_education) and not force:
+        return None
+    accepts_related = bool(_RELATED_MARKERS.search(job_education))
+    today = date(year, 12, 31)
+
+    best: Optional[Tuple[float, str]] = None
+    undecided = False
+    for degree, field, entry_year in entries:
+        edu = {"degree": degree, "field": field, "year": entry_year}
+        level = entry_level(edu)
+        if not level:
+            undecided = True
+            continue
+        families = field_families(_entry_text(edu))
+        score, field_note = _entry_score(level, families, required, job_families, accepts_related)
+        if score is None and level < required - 1:
+            # Dos o más niveles por debajo: el área no cambia el resultado
+            score, field_note = 0.2, ""
+        if score is None:
+            if not force:
+                undecided = True
+                continue
+            score, field_note = (0.5 if level >= required else 0.2), "en un área que no se pudo verificar"
+        in_progress = is_in_progress(edu, today)
+        if in_progress:
+            if not force:
+                undecided = True
+                continue
+            score = round(score * 0.7, 2)
+
+        detail = f"{degree or field} ({LEVEL_NAMES[level]}{', en curso' if in_progress else ''}) {field_note}".strip()
+        if best is None or score > best[0]:
+            best = (score, detail)
+
+    # Lo que no se pudo clasificar podría mejorar el resultado: decide la IA
+    if best is None or (undecided and best[0] < 1.0 and not force):
+        return None
+
+    score, detail = best
+    required_text = f"mínimo {LEVEL_NAMES[required]}"
+    if score >= 1.0:
+        reason = f"Cumple el requisito educativo ({required_text}): {detail}."
+    elif score >= 0.5:
+        reason = f"Cumple parcialmente el requisito educativo ({required_text}): {detail}."
+    else:
+        reason = f"No cumple el requisito educativo ({required_text}): la mejor formación es {detail}."
+    return score, reason
+
+
+def local_education_comparison(
+    cv_education: List[Dict[str, Any]],
+    job_education: str,
+    today: Optional[date] = None,
+    force: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Score de educación sin IA para combinaciones conocidas de nivel y área.
+
+    Args:
+        cv_education (list): education[] del CV
+        job_education (str): Requisito educativo del Job
+        today (date): Fecha para detectar estudios en curso
+        force (bool): Si True, siempre devuelve un score (fallback cuando falla la IA)
+
+    Returns:
+        dict: {"score", "reason"} o None si el caso debe ir a la IA
+    """
+    entries = tuple(
+        (str(edu.get("degree") or ""), str(edu.get("field") or ""), str(edu.get("year") or ""))
+        for edu in cv_education or [] if isinstance(edu, dict)
+    )
+    result = _compare_cached(entries, _normalize(job_education), (today or date.today()).year, force)
+    if result is None:
+        if not force:
+            return None
+        return {"score": 0.0, "reason": "No se pudo clasificar la educación del CV frente al requisito."}
+    return {"score": result[0], "reason": result[1]}
@@ -0,0 +1,293 @@
+"""
+Años de experiencia sin IA.
+Convierte las duraciones de experience[] (español e inglés) en intervalos de meses,
+los une sin contar dos veces los periodos que se solapan, y extrae los años que
+pide el Job de su texto de experiencia.
+
+El resumen se calcula una vez al extraer el CV y se guarda en cv_data bajo
+"experience_summary". compare_experience lo usa para resolver sin IA los casos
+evidentes (p.ej. piden "mínimo 4 años" y el CV suma 0.5).
+"""
+
+import os
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from engines.skill_canonicalizer import strip_accents
+
+# Sube al cambiar el parser: los resúmenes guardados con otra versión se recalculan
+EXPERIENCE_SUMMARY_VERSION = 2
+
+# Modo de compare_experience: "prefilter" (por defecto; los casos evidentes se resuelven sin IA)
+# o "llm" (siempre IA; el cálculo por años solo como fallback)
+EXPERIENCE_COMPARISON_MODE = os.getenv("EXPERIENCE_COMPARISON_MODE", "prefilter").lower()
+
+# Por debajo de esta fracción de los años pedidos el CV no cumple, sin importar el cargo
+CLEAR_SHORTFALL_RATIO = 0.5
+
+MONTHS = {
+    "enero": 1, "january": 1, "jan": 1, "ene": 1,
+    "febrero": 2, "february": 2, "feb": 2,
+    "marzo": 3, "march": 3, "mar": 3,
+    "abril": 4, "april": 4, "apr": 4, "abr": 4,
+    "mayo": 5, "may": 5,
+    "junio": 6, "june": 6, "jun": 6,
+    "julio": 7, "july": 7, "jul": 7,
+    "agosto": 8, "august": 8, "aug": 8, "ago": 8,
+    "septiembre": 9, "setiembre": 9, "september": 9, "sep": 9, "sept": 9,
+    "octubre": 10, "october": 10, "oct": 10,
+    "noviembre": 11, "november": 11, "nov": 11,
+    "diciembre": 12, "december": 12, "dec": 12, "dic": 12
+}
+_CURRENT_WORDS = ("presente", "actual", "actualmente", "actualidad", "present", "current", "now", "hoy", "la fecha")
+# "desde 2019", "since march 2020": una sola fecha sin fin es un cargo vigente
+_OPEN_START = re.compile(r"^\W*(?:desde|since|from|a partir de)\b")
+_NUMBER_WORDS = {
+    "un": 1, "una": 1, "uno": 1, "one": 1, "a": 1, "dos": 2, "two": 2, "tres": 3, "three": 3,
+    "cuatro": 4, "four": 4, "cinco": 5, "five": 5, "seis": 6, "six": 6,
+    "siete": 7, "seven": 7, "ocho": 8, "eight": 8, "nueve": 9, "nine": 9, "diez": 10, "ten": 10
+}
+_NUMBER = r"(\d+(?:[.,]\d+)?|" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r")"
+
+# "marzo de 2021", "mar. 2021", "2021", "03/2021", "2021-03"
+_DATE_POINT = re.compile(
+    r"(?:\b(\d{1,2})\s*[/.-]\s*((?:19|20)\d{2})\b)"
+    r"|(?:\b((?:19|20)\d{2})\s*[/-]\s*(\d{1,2})\b)"
+    r"|(?:(?:\b([a-z]+)\.?\s+(?:de\s+|del\s+)?)?\b((?:19|20)\d{2})\b)"
+)
+_YEARS_SPAN = re.compile(r"\b" + _NUMBER + r"\s*\+?\s*(?:anos?|years?|yrs?)\b")
+_MONTHS_SPAN = re.compile(r"\b" + _NUMBER + r"\s*\+?\s*(?:meses|mes|months?|mos?)\b")
+# "2 años y 6 meses": una sola cantidad, no dos alternativas
+_YEARS_AND_MONTHS = re.compile(
+    r"\b" + _NUMBER + r"\s*\+?\s*(?:anos?|years?|yrs?)\s*(?:y|and|,)?\s*" + _NUMBER + r"\s*(?:meses|mes|months?|mos?)\b"
+)
+_YEARS_RANGE = re.compile(r"\b(\d+)\s*(?:a|-|to|y|or|o)\s*\d+\s*(?:anos?|years?)\b")
+
+# Palabras que acompañan a los años pedidos sin agregar otros requisitos
+_YEARS_ONLY_FILLER = {
+    "minimo", "minima", "al", "menos", "de", "del", "experiencia", "laboral", "profesional",
+    "comprobada", "certificada", "demostrable", "relacionada", "anos", "ano", "a", "mas", "en",
+    "con", "contar", "tener", "y", "o", "required", "experience", "years", "year", "of", "at",
+    "least", "minimum", "work", "working", "professional", "requerida", "requiere", "se", "meses",
+    "mes", "months", "month", "total", "general"
+}
+
+
+def _normalize(text: Any) -> str:
+    return strip_accents(str(text).lower()) if text else ""
+
+
+def _number(value: str) -> float:
+    number = _NUMBER_WORDS.get(value)
+    return float(number) if number is not None else float(value.replace(",", "."))
+
+
+def _date_points(text: str) -> List[Tuple[int, int]]:
+    """Fechas (año, mes) de una duración en orden de aparición (mes 0 = no indicado)"""
+    points = []
+    for month_num, year_a, year_b, month_b, month_word, year in _DATE_POINT.findall(text):
+        if year_a:
+            points.append((int(year_a), int(month_num) if 1 <= int(month_num) <= 12 else 0))
+        elif year_b:
+            points.append((int(year_b), int(month_b) if 1 <= int(month_b) <= 12 else 0))
+        else:
+            points.append((int(year), MONTHS.get(month_word, 0)))
+    return points
+
+
+def _is_current(text: str) -> bool:
+    return any(re.search(rf"\b{word}\b", text) for word in _CURRENT_WORDS)
+
+
+def duration_interval(duration: Any, today: Optional[date] = None) -> Optional[Tuple[int, int]]:
+    """
+    Intervalo en meses absolutos de una duración de experiencia.
+
+    Args:
+        duration (str): "march 2023 – jul 2023", "2020 – 2021", "03/2021 - 2022", "enero 2024 - presente", "desde 2019"
+        today (date): Fecha para "presente" (hoy si no se pasa)
+
+    Returns:
+        tuple: (mes_inicio, mes_fin) con mes = año * 12 + mes - 1, o None si no hay fechas
+    """
+    interval = _open_interval(_normalize(duration))
+    if interval is None:
+        return None
+    today = today or date.today()
+    start, end = interval
+    return start, (end if end is not None else max(start, today.year * 12 + today.month - 1))
+
+
+def _open_interval(text: str) -> Optional[Tuple[int, Optional[int]]]:
+    """(inicio, fin) en meses absolutos; fin None si el cargo sigue vigente"""
+    points = _date_points(text)
+    if not points:
+        return None
+    start_year, start_month = points[0]
+    start = start_year * 12 + (start_month or 1) - 1
+    if _is_current(text) or (len(points) == 1 and _OPEN_START.search(text)):
+        return start, None
+    end_year, end_month = points[-1]
+    end = end_year * 12 + (end_month or 12) - 1
+    return (start, end) if end >= start else (end, start)
+
+
+def explicit_months(duration: Any) -> Optional[int]:
+    """Meses de una duración escrita como cantidad ("2 años y 6 meses", "18 months"), None si no la hay"""
+    text = _normalize(duration)
+    years = sum(_number(value) for value in _YEARS_SPAN.findall(text))
+    months = sum(_number(value) for value in _MONTHS_SPAN.findall(text))
+    total = round(years * 12 + months)
+    return total if total > 0 else None
+
+
+def merged_months(intervals: List[Tuple[int, int]]) -> int:
+    """Meses cubiertos por los intervalos, sin contar dos veces los solapes"""
+    months = 0
+    current_start, current_end = None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end + 1:
+            if current_end is not None:
+                months += current_end - current_start + 1
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        months += current_end - current_start + 1
+    return months
+
+
+# ==================== RESUMEN DEL CV ====================
+
+def experience_summary(experience: Any) -> Dict[str, Any]:
+    """
+    Resumen de la experiencia del CV, independiente de la fecha actual.
+
+    Args:
+        experience (list): experience[] del CV estructurado
+
+    Returns:
+        dict: {"version", "intervals": [[inicio, fin o None si sigue vigente]],
+               "extra_months": meses de duraciones sin fechas, "unparsed": entradas sin duración reconocible}
+    """
+    intervals, extra_months, unparsed = [], 0, 0
+    for exp in experience if isinstance(experience, list) else []:
+        if not isinstance(exp, dict):
+            continue
+        text = _normalize(exp.get("duration", ""))
+        interval = _open_interval(text)
+        if interval is not None:
+            intervals.append(list(interval))
+            continue
+        months = explicit_months(text)
+        if months:
+            extra_months += months
+        else:
+            unparsed += 1
+    return {
+        "version": EXPERIENCE_SUMMARY_VERSION,
+        "intervals": sorted(intervals, key=lambda interval: interval[0]),
+        "extra_months": extra_months,
+        "unparsed": unparsed
+    }
+
+
+def get_experience_summary(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumen guardado en cv_data si es de la versión actual; si no, lo calcula"""
+    stored = cv_data.get("experience_summary") if isinstance(cv_data, dict) else None
+    if isinstance(stored, dict) and stored.get("version") == EXPERIENCE_SUMMARY_VERSION:
+        return stored
+    return experience_summary((cv_data or {}).get("experience"))
+
+
+def with_experience_summary(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia de cv_data con "experience_summary" (la misma si ya estaba al día)"""
+    stored = cv_data.get("experience_summary")
+    if isinstance(stored, dict) and stored.get("version") == EXPERIENCE_SUMMARY_VERSION:
+        return cv_data
+    return {**cv_data, "experience_summary": experience_summary(cv_data.get("experience"))}
+
+
+def summary_years(summary: Dict[str, Any], today: Optional[date] = None) -> float:
+    """Años totales de un resumen; los cargos vigentes se cierran en la fecha actual"""
+    today = today or date.today()
+    now = today.year * 12 + today.month - 1
+    intervals = [
+        (start, end if end is not None else max(start, now))
+        for start, end in summary.get("intervals", [])
+    ]
+    return round((merged_months(intervals) + summary.get("extra_months", 0)) / 12, 2)
+
+
+def cv_experience_years(experience: Any, today: Optional[date] = None) -> float:
+    """Años de experiencia de una lista experience[], sin contar dos veces los solapes"""
+    return summary_years(experience_summary(experience), today)
+
+
+# ==================== REQUISITO DEL JOB ====================
+
+def required_experience_years(experience_text: Any) -> Optional[float]:
+    """
+    Años mínimos pedidos por el Job ("mínimo 4 años", "un año", "3 a 5 años", "18 meses",
+    "2 años y 6 meses"), None si no los menciona. Solo los rangos y las alternativas
+    separadas se resuelven con el mínimo.
+    """
+    text = _normalize(experience_text)
+    values = [round(_number(years) + _number(months) / 12, 2) for years, months in _YEARS_AND_MONTHS.findall(text)]
+    text = _YEARS_AND_MONTHS.sub(" ", text)
+    values += [float(value) for value in _YEARS_RANGE.findall(text)]
+    values += [_number(value) for value in _YEARS_SPAN.findall(text)]
+    values += [round(_number(value) / 12, 2) for value in _MONTHS_SPAN.findall(text)]
+    return min(values) if values else None
+
+
+def is_years_only_requirement(experience_text: Any) -> bool:
+    """True si el texto solo pide años ("mínimo 3 años de experiencia"), sin cargos ni áreas"""
+    text = _normalize(experience_text)
+    if required_experience_years(text) is None:
+        return False
+    words = re.findall(r"[a-z]+", text)
+    return all(word in _YEARS_ONLY_FILLER or word in _NUMBER_WORDS for word in words)
+
+
+def local_experience_comparison(
+    summary: Dict[str, Any],
+    job_experience: str,
+    today: Optional[date] = None,
+    force: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Score de experiencia sin IA cuando el caso es evidente.
+
+    - El CV no llega a CLEAR_SHORTFALL_RATIO de los años pedidos: no cumple.
+    - El Job solo pide años y el CV los cumple: cumple.
+    Lo demás (cargos similares, áreas, duraciones que no se entienden) es ambiguo.
+
+    Args:
+        summary (dict): Resumen de experience_summary()
+        job_experience (str): Experiencia requerida por el Job
+        today (date): Fecha para los cargos vigentes
+        force (bool): Si True, siempre devuelve un score por años (fallback cuando falla la IA)
+
+    Returns:
+        dict: {"score", "reason"} o None si el caso debe ir a la IA
+    """
+    required = required_experience_years(job_experience)
+    if required is None:
+        return None
+    years = summary_years(summary, today)
+    if required <= 0:
+        return {"score": 1.0, "reason": "El Job no pide un mínimo de años de experiencia."}
+
+    ratio = years / required
+    reason = f"El CV suma {years:g} años de experiencia y el Job pide mínimo {required:g}."
+    ambiguous = summary.get("unparsed", 0) > 0
+
+    if ratio < CLEAR_SHORTFALL_RATIO and not ambiguous:
+        return {"score": round(0.7 * ratio, 2), "reason": f"{reason} No cumple con los años requeridos."}
+    if ratio >= 1.0 and is_years_only_requirement(job_experience):
+        return {"score": 1.0, "reason": f"{reason} Cumple con los años requeridos."}
+    if force:
+        return {"score": round(min(1.0, ratio), 2), "reason": f"{reason} Evaluación solo por años de experiencia."}
+    return None
@@ -0,0 +1,45 @@
+"""
+Lock exclusivo entre procesos sobre un archivo (fcntl en Linux/Mac, msvcrt en Windows)
+y nombres temporales únicos por proceso. Lo usan los archivos en disco que comparten
+varios workers de la API (índice vectorial, caché de vectores de habilidades).
+"""
+
+import os
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Bloquea hasta obtener el lock exclusivo de path (el archivo se crea si no existe).
+
+    Args:
+        path (str): Archivo de lock (p. ej. "<carpeta>/.lock")
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def temp_path(path: str) -> str:
+    """Ruta temporal junto a path, única por proceso y escritura (para os.replace)"""
+    return f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
@@ -0,0 +1,66 @@
+"""
+Orden de los prompts de los comparadores para la caché de prefijos del proveedor.
+Cada prompt es una instrucción de sistema fija, luego el lado compartido del lote y al final
+el lado que cambia en cada llamada:
+- "job": un Job contra muchos CVs (ranking); el Job va primero.
+- "cv": un CV contra muchos Jobs (matching inverso); el CV va primero.
+Así las llamadas seguidas del mismo lote comparten el prefijo más largo posible.
+"""
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+SHARED_SIDES = ("job", "cv")
+
+# Lado compartido cuando el llamador no indica la dirección del lote
+PROMPT_SHARED_SIDE = os.getenv("PROMPT_SHARED_SIDE", "job").lower()
+if PROMPT_SHARED_SIDE not in SHARED_SIDES:
+    PROMPT_SHARED_SIDE = "job"
+
+_shared_side: ContextVar[str] = ContextVar("prompt_shared_side", default=PROMPT_SHARED_SIDE)
+
+
+def current_shared_side() -> str:
+    """Lado que va primero en los prompts del análisis en curso"""
+    return _shared_side.get()
+
+
+@contextmanager
+def shared_prompt_side(side: Optional[str]):
+    """
+    Fija el lado compartido de los prompts dentro del bloque.
+
+    Args:
+        side (str): "job" o "cv"; None deja el actual
+    """
+    if side is None:
+        yield
+        return
+    if side not in SHARED_SIDES:
+        raise ValueError(f"Lado compartido inválido: {side}")
+    token = _shared_side.set(side)
+    try:
+        yield
+    finally:
+        _shared_side.reset(token)
+
+
+def layout_prompt(system: str, cv_section: str, job_section: str) -> List[Tuple[str, str]]:
+    """
+    Mensajes de un prompt: [("system", instrucción fija), ("human", lado compartido + lado variable)]
+
+    Args:
+        system (str): Instrucción de sistema (no debe depender del CV ni del Job)
+        cv_section (str): Datos del CV
+        job_section (str): Datos del Job
+
+    Returns:
+        list: [(rol, contenido)]
+    """
+    if current_shared_side() == "job":
+        first, last = job_section, cv_section
+    else:
+        first, last = cv_section, job_section
+    return [("system", system), ("human", f"{first}\n\n{last}")]
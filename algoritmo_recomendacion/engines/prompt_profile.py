@@ -0,0 +1,110 @@
+"""
+Perfil de prompt del CV.
+Los textos del CV que van en los prompts de los comparadores (experiencia, habilidades,
+certificaciones, educación) se arman una sola vez al guardar el CV y quedan en
+cv_data["prompt_profile"]; todos los comparadores y todos los Jobs los reutilizan.
+Los CVs sin el bloque lo calculan una vez y lo dejan en el mismo dict en memoria.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from engines.token_budget import (
+    INPUT_TOKEN_BUDGETS, count_tokens, fit_experience, format_experience, record_input
+)
+
+PROMPT_PROFILE_VERSION = 1
+
+
+def format_bullets(items: List[Any]) -> str:
+    """Lista como viñetas "- item", una por línea"""
+    return "\n".join([f"- {item}" for item in items or []])
+
+
+def format_certifications(cv_certifications: List[Dict[str, Any]]) -> str:
+    """Certificaciones del CV como "- nombre (emisor)" """
+    cv_text = ""
+    for cert in cv_certifications or []:
+        if isinstance(cert, dict):
+            cv_text += f"- {cert.get('name', '')} ({cert.get('issuer', '')})\n"
+    return cv_text
+
+
+def format_education(cv_education: List[Dict[str, Any]]) -> str:
+    """Educación del CV, un título por línea"""
+    return "\n".join([
+        f"- Título: {edu.get('degree', 'N/A')}, Institución: {edu.get('institution', 'N/A')}, "
+        f"Año: {edu.get('year', 'N/A')}, Campo: {edu.get('field', 'N/A')}"
+        for edu in cv_education or [] if isinstance(edu, dict)
+    ])
+
+
+def prompt_profile(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Textos de prompt de un CV.
+
+    Args:
+        cv_data (dict): CV estructurado
+
+    Returns:
+        dict: {"version", "experience_text", "experience_tokens", "technical_skills_text",
+               "soft_skills_text", "certifications_text", "education_text"}
+    """
+    experience = [exp for exp in cv_data.get("experience") or [] if isinstance(exp, dict)]
+    experience_text = format_experience(experience)
+    return {
+        "version": PROMPT_PROFILE_VERSION,
+        "experience_text": experience_text,
+        "experience_tokens": count_tokens(experience_text),
+        "technical_skills_text": format_bullets(cv_data.get("technical_skills")),
+        "soft_skills_text": format_bullets(cv_data.get("soft_skills")),
+        "certifications_text": format_certifications(cv_data.get("certifications")),
+        "education_text": format_education(cv_data.get("education"))
+    }
+
+
+def get_prompt_profile(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Perfil guardado en cv_data si es de la versión actual; si no, lo calcula y lo deja en cv_data"""
+    stored = cv_data.get("prompt_profile") if isinstance(cv_data, dict) else None
+    if isinstance(stored, dict) and stored.get("version") == PROMPT_PROFILE_VERSION:
+        return stored
+    profile = prompt_profile(cv_data or {})
+    if isinstance(cv_data, dict):
+        cv_data["prompt_profile"] = profile
+    return profile
+
+
+def with_prompt_profile(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia de cv_data con "prompt_profile" (la misma si ya estaba al día)"""
+    stored = cv_data.get("prompt_profile")
+    if isinstance(stored, dict) and stored.get("version") == PROMPT_PROFILE_VERSION:
+        return cv_data
+    return {**cv_data, "prompt_profile": prompt_profile(cv_data)}
+
+
+def experience_prompt_text(
+    cv_experience: List[Dict[str, Any]],
+    job_text: str,
+    aspect: str,
+    cv_profile: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Experiencia del CV para el prompt de un aspecto, dentro de su presupuesto de tokens.
+    Si el perfil cabe en el presupuesto se usa tal cual, sin volver a formatear ni contar.
+
+    Args:
+        cv_experience (list): Experiencia del CV
+        job_text (str): Texto del Job para medir relevancia si hay que recortar
+        aspect (str): Aspecto en INPUT_TOKEN_BUDGETS
+        cv_profile (dict): Perfil de prompt del CV (opcional)
+
+    Returns:
+        str: Texto de la experiencia
+    """
+    budget = INPUT_TOKEN_BUDGETS[aspect]
+    if cv_profile and cv_profile.get("experience_tokens", budget + 1) <= budget:
+        tokens = cv_profile["experience_tokens"]
+        record_input(aspect, {"tokens_before": tokens, "tokens_after": tokens, "trimmed_entries": 0})
+        return cv_profile["experience_text"]
+    fitted_experience, budget_stats = fit_experience(cv_experience, job_text, budget)
+    record_input(aspect, budget_stats)
+    return format_experience(fitted_experience)
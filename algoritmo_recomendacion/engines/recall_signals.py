@@ -0,0 +1,272 @@
+"""
+Señales deterministas (sin IA) para la primera etapa del ranking.
+Puntúan todos los CVs contra un Job con habilidades, años de experiencia,
+nivel educativo, idiomas y ubicación, para que los comparadores con IA
+solo se ejecuten sobre una lista corta.
+
+Las señales siguen la convención de los comparadores: 0.0 - 1.0, o -1.0
+cuando el Job no pide nada evaluable para ese aspecto.
+"""
+
+import re
+import threading
+from datetime import date
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from engines.skill_canonicalizer import canonical_skill_key, strip_accents, skill_ids, skill_id_union, get_canonical_skills
+from engines.experience_parser import get_experience_summary, required_experience_years, summary_years
+from engines.education_engine import cv_education_level, required_education_level
+
+# Pesos de ComparatorMain para los aspectos que tienen señal rápida
+# (las certificaciones cuentan dentro de las habilidades)
+DEFAULT_RECALL_WEIGHTS = {
+    "technical_skills": 0.25,
+    "experience": 0.30,
+    "education": 0.15,
+    "languages": 0.04,
+    "location": 0.03
+}
+
+LANGUAGE_ALIASES = {
+    "ingles": "en", "english": "en", "espanol": "es", "spanish": "es", "castellano": "es",
+    "frances": "fr", "french": "fr", "portugues": "pt", "portuguese": "pt",
+    "aleman": "de", "german": "de", "italiano": "it", "italian": "it",
+    "mandarin": "zh", "chino": "zh", "chinese": "zh", "japones": "ja", "japanese": "ja"
+}
+_CEFR = {"a1": 1, "a2": 2, "b1": 3, "b2": 4, "c1": 5, "c2": 6}
+_LEVEL_WORDS = [
+    (7, ("nativo", "native", "materna", "bilingue", "bilingual")),
+    (5, ("avanzado", "advanced", "fluido", "fluent")),
+    (3, ("intermedio", "intermediate")),
+    (2, ("basico", "basic", "elemental"))
+]
+
+# Palabras de ubicación que no identifican una ciudad
+_LOCATION_STOPWORDS = {"colombia", "dc", "d.c", "de", "del", "la", "el", "y", "region", "area", "ciudad"}
+_UNKNOWN_LOCATIONS = {"", "desconocido", "unknown", "no especificada", "no especificado", "n/a"}
+
+
+def _normalize(text: Any) -> str:
+    return strip_accents(str(text).lower()) if text else ""
+
+
+# ==================== IDIOMAS ====================
+
+def language_key(name: Any) -> str:
+    key = canonical_skill_key(str(name)) if name else ""
+    return LANGUAGE_ALIASES.get(key, key)
+
+
+def language_level(level: Any) -> int:
+    """Nivel de idioma 1-7 (A1..C2, nativo = 7). Los porcentajes se mapean a la escala CEFR"""
+    normalized = _normalize(level)
+    for code, value in _CEFR.items():
+        if re.search(rf"\b{code}\b", normalized):
+            return value
+    for value, words in _LEVEL_WORDS:
+        if any(word in normalized for word in words):
+            return value
+    number = re.search(r"\d+", normalized)
+    if number:
+        return max(1, min(6, round(int(number.group()) / 100 * 6)))
+    return 3 if normalized else 0
+
+
+def normalize_languages(languages: Any) -> Dict[str, int]:
+    if not isinstance(languages, dict):
+        return {}
+    return {language_key(name): language_level(level) for name, level in languages.items() if language_key(name)}
+
+
+# ==================== UBICACIÓN ====================
+
+def location_tokens(location: Any) -> FrozenSet[str]:
+    normalized = canonical_skill_key(str(location)) if location else ""
+    if normalized in _UNKNOWN_LOCATIONS:
+        return frozenset()
+    return frozenset(token for token in normalized.split() if token not in _LOCATION_STOPWORDS)
+
+
+# ==================== FEATURES Y SCORE ====================
+
+class CVFeatures(NamedTuple):
+    """Lo que la primera etapa necesita de un CV, precalculado una vez"""
+    skills: FrozenSet[str]
+    skill_ids: FrozenSet[int]
+    years: float
+    education: int
+    languages: Dict[str, int]
+    location: FrozenSet[str]
+
+
+def cv_features(cv_data: Dict[str, Any], today: Optional[date] = None) -> CVFeatures:
+    """Extrae las features de la primera etapa de un CV estructurado"""
+    skills = set()
+    for skill in cv_data.get("technical_skills") or []:
+        skills.add(canonical_skill_key(skill) if isinstance(skill, str) else "")
+    for cert in cv_data.get("certifications") or []:
+        name = cert.get("name", "") if isinstance(cert, dict) else cert
+        skills.add(canonical_skill_key(name) if isinstance(name, str) else "")
+    skills.discard("")
+    return CVFeatures(
+        skills=frozenset(skills),
+        skill_ids=skill_id_union(cv_data),
+        years=summary_years(get_experience_summary(cv_data), today),
+        education=cv_education_level(cv_data.get("education")),
+        languages=normalize_languages(cv_data.get("languages")),
+        location=location_tokens((cv_data.get("personal") or {}).get("location", ""))
+    )
+
+
+def _skill_matches(job_key: str, job_ids: FrozenSet[int], features: CVFeatures) -> bool:
+    """
+    Coincidencia por ids de concepto (intersección de enteros) y, si no hay,
+    por inclusión de palabras ("wazuh" cubre "herramientas como wazuh")
+    """
+    if job_ids & features.skill_ids:
+        return True
+    cv_skills = features.skills
+    if job_key in cv_skills:
+        return True
+    job_tokens = set(job_key.split())
+    for cv_key in cv_skills:
+        cv_tokens = cv_key.split()
+        if set(cv_tokens) <= job_tokens or (len(job_tokens) > 0 and job_tokens <= set(cv_tokens)):
+            return True
+    return False
+
+
+class RecallScorer:
+    """
+    Puntúa CVs contra un Job con señales deterministas.
+    Los requisitos del Job se procesan una sola vez al crear el scorer.
+    """
+
+    def __init__(self, job_data: Dict[str, Any], weights: Optional[Dict[str, float]] = None):
+        self.weights = {aspect: w for aspect, w in (weights or DEFAULT_RECALL_WEIGHTS).items()
+                        if aspect in DEFAULT_RECALL_WEIGHTS}
+        if not self.weights:
+            self.weights = dict(DEFAULT_RECALL_WEIGHTS)
+
+        skills = {}
+        block = get_canonical_skills(job_data)
+        for field in ("technical_skills", "certifications"):
+            for raw, ids in zip(job_data.get(field) or [], block.get(field, [])):
+                key = canonical_skill_key(raw) if isinstance(raw, str) else ""
+                if key:
+                    skills[key] = frozenset(ids) or skill_ids(raw)
+        self.job_skills = sorted(skills.items())
+        self.required_years = required_experience_years(job_data.get("experience", ""))
+        self.required_education = required_education_level(job_data.get("education", ""))
+        self.job_languages = normalize_languages(job_data.get("languages"))
+        self.job_location = location_tokens(job_data.get("location", ""))
+
+    def signals(self, features: CVFeatures) -> Dict[str, float]:
+        """Señal por aspecto (0-1, o -1.0 si el Job no pide nada de ese aspecto)"""
+        signals = {}
+
+        if self.job_skills:
+            matched = sum(1 for key, ids in self.job_skills if _skill_matches(key, ids, features))
+            signals["technical_skills"] = matched / len(self.job_skills)
+        else:
+            signals["technical_skills"] = -1.0
+
+        if self.required_years is None:
+            signals["experience"] = -1.0
+        elif self.required_years <= 0:
+            signals["experience"] = 1.0
+        else:
+            signals["experience"] = min(1.0, features.years / self.required_years)
+
+        if self.required_education:
+            signals["education"] = min(1.0, features.education / self.required_education)
+        else:
+            signals["education"] = -1.0
+
+        if self.job_languages:
+            signals["languages"] = sum(
+                min(1.0, features.languages.get(name, 0) / (level or 1))
+                for name, level in self.job_languages.items()
+            ) / len(self.job_languages)
+        else:
+            signals["languages"] = -1.0
+
+        if self.job_location:
+            signals["location"] = 1.0 if self.job_location & features.location else 0.0
+        else:
+            signals["location"] = -1.0
+
+        return signals
+
+    def score(self, features: CVFeatures) -> Tuple[float, Dict[str, float]]:
+        """
+        Score ponderado de la primera etapa.
+
+        Returns:
+            tuple: (score 0-1 normalizado por el peso de los aspectos evaluados, señales)
+        """
+        signals = self.signals(features)
+        used_weight = 0.0
+        total = 0.0
+        for aspect, weight in self.weights.items():
+            value = signals.get(aspect, -1.0)
+            if value != -1.0:
+                total += value * weight
+                used_weight += weight
+        return (round(total / used_weight, 4) if used_weight else 0.0), signals
+
+    def rank(self, items: Iterable[Tuple[int, CVFeatures]], k: int) -> List[Dict[str, Any]]:
+        """
+        Los k mejores CVs por score de la primera etapa.
+
+        Args:
+            items: Iterable de (cv_id, CVFeatures)
+            k (int): Tamaño de la lista corta
+
+        Returns:
+            list: [{"id", "score", "signals"}] de mayor a menor score
+        """
+        scored = []
+        for cv_id, features in items:
+            score, signals = self.score(features)
+            scored.append((score, cv_id, signals))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [{"id": cv_id, "score": score, "signals": signals} for score, cv_id, signals in scored[:k]]
+
+
+class CVFeatureStore:
+    """
+    Features de la primera etapa de todos los CVs, en memoria.
+    Thread-safe; se actualiza con add() / remove() igual que los índices.
+    """
+
+    def __init__(self):
+        self._features: Dict[int, CVFeatures] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def ids(self) -> List[int]:
+        with self._lock:
+            return list(self._features)
+
+    def add(self, cv_id: int, cv_data: Dict[str, Any]) -> None:
+        features = cv_features(cv_data or {})
+        with self._lock:
+            self._features[cv_id] = features
+
+    def build(self, documents: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+        with self._lock:
+            self._features.clear()
+            for cv_id, cv_data in documents:
+                self.add(cv_id, cv_data)
+            return len(self._features)
+
+    def remove(self, cv_id: int) -> bool:
+        with self._lock:
+            return self._features.pop(cv_id, None) is not None
+
+    def items(self) -> List[Tuple[int, CVFeatures]]:
+        with self._lock:
+            return list(self._features.items())
@@ -0,0 +1,305 @@
+"""
+Canonicalización de habilidades.
+Convierte el texto libre de una habilidad en una llave estable para indexar y comparar,
+y en ids enteros de concepto a partir de un catálogo de alias ("js" = "javascript").
+
+Los ids se calculan una vez al extraer el CV/Job y se guardan en cv_data/job_data
+bajo "canonical_skills"; comparar habilidades pasa a ser intersección de sets de enteros.
+"""
+
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Tuple
+
+# Tipos de habilidad que se indexan
+SKILL_KINDS = ("technical", "soft", "certification")
+
+# Caracteres que se conservan dentro de la llave (c++, c#, .net, node.js)
+_SEPARATORS = re.compile(r"[\s_/\\|,;:()\[\]{}\"'`´–—]+")
+_EDGE_PUNCTUATION = ".-*•·"
+
+# Sube al cambiar SKILL_CATALOG: los ids guardados con otra versión se recalculan
+CATALOG_VERSION = 2
+
+# Ids >= FREE_TEXT_ID_BASE son habilidades fuera del catálogo (crc32 de la llave canónica)
+FREE_TEXT_ID_BASE = 1 << 31
+
+# Catálogo de conceptos con sus alias (español / inglés / abreviaturas).
+# El id de cada concepto es su posición + 1: solo agregar al final.
+SKILL_CATALOG = [
+    # Técnicas
+    ["postgresql", "postgres", "postgre", "psql", "postgre sql"],
+    ["javascript", "js", "java script", "ecmascript"],
+    ["typescript", "ts"],
+    ["node.js", "nodejs", "node", "node js"],
+    ["react", "react.js", "reactjs"],
+    ["angular", "angularjs", "angular.js"],
+    ["vue", "vue.js", "vuejs"],
+    ["aws", "amazon web services"],
+    ["gcp", "google cloud", "google cloud platform"],
+    ["azure", "microsoft azure"],
+    ["kubernetes", "k8s"],
+    ["machine learning", "aprendizaje automatico", "ml"],
+    ["inteligencia artificial", "artificial intelligence", "ia", "ai"],
+    ["deep learning", "aprendizaje profundo"],
+    ["base de datos", "bases de datos", "database", "databases"],
+    ["sql server", "mssql", "microsoft sql server"],
+    ["power bi", "powerbi"],
+    ["excel", "microsoft excel", "ms excel"],
+    ["git", "github", "gitlab", "control de versiones", "version control"],
+    ["ci/cd", "ci cd", "integracion continua", "continuous integration"],
+    ["redes", "networking", "fundamentos de networking", "network"],
+    ["seguridad informatica", "ciberseguridad", "cybersecurity", "seguridad de la informacion", "information security"],
+    ["linux", "gnu/linux", "sistemas operativos linux"],
+    ["windows", "sistemas operativos windows"],
+    ["c#", "csharp", "c sharp"],
+    ["c++", "cpp"],
+    [".net", "dotnet", "net framework", ".net core"],
+    ["python", "python3"],
+    ["golang", "go"],
+    ["scrum", "metodologias agiles", "agile", "agil", "metodologia agil"],
+    ["rest api", "api rest", "apis rest", "restful", "rest"],
+    ["nosql", "no sql", "mongodb"],
+    ["analisis de datos", "data analysis", "analitica de datos", "data analytics"],
+    # Blandas
+    ["trabajo en equipo", "teamwork", "team work", "colaboracion", "collaboration", "trabajo colaborativo"],
+    ["liderazgo", "leadership", "lider"],
+    ["comunicacion", "communication", "comunicacion efectiva", "effective communication", "comunicacion asertiva"],
+    ["resolucion de problemas", "problem solving", "solucion de problemas"],
+    ["pensamiento critico", "critical thinking"],
+    ["adaptabilidad", "adaptability", "flexibilidad", "flexibility"],
+    ["proactividad", "proactivity", "proactivo", "iniciativa", "initiative"],
+    ["creatividad", "creativity", "innovacion", "innovation"],
+    ["organizacion", "organization", "gestion del tiempo", "time management"],
+    ["orientacion a resultados", "results oriented", "orientacion al logro"],
+    ["atencion al detalle", "attention to detail", "detallista"],
+    ["servicio al cliente", "customer service", "orientacion al cliente", "atencion al cliente"],
+    ["negociacion", "negotiation"],
+    ["empatia", "empathy"],
+    ["responsabilidad", "responsibility", "compromiso", "commitment"],
+    ["autonomia", "autonomy", "independencia", "trabajo autonomo"],
+    ["aprendizaje continuo", "continuous learning", "capacidad de aprendizaje", "aprendizaje rapido"],
+    ["java"],
+    ["sql"],
+    ["docker", "contenedores", "containers"],
+    ["sap", "sap erp"],
+    ["gestion de proyectos", "project management", "gerencia de proyectos", "administracion de proyectos"],
+    ["cloud computing", "computacion en la nube", "cloud", "nube"],
+    ["devops"],
+    ["terraform", "infraestructura como codigo", "infrastructure as code", "iac"],
+    ["oracle", "oracle database", "oracle db"],
+    ["itil", "gestion de servicios de ti", "it service management"],
+    ["pentesting", "ethical hacking", "hacking etico", "pruebas de penetracion", "penetration testing"],
+    ["salesforce", "salesforce crm"]
+]
+
+
+def strip_accents(text: str) -> str:
+    """Quita tildes y diacríticos ('programación' -> 'programacion')"""
+    normalized = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in normalized if not unicodedata.combining(char))
+
+
+def canonical_skill_key(raw: str) -> str:
+    """
+    Llave canónica de una habilidad.
+
+    Args:
+        raw (str): Habilidad como viene del CV o del Job ("  PostgreSQL ", "Programación")
+
+    Returns:
+        str: Llave normalizada ("postgresql", "programacion"), vacía si no hay texto útil
+    """
+    if not raw or not isinstance(raw, str):
+        return ""
+    key = strip_accents(raw.lower())
+    key = _SEPARATORS.sub(" ", key)
+    key = " ".join(token.strip(_EDGE_PUNCTUATION) for token in key.split())
+    return " ".join(key.split())
+
+
+def iter_profile_skills(data: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """
+    Recorre las habilidades de un CV o Job estructurado.
+
+    Args:
+        data (dict): cv_data o job_data
+
+    Yields:
+        tuple: (tipo, texto original) con tipo en SKILL_KINDS
+    """
+    for skill in data.get("technical_skills") or []:
+        if isinstance(skill, str):
+            yield "technical", skill
+
+    for skill in data.get("soft_skills") or []:
+        if isinstance(skill, str):
+            yield "soft", skill
+
+    certifications = data.get("certifications") or []
+    if isinstance(certifications, list):
+        for cert in certifications:
+            # En el CV son objetos {"name", "issuer", "year"}, en el Job son strings
+            name = cert.get("name", "") if isinstance(cert, dict) else cert
+            if isinstance(name, str):
+                yield "certification", name
+
+
+def profile_skill_keys(data: Dict[str, Any]) -> Dict[Tuple[str, str], str]:
+    """
+    Llaves canónicas de todas las habilidades de un CV o Job (sin duplicados).
+
+    Returns:
+        dict: {(tipo, llave): texto original}
+    """
+    keys = {}
+    for kind, raw in iter_profile_skills(data):
+        key = canonical_skill_key(raw)
+        if key and (kind, key) not in keys:
+            keys[(kind, key)] = raw
+    return keys
+
+
+# ==================== CATÁLOGO, TRIE E IDS ====================
+
+_TRIE_END = "$"
+
+
+def build_alias_trie(aliases: Iterable[Tuple[str, Any]]) -> dict:
+    """Trie por palabras de (alias, valor); los alias se canonicalizan"""
+    trie: dict = {}
+    for alias, value in aliases:
+        key = canonical_skill_key(alias)
+        if not key:
+            continue
+        node = trie
+        for token in key.split():
+            node = node.setdefault(token, {})
+        node[_TRIE_END] = value
+    return trie
+
+
+def trie_find(trie: dict, key: str) -> List[Any]:
+    """
+    Valores de los alias del trie que aparecen dentro de una llave canónica
+    (el alias más largo en cada posición, sin solaparse)
+    """
+    tokens = key.split()
+    found = []
+    i = 0
+    while i < len(tokens):
+        node = trie
+        match, match_end = _TRIE_END, i
+        j = i
+        while j < len(tokens) and tokens[j] in node:
+            node = node[tokens[j]]
+            j += 1
+            if _TRIE_END in node:
+                match, match_end = node[_TRIE_END], j
+        if match_end > i:
+            found.append(match)
+            i = match_end
+        else:
+            i += 1
+    return found
+
+
+def _build_catalog() -> Tuple[Dict[str, int], Dict[int, str], dict]:
+    """Mapa alias -> id, id -> nombre del concepto y trie de alias por palabras"""
+    alias_map = {}
+    names = {}
+    for position, group in enumerate(SKILL_CATALOG):
+        concept_id = position + 1
+        names[concept_id] = canonical_skill_key(group[0])
+        for alias in group:
+            alias_map[canonical_skill_key(alias)] = concept_id
+    trie = build_alias_trie(
+        (alias, position + 1) for position, group in enumerate(SKILL_CATALOG) for alias in group
+    )
+    return alias_map, names, trie
+
+
+ALIAS_MAP, CONCEPT_NAMES, _ALIAS_TRIE = _build_catalog()
+
+
+def concept_key(raw: str) -> str:
+    """Llave canónica llevada al nombre del concepto si es un alias del catálogo ("js" -> "javascript")"""
+    key = canonical_skill_key(raw)
+    concept_id = ALIAS_MAP.get(key)
+    return CONCEPT_NAMES[concept_id] if concept_id else key
+
+
+def free_text_id(key: str) -> int:
+    """Id estable de una habilidad fuera del catálogo"""
+    return FREE_TEXT_ID_BASE | zlib.crc32(key.encode("utf-8"))
+
+
+def find_concepts(key: str) -> List[int]:
+    """
+    Conceptos del catálogo mencionados dentro de una llave canónica (el alias más largo
+    en cada posición): "certificados amazon web services" -> [id de aws]
+    """
+    return trie_find(_ALIAS_TRIE, key)
+
+
+@lru_cache(maxsize=65536)
+def skill_ids(raw: str) -> FrozenSet[int]:
+    """
+    Ids de una habilidad: el id del concepto si todo el texto es un alias; si no, el id de texto
+    libre más los conceptos del catálogo que aparezcan dentro.
+
+    Returns:
+        frozenset: Ids enteros (vacío si no hay texto útil)
+    """
+    key = canonical_skill_key(raw) if isinstance(raw, str) else ""
+    if not key:
+        return frozenset()
+    concept_id = ALIAS_MAP.get(key)
+    if concept_id:
+        return frozenset((concept_id,))
+    return frozenset([free_text_id(key)] + find_concepts(key))
+
+
+def canonical_skills(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ids de las habilidades de un CV o Job, alineados con sus listas originales.
+
+    Returns:
+        dict: {"version", "technical_skills": [[ids], ...], "soft_skills": [...], "certifications": [...]}
+    """
+    result: Dict[str, Any] = {"version": CATALOG_VERSION}
+    for field in ("technical_skills", "soft_skills", "certifications"):
+        values = data.get(field) or []
+        if not isinstance(values, list):
+            values = []
+        result[field] = [
+            sorted(skill_ids(value.get("name", "") if isinstance(value, dict) else value))
+            for value in values
+        ]
+    return result
+
+
+def get_canonical_skills(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Ids guardados en data si son de la versión actual del catálogo; si no, los calcula"""
+    stored = data.get("canonical_skills")
+    if isinstance(stored, dict) and stored.get("version") == CATALOG_VERSION:
+        return stored
+    return canonical_skills(data)
+
+
+def with_canonical_skills(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia de data con "canonical_skills" al día (para guardarla junto al CV/Job)"""
+    if not data:
+        return data
+    stored = data.get("canonical_skills")
+    if isinstance(stored, dict) and stored.get("version") == CATALOG_VERSION:
+        return data
+    return {**data, "canonical_skills": canonical_skills(data)}
+
+
+def skill_id_union(data: Dict[str, Any], fields: Tuple[str, ...] = ("technical_skills", "certifications")) -> FrozenSet[int]:
+    """Todos los ids de los campos indicados de un CV o Job"""
+    block = get_canonical_skills(data)
+    return frozenset(skill_id for field in fields for ids in block.get(field, []) for skill_id in ids)
@@ -0,0 +1,208 @@
+"""
+Índice invertido en memoria de habilidades técnicas, certificaciones e idiomas.
+Permite recuperar los CVs con mayor coincidencia ponderada para un Job sin usar IA.
+"""
+
+import math
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from engines.skill_canonicalizer import canonical_skill_key, concept_key
+
+# Peso de cada tipo de término en el score de coincidencia
+DEFAULT_FIELD_WEIGHTS = {
+    "technical": 1.0,
+    "certification": 1.5,
+    "language": 0.5,
+    "token": 0.5
+}
+
+# Palabras que no se indexan como token suelto de una habilidad compuesta
+TOKEN_STOPWORDS = {
+    "de", "del", "la", "las", "el", "los", "en", "y", "o", "u", "con", "como", "para", "por",
+    "a", "al", "un", "una", "the", "of", "and", "or", "in", "with", "for", "to",
+    "conocimiento", "conocimientos", "manejo", "experiencia", "herramienta", "herramientas",
+    "gestion", "uso", "nivel", "avanzado", "basico", "intermedio", "knowledge", "tools", "experience"
+}
+
+
+def index_terms(data: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    """
+    Términos indexables de un CV o Job estructurado.
+
+    Args:
+        data (dict): cv_data o job_data
+
+    Returns:
+        set: {(campo, llave canónica)} con campo en "technical", "certification", "language"
+    """
+    terms = set()
+
+    # Las habilidades y certificaciones se indexan por concepto ("js" y "javascript" comparten posting)
+    for skill in data.get("technical_skills") or []:
+        if isinstance(skill, str):
+            terms.add(("technical", concept_key(skill)))
+
+    certifications = data.get("certifications") or []
+    if isinstance(certifications, list):
+        for cert in certifications:
+            name = cert.get("name", "") if isinstance(cert, dict) else cert
+            if isinstance(name, str):
+                terms.add(("certification", concept_key(name)))
+
+    languages = data.get("languages") or {}
+    if isinstance(languages, dict):
+        for language in languages.keys():
+            terms.add(("language", canonical_skill_key(language)))
+
+    return {(field, key) for field, key in terms if key}
+
+
+def match_terms(data: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    """
+    index_terms() más las palabras sueltas de las habilidades y certificaciones compuestas,
+    para que "wazuh" coincida con "herramientas de monitoreo como wazuh".
+
+    Returns:
+        set: {(campo, llave)} con campo adicional "token"
+    """
+    terms = index_terms(data)
+    for field, key in list(terms):
+        if field == "language" or " " not in key:
+            continue
+        for token in key.split():
+            if len(token) > 1 and token not in TOKEN_STOPWORDS:
+                terms.add(("token", token))
+    for field, key in list(terms):
+        if field == "technical" and " " not in key:
+            terms.add(("token", key))
+    return terms
+
+
+class InvertedSkillIndex:
+    """
+    Índice invertido: (campo, llave canónica) -> posting list de ids.
+    Es thread-safe y se actualiza incrementalmente con add() / remove().
+    """
+
+    def __init__(
+        self,
+        field_weights: Optional[Dict[str, float]] = None,
+        terms_fn: Callable[[Dict[str, Any]], Set[Tuple[str, str]]] = index_terms
+    ):
+        self.field_weights = field_weights or dict(DEFAULT_FIELD_WEIGHTS)
+        self.terms_fn = terms_fn
+        self._postings: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+        self._doc_terms: Dict[int, Set[Tuple[str, str]]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._doc_terms
+
+    def ids(self) -> List[int]:
+        """IDs de los documentos indexados"""
+        with self._lock:
+            return list(self._doc_terms)
+
+    def add(self, doc_id: int, data: Dict[str, Any]) -> None:
+        """Indexa (o reindexa) un documento"""
+        terms = self.terms_fn(data or {})
+        with self._lock:
+            if doc_id in self._doc_terms:
+                self._remove_unlocked(doc_id)
+            self._doc_terms[doc_id] = terms
+            for term in terms:
+                self._postings[term].add(doc_id)
+
+    def build(self, documents: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+        """
+        Construye el índice desde cero.
+
+        Args:
+            documents: Iterable de (id, datos estructurados)
+
+        Returns:
+            int: Número de documentos indexados
+        """
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            for doc_id, data in documents:
+                self.add(doc_id, data)
+            return len(self._doc_terms)
+
+    def remove(self, doc_id: int) -> bool:
+        """Elimina un documento del índice"""
+        with self._lock:
+            return self._remove_unlocked(doc_id)
+
+    def _remove_unlocked(self, doc_id: int) -> bool:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[term]
+        return True
+
+    def _term_weight(self, term: Tuple[str, str], n_docs: int) -> float:
+        """Peso del campo por IDF: las habilidades raras discriminan más que las comunes"""
+        df = len(self._postings.get(term, ()))
+        idf = math.log(1 + n_docs / (1 + df))
+        return self.field_weights.get(term[0], 1.0) * idf
+
+    def top_n(self, query: Dict[str, Any], n: int = 10, normalize: str = "query") -> List[Dict[str, Any]]:
+        """
+        Documentos con mayor coincidencia ponderada con los términos de query.
+
+        Args:
+            query (dict): Datos estructurados del lado que consulta (p.ej. job_data)
+            n (int): Número de resultados
+            normalize (str): "query" = fracción del peso de la consulta que cubre el documento;
+                             "document" = fracción del peso del documento que cubre la consulta
+                             (p.ej. qué parte de los requisitos de un Job cumple un CV)
+
+        Returns:
+            list: [{"id", "score" (0-1, fracción del peso cubierto), "matched": [llaves]}]
+        """
+        query_terms = self.terms_fn(query or {})
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if not query_terms or n_docs == 0:
+                return []
+
+            weights = {term: self._term_weight(term, n_docs) for term in query_terms}
+            total_weight = sum(weights.values())
+
+            scores: Dict[int, float] = defaultdict(float)
+            matched: Dict[int, List[str]] = defaultdict(list)
+            for term, weight in weights.items():
+                for doc_id in self._postings.get(term, ()):
+                    scores[doc_id] += weight
+                    matched[doc_id].append(term[1])
+
+            if normalize == "document":
+                normalized = {}
+                for doc_id, score in scores.items():
+                    doc_weight = sum(self._term_weight(term, n_docs) for term in self._doc_terms[doc_id])
+                    normalized[doc_id] = score / doc_weight if doc_weight else 0.0
+            else:
+                normalized = {doc_id: score / total_weight if total_weight else 0.0
+                              for doc_id, score in scores.items()}
+
+        ranked = sorted(normalized.items(), key=lambda item: (-item[1], item[0]))[:n]
+        return [
+            {
+                "id": doc_id,
+                "score": round(min(score, 1.0), 3),
+                "matched": sorted(set(matched[doc_id]))
+            }
+            for doc_id, score in ranked
+        ]
@@ -0,0 +1,222 @@
+"""
+Similitud semántica local (sin IA) entre listas de habilidades.
+
+- Cada habilidad se representa con un vector de n-gramas de caracteres con hashing,
+  así "postgres" y "postgresql" quedan cerca aunque no sean iguales.
+- El catálogo de alias del canonicalizador lleva variantes a un mismo concepto
+  ("teamwork" = "trabajo en equipo"), que comparten vector; si los ids de dos
+  habilidades se intersectan (mismo concepto) la similitud es 1.0.
+- Los vectores se guardan en una caché persistente por habilidad.
+- La matriz de similitud CV x Job se calcula con un solo producto de matrices.
+"""
+
+import atexit
+import os
+import threading
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from engines.skill_canonicalizer import canonical_skill_key, concept_key, skill_ids
+from engines.file_lock import file_lock, temp_path
+
+N_FEATURES = 2048
+NGRAM_SIZES = (2, 3, 4)
+
+# Umbral desde el que una habilidad del CV cubre una requerida
+MATCH_THRESHOLD = 0.55
+
+# Modo de los comparadores de habilidades:
+# "llm" (IA, local solo como fallback), "local" (sin IA) o
+# "prefilter" (local primero; solo se llama a la IA si el score local no es concluyente)
+SKILLS_COMPARISON_MODE = os.getenv("SKILLS_COMPARISON_MODE", "llm").lower()
+
+# En modo "prefilter", score local desde el que se acepta sin llamar a la IA
+PREFILTER_ACCEPT_SCORE = float(os.getenv("SKILLS_PREFILTER_ACCEPT_SCORE", "0.9"))
+
+def ngram_vector(text: str, n_features: int = N_FEATURES) -> np.ndarray:
+    """
+    Vector L2 de n-gramas de caracteres (con hashing estable crc32) de un texto ya canónico.
+    Cada palabra se rodea de espacios para que los bordes cuenten.
+    """
+    vector = np.zeros(n_features, dtype=np.float32)
+    for word in text.split():
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for i in range(len(padded) - size + 1):
+                vector[zlib.crc32(padded[i:i + size].encode("utf-8")) % n_features] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SkillVectorCache:
+    """
+    Caché persistente concepto -> vector.
+    En disco: <path>/vectors.npz con "keys" y "vectors" (misma posición = mismo concepto),
+    un solo archivo para que las llaves y los vectores siempre sean de la misma escritura.
+    """
+
+    def __init__(self, path: Optional[str] = None, n_features: int = N_FEATURES):
+        self.path = path
+        self.n_features = n_features
+        self._rows: Dict[str, int] = {}
+        self._matrix = np.zeros((64, n_features), dtype=np.float32)  # capacidad, crece x2
+        self._lock = threading.RLock()
+        if path and os.path.exists(self._file()):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _file(self) -> str:
+        return os.path.join(self.path, "vectors.npz")
+
+    def _read(self) -> Optional[Dict[str, np.ndarray]]:
+        """Llave -> vector del archivo en disco (None si no existe o es de otra configuración)"""
+        if not os.path.exists(self._file()):
+            return None
+        with np.load(self._file()) as stored:
+            keys, matrix = stored["keys"].tolist(), stored["vectors"]
+        if matrix.shape != (len(keys), self.n_features):
+            return None  # caché de otra configuración: se reconstruye
+        return dict(zip(keys, matrix))
+
+    def load(self) -> None:
+        with self._lock:
+            stored = self._read()
+            if stored is None:
+                return
+            self._matrix = np.zeros((max(64, 2 * len(stored)), self.n_features), dtype=np.float32)
+            self._rows = {}
+            for row, (key, vector) in enumerate(stored.items()):
+                self._matrix[row] = vector
+                self._rows[key] = row
+
+    def _append(self, concept: str, vector: Optional[np.ndarray] = None) -> None:
+        row = len(self._rows)
+        if row == self._matrix.shape[0]:
+            grown = np.zeros((2 * row, self.n_features), dtype=np.float32)
+            grown[:row] = self._matrix
+            self._matrix = grown
+        self._matrix[row] = ngram_vector(concept, self.n_features) if vector is None else vector
+        self._rows[concept] = row
+
+    def vectors(self, concepts: List[str]) -> np.ndarray:
+        """Matriz (len(concepts) x n_features), calculando y guardando los vectores que falten"""
+        with self._lock:
+            for concept in concepts:
+                if concept not in self._rows:
+                    self._append(concept)
+            return self._matrix[[self._rows[concept] for concept in concepts]]
+
+    def save(self) -> None:
+        """
+        Escribe la caché en disco: un solo archivo, reemplazado de forma atómica. Con el lock
+        de la carpeta agrega antes los conceptos que otros procesos hayan guardado.
+        """
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, file_lock(os.path.join(self.path, ".lock")):
+            for key, vector in (self._read() or {}).items():
+                if key not in self._rows:
+                    self._append(key, vector)
+            keys = sorted(self._rows, key=self._rows.get)
+            tmp_path = temp_path(self._file())
+            with open(tmp_path, "wb") as f:
+                np.savez(f, keys=np.asarray(keys, dtype=str), vectors=self._matrix[:len(keys)])
+            os.replace(tmp_path, self._file())
+
+
+class SkillSimilarityEngine:
+    """
+    Compara listas de habilidades sin IA.
+    """
+
+    def __init__(self, cache: Optional[SkillVectorCache] = None, threshold: float = MATCH_THRESHOLD):
+        self.cache = cache if cache is not None else SkillVectorCache()
+        self.threshold = threshold
+
+    def similarity_matrix(self, cv_skills: List[str], job_skills: List[str]) -> np.ndarray:
+        """
+        Similitud coseno de cada habilidad requerida contra cada habilidad del CV.
+
+        Returns:
+            np.ndarray: Matriz (len(job_skills) x len(cv_skills)) con valores 0-1
+        """
+        job_concepts = [concept_key(skill) for skill in job_skills]
+        cv_concepts = [concept_key(skill) for skill in cv_skills]
+        matrix = self.cache.vectors(job_concepts) @ self.cache.vectors(cv_concepts).T
+        # Ids en común (mismo concepto o concepto contenido) es coincidencia exacta
+        cv_ids = [skill_ids(skill) for skill in cv_skills]
+        cv_union = frozenset().union(*cv_ids)
+        for i, skill in enumerate(job_skills):
+            ids = skill_ids(skill)
+            if ids & cv_union:
+                for j, ids_cv in enumerate(cv_ids):
+                    if ids & ids_cv:
+                        matrix[i, j] = 1.0
+        return np.clip(matrix, 0.0, 1.0)
+
+    def compare(self, cv_skills: List[str], job_skills: List[str], kind: str = "técnicas") -> Dict[str, Any]:
+        """
+        Score de cobertura de las habilidades requeridas, con el mismo formato de los comparadores.
+
+        Args:
+            cv_skills (list): Habilidades del CV
+            job_skills (list): Habilidades requeridas
+            kind (str): Texto para la razón ("técnicas", "blandas")
+
+        Returns:
+            dict: {"score", "reason", "matched": [(requerida, del CV, similitud)], "missing": [requeridas]}
+        """
+        cv_skills = [skill for skill in cv_skills or [] if isinstance(skill, str) and canonical_skill_key(skill)]
+        job_skills = [skill for skill in job_skills or [] if isinstance(skill, str) and canonical_skill_key(skill)]
+        if not job_skills:
+            return {"score": -1.0, "reason": f"No hay habilidades {kind} requeridas", "matched": [], "missing": []}
+        if not cv_skills:
+            return {"score": -1.0, "reason": f"CV no especifica habilidades {kind}", "matched": [], "missing": job_skills}
+
+        matrix = self.similarity_matrix(cv_skills, job_skills)
+        best = matrix.argmax(axis=1)
+        best_scores = matrix[np.arange(len(job_skills)), best]
+        credit = np.where(best_scores >= self.threshold, best_scores, 0.0)
+
+        matched = [(job_skills[i], cv_skills[best[i]], round(float(best_scores[i]), 2))
+                   for i in range(len(job_skills)) if credit[i] > 0]
+        missing = [job_skills[i] for i in range(len(job_skills)) if credit[i] == 0]
+
+        details = ", ".join(f"{cv} coincide con {job}" for job, cv, _ in matched[:3])
+        if not matched:
+            reason = f"No se encontraron coincidencias entre las {len(cv_skills)} habilidades {kind} del CV y las {len(job_skills)} requeridas."
+        elif not missing:
+            reason = f"Todas las {len(job_skills)} habilidades {kind} requeridas tienen coincidencias en el CV. {details}."
+        else:
+            reason = (f"{len(matched)} de {len(job_skills)} habilidades {kind} requeridas tienen coincidencias. "
+                      f"{details}. Faltan: {', '.join(missing[:5])}.")
+
+        return {
+            "score": round(float(credit.mean()), 2),
+            "reason": reason,
+            "matched": matched,
+            "missing": missing
+        }
+
+
+_default_engine: Optional[SkillSimilarityEngine] = None
+_default_lock = threading.Lock()
+
+
+def get_skill_similarity_engine() -> SkillSimilarityEngine:
+    """
+    Motor compartido del proceso. La caché de vectores vive en SKILL_VECTOR_CACHE_PATH
+    (por defecto ./skill_vectors) y se guarda al terminar el proceso.
+    """
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            cache = SkillVectorCache(os.getenv("SKILL_VECTOR_CACHE_PATH", "./skill_vectors"))
+            _default_engine = SkillSimilarityEngine(cache)
+            atexit.register(cache.save)
+        return _default_engine
@@ -0,0 +1,239 @@
+"""
+Presupuesto de tokens para los prompts de los comparadores.
+Cuenta tokens (tiktoken si está instalado; si no, ~4 caracteres por token) y, cuando la
+experiencia del CV supera el presupuesto de entrada de un aspecto, resume de forma
+determinista las entradas menos relevantes para el Job (solapamiento léxico) hasta que quepa.
+
+track_token_usage() registra por análisis los tokens usados (callback de LangChain), los
+ahorrados por el recorte de cada aspecto y los que el proveedor sirvió desde su caché de prefijos.
+"""
+
+import math
+import os
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from engines.skill_canonicalizer import strip_accents
+
+try:
+    import tiktoken
+except ImportError:  # conteo aproximado
+    tiktoken = None
+
+try:
+    from langchain.callbacks import get_openai_callback
+except ImportError:
+    get_openai_callback = None
+
+# Presupuesto de tokens para la experiencia del CV dentro del prompt de cada aspecto
+INPUT_TOKEN_BUDGETS = {
+    "experience": int(os.getenv("EXPERIENCE_INPUT_TOKEN_BUDGET", "1200")),
+    "responsibilities": int(os.getenv("RESPONSIBILITIES_INPUT_TOKEN_BUDGET", "1200"))
+}
+
+_encoding = None
+if tiktoken is not None:
+    try:
+        _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o-mini
+    except Exception:
+        _encoding = None
+
+_WORD = re.compile(r"[a-z0-9+#]{3,}")
+_SENTENCE_END = re.compile(r"(?<=[.;!?])\s+|\n+")
+_STOPWORDS = frozenset(
+    "con para por los las del una uno que como sus mas entre sobre desde hasta este esta estos estas "
+    "ser son fue han the and for with from that this are was were into our your"
+    .split()
+)
+
+
+def count_tokens(text: str) -> int:
+    """Tokens de un texto (aproximado como caracteres / 4 sin tiktoken)"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _terms(text: Any) -> FrozenSet[str]:
+    words = _WORD.findall(strip_accents(str(text).lower())) if text else []
+    return frozenset(word for word in words if word not in _STOPWORDS)
+
+
+def _overlap(text: Any, job_terms: FrozenSet[str]) -> int:
+    return len(_terms(text) & job_terms)
+
+
+def format_experience(cv_experience: List[Dict[str, Any]]) -> str:
+    """Texto de la experiencia del CV tal como va en los prompts"""
+    cv_text = ""
+    for exp in cv_experience:
+        cv_text += f"- {exp.get('position', '')} en {exp.get('company', '')} ({exp.get('duration', '')})\n"
+        if exp.get('description'):
+            cv_text += f"  Descripción: {exp.get('description', '')}\n"
+        cv_text += "\n"
+    return cv_text
+
+
+def _summarize(description: str, job_terms: FrozenSet[str], budget: int) -> str:
+    """Oraciones más relevantes de una descripción que caben en el presupuesto, en su orden original"""
+    sentences = [sentence.strip() for sentence in _SENTENCE_END.split(description) if sentence.strip()]
+    ranked = sorted(range(len(sentences)), key=lambda i: (-_overlap(sentences[i], job_terms), i))
+    chosen: List[int] = []
+    for i in ranked:
+        candidate = " ".join(sentences[j] for j in sorted(chosen + [i]))
+        if count_tokens(f"  Descripción: {candidate}\n") <= budget:
+            chosen.append(i)
+    return " ".join(sentences[j] for j in sorted(chosen))
+
+
+def fit_experience(
+    cv_experience: List[Dict[str, Any]],
+    job_text: str,
+    budget: int
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Ajusta la experiencia del CV al presupuesto de tokens.
+
+    Si no cabe, conserva primero el encabezado (cargo, empresa, duración) de cada entrada y
+    luego, de la más relevante para el Job a la menos, su descripción completa o, si no cabe,
+    las oraciones más relevantes. Las entradas cuyo encabezado no cabe se omiten.
+
+    Args:
+        cv_experience (list): Experiencia del CV
+        job_text (str): Texto del Job contra el que se mide la relevancia
+        budget (int): Máximo de tokens para format_experience(resultado)
+
+    Returns:
+        tuple: (entradas ajustadas en el orden original,
+                {"tokens_before", "tokens_after", "trimmed_entries"})
+    """
+    entries = [exp for exp in cv_experience or [] if isinstance(exp, dict)]
+    tokens_before = count_tokens(format_experience(entries))
+    if tokens_before <= budget:
+        return entries, {"tokens_before": tokens_before, "tokens_after": tokens_before, "trimmed_entries": 0}
+
+    job_terms = _terms(job_text)
+    relevance = [_overlap(f"{exp.get('position', '')} {exp.get('description', '')}", job_terms) for exp in entries]
+    order = sorted(range(len(entries)), key=lambda i: (-relevance[i], i))
+
+    headers = [{**exp, "description": ""} for exp in entries]
+    header_cost = [count_tokens(format_experience([header])) for header in headers]
+    remaining = budget
+    kept: Dict[int, Dict[str, Any]] = {}
+    for i in order:
+        if header_cost[i] <= remaining:
+            kept[i] = headers[i]
+            remaining -= header_cost[i]
+
+    for i in order:
+        description = str(entries[i].get("description") or "")
+        if i not in kept or not description:
+            continue
+        cost = count_tokens(f"  Descripción: {description}\n")
+        if cost > remaining:
+            description = _summarize(description, job_terms, remaining)
+            cost = count_tokens(f"  Descripción: {description}\n") if description else 0
+        if description:
+            kept[i] = {**entries[i], "description": description}
+            remaining -= cost
+
+    fitted = [kept[i] for i in sorted(kept)]
+    trimmed = sum(
+        1 for i, exp in enumerate(entries)
+        if i not in kept or kept[i].get("description") != str(exp.get("description") or "")
+    )
+    return fitted, {
+        "tokens_before": tokens_before,
+        "tokens_after": count_tokens(format_experience(fitted)),
+        "trimmed_entries": trimmed
+    }
+
+
+# ==================== REGISTRO POR ANÁLISIS ====================
+
+class TokenUsage:
+    """Tokens de un análisis: totales de la IA y entrada ahorrada por aspecto"""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_calls = 0
+        # Tokens de entrada y cacheados según el uso que reporta cada respuesta
+        self.reported_prompt_tokens = 0
+        self.cached_tokens = 0
+        self.aspects: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record_input(self, aspect: str, stats: Dict[str, int]):
+        with self._lock:
+            self.aspects[aspect] = {
+                "input_tokens": stats["tokens_after"],
+                "input_tokens_saved": stats["tokens_before"] - stats["tokens_after"],
+                "trimmed_entries": stats["trimmed_entries"]
+            }
+
+    def record_llm_usage(self, prompt_tokens: int, cached_tokens: int):
+        with self._lock:
+            self.reported_prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "llm_calls": self.llm_calls,
+            "cached_tokens": self.cached_tokens,
+            "cached_token_ratio": round(self.cached_tokens / self.reported_prompt_tokens, 3)
+                                  if self.reported_prompt_tokens else 0.0,
+            "input_tokens_saved": sum(aspect["input_tokens_saved"] for aspect in self.aspects.values()),
+            "by_aspect": dict(self.aspects)
+        }
+
+
+_current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("token_usage", default=None)
+
+
+def record_input(aspect: str, stats: Dict[str, int]):
+    """Registra el recorte de entrada de un aspecto en el análisis en curso (si hay uno)"""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.record_input(aspect, stats)
+
+
+def record_llm_usage(prompt_tokens: int, cached_tokens: int):
+    """Registra los tokens de entrada y cacheados de una respuesta en el análisis en curso (si hay uno)"""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.record_llm_usage(prompt_tokens, cached_tokens)
+
+
+@contextmanager
+def track_token_usage():
+    """
+    Registra los tokens del análisis que corre dentro del bloque.
+    Los hilos que hagan llamadas a la IA deben ejecutarse con contextvars.copy_context().
+
+    Returns:
+        TokenUsage: completo al salir del bloque
+    """
+    usage = TokenUsage()
+    token = _current_usage.set(usage)
+    try:
+        if get_openai_callback is None:
+            yield usage
+        else:
+            with get_openai_callback() as cb:
+                try:
+                    yield usage
+                finally:
+                    usage.prompt_tokens = cb.prompt_tokens
+                    usage.completion_tokens = cb.completion_tokens
+                    usage.llm_calls = cb.successful_requests
+    finally:
+        _current_usage.reset(token)
@@ -0,0 +1,382 @@
+"""
+Índice vectorial TF-IDF (con hashing) sobre el contenido estructurado de los CVs.
+Permite recuperar los CVs más similares a un Job con productos de matrices dispersas.
+
+Formato en disco (carpeta del índice):
+- meta.json: generación, segmentos, tombstones y número de features
+- df.npy: frecuencia de documento por feature (para el IDF)
+- <segmento>/data.npy, indices.npy, indptr.npy, ids.npy: matriz CSR de cada segmento
+- .lock: lock entre procesos de las lecturas y escrituras de meta.json/df.npy
+
+Los segmentos se abren con memoria mapeada (np.load(mmap_mode="r")), así que cargar
+el índice al iniciar la API no lee las matrices completas. Las altas nuevas se acumulan
+en memoria y se escriben como un segmento nuevo con flush(); compact() une los segmentos.
+
+Varios workers pueden compartir la carpeta: flush() y compact() toman el lock y, si otro
+proceso escribió desde la última lectura (la generación de meta.json cambió), recargan
+el índice de disco y vuelven a aplicar encima las altas y bajas propias antes de escribir.
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from engines.file_lock import file_lock, temp_path
+
+DEFAULT_N_FEATURES = 2 ** 18
+DEFAULT_FLUSH_THRESHOLD = 1000
+
+
+def cv_document(cv_data: Dict[str, Any]) -> str:
+    """Texto indexable de un CV: experiencia, habilidades y educación"""
+    parts = []
+    for exp in cv_data.get("experience") or []:
+        if isinstance(exp, dict):
+            parts.extend([exp.get("position", ""), exp.get("description", "")])
+    parts.extend(skill for skill in cv_data.get("technical_skills") or [] if isinstance(skill, str))
+    parts.extend(skill for skill in cv_data.get("soft_skills") or [] if isinstance(skill, str))
+    for edu in cv_data.get("education") or []:
+        if isinstance(edu, dict):
+            parts.extend([edu.get("degree", ""), edu.get("field", "")])
+    for cert in cv_data.get("certifications") or []:
+        if isinstance(cert, dict):
+            parts.append(cert.get("name", ""))
+    return "\n".join(part for part in parts if part)
+
+
+def job_query_text(job_data: Dict[str, Any]) -> str:
+    """Texto de consulta de un Job: responsabilidades + habilidades técnicas"""
+    parts = [resp for resp in job_data.get("responsibilities") or [] if isinstance(resp, str)]
+    parts.extend(skill for skill in job_data.get("technical_skills") or [] if isinstance(skill, str))
+    return "\n".join(parts)
+
+
+class CVVectorIndex:
+    """
+    Índice TF-IDF por hashing con segmentos CSR en disco y altas incrementales.
+
+    - Documentos: TF sublineal normalizado L2 (no depende del IDF, así no hay que reindexar).
+    - Consulta: TF sublineal * IDF (con df incremental), normalizada L2.
+    - Score: producto punto (coseno con el IDF aplicado del lado de la consulta).
+    """
+
+    def __init__(self, path: Optional[str] = None, n_features: int = DEFAULT_N_FEATURES,
+                 flush_threshold: int = DEFAULT_FLUSH_THRESHOLD):
+        self.path = path
+        self.n_features = n_features
+        self.flush_threshold = flush_threshold
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            analyzer="word",
+            ngram_range=(1, 2),
+            strip_accents="unicode",
+            lowercase=True,
+            token_pattern=r"(?u)\b\w[\w+#.]*\w\b|\b\w\b",
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32
+        )
+        self._lock = threading.RLock()
+        # Segmento: {"name", "matrix", "ids", "alive"}; los pendientes aún no tienen nombre
+        self._segments: List[Dict[str, Any]] = []
+        self._pending: List[Dict[str, Any]] = []
+        self._live: Dict[int, Tuple[Dict[str, Any], int]] = {}  # cv_id -> (segmento, fila)
+        self._tombstones: Dict[int, int] = {}  # cv_id -> segmentos en disco al borrarlo
+        self._removed: Set[int] = set()  # Bajas de segmentos en disco aún no escritas
+        self._generation = 0  # Generación de meta.json que refleja la memoria
+        self._df = np.zeros(n_features, dtype=np.int32)
+
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            with file_lock(self._lock_path()):
+                self.load()
+
+    # ==================== VECTORIZACIÓN ====================
+
+    def _tf(self, texts: List[str]) -> sparse.csr_matrix:
+        """TF sublineal (1 + log tf) de una lista de textos"""
+        matrix = self.vectorizer.transform(texts).tocsr()
+        matrix.data = (1.0 + np.log(matrix.data)).astype(np.float32)
+        return matrix
+
+    def _vectorize_documents(self, documents: List[Dict[str, Any]]) -> sparse.csr_matrix:
+        return normalize(self._tf([cv_document(doc or {}) for doc in documents]), norm="l2", copy=False)
+
+    def _query_vector(self, job_data: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Vector denso de consulta con IDF, o None si el Job no tiene texto"""
+        tf = self._tf([job_query_text(job_data or {})])
+        if tf.nnz == 0:
+            return None
+        n_docs = max(len(self), 1)
+        idf = np.log((1.0 + n_docs) / (1.0 + self._df[tf.indices])) + 1.0
+        weights = tf.data * idf.astype(np.float32)
+        weights /= np.linalg.norm(weights) or 1.0
+        query = np.zeros(self.n_features, dtype=np.float32)
+        query[tf.indices] = weights
+        return query
+
+    # ==================== ALTAS Y BAJAS ====================
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, cv_id: int) -> bool:
+        return cv_id in self._live
+
+    def ids(self) -> List[int]:
+        """IDs indexados"""
+        with self._lock:
+            return list(self._live.keys())
+
+    def add(self, cv_id: int, cv_data: Dict[str, Any]) -> None:
+        """Indexa (o reindexa) un CV"""
+        self.add_many([(cv_id, cv_data)])
+
+    def add_many(self, items: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+        """
+        Indexa varios CVs con una sola vectorización.
+
+        Returns:
+            int: Número de CVs indexados
+        """
+        items = list(items)
+        if not items:
+            return 0
+        matrix = self._vectorize_documents([data for _, data in items])
+        ids = np.asarray([cv_id for cv_id, _ in items], dtype=np.int64)
+        segment = {"name": None, "matrix": matrix, "ids": ids, "alive": np.ones(len(ids), dtype=bool)}
+        with self._lock:
+            for row, cv_id in enumerate(ids.tolist()):
+                self._remove_unlocked(cv_id)
+                self._live[cv_id] = (segment, row)
+            np.add.at(self._df, matrix.indices, 1)
+            self._pending.append(segment)
+            if self.path and sum(len(p["ids"]) for p in self._pending) >= self.flush_threshold:
+                self.flush()
+        return len(items)
+
+    def remove(self, cv_id: int) -> bool:
+        """Saca un CV del índice"""
+        with self._lock:
+            return self._remove_unlocked(cv_id)
+
+    def _remove_unlocked(self, cv_id: int) -> bool:
+        location = self._live.pop(cv_id, None)
+        if location is None:
+            return False
+        segment, row = location
+        matrix = segment["matrix"]
+        np.subtract.at(self._df, matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]], 1)
+        segment["alive"][row] = False
+        if segment["name"] is not None:
+            self._tombstones[cv_id] = len(self._segments)
+            self._removed.add(cv_id)
+        return True
+
+    # ==================== BÚSQUEDA ====================
+
+    def search(self, job_data: Dict[str, Any], k: int = 10) -> List[Tuple[int, float]]:
+        """
+        CVs más similares a un Job.
+
+        Args:
+            job_data (dict): Job estructurado (responsibilities + technical_skills)
+            k (int): Número de resultados
+
+        Returns:
+            list: [(cv_id, similitud)] de mayor a menor
+        """
+        with self._lock:
+            query = self._query_vector(job_data)
+            if query is None:
+                return []
+
+            all_ids = []
+            all_scores = []
+            for segment in self._segments + self._pending:
+                alive = segment["alive"]
+                all_ids.append(np.asarray(segment["ids"])[alive])
+                all_scores.append(segment["matrix"].dot(query)[alive])
+
+        if not all_ids:
+            return []
+        ids = np.concatenate(all_ids)
+        scores = np.concatenate(all_scores)
+        if ids.size == 0:
+            return []
+
+        k = min(k, ids.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[i]), round(float(scores[i]), 4)) for i in top if scores[i] > 0]
+
+    # ==================== PERSISTENCIA ====================
+
+    def _lock_path(self) -> str:
+        return os.path.join(self.path, ".lock")
+
+    def _read_generation(self) -> Optional[int]:
+        """Generación de meta.json en disco (None si aún no existe)"""
+        meta_path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f).get("generation", 0)
+
+    def _write_meta(self) -> None:
+        """Escribe df.npy y meta.json (con el lock tomado; nombres temporales únicos por proceso)"""
+        self._generation += 1
+        meta = {
+            "generation": self._generation,
+            "n_features": self.n_features,
+            "segments": [segment["name"] for segment in self._segments],
+            "tombstones": {str(cv_id): count for cv_id, count in self._tombstones.items()}
+        }
+        df_path = os.path.join(self.path, "df.npy")
+        df_tmp = temp_path(df_path)
+        with open(df_tmp, "wb") as f:
+            np.save(f, self._df)
+        meta_path = os.path.join(self.path, "meta.json")
+        meta_tmp = temp_path(meta_path)
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(df_tmp, df_path)
+        os.replace(meta_tmp, meta_path)
+        self._removed = set()
+
+    def _refresh_unlocked(self) -> None:
+        """
+        Si otro proceso escribió desde la última lectura, recarga el índice de disco y vuelve
+        a aplicar las bajas y las altas pendientes de este proceso (con el lock tomado).
+        """
+        generation = self._read_generation()
+        if generation is None or generation == self._generation:
+            return
+        pending, removed = self._pending, self._removed
+        self.load()
+        for cv_id in removed:
+            self._remove_unlocked(cv_id)
+        for segment in pending:
+            matrix = segment["matrix"]
+            for row in np.flatnonzero(segment["alive"]).tolist():
+                cv_id = int(segment["ids"][row])
+                self._remove_unlocked(cv_id)
+                self._live[cv_id] = (segment, row)
+                np.add.at(self._df, matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]], 1)
+        self._pending = pending
+
+    def _write_segment(self, matrix: sparse.csr_matrix, ids: np.ndarray) -> str:
+        name = f"seg_{uuid.uuid4().hex[:12]}"
+        segment_path = os.path.join(self.path, name)
+        os.makedirs(segment_path)
+        index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+        np.save(os.path.join(segment_path, "data.npy"), matrix.data.astype(np.float32))
+        np.save(os.path.join(segment_path, "indices.npy"), matrix.indices.astype(index_dtype))
+        np.save(os.path.join(segment_path, "indptr.npy"), matrix.indptr.astype(index_dtype))
+        np.save(os.path.join(segment_path, "ids.npy"), ids.astype(np.int64))
+        return name
+
+    def _open_segment(self, name: str) -> Dict[str, Any]:
+        segment_path = os.path.join(self.path, name)
+        data = np.load(os.path.join(segment_path, "data.npy"), mmap_mode="r")
+        indices = np.load(os.path.join(segment_path, "indices.npy"), mmap_mode="r")
+        indptr = np.load(os.path.join(segment_path, "indptr.npy"), mmap_mode="r")
+        ids = np.load(os.path.join(segment_path, "ids.npy"), mmap_mode="r")
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(ids), self.n_features), copy=False)
+        return {"name": name, "matrix": matrix, "ids": ids, "alive": np.ones(len(ids), dtype=bool)}
+
+    def load(self) -> None:
+        """Abre el índice desde disco (segmentos con memoria mapeada; se llama con el lock de la carpeta)"""
+        with self._lock:
+            with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            self._generation = meta.get("generation", 0)
+            self._removed = set()
+            self.n_features = meta["n_features"]
+            self._tombstones = {int(cv_id): count for cv_id, count in meta.get("tombstones", {}).items()}
+            self._df = np.load(os.path.join(self.path, "df.npy"))
+            self._segments = [self._open_segment(name) for name in meta["segments"]]
+            self._live = {}
+            self._pending = []
+
+            # La aparición más reciente de cada id gana; las anteriores a su tombstone están muertas
+            for segment_idx, segment in enumerate(self._segments):
+                for row, cv_id in enumerate(segment["ids"].tolist()):
+                    if self._tombstones.get(cv_id, 0) > segment_idx:
+                        segment["alive"][row] = False
+                        continue
+                    previous = self._live.get(cv_id)
+                    if previous is not None:
+                        previous[0]["alive"][previous[1]] = False
+                    self._live[cv_id] = (segment, row)
+
+    def _alive_rows(self, segments: List[Dict[str, Any]]) -> Tuple[Optional[sparse.csr_matrix], np.ndarray]:
+        """Filas vivas de varios segmentos como una sola matriz CSR"""
+        matrices, ids = [], []
+        for segment in segments:
+            alive = segment["alive"]
+            if alive.any():
+                matrices.append(segment["matrix"][np.flatnonzero(alive)])
+                ids.append(np.asarray(segment["ids"])[alive])
+        if not matrices:
+            return None, np.zeros(0, dtype=np.int64)
+        return sparse.vstack(matrices).tocsr(), np.concatenate(ids)
+
+    def _append_segment(self, matrix: sparse.csr_matrix, ids: np.ndarray) -> None:
+        segment = self._open_segment(self._write_segment(matrix, ids))
+        self._segments.append(segment)
+        for row, cv_id in enumerate(segment["ids"].tolist()):
+            self._live[cv_id] = (segment, row)
+
+    def refresh(self) -> None:
+        """Incorpora lo que otros procesos escribieron en la carpeta, sin escribir nada"""
+        if not self.path or not os.path.exists(os.path.join(self.path, "meta.json")):
+            return
+        with self._lock, file_lock(self._lock_path()):
+            self._refresh_unlocked()
+
+    def flush(self) -> None:
+        """
+        Escribe las altas pendientes como un segmento nuevo y las bajas como tombstones.
+        Incorpora también lo que hayan escrito otros procesos en la misma carpeta.
+        """
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, file_lock(self._lock_path()):
+            self._refresh_unlocked()
+            if not self._pending and not self._removed and self._generation:
+                return
+            matrix, ids = self._alive_rows(self._pending)
+            self._pending = []
+            if matrix is not None:
+                self._append_segment(matrix, ids)
+            self._write_meta()
+
+    def compact(self) -> None:
+        """Une todos los segmentos (solo filas vivas) en uno y limpia los tombstones"""
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, file_lock(self._lock_path()):
+            self._refresh_unlocked()
+            matrix, ids = self._alive_rows(self._pending)
+            self._pending = []
+            if matrix is not None:
+                self._append_segment(matrix, ids)
+            old_names = [segment["name"] for segment in self._segments]
+            matrix, ids = self._alive_rows(self._segments)
+            self._segments, self._live, self._tombstones = [], {}, {}
+            if matrix is not None:
+                self._append_segment(matrix, ids)
+            self._write_meta()
+
+            for name in old_names:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
@@ -0,0 +1,2 @@
+# Tests de motores locales
+# Proyecto de Tesis - Universidad de los Andes
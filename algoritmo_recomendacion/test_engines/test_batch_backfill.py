@@ -0,0 +1,130 @@
+"""
+Test para el backfill por lotes de análisis (rondas, ingesta y re-puntuación)
+"""
+
+import sys
+import os
+import json
+import tempfile
+# Agregar la raíz del proyecto al path para importar la API
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.orm import sessionmaker
+
+from api.database import Analysis, Base, create_db_engine
+from api.repositories import AnalysisRepository, CVRepository, JobRepository, StatsRepository
+from api.batch_backfill import BatchBackfill
+from cliente_llm.batch import BatchPendingError, run_local_batch
+from cliente_llm.structured_output import generate_structured, SCORE_SCHEMA
+
+class Message:
+    def __init__(self, type, content):
+        self.type = type
+        self.content = content
+
+class FakeLLM:
+    deployment_name = "gpt-4o-mini"
+    temperature = 0
+    max_tokens = 200
+
+    def generate(self, *args, **kwargs):
+        raise AssertionError("En modo de lote no se llama a la API")
+
+class RecommendationService:
+    """Un solo prompt por par (misma interfaz que RecommendationService.analyze)"""
+    def analyze(self, cv_data, job_data, weights=None, shared_side=None):
+        messages = [Message("system", "Compara ubicaciones"), Message("human", f"{cv_data} vs {job_data}")]
+        try:
+            score = generate_structured(FakeLLM(), "location", SCORE_SCHEMA, messages)["score"]
+        except BatchPendingError:
+            score = 0.0  # fallback del comparador
+        return {"score": score, "score_breakdown": {}, "resultado_completo": {}}
+
+class AnalysisService:
+    def replace_analyses_bulk(self, db, analyses):
+        return AnalysisRepository.bulk_replace(db, analyses)
+
+def _run(backfill, db, run_dir):
+    """Rondas con el procesador local hasta que no quedan peticiones"""
+    summary = backfill.round(db)
+    while summary["requests"]:
+        for path in summary["request_files"]:
+            output_path = path.replace("batch_input", "batch_output")
+            run_local_batch(path, output_path)
+            backfill.ingest(output_path)
+        summary = backfill.round(db)
+    return summary
+
+def test_rounds_and_rescore():
+    """
+    Un backfill completo guarda un análisis por par; re-puntuar reemplaza en vez de duplicar
+    """
+    print("\n=== TEST DE BACKFILL POR LOTES ===\n")
+
+    engine = create_db_engine(f"sqlite:///{tempfile.mkdtemp()}/backfill.db")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    StatsRepository.ensure_initialized(db)
+    cv_ids = CVRepository.bulk_create(db, [{"personal": {"name": name, "location": city}} for name, city in
+                                           (("Ana", "Bogotá"), ("Luis", "Cali"), ("Eva", "Medellín"))])
+    job = JobRepository.create(db, {"basic_info": {"job_title": "Dev"}, "location": "Bogotá"})
+
+    services = {"cv_service": object(), "analysis_service": AnalysisService(), "recommendation_service": RecommendationService()}
+    run_dir = os.path.join(tempfile.mkdtemp(), "rescore")
+    backfill = BatchBackfill(run_dir, **services)
+    manifest = backfill.init(db, "analyses")
+    assert manifest["job_ids"] == [job.id] and manifest["cv_ids"] == cv_ids
+
+    first = backfill.round(db)
+    print(first)
+    assert first["saved"] == 0 and first["pending"] == 3 and first["requests"] == 3
+    assert os.path.exists(os.path.join(run_dir, "batch_input_001.schemas.json"))
+    assert _run(backfill, db, run_dir)["saved"] == 3
+    assert len(AnalysisRepository.get_by_job(db, job.id)) == 3
+
+    # Un segundo backfill sobre los mismos pares reemplaza los análisis
+    old_scores = AnalysisRepository.get_latest_scores_by_job(db, job.id)
+    rescore = BatchBackfill(os.path.join(tempfile.mkdtemp(), "rescore"), **services)
+    rescore.init(db, "analyses", [job.id], cv_ids)
+    assert _run(rescore, db, run_dir)["saved"] == 3
+    top = AnalysisRepository.get_top_candidates(db, job.id)
+    assert sorted(analysis.cv_id for analysis in top) == cv_ids
+    assert AnalysisRepository.get_latest_scores_by_job(db, job.id) == old_scores
+    stats = StatsRepository.get_job(db, job.id)
+    assert stats["total_analyses"] == 3 and sum(stats["score_histogram"]) == 3
+    assert db.query(Analysis).count() == 3
+    db.close()
+
+def test_ingest_rejects_schema_violations():
+    """
+    Una respuesta 200 que no cumple el esquema de su petición se pide de nuevo en la ronda siguiente
+    """
+    print("\n=== TEST DE RESPUESTAS FUERA DE ESQUEMA ===\n")
+
+    engine = create_db_engine(f"sqlite:///{tempfile.mkdtemp()}/backfill.db")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    CVRepository.create(db, {"personal": {"name": "Ana", "location": "Bogotá"}})
+    JobRepository.create(db, {"basic_info": {"job_title": "Dev"}, "location": "Bogotá"})
+
+    run_dir = os.path.join(tempfile.mkdtemp(), "rescore")
+    backfill = BatchBackfill(run_dir, cv_service=object(), analysis_service=AnalysisService(),
+                             recommendation_service=RecommendationService())
+    backfill.init(db, "analyses")
+    request_path = backfill.round(db)["request_files"][0]
+    with open(request_path, encoding="utf-8") as f:
+        key = json.loads(f.readline())["custom_id"]
+
+    output_path = os.path.join(run_dir, "batch_output_001.jsonl")
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"custom_id": key, "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": '{"score": 1.7, "reason": "fuera de rango"}'}}]}}, "error": None}) + "\n")
+    assert backfill.ingest(output_path) == (0, 1)
+
+    summary = backfill.round(db)
+    assert summary["saved"] == 0 and summary["requests"] == 1
+    db.close()
+
+if __name__ == "__main__":
+    test_rounds_and_rescore()
+    test_ingest_rejects_schema_violations()
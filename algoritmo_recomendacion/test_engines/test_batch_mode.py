@@ -0,0 +1,121 @@
+"""
+Test para el modo de lote de las llamadas a la IA (backfills por archivo)
+"""
+
+import sys
+import os
+import json
+import tempfile
+# Agregar src al path para importar el cliente de IA compartido
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from cliente_llm.batch import BatchStore, BatchPendingError, batch_item, run_local_batch
+from cliente_llm.circuit_breaker import CircuitOpenError
+from cliente_llm.structured_output import (
+    generate_structured, validate, StructuredOutputError, SCORE_SCHEMA, STRING_LIST_SCHEMA
+)
+
+class Message:
+    def __init__(self, type, content):
+        self.type = type
+        self.content = content
+
+class FakeLLM:
+    deployment_name = "gpt-4o-mini"
+    temperature = 0
+    max_tokens = 200
+
+    def generate(self, *args, **kwargs):
+        raise AssertionError("En modo de lote no se llama a la API")
+
+def _messages(text):
+    return [Message("system", "Compara ubicaciones"), Message("human", text)]
+
+def _skills():
+    return generate_structured(FakeLLM(), "cv.technical_skills", STRING_LIST_SCHEMA, _messages("CV"))
+
+def test_pending_render_process_ingest():
+    """
+    Sin respuesta la llamada queda pendiente y se escribe; tras procesar e ingerir el archivo
+    la misma llamada devuelve una respuesta que cumple el esquema
+    """
+    print("\n=== TEST DE RONDA DEL LOTE ===\n")
+
+    run_dir = tempfile.mkdtemp()
+    store_path = os.path.join(run_dir, "responses.jsonl")
+    store = BatchStore.load(store_path)
+
+    with batch_item(store) as item:
+        for text in ("CV: Bogotá", "CV: Bogotá", "CV: Medellín"):
+            try:
+                generate_structured(FakeLLM(), "location", SCORE_SCHEMA, _messages(text))
+                assert False, "debía quedar pendiente"
+            except BatchPendingError as e:
+                # Los comparadores lo tratan como circuito abierto y usan su fallback
+                assert isinstance(e, CircuitOpenError)
+        try:
+            _skills()
+        except BatchPendingError:
+            pass
+    # Los prompts repetidos se piden una sola vez
+    assert len(item.pending) == 3 and len(store.requests) == 3
+
+    paths = store.write_requests(os.path.join(run_dir, "batch_input_001"))
+    with open(paths[0], encoding="utf-8") as f:
+        request = json.loads(f.readline())
+    print(request["body"]["messages"][0])
+    assert request["url"] == "/chat/completions" and request["body"]["model"] == "gpt-4o-mini"
+    assert request["body"]["messages"][1]["role"] == "user"
+
+    output_path = os.path.join(run_dir, "batch_output_001.jsonl")
+    assert run_local_batch(paths[0], output_path) == 3
+    assert store.ingest(output_path, store_path) == (3, 0)
+    # Ingerir dos veces el mismo archivo no duplica respuestas
+    assert store.ingest(output_path, store_path) == (0, 0)
+
+    store = BatchStore.load(store_path)
+    with batch_item(store) as item:
+        result = generate_structured(FakeLLM(), "location", SCORE_SCHEMA, _messages("CV: Medellín"))
+        skills = _skills()
+    assert not item.pending
+    print(result, skills)
+    assert validate(result, SCORE_SCHEMA) is None and validate(skills, STRING_LIST_SCHEMA) is None
+
+def test_failed_and_invalid_responses():
+    """
+    Las respuestas con error y las que no cumplen el esquema no se guardan: se piden de nuevo
+    """
+    print("\n=== TEST DE RESPUESTAS FALLIDAS ===\n")
+
+    run_dir = tempfile.mkdtemp()
+    output_path = os.path.join(run_dir, "batch_output.jsonl")
+    store_path = os.path.join(run_dir, "responses.jsonl")
+    store = BatchStore.load(store_path)
+    with batch_item(store):
+        try:
+            generate_structured(FakeLLM(), "location", SCORE_SCHEMA, _messages("CV: Cali"))
+        except BatchPendingError:
+            pass
+    key = next(iter(store.requests))
+    store.write_requests(os.path.join(run_dir, "batch_input_001"))
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"custom_id": "otro", "response": {"status_code": 429, "body": {}}, "error": None}) + "\n")
+        f.write(json.dumps({"custom_id": key, "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": '{"score": 1.7, "reason": "fuera de rango"}'}}]}}, "error": None}) + "\n")
+    # El esquema se toma del archivo guardado junto a las peticiones (otro proceso)
+    store = BatchStore.load(store_path)
+    store.load_schemas(os.path.join(run_dir, "batch_input_*.schemas.json"))
+    assert store.ingest(output_path, store_path) == (0, 2)
+
+    with batch_item(BatchStore.load(store_path)) as item:
+        try:
+            generate_structured(FakeLLM(), "location", SCORE_SCHEMA, _messages("CV: Cali"))
+            assert False, "debía quedar pendiente"
+        except BatchPendingError as e:
+            print(e)
+    assert item.pending == {key}
+
+if __name__ == "__main__":
+    test_pending_render_process_ingest()
+    test_failed_and_invalid_responses()
@@ -0,0 +1,72 @@
+"""
+Test para el catálogo local de certificaciones
+"""
+
+import sys
+import os
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.certification_catalog import (
+    resolve_certification, local_direct_comparison, local_certifications_vs_skills, local_required_vs_cv_skills
+)
+
+CV_CERTIFICATIONS = [
+    {"name": "AWS Certified Cloud Practitioner", "issuer": "Amazon", "year": "2023"},
+    {"name": "PSM I", "issuer": "Scrum.org", "year": "2022"}
+]
+
+def test_resolve():
+    """
+    Alias, proveedores y áreas del catálogo
+    """
+    print("\n=== TEST DE RESOLUCIÓN ===\n")
+    
+    assert resolve_certification("AWS Certified Solutions Architect – Associate").certs == {"aws-saa"}
+    assert resolve_certification("(ISC)² CISSP").certs == {"cissp"}
+    assert resolve_certification("AZ-900").certs == {"az-900"}
+    assert {"azure", "cloud"} <= resolve_certification("AZ-900").tags
+    generic = resolve_certification("certificados aws")
+    assert not generic.certs and generic.tags == {"aws"}
+    assert not resolve_certification("Curso de Python en Platzi").known
+
+def test_direct_comparison():
+    """
+    Coincidencias directas sin IA; nombres fuera del catálogo van a la IA
+    """
+    print("\n=== TEST DE COMPARACIÓN DIRECTA ===\n")
+    
+    result = local_direct_comparison(CV_CERTIFICATIONS, ["certificados aws", "certificados google cloud"])
+    print(result)
+    assert result["score"] == 0.5
+    # PSM y CSM son la misma familia y nivel
+    assert local_direct_comparison(CV_CERTIFICATIONS, ["Certified Scrum Master"])["score"] == 1.0
+    # Mismo proveedor, otra familia
+    assert local_direct_comparison(CV_CERTIFICATIONS, ["AWS Solutions Architect Associate"])["score"] == 0.4
+    # Área pedida con ejemplos: otra certificación de la misma área cubre parcialmente
+    assert local_direct_comparison([{"name": "CompTIA Security+"}], ["Certificación en seguridad como CISSP o CEH"])["score"] == 0.7
+    
+    unknown = CV_CERTIFICATIONS + [{"name": "Curso de arquitectura en la nube", "issuer": "Platzi"}]
+    assert local_direct_comparison(unknown, ["AWS Solutions Architect Associate"]) is None
+    assert local_direct_comparison(unknown, ["certificados aws"])["score"] == 1.0
+    assert local_direct_comparison(CV_CERTIFICATIONS, ["Certificado de manipulación de alimentos"]) is None
+
+def test_implied_skills():
+    """
+    Habilidades implicadas por las certificaciones
+    """
+    print("\n=== TEST DE HABILIDADES IMPLICADAS ===\n")
+    
+    result = local_certifications_vs_skills(CV_CERTIFICATIONS, ["Amazon Web Services", "Python", "metodologías ágiles", "Docker"])
+    print(result)
+    assert result["score"] == 0.8
+    assert local_certifications_vs_skills(CV_CERTIFICATIONS, ["Excel"])["score"] == 0.0
+    assert local_certifications_vs_skills([{"name": "Curso Platzi"}], ["Excel"]) is None
+    
+    assert local_required_vs_cv_skills(["certificados aws", "CKA"], ["AWS", "Docker"])["score"] == 0.55
+    assert local_required_vs_cv_skills(["Certificado de alturas"], ["AWS"]) is None
+
+if __name__ == "__main__":
+    test_resolve()
+    test_direct_comparison()
+    test_implied_skills()
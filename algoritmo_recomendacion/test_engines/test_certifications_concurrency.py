@@ -0,0 +1,134 @@
+"""
+Test para las dos sub-comparaciones de certificaciones requeridas (directa y por habilidades técnicas):
+cuándo se lanza, se descarta o se combina la comparación por habilidades
+"""
+
+import sys
+import os
+import threading
+from contextlib import contextmanager
+# Agregar el directorio padre y src al path para importar los comparadores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+from cliente_llm import providers
+# Proveedor local: ninguna llamada sale a la red (LLM_PROVIDER se lee al importar providers)
+providers.LLM_PROVIDER = "stub"
+
+from comparators import certifications_comparator
+from comparators.certifications_comparator import compare_certifications, SKILLS_PENALTY
+
+CV_CERTIFICATIONS = [{"name": "Curso interno de nube", "issuer": "Empresa", "year": "2023"}]
+JOB_CERTIFICATIONS = ["certificados aws"]
+CV_SKILLS = ["AWS", "Terraform"]
+
+@contextmanager
+def _patched(**functions):
+    """Reemplaza funciones del comparador durante el bloque"""
+    originals = {name: getattr(certifications_comparator, name) for name in functions}
+    for name, fn in functions.items():
+        setattr(certifications_comparator, name, fn)
+    try:
+        yield
+    finally:
+        for name, fn in originals.items():
+            setattr(certifications_comparator, name, fn)
+
+def _skills_call(calls, score=0.4, release=None):
+    def compare(job_certifications, cv_technical_skills, cv_profile=None):
+        calls.append("skills")
+        if release is not None:
+            release.wait(5)
+        return {"score": score, "reason": "Habilidades relacionadas"}
+    return compare
+
+def test_catalog_match_skips_skills_call():
+    """
+    Con un score directo del catálogo >= SKILLS_PENALTY no se lanza la comparación por habilidades
+    """
+    print("\n=== TEST DE COINCIDENCIA EN EL CATÁLOGO ===\n")
+
+    calls = []
+    def direct_llm(*args):
+        calls.append("direct")
+        return {"score": 0.0, "reason": "no debía llamarse"}
+
+    with _patched(
+        local_direct_comparison=lambda cv, job: {"score": 1.0, "reason": "AWS del catálogo"},
+        _compare_certifications_direct=direct_llm,
+        _compare_required_certifications_with_cv_technical_skills=_skills_call(calls)
+    ):
+        result = compare_certifications(CV_CERTIFICATIONS, JOB_CERTIFICATIONS, [], CV_SKILLS)
+    print(result)
+    assert result == {"score": 1.0, "reason": "AWS del catálogo"} and calls == []
+
+def test_high_direct_score_drops_skills_call():
+    """
+    Si la comparación directa con IA da >= 0.5, la de habilidades en curso no se espera ni cuenta
+    """
+    print("\n=== TEST DE DESCARTE DE HABILIDADES ===\n")
+
+    calls = []
+    release = threading.Event()
+    skills_started = threading.Event()
+    skills = _skills_call(calls, score=SKILLS_PENALTY, release=release)
+    def started_skills(*args):
+        skills_started.set()
+        return skills(*args)
+    def direct_llm(*args):
+        calls.append("direct")
+        skills_started.wait(5)  # la de habilidades ya corre en paralelo
+        return {"score": 0.9, "reason": "Certificación equivalente"}
+
+    results = []
+    with _patched(
+        local_direct_comparison=lambda cv, job: None,
+        _compare_certifications_direct=direct_llm,
+        _compare_required_certifications_with_cv_technical_skills=started_skills
+    ):
+        thread = threading.Thread(
+            target=lambda: results.append(compare_certifications(CV_CERTIFICATIONS, JOB_CERTIFICATIONS, [], CV_SKILLS)),
+            daemon=True)
+        thread.start()
+        # Responde sin esperar a la comparación de habilidades, que sigue bloqueada
+        thread.join(5)
+        finished = not thread.is_alive()
+        release.set()
+    print(results)
+    assert finished, "compare_certifications esperó la comparación de habilidades"
+    assert results == [{"score": 0.9, "reason": "Certificación equivalente"}]
+    assert sorted(calls) == ["direct", "skills"]
+
+def test_low_direct_score_combines_both():
+    """
+    Con un score directo < 0.5 corren las dos comparaciones y gana la mejor
+    """
+    print("\n=== TEST DE COMBINACIÓN ===\n")
+
+    calls = []
+    def direct_llm(*args):
+        calls.append("direct")
+        return {"score": 0.2, "reason": "Certificación poco relacionada"}
+
+    with _patched(
+        local_direct_comparison=lambda cv, job: None,
+        _compare_certifications_direct=direct_llm,
+        _compare_required_certifications_with_cv_technical_skills=_skills_call(calls, score=0.4)
+    ):
+        result = compare_certifications(CV_CERTIFICATIONS, JOB_CERTIFICATIONS, [], CV_SKILLS)
+        print(result)
+        assert sorted(calls) == ["direct", "skills"]
+        assert result["score"] == 0.4 and result["reason"].startswith("No hay certificaciones adecuadas")
+
+    # Si la directa gana, la razón incluye también la de habilidades
+    with _patched(
+        local_direct_comparison=lambda cv, job: None,
+        _compare_certifications_direct=lambda *args: {"score": 0.3, "reason": "Parcial"},
+        _compare_required_certifications_with_cv_technical_skills=_skills_call(calls, score=0.1)
+    ):
+        result = compare_certifications(CV_CERTIFICATIONS, JOB_CERTIFICATIONS, [], CV_SKILLS)
+    assert result == {"score": 0.3, "reason": "Parcial | Adicionalmente: Habilidades relacionadas"}
+
+if __name__ == "__main__":
+    test_catalog_match_skips_skills_call()
+    test_high_direct_score_drops_skills_call()
+    test_low_direct_score_combines_both()
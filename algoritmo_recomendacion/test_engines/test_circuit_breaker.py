@@ -0,0 +1,93 @@
+"""
+Test para el circuit breaker de las llamadas a la IA
+"""
+
+import sys
+import os
+# Agregar src al path para importar el cliente de IA compartido
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from cliente_llm.circuit_breaker import (
+    CircuitBreaker, CLOSED, OPEN, HALF_OPEN, is_endpoint_failure, track_degradation, mark_degraded
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class ServerError(Exception):
+    status_code = 503
+
+class RateLimitError(Exception):
+    status_code = 429
+
+def _breaker(clock):
+    return CircuitBreaker("gpt-4o-mini", window=10, min_calls=4, error_rate=0.5, latency_p95=10.0, cooldown=30.0, clock=clock)
+
+def test_trips_on_error_rate_and_recovers():
+    """
+    Se abre con la mitad de errores, rechaza durante el enfriamiento y una prueba exitosa lo cierra
+    """
+    print("\n=== TEST DE TASA DE ERRORES ===\n")
+
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for ok in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record_success(1.0) if ok else breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now = 31.0
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    # Solo una llamada de prueba a la vez
+    assert not breaker.allow()
+    breaker.record_success(1.0)
+    assert breaker.state == CLOSED and breaker.allow()
+    stats = breaker.snapshot()
+    print(stats)
+    assert stats["trips"] == 1 and stats["probes"] == 1 and stats["rejected"] == 2
+
+def test_trips_on_latency_and_failed_probe():
+    """
+    Se abre por el p95 de latencia; si la prueba falla vuelve a abrirse
+    """
+    print("\n=== TEST DE LATENCIA ===\n")
+
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for latency in (2.0, 3.0, 12.0, 15.0):
+        breaker.allow()
+        breaker.record_success(latency)
+    assert breaker.state == OPEN
+
+    clock.now = 30.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    assert breaker.snapshot()["trips"] == 2
+
+def test_endpoint_failures_and_degradation():
+    """
+    Los 429 no cuentan como fallas del endpoint; las llamadas rechazadas marcan el análisis en curso
+    """
+    print("\n=== TEST DE DEGRADACIÓN ===\n")
+
+    assert is_endpoint_failure(ServerError())
+    assert is_endpoint_failure(TimeoutError())
+    assert not is_endpoint_failure(RateLimitError())
+
+    mark_degraded("experience")
+    with track_degradation() as degradation:
+        assert degradation.as_dict() == {"degraded": False, "degraded_calls": []}
+        mark_degraded("technical_skills")
+        mark_degraded("experience")
+    assert degradation.as_dict() == {"degraded": True, "degraded_calls": ["experience", "technical_skills"]}
+
+if __name__ == "__main__":
+    test_trips_on_error_rate_and_recovers()
+    test_trips_on_latency_and_failed_probe()
+    test_endpoint_failures_and_degradation()
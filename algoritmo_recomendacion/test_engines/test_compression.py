@@ -0,0 +1,91 @@
+"""
+Test para la columna JSON comprimida de los análisis
+"""
+
+import sys
+import os
+import json
+# Agregar la raíz del proyecto al path para importar la API
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine, Column, Integer, text
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from api import compression
+from api.compression import CompressedJSON, compress_json, decompress_json, is_compressed, UnknownDictionaryError
+
+PAYLOAD = {
+    "final_score_data": {"final_score": 0.72, "score_breakdown": {"experience": {"score": 0.8, "weight": 0.3}}},
+    "summary": "Candidato adecuado. Destaca en Experiencia",
+    "skills": ["Python", "Gestión de proyectos", "Inglés B2"],
+}
+
+def test_round_trip_and_version_byte():
+    """
+    compress -> decompress devuelve el mismo valor; la cabecera lleva la versión del diccionario
+    """
+    print("\n=== TEST DE IDA Y VUELTA ===\n")
+
+    for version in (None, 0, 1):
+        raw = compress_json(PAYLOAD, version)
+        expected = compression.CURRENT_DICTIONARY_VERSION if version is None else version
+        print(f"v{expected}: {len(raw)} bytes")
+        assert is_compressed(raw) and raw[:1] == compression.MAGIC and raw[1] == expected
+        assert decompress_json(raw) == PAYLOAD
+    assert compression.CURRENT_DICTIONARY_VERSION == int(os.getenv("ANALYSIS_DICTIONARY_VERSION", "1"))
+    assert len(compress_json(PAYLOAD, 1)) < len(json.dumps(PAYLOAD, ensure_ascii=False).encode("utf-8"))
+
+def test_legacy_rows_and_unknown_version():
+    """
+    Las filas sin comprimir se leen como JSON plano; una versión desconocida da un error claro
+    """
+    print("\n=== TEST DE FILAS ANTIGUAS ===\n")
+
+    plain = json.dumps(PAYLOAD, ensure_ascii=False)
+    assert decompress_json(plain) == PAYLOAD
+    assert decompress_json(plain.encode("utf-8")) == PAYLOAD
+    assert decompress_json(memoryview(plain.encode("utf-8"))) == PAYLOAD
+    assert decompress_json(PAYLOAD) == PAYLOAD and decompress_json(None) is None
+    assert not is_compressed(plain.encode("utf-8"))
+
+    raw = bytearray(compress_json(PAYLOAD, 1))
+    raw[1] = 250
+    try:
+        decompress_json(bytes(raw))
+        assert False, "debía fallar con una versión desconocida"
+    except UnknownDictionaryError as e:
+        print(e)
+        assert "v250" in str(e)
+
+def test_column_round_trip():
+    """
+    La columna guarda bytes comprimidos y entrega el dict; también lee filas en JSON plano
+    """
+    print("\n=== TEST DE LA COLUMNA ===\n")
+
+    Base = declarative_base()
+
+    class Row(Base):
+        __tablename__ = "rows"
+        id = Column(Integer, primary_key=True)
+        data = Column(CompressedJSON)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    db.add(Row(id=1, data=PAYLOAD))
+    db.commit()
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO rows (id, data) VALUES (2, :data)"), {"data": json.dumps(PAYLOAD)})
+        stored = conn.execute(text("SELECT data FROM rows WHERE id = 1")).scalar()
+    assert is_compressed(stored)
+
+    db = Session()
+    assert db.get(Row, 1).data == PAYLOAD and db.get(Row, 2).data == PAYLOAD
+
+if __name__ == "__main__":
+    test_round_trip_and_version_byte()
+    test_legacy_rows_and_unknown_version()
+    test_column_round_trip()
@@ -0,0 +1,80 @@
+"""
+Test para el motor de educación (escala ordinal y áreas de estudio)
+"""
+
+import sys
+import os
+import json
+from datetime import date
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.education_engine import (
+    BACHILLER, TECNICO, TECNOLOGO, PREGRADO, MAESTRIA, DOCTORADO, education_level, required_education_level,
+    field_families, is_in_progress, local_education_comparison
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TODAY = date(2025, 6, 1)
+
+def test_levels_and_fields():
+    """
+    Escala ordinal y familias de carreras
+    """
+    print("\n=== TEST DE NIVELES Y ÁREAS ===\n")
+    
+    assert education_level("Maestría en Ciencia de Datos") == MAESTRIA
+    assert education_level("Maestría en Ciencia de Datos") > education_level("ingeniería de sistemas")
+    assert education_level("bachiller académico") == BACHILLER
+    assert required_education_level("técnico, tecnólogo o profesional en sistemas") == TECNICO
+    assert required_education_level("Administración de empresas") == PREGRADO
+    assert required_education_level("sin requisito") == 0
+    # "Doctor en Medicina/Derecho" es un título profesional, no un doctorado
+    assert education_level("Doctor en Medicina") == PREGRADO
+    assert education_level("Doctora en Derecho y Ciencias Políticas") == PREGRADO
+    assert education_level("Doctorado en Derecho") == DOCTORADO
+    assert required_education_level("Médico (Doctor en medicina)") == PREGRADO
+    # "Técnico/Tecnólogo profesional" son títulos de nivel técnico; "carreras técnicas" no es un nivel
+    assert education_level("Técnico profesional en programación de software") == TECNICO
+    assert education_level("Tecnóloga profesional en gestión empresarial") == TECNOLOGO
+    assert required_education_level("Profesional en carreras técnicas o afines") == PREGRADO
+    assert required_education_level("Técnica en enfermería") == TECNICO
+    
+    assert field_families("Ingeniería de Sistemas y Computación") == {"sistemas"}
+    assert field_families("Industrial Engineering and Systems Engineering") == {"industrial", "sistemas"}
+    assert is_in_progress({"degree": "ingeniería industrial", "year": "presente"})
+    assert not is_in_progress({"degree": "ingeniería industrial", "year": "2020"}, TODAY)
+
+def test_local_comparison():
+    """
+    Combinaciones conocidas sin IA; requisitos inusuales o estudios en curso van a la IA
+    """
+    print("\n=== TEST DE COMPARACIÓN LOCAL ===\n")
+    
+    with open(os.path.join(ROOT, "src/estructuracion_CV/CvEjemplos/exampleReal2.json"), encoding="utf-8") as f:
+        cv_education = json.load(f)["education"]
+    job = "profesional en ingeniería de sistemas electrónica telecomunicaciones o afines"
+    
+    result = local_education_comparison(cv_education, job, TODAY)
+    print(result)
+    assert result["score"] == 1.0
+    assert local_education_comparison(cv_education, "Maestría en finanzas", TODAY)["score"] == 0.0
+    assert local_education_comparison([{"degree": "Tecnólogo en sistemas", "year": "2019"}], job, TODAY)["score"] == 0.5
+    assert local_education_comparison(cv_education, "Estudiante de últimos semestres de ingeniería", TODAY) is None
+    
+    # Dos niveles o más por debajo se resuelve sin IA aunque el CV no diga área
+    bachiller = [{"degree": "Bachiller académico", "year": "2015"}]
+    assert local_education_comparison(bachiller, job, TODAY)["score"] == 0.2
+    assert local_education_comparison(bachiller, "Técnico en sistemas", TODAY) is None
+    technical = [{"degree": "Técnico profesional en programación de software", "year": "2020"}]
+    result = local_education_comparison(technical, "Profesional en ingeniería de sistemas o afines", TODAY)
+    print(result)
+    assert result["score"] == 0.2 and "técnico" in result["reason"]
+    
+    student = [{"degree": "ingeniería de sistemas", "year": "presente"}]
+    assert local_education_comparison(student, job, TODAY) is None
+    assert local_education_comparison(student, job, TODAY, force=True)["score"] == 0.7
+
+if __name__ == "__main__":
+    test_levels_and_fields()
+    test_local_comparison()
@@ -0,0 +1,99 @@
+"""
+Test para el parser de años de experiencia
+"""
+
+import sys
+import os
+from datetime import date
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.experience_parser import (
+    EXPERIENCE_SUMMARY_VERSION, cv_experience_years, duration_interval, experience_summary,
+    local_experience_comparison, required_experience_years, summary_years, with_experience_summary
+)
+
+TODAY = date(2025, 6, 1)
+
+def test_experience_years():
+    """
+    Duraciones en español e inglés, 'presente' y periodos solapados
+    """
+    print("\n=== TEST DE AÑOS DE EXPERIENCIA ===\n")
+    
+    experience = [
+        {"duration": "march 2023 – jul 2023"},
+        {"duration": "junio 2023 – diciembre 2023"},  # se solapa con la anterior
+        {"duration": "enero 2024 - presente"},
+        {"duration": "no especificada"}
+    ]
+    years = cv_experience_years(experience, TODAY)
+    print(f"Años: {years}")
+    assert years == round(28 / 12, 2)  # marzo 2023 - junio 2025
+    
+    assert duration_interval("03/2021 - 12/2021") == (2021 * 12 + 2, 2021 * 12 + 11)
+    assert duration_interval("Mar. de 2022 a la fecha", TODAY) == (2022 * 12 + 2, 2025 * 12 + 5)
+    # "desde X" sin fecha de fin llega hasta hoy; un año solo sigue siendo ese año
+    assert duration_interval("desde 2019", TODAY) == (2019 * 12, 2025 * 12 + 5)
+    assert duration_interval("Since March 2020", TODAY) == (2020 * 12 + 2, 2025 * 12 + 5)
+    assert duration_interval("desde 2019 hasta 2020", TODAY) == (2019 * 12, 2020 * 12 + 11)
+    assert duration_interval("2019", TODAY) == (2019 * 12, 2019 * 12 + 11)
+    assert cv_experience_years([{"duration": "Desde 2019"}], TODAY) == 6.5  # enero 2019 - junio 2025
+    assert cv_experience_years([{"duration": "2 años y 6 meses"}, {"duration": "18 months"}]) == 4.0
+    
+    assert required_experience_years("contar con mínimo 4 años trabajando en posiciones similares") == 4
+    assert required_experience_years("experiencia mínima de un año en cargos asociados") == 1
+    assert required_experience_years("3+ years of experience") == 3
+    assert required_experience_years("de 3 a 5 años de experiencia") == 3
+    assert required_experience_years("al menos 18 meses") == 1.5
+    # "N años y M meses" es una sola cantidad
+    assert required_experience_years("Mínimo 2 años y 6 meses de experiencia") == 2.5
+    assert required_experience_years("2 years and 6 months of experience") == 2.5
+    assert required_experience_years("2 años y 6 meses o 12 meses con posgrado") == 1
+    assert required_experience_years("experiencia en seguridad de la información") is None
+
+def test_stored_summary():
+    """
+    El resumen guardado no depende de la fecha: los cargos vigentes crecen con el tiempo
+    """
+    print("\n=== TEST DE RESUMEN GUARDADO ===\n")
+    
+    cv_data = {"experience": [{"duration": "enero 2024 - presente"}]}
+    stored = with_experience_summary(cv_data)
+    print(stored["experience_summary"])
+    assert stored["experience_summary"]["version"] == EXPERIENCE_SUMMARY_VERSION
+    assert stored["experience_summary"]["intervals"] == [[2024 * 12, None]]
+    assert with_experience_summary(stored) is stored
+    assert summary_years(stored["experience_summary"], date(2024, 12, 1)) == 1.0
+    assert summary_years(stored["experience_summary"], date(2025, 12, 1)) == 2.0
+
+def test_local_comparison():
+    """
+    Solo los casos evidentes se resuelven sin IA
+    """
+    print("\n=== TEST DE CASOS EVIDENTES ===\n")
+    
+    junior = experience_summary([{"duration": "enero 2025 - junio 2025"}])
+    senior = experience_summary([{"duration": "2015 - presente"}])
+    
+    result = local_experience_comparison(junior, "mínimo 4 años en posiciones similares", TODAY)
+    print(result)
+    assert result is not None and result["score"] < 0.2
+    
+    assert local_experience_comparison(senior, "mínimo 4 años de experiencia", TODAY)["score"] == 1.0
+    # 6 meses no cumplen "2 años y 6 meses"
+    result = local_experience_comparison(junior, "Mínimo 2 años y 6 meses de experiencia", TODAY)
+    assert result is not None and result["score"] < 1.0
+    # Cumple los años pero el cargo importa: decide la IA
+    assert local_experience_comparison(senior, "mínimo 4 años en desarrollo backend", TODAY) is None
+    # No pide años: decide la IA
+    assert local_experience_comparison(junior, "experiencia en seguridad", TODAY) is None
+    # Duraciones que no se entienden: no se descarta sin IA
+    unclear = experience_summary([{"duration": "2025"}, {"duration": "varios proyectos"}])
+    assert local_experience_comparison(unclear, "mínimo 4 años", TODAY) is None
+    assert local_experience_comparison(unclear, "mínimo 4 años", TODAY, force=True)["score"] == 0.25
+
+if __name__ == "__main__":
+    test_experience_years()
+    test_stored_summary()
+    test_local_comparison()
@@ -0,0 +1,80 @@
+"""
+Test para la sincronización de los índices en memoria entre workers
+"""
+
+import sys
+import os
+import tempfile
+# Agregar la raíz del proyecto al path para importar la API
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.orm import sessionmaker
+
+from api.database import Base, create_db_engine
+from api.repositories import CVRepository, JobRepository
+from api.index_sync import IndexSyncService
+from engines.skill_index import InvertedSkillIndex
+
+class CVIndex:
+    """Índice de CVs de un worker (misma interfaz que CandidateIndexService)"""
+    def __init__(self):
+        self.index = InvertedSkillIndex()
+        self.loaded = []
+
+    def ids(self):
+        return self.index.ids()
+
+    def add_cvs(self, items):
+        self.loaded.extend(cv_id for cv_id, _ in items)
+        for cv_id, cv_data in items:
+            self.index.add(cv_id, cv_data)
+
+    def remove_cv(self, cv_id):
+        self.index.remove(cv_id)
+
+class JobIndex(CVIndex):
+    def add_jobs(self, items):
+        self.add_cvs(items)
+
+    def remove_job(self, job_id):
+        self.remove_cv(job_id)
+
+def test_changes_from_other_worker():
+    """
+    Un worker ve los CVs creados y eliminados por otro; solo carga los registros nuevos
+    """
+    print("\n=== TEST DE SINCRONIZACIÓN ENTRE WORKERS ===\n")
+
+    engine = create_db_engine(f"sqlite:///{tempfile.mkdtemp()}/sync.db")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+
+    first = CVRepository.create(db, {"personal": {"name": "Ana"}, "technical_skills": ["Python"]})
+    index = CVIndex()
+    sync = IndexSyncService("cvs", [index])
+    assert sync.sync(db, force=True)["agregados"] == 1
+    # Sin cambios no se consulta la tabla
+    assert sync.sync(db) == {}
+
+    # Otro worker crea dos CVs y elimina el primero
+    other = Session()
+    new_ids = CVRepository.bulk_create(other, [{"technical_skills": ["Java"]}, {"technical_skills": ["SQL"]}])
+    CVRepository.delete(other, first.id)
+    other.close()
+
+    result = sync.sync(db)
+    print(result)
+    assert result == {"indexados": 2, "agregados": 2, "eliminados": 1}
+    assert sorted(index.ids()) == sorted(new_ids)
+    assert index.loaded == [first.id] + sorted(new_ids)
+
+    jobs = JobIndex()
+    job_sync = IndexSyncService("jobs", [jobs])
+    job_sync.sync(db, force=True)
+    job = JobRepository.create(Session(), {"basic_info": {"job_title": "Dev"}, "technical_skills": ["Python"]})
+    assert job_sync.sync(db)["agregados"] == 1 and jobs.ids() == [job.id]
+    db.close()
+
+if __name__ == "__main__":
+    test_changes_from_other_worker()
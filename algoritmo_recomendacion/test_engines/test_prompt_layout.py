@@ -0,0 +1,58 @@
+"""
+Test para el orden de los prompts (caché de prefijos del proveedor)
+"""
+
+import sys
+import os
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.prompt_layout import current_shared_side, layout_prompt, shared_prompt_side, PROMPT_SHARED_SIDE
+from engines.token_budget import record_llm_usage, track_token_usage
+
+def test_layout_by_batch_direction():
+    """
+    La instrucción fija va primero, luego el lado compartido del lote y al final el variable
+    """
+    print("\n=== TEST DE ORDEN ===\n")
+
+    with shared_prompt_side("job"):
+        assert layout_prompt("SYS", "CV: a", "JOB: b") == [("system", "SYS"), ("human", "JOB: b\n\nCV: a")]
+    with shared_prompt_side("cv"):
+        assert current_shared_side() == "cv"
+        assert layout_prompt("SYS", "CV: a", "JOB: b")[1] == ("human", "CV: a\n\nJOB: b")
+        with shared_prompt_side(None):
+            assert current_shared_side() == "cv"
+    assert current_shared_side() == PROMPT_SHARED_SIDE
+
+def test_invalid_side():
+    """
+    Un lado desconocido es un error
+    """
+    print("\n=== TEST DE LADO INVÁLIDO ===\n")
+
+    try:
+        with shared_prompt_side("ambos"):
+            pass
+        assert False, "debía fallar"
+    except ValueError:
+        pass
+
+def test_cached_token_ratio():
+    """
+    Proporción de tokens de entrada servidos desde la caché del proveedor
+    """
+    print("\n=== TEST DE TOKENS CACHEADOS ===\n")
+
+    with track_token_usage() as usage:
+        record_llm_usage(2000, 1536)
+        record_llm_usage(2000, 0)
+    summary = usage.as_dict()
+    print(summary)
+    assert summary["cached_tokens"] == 1536
+    assert summary["cached_token_ratio"] == 0.384
+
+if __name__ == "__main__":
+    test_layout_by_batch_direction()
+    test_invalid_side()
+    test_cached_token_ratio()
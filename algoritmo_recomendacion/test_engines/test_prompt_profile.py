@@ -0,0 +1,68 @@
+"""
+Test para el perfil de prompt del CV
+"""
+
+import sys
+import os
+import json
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.prompt_profile import (
+    PROMPT_PROFILE_VERSION, experience_prompt_text, get_prompt_profile, prompt_profile, with_prompt_profile
+)
+from engines.token_budget import format_experience, track_token_usage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _example_cv():
+    with open(os.path.join(ROOT, "src/estructuracion_CV/CvEjemplos/exampleReal.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def test_profile_texts():
+    """
+    Los textos del perfil son los mismos que arman los comparadores
+    """
+    print("\n=== TEST DE TEXTOS ===\n")
+
+    cv_data = _example_cv()
+    profile = prompt_profile(cv_data)
+    assert profile["version"] == PROMPT_PROFILE_VERSION
+    assert profile["experience_text"] == format_experience(cv_data["experience"])
+    assert profile["technical_skills_text"] == "\n".join(f"- {skill}" for skill in cv_data["technical_skills"])
+    assert profile["experience_tokens"] > 0
+
+def test_stored_and_memoized():
+    """
+    with_prompt_profile guarda el bloque; get_prompt_profile lo reutiliza o lo deja en memoria
+    """
+    print("\n=== TEST DE CACHÉ ===\n")
+
+    cv_data = _example_cv()
+    stored = with_prompt_profile(cv_data)
+    assert "prompt_profile" not in cv_data
+    assert with_prompt_profile(stored) is stored
+    assert get_prompt_profile(stored) is stored["prompt_profile"]
+
+    profile = get_prompt_profile(cv_data)
+    assert cv_data["prompt_profile"] is profile
+    assert get_prompt_profile(cv_data) is profile
+
+def test_experience_prompt_text():
+    """
+    La experiencia del perfil se usa tal cual cuando cabe en el presupuesto
+    """
+    print("\n=== TEST DE EXPERIENCIA ===\n")
+
+    cv_data = _example_cv()
+    profile = {**prompt_profile(cv_data), "experience_text": "desde el perfil"}
+    with track_token_usage() as usage:
+        text = experience_prompt_text(cv_data["experience"], "analista", "experience", profile)
+    assert text == "desde el perfil"
+    assert usage.as_dict()["by_aspect"]["experience"]["input_tokens_saved"] == 0
+    assert experience_prompt_text(cv_data["experience"], "analista", "experience") == format_experience(cv_data["experience"])
+
+if __name__ == "__main__":
+    test_profile_texts()
+    test_stored_and_memoized()
+    test_experience_prompt_text()
@@ -0,0 +1,86 @@
+"""
+Test para el proveedor de IA stub (local y determinista)
+"""
+
+import sys
+import os
+import random
+# Agregar src al path para importar el cliente de IA compartido
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from cliente_llm.providers import StubChatModel, StubAPIError, create_chat_model, latency_sampler, register_provider
+from cliente_llm.structured_output import generate_structured, validate, request_format, SCORE_SCHEMA, STRING_LIST_SCHEMA
+
+class Message:
+    def __init__(self, content):
+        self.content = content
+
+def test_schema_valid_and_deterministic():
+    """
+    Las respuestas cumplen el esquema y dependen solo de la semilla y del prompt
+    """
+    print("\n=== TEST DE RESPUESTAS DEL STUB ===\n")
+
+    llm = StubChatModel("gpt-4o-mini", max_tokens=500)
+    result = generate_structured(llm, "location", SCORE_SCHEMA, [Message("Compara ubicaciones"), Message("CV: Bogotá")])
+    skills = generate_structured(llm, "cv.technical_skills", STRING_LIST_SCHEMA, [Message("Extrae habilidades")])
+    print(result, skills)
+    assert validate(result, SCORE_SCHEMA) is None and validate(skills, STRING_LIST_SCHEMA) is None
+
+    response_format, _ = request_format("location", SCORE_SCHEMA)
+    messages = [Message("CV: Medellín")]
+    text = StubChatModel("gpt-4o-mini").generate([messages], response_format=response_format).generations[0][0].text
+    assert text == StubChatModel("gpt-4o-mini").generate([messages], response_format=response_format).generations[0][0].text
+    assert text != StubChatModel("gpt-4o-mini", seed=1).generate([messages], response_format=response_format).generations[0][0].text
+
+def test_latency_and_errors():
+    """
+    Latencia según la distribución configurada y errores con el código HTTP configurado
+    """
+    print("\n=== TEST DE LATENCIA Y ERRORES ===\n")
+
+    rng = random.Random(0)
+    assert latency_sampler("none")(rng) == 0.0
+    assert latency_sampler("fixed:0.25")(rng) == 0.25
+    assert all(0.1 <= latency_sampler("uniform:0.1:0.3")(rng) <= 0.3 for _ in range(50))
+    samples = sorted(latency_sampler("lognormal:0.8:0.5")(rng) for _ in range(2000))
+    assert 0.7 < samples[1000] < 0.9
+    try:
+        latency_sampler("normal:1")
+        assert False, "debía rechazar la distribución"
+    except ValueError:
+        pass
+
+    sleeps = []
+    llm = StubChatModel("gpt-4o-mini", latency="fixed:0.5", error_rate=0.3, error_status="503,429", sleep=sleeps.append)
+    statuses = []
+    for _ in range(200):
+        try:
+            llm.generate([[Message("hola")]])
+        except StubAPIError as e:
+            statuses.append(e.status_code)
+    print(f"{len(statuses)} errores de 200 llamadas")
+    assert 30 < len(statuses) < 90 and set(statuses) == {503, 429}
+    assert sleeps == [0.5] * 200
+
+def test_provider_registry():
+    """
+    create_chat_model usa el proveedor pedido; los desconocidos se rechazan
+    """
+    print("\n=== TEST DE PROVEEDORES ===\n")
+
+    llm = create_chat_model("gpt-4o-mini", "https://example", None, "2024-12-01-preview", temperature=0.1, max_tokens=500, provider="stub")
+    assert isinstance(llm, StubChatModel) and llm.deployment_name == "gpt-4o-mini" and llm.max_tokens == 500
+
+    register_provider("eco", lambda deployment, *args: deployment)
+    assert create_chat_model("d", "e", None, "v", provider="eco") == "d"
+    try:
+        create_chat_model("d", "e", None, "v", provider="otro")
+        assert False, "debía rechazar el proveedor"
+    except ValueError as e:
+        print(e)
+
+if __name__ == "__main__":
+    test_schema_valid_and_deterministic()
+    test_latency_and_errors()
+    test_provider_registry()
@@ -0,0 +1,87 @@
+"""
+Test para el límite de tasa compartido de las llamadas a la IA
+"""
+
+import sys
+import os
+# Agregar src al path para importar el cliente de IA compartido
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from cliente_llm.rate_limiter import DeploymentLimiter, retry_delay, LLM_BACKOFF_BASE
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, headers=None):
+        super().__init__("429")
+        self.response = FakeResponse(headers or {})
+
+class BadRequestError(Exception):
+    status_code = 400
+
+def test_token_buckets():
+    """
+    Sin cuota disponible el hilo espera lo justo para que se rellene el bucket más restrictivo
+    """
+    print("\n=== TEST DE TOKEN BUCKETS ===\n")
+
+    clock = FakeClock()
+    limiter = DeploymentLimiter("gpt-4o-mini", rpm=60, tpm=6000, clock=clock, sleep=clock.sleep)
+    assert limiter.acquire(3000) == 0.0
+    assert limiter.acquire(3000) == 0.0
+    # Tokens agotados: 1000 tokens se rellenan en 10 s (100 tokens/s)
+    assert limiter.acquire(1000) == 10.0
+    # Peticiones: 1 por segundo
+    limiter.requests.level = 0
+    limiter.tokens.level = limiter.tokens.capacity
+    assert limiter.acquire(10) == 1.0
+    stats = limiter.snapshot()
+    print(stats)
+    assert stats["requests"] == 4 and stats["wait_seconds"] == 11.0
+
+def test_pause_on_429():
+    """
+    Un 429 detiene el deployment para todos los hilos hasta que pasa la pausa
+    """
+    print("\n=== TEST DE PAUSA POR 429 ===\n")
+
+    clock = FakeClock()
+    limiter = DeploymentLimiter("gpt-4o-mini", rpm=600, tpm=100000, clock=clock, sleep=clock.sleep)
+    limiter.pause(5.0)
+    assert limiter.acquire(100) == 5.0
+    assert limiter.snapshot()["throttled"] == 1
+
+def test_retry_delay():
+    """
+    Retry-After manda sobre el backoff; los errores del cliente no se reintentan
+    """
+    print("\n=== TEST DE ESPERA ENTRE REINTENTOS ===\n")
+
+    delay = retry_delay(RateLimitError({"retry-after": "7"}), attempt=0)
+    assert 7.0 <= delay <= 7.0 + LLM_BACKOFF_BASE
+    delay = retry_delay(RateLimitError({"retry-after-ms": "1500"}), attempt=3)
+    assert 1.5 <= delay <= 1.5 + LLM_BACKOFF_BASE
+    assert 0.0 <= retry_delay(RateLimitError(), attempt=2) <= LLM_BACKOFF_BASE * 4
+    assert retry_delay(BadRequestError(), attempt=0) is None
+    assert retry_delay(ValueError("JSON"), attempt=0) is None
+
+if __name__ == "__main__":
+    test_token_buckets()
+    test_pause_on_429()
+    test_retry_delay()
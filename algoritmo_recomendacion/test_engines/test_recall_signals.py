@@ -0,0 +1,85 @@
+"""
+Test para las señales deterministas de la primera etapa del ranking
+"""
+
+import sys
+import os
+import json
+import random
+import time
+from datetime import date
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.recall_signals import RecallScorer, cv_features, language_level
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TODAY = date(2025, 6, 1)
+
+def test_languages():
+    """
+    Niveles de idioma
+    """
+    print("\n=== TEST DE IDIOMAS ===\n")
+    
+    assert language_level("B2") == 4
+    assert language_level("nativo") > language_level("avanzado c1")
+    assert language_level("intermedio b2") == 4
+
+def test_rank_with_real_examples():
+    """
+    Ranking de la primera etapa con los CVs y Jobs de ejemplo del proyecto
+    """
+    print("\n=== TEST CON EJEMPLOS REALES ===\n")
+    
+    cvs = []
+    for i in range(1, 5):
+        name = "exampleReal" if i == 1 else f"exampleReal{i}"
+        with open(os.path.join(ROOT, "src/estructuracion_CV/CvEjemplos", name + ".json"), encoding="utf-8") as f:
+            cvs.append((i, cv_features(json.load(f), TODAY)))
+    with open(os.path.join(ROOT, "src/estructuracion_Descripcion/DescripcionesEjemplos/CA_Ejemplo2.json"), encoding="utf-8") as f:
+        job_data = json.load(f)
+    
+    ranking = RecallScorer(job_data).rank(cvs, 2)
+    for entry in ranking:
+        print(f"CV {entry['id']}: {entry['score']} {entry['signals']}")
+    assert len(ranking) == 2
+    assert ranking[0]["score"] >= ranking[1]["score"]
+    assert ranking[0]["signals"]["languages"] == -1.0  # el Job no pide idiomas
+
+def test_rank_100k():
+    """
+    Mide la primera etapa sobre 100.000 CVs sintéticos
+    """
+    print("\n=== TEST DE RENDIMIENTO (100k CVs) ===\n")
+    
+    rng = random.Random(5)
+    skills = ["python", "sql", "java", "power bi", "excel", "linux", "wazuh", "pci dss", "aws", "docker"]
+    degrees = ["bachiller académico", "tecnólogo en sistemas", "ingeniería de sistemas", "maestría en seguridad"]
+    cvs = [
+        (i, cv_features({
+            "technical_skills": rng.sample(skills, 4),
+            "experience": [{"duration": f"{rng.randint(2010, 2023)} – 2024"}],
+            "education": [{"degree": rng.choice(degrees)}],
+            "languages": {"inglés": rng.choice(["b1", "b2", "c1"])},
+            "personal": {"location": rng.choice(["bogotá", "medellín", "cali"])}
+        }, TODAY))
+        for i in range(100000)
+    ]
+    job_data = {
+        "technical_skills": ["herramientas de monitoreo como wazuh", "power bi", "sistemas operativos linux"],
+        "experience": "mínimo 3 años",
+        "education": "profesional en ingeniería de sistemas",
+        "languages": {"inglés": "B2"},
+        "location": "bogotá"
+    }
+    start = time.perf_counter()
+    ranking = RecallScorer(job_data).rank(cvs, 50)
+    elapsed = time.perf_counter() - start
+    print(f"Primera etapa: {elapsed:.2f} s para {len(cvs)} CVs")
+    assert len(ranking) == 50 and ranking[0]["score"] == 1.0
+
+if __name__ == "__main__":
+    test_languages()
+    test_rank_with_real_examples()
+    test_rank_100k()
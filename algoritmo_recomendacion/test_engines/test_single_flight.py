@@ -0,0 +1,109 @@
+"""
+Test para el single-flight de las llamadas a la IA
+"""
+
+import sys
+import os
+import threading
+import time
+# Agregar src al path para importar el cliente de IA compartido
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from cliente_llm.single_flight import SingleFlight, prompt_key
+
+class Message:
+    def __init__(self, content):
+        self.content = content
+
+def _concurrent(flight, fn, n=4):
+    """Lanza n llamadas con la misma llave y espera a que todas estén dentro antes de soltar la primera"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do("location", "k", fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, daemon=True) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+def _wait_coalesced(flight, expected, timeout=5.0):
+    """Espera a que expected llamadas estén esperando a la primera (falla pasado el timeout)"""
+    deadline = time.monotonic() + timeout
+    while flight.snapshot().get("location", {}).get("coalesced", 0) < expected:
+        assert time.monotonic() < deadline, f"no llegaron {expected} llamadas coalescidas en {timeout}s"
+        time.sleep(0.001)
+
+def test_concurrent_duplicates_share_one_call():
+    """
+    Las llamadas idénticas simultáneas esperan la primera; cada una recibe su propia copia
+    """
+    print("\n=== TEST DE COALESCENCIA ===\n")
+
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait()
+        return {"score": 1.0, "reason": "Misma ciudad"}
+
+    threads, results, errors = _concurrent(flight, fn)
+    _wait_coalesced(flight, 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1 and not errors
+    assert len(results) == 4 and all(r == {"score": 1.0, "reason": "Misma ciudad"} for r in results)
+    assert len({id(r) for r in results}) == 4
+    stats = flight.snapshot()
+    print(stats)
+    assert stats["location"] == {"requests": 4, "coalesced": 3, "coalesced_ratio": 0.75}
+
+    # Terminada la llamada, la siguiente vuelve a llamar a la API (no es una caché)
+    flight.do("location", "k", fn)
+    assert len(calls) == 2
+
+def test_errors_reach_waiting_calls():
+    """
+    Si la llamada falla, las que esperaban reciben el mismo error
+    """
+    print("\n=== TEST DE ERROR COMPARTIDO ===\n")
+
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait()
+        raise TimeoutError("timeout")
+
+    threads, results, errors = _concurrent(flight, fn, n=3)
+    _wait_coalesced(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert not results and len(errors) == 3
+    assert all(isinstance(e, TimeoutError) for e in errors)
+
+def test_prompt_key():
+    """
+    La llave depende del deployment, el punto de llamada y los mensajes
+    """
+    print("\n=== TEST DE LLAVE DEL PROMPT ===\n")
+
+    messages = [Message("Compara ubicaciones"), Message("CV: Bogotá")]
+    key = prompt_key("gpt-4o-mini", "location", {"type": "object"}, messages)
+    assert key == prompt_key("gpt-4o-mini", "location", {"type": "object"}, [Message("Compara ubicaciones"), Message("CV: Bogotá")])
+    assert key != prompt_key("gpt-4o-mini", "location", {"type": "object"}, [Message("Compara ubicaciones"), Message("CV: Medellín")])
+    assert key != prompt_key("gpt-4o", "location", {"type": "object"}, messages)
+    assert key != prompt_key("gpt-4o-mini", "languages", {"type": "object"}, messages)
+
+if __name__ == "__main__":
+    test_concurrent_duplicates_share_one_call()
+    test_errors_reach_waiting_calls()
+    test_prompt_key()
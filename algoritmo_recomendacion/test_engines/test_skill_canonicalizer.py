@@ -0,0 +1,92 @@
+"""
+Test para la canonicalización de habilidades
+"""
+
+import sys
+import os
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.skill_canonicalizer import (
+    CATALOG_VERSION, FREE_TEXT_ID_BASE, canonical_skill_key, profile_skill_keys,
+    skill_ids, with_canonical_skills
+)
+
+def test_canonical_skill_key():
+    """
+    Prueba la normalización de habilidades escritas de distintas formas
+    """
+    print("\n=== TEST DE LLAVES CANÓNICAS ===\n")
+    
+    casos = [
+        ("  PostgreSQL ", "postgresql"),
+        ("Programación", "programacion"),
+        ("C++", "c++"),
+        ("node.js", "node.js"),
+        ("CI/CD", "ci cd"),
+        ("Trabajo  en   equipo.", "trabajo en equipo"),
+        ("", ""),
+    ]
+    for raw, esperado in casos:
+        key = canonical_skill_key(raw)
+        print(f"'{raw}' -> '{key}'")
+        assert key == esperado
+
+def test_profile_skill_keys():
+    """
+    Prueba la extracción de habilidades de un CV real
+    """
+    print("\n=== TEST CON CV REAL ===\n")
+    
+    cv_data = {
+        "technical_skills": ["Python", "python ", "SQL"],
+        "soft_skills": ["Liderazgo"],
+        "certifications": [{"name": "AWS Certified Cloud Practitioner", "issuer": "amazon", "year": "2023"}]
+    }
+    keys = profile_skill_keys(cv_data)
+    for (kind, key), raw in keys.items():
+        print(f"{kind}: {key} ({raw})")
+    assert ("technical", "python") in keys
+    assert len([k for k in keys if k[0] == "technical"]) == 2
+    assert ("certification", "aws certified cloud practitioner") in keys
+
+def test_canonical_ids():
+    """
+    Alias del catálogo comparten id; el texto libre recibe un id estable
+    """
+    print("\n=== TEST DE IDS CANÓNICOS ===\n")
+    
+    assert skill_ids("JS") == skill_ids("javascript") == skill_ids("Java Script")
+    assert skill_ids("AWS") == skill_ids("Amazon Web Services")
+    assert skill_ids("java") != skill_ids("javascript")
+    # El trie encuentra el concepto dentro de un texto más largo
+    assert skill_ids("aws") <= skill_ids("Certificados Amazon Web Services")
+    
+    libre = skill_ids("Cobol Mainframe")
+    print(f"'Cobol Mainframe' -> {sorted(libre)}")
+    assert len(libre) == 1 and min(libre) >= FREE_TEXT_ID_BASE
+    assert libre == skill_ids("  cobol   mainframe ")
+    assert skill_ids("") == frozenset()
+
+def test_with_canonical_skills():
+    """
+    El bloque se guarda con la versión del catálogo y se recalcula si cambia
+    """
+    print("\n=== TEST DE BLOQUE canonical_skills ===\n")
+    
+    cv_data = {"technical_skills": ["js", "Amazon Web Services"], "soft_skills": ["teamwork"]}
+    stored = with_canonical_skills(cv_data)
+    print(stored["canonical_skills"])
+    assert "canonical_skills" not in cv_data
+    assert stored["canonical_skills"]["version"] == CATALOG_VERSION
+    assert stored["canonical_skills"]["technical_skills"] == [sorted(skill_ids("javascript")), sorted(skill_ids("aws"))]
+    assert with_canonical_skills(stored) is stored
+    
+    stale = dict(stored, canonical_skills={"version": CATALOG_VERSION - 1})
+    assert with_canonical_skills(stale)["canonical_skills"] == stored["canonical_skills"]
+
+if __name__ == "__main__":
+    test_canonical_skill_key()
+    test_profile_skill_keys()
+    test_canonical_ids()
+    test_with_canonical_skills()
@@ -0,0 +1,79 @@
+"""
+Test para el índice invertido de habilidades
+"""
+
+import sys
+import os
+import json
+import random
+import time
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.skill_index import InvertedSkillIndex, match_terms
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_top_n_with_real_examples():
+    """
+    Prueba el ranking con los CVs y el Job de ejemplo del proyecto
+    """
+    print("\n=== TEST CON EJEMPLOS REALES ===\n")
+    
+    index = InvertedSkillIndex()
+    for i in range(1, 5):
+        name = "exampleReal" if i == 1 else f"exampleReal{i}"
+        with open(os.path.join(ROOT, "src/estructuracion_CV/CvEjemplos", name + ".json"), encoding="utf-8") as f:
+            index.add(i, json.load(f))
+    
+    job_data = {"technical_skills": ["Python", "SQL", "AWS Lambda"], "languages": {"Inglés": "B2"}}
+    results = index.top_n(job_data, 3)
+    for result in results:
+        print(f"CV {result['id']}: {result['score']} {result['matched']}")
+    assert results and results[0]["score"] > 0
+    
+    # Eliminar un CV lo saca del ranking
+    index.remove(results[0]["id"])
+    assert results[0]["id"] not in [r["id"] for r in index.top_n(job_data, 10)]
+
+def test_top_n_100k():
+    """
+    Prueba de velocidad con 100k CVs sintéticos
+    """
+    print("\n=== TEST 100K CVs ===\n")
+    
+    rng = random.Random(0)
+    vocabulary = [f"skill{i}" for i in range(2000)] + ["python", "sql", "java", "aws", "docker"]
+    index = InvertedSkillIndex()
+    index.build((i, {"technical_skills": rng.sample(vocabulary, 15)}) for i in range(100_000))
+    
+    start = time.perf_counter()
+    results = index.top_n({"technical_skills": ["python", "sql", "aws", "skill10", "skill20"]}, 10)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Top 10 en {elapsed:.1f} ms, mejor score {results[0]['score']}")
+    assert len(results) == 10
+
+def test_reverse_matching_over_jobs():
+    """
+    Índice de Jobs consultado con un CV: palabras sueltas de habilidades compuestas
+    y score normalizado por los requisitos de cada Job
+    """
+    print("\n=== TEST MATCHING INVERSO (JOBS) ===\n")
+    
+    index = InvertedSkillIndex(terms_fn=match_terms)
+    for i, name in enumerate(["CA_Ejemplo1", "CA_Ejemplo2"], start=1):
+        with open(os.path.join(ROOT, "src/estructuracion_Descripcion/DescripcionesEjemplos", name + ".json"), encoding="utf-8") as f:
+            index.add(i, json.load(f))
+    
+    cv_data = {"technical_skills": ["Wazuh", "Power BI", "Linux", "Excel"]}
+    results = index.top_n(cv_data, 5, normalize="document")
+    for result in results:
+        print(f"Job {result['id']}: {result['score']} {result['matched']}")
+    assert results[0]["id"] == 2
+    assert "wazuh" in results[0]["matched"]
+    assert all(0 < r["score"] <= 1 for r in results)
+
+if __name__ == "__main__":
+    test_top_n_with_real_examples()
+    test_top_n_100k()
+    test_reverse_matching_over_jobs()
@@ -0,0 +1,66 @@
+"""
+Test para el prefiltro de candidatos por habilidades en SQL (tablas cv_skill y job_skill)
+"""
+
+import sys
+import os
+import tempfile
+# Agregar la raíz del proyecto al path para importar la API
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from api.database import Base, CVSkill, create_db_engine, ensure_skill_id_columns
+from api.repositories import CVRepository, JobRepository, SkillRepository
+
+def _session_factory():
+    engine = create_db_engine(f"sqlite:///{tempfile.mkdtemp()}/skills.db")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def test_alias_pair():
+    """
+    Un CV con "JS" aparece para un Job que pide "javascript" (mismo concepto)
+    """
+    print("\n=== TEST DE ALIAS EN EL PREFILTRO ===\n")
+
+    _, Session = _session_factory()
+    db = Session()
+    js = CVRepository.create(db, {"personal": {"name": "Ana"}, "technical_skills": ["JS", "Amazon Web Services"]})
+    python = CVRepository.create(db, {"personal": {"name": "Luis"}, "technical_skills": ["Python"]})
+    job = JobRepository.create(db, {"basic_info": {"job_title": "Dev"}, "technical_skills": ["javascript", "AWS"]})
+
+    result = SkillRepository.find_candidate_cv_ids_for_job(db, job.id)
+    print(result)
+    assert result == [(js.id, 2)]
+    assert SkillRepository.find_candidate_cv_ids(db, ["JavaScript", "js", "python"]) == [(js.id, 1), (python.id, 1)]
+    assert SkillRepository.find_candidate_cv_ids(db, ["javascript", "aws"], min_overlap=2) == [(js.id, 2)]
+    db.close()
+
+def test_backfill_old_rows():
+    """
+    Las filas anteriores a los ids de concepto se rehacen con el backfill
+    """
+    print("\n=== TEST DE BACKFILL DE IDS ===\n")
+
+    engine, Session = _session_factory()
+    db = Session()
+    cv = CVRepository.create(db, {"personal": {"name": "Ana"}, "technical_skills": ["JS"]})
+    # Filas como las guardaba la versión anterior: solo la llave canónica
+    db.query(CVSkill).delete()
+    db.execute(text("INSERT INTO cv_skill (cv_id, kind, skill_key, raw) VALUES (:id, 'technical', 'js', 'JS')"), {"id": cv.id})
+    db.commit()
+    assert SkillRepository.find_candidate_cv_ids(db, ["javascript"]) == []
+
+    with engine.begin() as conn:
+        ensure_skill_id_columns(conn)
+    assert SkillRepository.backfill(db) == (1, 0)
+    assert SkillRepository.find_candidate_cv_ids(db, ["javascript"]) == [(cv.id, 1)]
+    # Reanudable: una segunda pasada no procesa nada
+    assert SkillRepository.backfill(db) == (0, 0)
+    db.close()
+
+if __name__ == "__main__":
+    test_alias_pair()
+    test_backfill_old_rows()
@@ -0,0 +1,85 @@
+"""
+Test para el motor local de similitud de habilidades
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.skill_similarity import SkillSimilarityEngine, SkillVectorCache
+
+def test_synonyms_and_variants():
+    """
+    Variantes de escritura y sinónimos en español/inglés
+    """
+    print("\n=== TEST DE SINÓNIMOS Y VARIANTES ===\n")
+    
+    engine = SkillSimilarityEngine()
+    matrix = engine.similarity_matrix(["PostgreSQL", "teamwork", "Java"], ["Postgres", "trabajo en equipo", "JavaScript"])
+    print(matrix.round(2))
+    assert matrix.shape == (3, 3)
+    assert matrix[0, 0] == 1.0 and matrix[1, 1] == 1.0
+    assert matrix[2, 2] < engine.threshold  # java no cubre javascript
+    
+    result = engine.compare(["python", "excel", "Postgre"], ["PostgreSQL", "Excel avanzado", "Kubernetes"])
+    print(result)
+    assert result["missing"] == ["Kubernetes"]
+    assert 0.5 < result["score"] < 1.0
+    
+    assert engine.compare([], ["python"])["score"] == -1.0
+    assert engine.compare(["python"], [])["score"] == -1.0
+
+def test_persistent_cache():
+    """
+    Los vectores calculados se guardan y se recargan
+    """
+    print("\n=== TEST DE CACHÉ PERSISTENTE ===\n")
+    
+    path = tempfile.mkdtemp()
+    cache = SkillVectorCache(path)
+    first = SkillSimilarityEngine(cache).similarity_matrix(["docker", "aws"], ["docker compose"])
+    cache.save()
+    
+    reloaded = SkillVectorCache(path)
+    assert len(reloaded) == len(cache) == 3
+    again = SkillSimilarityEngine(reloaded).similarity_matrix(["docker", "aws"], ["docker compose"])
+    assert (first == again).all()
+    print(f"✅ {len(reloaded)} vectores recargados")
+
+    # Dos workers que guardan sobre la misma carpeta no pierden los conceptos del otro
+    worker_a, worker_b = SkillVectorCache(path), SkillVectorCache(path)
+    worker_a.vectors(["kubernetes"])
+    worker_b.vectors(["terraform"])
+    worker_a.save()
+    worker_b.save()
+    merged = SkillVectorCache(path)
+    assert len(merged) == 5
+    assert (merged.vectors(["kubernetes"]) == worker_a.vectors(["kubernetes"])).all()
+    assert not [name for name in os.listdir(path) if name.endswith(".tmp")]
+
+def test_matrix_speed():
+    """
+    Mide la matriz CV x Job con la caché caliente
+    """
+    print("\n=== TEST DE RENDIMIENTO ===\n")
+    
+    rng = random.Random(1)
+    words = ["datos", "cloud", "seguridad", "redes", "python", "java", "sql", "web", "devops", "bi"]
+    skills = [" ".join(rng.sample(words, 2)) + f" {i}" for i in range(2000)]
+    engine = SkillSimilarityEngine()
+    engine.similarity_matrix(skills, skills[:50])
+    
+    start = time.perf_counter()
+    for _ in range(100):
+        engine.similarity_matrix(rng.sample(skills, 30), rng.sample(skills, 15))
+    elapsed = (time.perf_counter() - start) * 10
+    print(f"Matriz 15x30: {elapsed:.2f} ms")
+
+if __name__ == "__main__":
+    test_synonyms_and_variants()
+    test_persistent_cache()
+    test_matrix_speed()
@@ -0,0 +1,108 @@
+"""
+Test para los contadores incrementales de /stats
+"""
+
+import sys
+import os
+import tempfile
+import threading
+# Agregar la raíz del proyecto al path para importar la API
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from api.database import Base, create_db_engine
+from api.repositories import CVRepository, JobRepository, AnalysisRepository, StatsRepository
+
+def _session_factory():
+    engine = create_db_engine(f"sqlite:///{tempfile.mkdtemp()}/stats.db")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _analysis(cv_id, job_id, score):
+    return {
+        "cv_id": cv_id, "job_id": job_id, "nombre_candidato": "Ana", "titulo_trabajo": "Dev",
+        "score": score, "score_breakdown": {}, "resultado_completo": {}, "processing_time": 0.0
+    }
+
+def test_create_bulk_delete_and_histogram():
+    """
+    Los contadores siguen las altas, las altas masivas y las bajas, globales y por Job
+    """
+    print("\n=== TEST DE CONTADORES ===\n")
+
+    _, Session = _session_factory()
+    db = Session()
+    StatsRepository.ensure_initialized(db)
+
+    cv = CVRepository.create(db, {"personal": {"name": "Ana"}, "technical_skills": ["Python"]})
+    CVRepository.bulk_create(db, [{"personal": {"name": "Luis"}}, {"personal": {"name": "Eva"}}])
+    job = JobRepository.create(db, {"basic_info": {"job_title": "Dev"}, "technical_skills": ["Python"]})
+    other_job = JobRepository.create(db, {"basic_info": {"job_title": "QA"}})
+
+    single = AnalysisRepository.create(db, **_analysis(cv.id, job.id, 0.85))
+    AnalysisRepository.bulk_create(db, [_analysis(cv.id, job.id, 0.15), _analysis(cv.id, other_job.id, 1.0)])
+
+    stats = StatsRepository.get_global(db)
+    print(stats)
+    assert stats["total_cvs"] == 3 and stats["total_jobs"] == 2 and stats["total_analyses"] == 3
+    assert stats["average_score"] == round(2.0 / 3, 3)
+    assert stats["score_histogram"][8] == 1 and stats["score_histogram"][1] == 1 and stats["score_histogram"][9] == 1
+
+    job_stats = StatsRepository.get_job(db, job.id)
+    assert job_stats["total_analyses"] == 2 and job_stats["average_score"] == 0.5
+    assert sum(job_stats["score_histogram"]) == 2 and job_stats["score_histogram"][9] == 0
+
+    assert AnalysisRepository.delete(db, single.id) and CVRepository.delete(db, cv.id)
+    stats = StatsRepository.get_global(db)
+    assert stats["total_cvs"] == 2 and stats["total_analyses"] == 2 and stats["score_histogram"][8] == 0
+    assert StatsRepository.get_job(db, job.id)["score_histogram"][1] == 1
+    db.close()
+
+def test_concurrent_initialization():
+    """
+    Varios workers que inician a la vez sobre una BD existente recalculan una sola vez
+    """
+    print("\n=== TEST DE INICIALIZACIÓN CONCURRENTE ===\n")
+
+    engine, Session = _session_factory()
+    # BD anterior a los contadores: filas sin stat_counters
+    with engine.begin() as conn:
+        for i in range(1, 4):
+            conn.execute(text("INSERT INTO cvs (id, nombre) VALUES (:id, 'CV')"), {"id": i})
+        conn.execute(text("INSERT INTO jobs (id, titulo) VALUES (1, 'Dev')"))
+        for i, score in enumerate((0.2, 0.4, 0.9), start=1):
+            conn.execute(text("INSERT INTO analyses (id, cv_id, job_id, score) VALUES (:id, :id, 1, :score)"), {"id": i, "score": score})
+
+    errors = []
+    def worker():
+        db = Session()
+        try:
+            StatsRepository.ensure_initialized(db)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = Session()
+    stats = StatsRepository.get_global(db)
+    print(stats, errors)
+    assert not errors
+    assert stats["total_cvs"] == 3 and stats["total_jobs"] == 1 and stats["total_analyses"] == 3
+    assert StatsRepository.get_job(db, 1)["average_score"] == 0.5
+
+    # Un worker que leyó la BD sin inicializar antes del commit del primero no recalcula
+    assert not StatsRepository._claim_initialization(db)
+    db.rollback()
+    db.close()
+
+if __name__ == "__main__":
+    test_create_bulk_delete_and_histogram()
+    test_concurrent_initialization()
@@ -0,0 +1,68 @@
+"""
+Test para la salida estructurada de las llamadas a la IA (esquemas, validación y contadores)
+"""
+
+import sys
+import os
+# Agregar src al path para importar el cliente de IA compartido
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src'))
+
+from cliente_llm.structured_output import (
+    SCORE_SCHEMA, STRING_LIST_SCHEMA, STRING_MAP_SCHEMA, validate, request_format, parse_response,
+    structured_output_stats, reset_structured_output_stats
+)
+
+def test_validate_score_schema():
+    """
+    El esquema de los comparadores exige score numérico en 0-1 y reason string, sin llaves extra
+    """
+    print("\n=== TEST DE VALIDACIÓN DEL ESQUEMA ===\n")
+
+    assert validate({"score": 0.8, "reason": "ok"}, SCORE_SCHEMA) is None
+    assert validate({"score": 1.2, "reason": "ok"}, SCORE_SCHEMA) == "$.score: mayor que 1"
+    assert validate({"score": "0.8", "reason": "ok"}, SCORE_SCHEMA) == "$.score: se esperaba number"
+    assert validate({"score": True, "reason": "ok"}, SCORE_SCHEMA) is not None
+    assert validate({"reason": "ok"}, SCORE_SCHEMA) == "$: falta 'score'"
+    assert validate({"score": 0.5, "reason": "ok", "extra": 1}, SCORE_SCHEMA) is not None
+    assert validate(["a", 3], STRING_LIST_SCHEMA) == "$[1]: se esperaba string"
+    assert validate({"inglés": "B2"}, STRING_MAP_SCHEMA) is None
+
+def test_request_format():
+    """
+    Esquemas cerrados van en modo estricto (las listas envueltas en "result"); los de llaves libres en json_object
+    """
+    print("\n=== TEST DE RESPONSE_FORMAT ===\n")
+
+    response_format, wrapped = request_format("certifications.direct", SCORE_SCHEMA)
+    assert response_format["type"] == "json_schema" and not wrapped
+    assert response_format["json_schema"]["name"] == "certifications_direct"
+    assert "maximum" not in response_format["json_schema"]["schema"]["properties"]["score"]
+
+    response_format, wrapped = request_format("cv.technical_skills", STRING_LIST_SCHEMA)
+    assert wrapped and response_format["json_schema"]["schema"]["required"] == ["result"]
+
+    assert request_format("cv.languages", STRING_MAP_SCHEMA) == ({"type": "json_object"}, False)
+
+def test_parse_failures_counted_per_call_site():
+    """
+    Cada respuesta inválida suma a los contadores de su punto de llamada
+    """
+    print("\n=== TEST DE CONTADORES ===\n")
+
+    reset_structured_output_stats()
+    assert parse_response("experience", '{"score": 0.7, "reason": "ok"}', SCORE_SCHEMA) == ({"score": 0.7, "reason": "ok"}, None)
+    assert parse_response("experience", "```json\n{\"score\": 0.7, \"reason\": \"ok\"}\n```", SCORE_SCHEMA)[1] is None
+    assert parse_response("experience", "score: 0.7", SCORE_SCHEMA)[1].startswith("JSON inválido")
+    assert parse_response("cv.soft_skills", '{"result": ["Liderazgo"]}', STRING_LIST_SCHEMA, wrapped=True) == (["Liderazgo"], None)
+    assert parse_response("cv.soft_skills", '{"result": "Liderazgo"}', STRING_LIST_SCHEMA, wrapped=True)[1] is not None
+
+    stats = structured_output_stats()
+    print(stats)
+    assert stats["experience"]["parse_failures"] == 1
+    assert stats["cv.soft_skills"]["schema_violations"] == 1
+    reset_structured_output_stats()
+
+if __name__ == "__main__":
+    test_validate_score_schema()
+    test_request_format()
+    test_parse_failures_counted_per_call_site()
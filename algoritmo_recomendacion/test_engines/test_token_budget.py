@@ -0,0 +1,87 @@
+"""
+Test para el presupuesto de tokens de la experiencia en los prompts
+"""
+
+import sys
+import os
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.token_budget import (
+    count_tokens, fit_experience, format_experience, record_input, track_token_usage
+)
+
+JOB_TEXT = "Analista SOC: monitoreo de eventos de seguridad con Wazuh y SIEM, respuesta a incidentes"
+
+def _long_cv():
+    filler = "Atención de clientes en tienda y manejo de caja registradora. " * 40
+    return [
+        {"position": "Vendedor", "company": "Almacenes X", "duration": "2015 - 2017", "description": filler},
+        {"position": "Analista SOC", "company": "Banco Y", "duration": "2018 - 2024",
+         "description": "Monitoreo de eventos de seguridad en Wazuh. Respuesta a incidentes críticos. "
+                        "Elaboración de reportes mensuales para la gerencia. " * 5},
+        {"position": "Auxiliar", "company": "Empresa Z", "duration": "2017 - 2018", "description": ""}
+    ]
+
+def test_within_budget_is_untouched():
+    """
+    Si la experiencia cabe, no se recorta
+    """
+    print("\n=== TEST SIN RECORTE ===\n")
+
+    cv_experience = _long_cv()[1:]
+    fitted, stats = fit_experience(cv_experience, JOB_TEXT, 10000)
+    assert fitted == cv_experience
+    assert stats["tokens_before"] == stats["tokens_after"] == count_tokens(format_experience(cv_experience))
+    assert stats["trimmed_entries"] == 0
+
+def test_trims_least_relevant_first():
+    """
+    Al superar el presupuesto se conservan los encabezados y la descripción más relevante
+    """
+    print("\n=== TEST DE RECORTE ===\n")
+
+    cv_experience = _long_cv()
+    budget = 250
+    fitted, stats = fit_experience(cv_experience, JOB_TEXT, budget)
+    print(stats)
+    assert stats["tokens_before"] > budget >= stats["tokens_after"]
+    assert [exp["position"] for exp in fitted] == ["Vendedor", "Analista SOC", "Auxiliar"]  # orden original
+    assert "Wazuh" in fitted[1]["description"]
+    assert len(fitted[0]["description"]) < len(cv_experience[0]["description"])
+    assert stats["trimmed_entries"] >= 1
+    assert fit_experience(cv_experience, JOB_TEXT, budget) == (fitted, stats)  # determinista
+
+def test_summarizes_by_sentence():
+    """
+    Una descripción que no cabe entera se resume con sus oraciones más relevantes
+    """
+    print("\n=== TEST DE RESUMEN ===\n")
+
+    cv_experience = _long_cv()[1:2]
+    fitted, stats = fit_experience(cv_experience, "wazuh siem monitoreo incidentes", 60)
+    description = fitted[0]["description"]
+    print(description)
+    assert "Wazuh" in description and "gerencia" not in description
+    assert stats["tokens_after"] <= 60
+
+def test_track_token_usage():
+    """
+    Registro por análisis de los tokens ahorrados por aspecto
+    """
+    print("\n=== TEST DE REGISTRO ===\n")
+
+    record_input("experience", {"tokens_before": 10, "tokens_after": 5, "trimmed_entries": 1})  # sin análisis: se ignora
+    with track_token_usage() as usage:
+        _, stats = fit_experience(_long_cv(), JOB_TEXT, 250)
+        record_input("experience", stats)
+    summary = usage.as_dict()
+    print(summary)
+    assert summary["by_aspect"]["experience"]["input_tokens"] == stats["tokens_after"]
+    assert summary["input_tokens_saved"] == stats["tokens_before"] - stats["tokens_after"] > 0
+
+if __name__ == "__main__":
+    test_within_budget_is_untouched()
+    test_trims_least_relevant_first()
+    test_summarizes_by_sentence()
+    test_track_token_usage()
@@ -0,0 +1,130 @@
+"""
+Test para el índice vectorial TF-IDF de CVs
+"""
+
+import sys
+import os
+import json
+import random
+import tempfile
+import time
+# Agregar el directorio padre al path para importar los motores
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engines.vector_index import CVVectorIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_search_with_real_examples():
+    """
+    Prueba la similitud con los CVs de ejemplo del proyecto
+    """
+    print("\n=== TEST CON EJEMPLOS REALES ===\n")
+    
+    index = CVVectorIndex()
+    for i in range(1, 5):
+        name = "exampleReal" if i == 1 else f"exampleReal{i}"
+        with open(os.path.join(ROOT, "src/estructuracion_CV/CvEjemplos", name + ".json"), encoding="utf-8") as f:
+            index.add(i, json.load(f))
+    
+    job_data = {
+        "technical_skills": ["Python", "SQL"],
+        "responsibilities": ["Desarrollar aplicaciones web y servicios backend"]
+    }
+    results = index.search(job_data, 3)
+    for cv_id, score in results:
+        print(f"CV {cv_id}: {score}")
+    assert results and all(0 < score <= 1 for _, score in results)
+
+def test_persistence_and_updates():
+    """
+    Altas, bajas, reapertura desde disco y compactación
+    """
+    print("\n=== TEST DE PERSISTENCIA ===\n")
+    
+    path = tempfile.mkdtemp()
+    index = CVVectorIndex(path, flush_threshold=2)
+    index.add(1, {"technical_skills": ["Python", "Django"]})
+    index.add(2, {"technical_skills": ["Java", "Spring"]})
+    index.add(3, {"technical_skills": ["Python", "FastAPI"]})
+    index.remove(1)
+    index.flush()
+    
+    reopened = CVVectorIndex(path)
+    assert sorted(reopened.ids()) == [2, 3]
+    assert [cv_id for cv_id, _ in reopened.search({"technical_skills": ["Python"]}, 5)] == [3]
+    
+    # Reindexar un id borrado y compactar conserva la última versión
+    reopened.add(1, {"technical_skills": ["Python"]})
+    reopened.compact()
+    compacted = CVVectorIndex(path)
+    assert sorted(compacted.ids()) == [1, 2, 3]
+    assert len([name for name in os.listdir(path) if name.startswith("seg_")]) == 1
+    print("✅ Índice reabierto y compactado correctamente")
+
+def test_shared_folder_between_workers():
+    """
+    Dos procesos que escriben en la misma carpeta no pierden los segmentos del otro
+    """
+    print("\n=== TEST DE CARPETA COMPARTIDA ===\n")
+    
+    path = tempfile.mkdtemp()
+    first = CVVectorIndex(path)
+    second = CVVectorIndex(path)
+    first.add(1, {"technical_skills": ["Python"]})
+    first.flush()
+    second.add(2, {"technical_skills": ["Java"]})
+    second.add(3, {"technical_skills": ["Go"]})
+    second.flush()
+    first.add(4, {"technical_skills": ["Rust"]})
+    first.remove(1)
+    first.flush()
+    second.remove(3)
+    second.flush()
+    
+    # Cada uno ve lo que escribió el otro al escribir o con refresh()
+    reopened = CVVectorIndex(path)
+    print(sorted(reopened.ids()))
+    assert sorted(reopened.ids()) == [2, 4]
+    first.refresh()
+    assert sorted(first.ids()) == [2, 4]
+    assert [cv_id for cv_id, _ in reopened.search({"technical_skills": ["Rust"]}, 5)] == [4]
+    # La frecuencia de documento coincide con la de las filas vivas
+    matrix, _ = reopened._alive_rows(reopened._segments)
+    assert (reopened._df == (matrix > 0).sum(axis=0).A1).all()
+    assert not [name for name in os.listdir(path) if name.endswith(".tmp")]
+
+def test_search_50k():
+    """
+    Mide la búsqueda sobre 50.000 CVs sintéticos
+    """
+    print("\n=== TEST DE RENDIMIENTO (50k CVs) ===\n")
+    
+    rng = random.Random(3)
+    vocabulary = ["python", "java", "sql", "docker", "kubernetes", "react", "angular", "aws",
+                  "azure", "django", "spring", "node.js", "c#", ".net", "excel", "power bi"]
+    positions = ["desarrollador backend", "analista de datos", "ingeniero devops", "desarrollador frontend"]
+    
+    path = tempfile.mkdtemp()
+    index = CVVectorIndex(path, flush_threshold=10000)
+    start = time.perf_counter()
+    index.add_many(
+        (i, {"technical_skills": rng.sample(vocabulary, 5),
+             "experience": [{"position": rng.choice(positions), "description": ""}]})
+        for i in range(50000)
+    )
+    index.flush()
+    print(f"Indexación: {time.perf_counter() - start:.2f} s")
+    
+    index = CVVectorIndex(path)
+    job_data = {"technical_skills": ["Python", "Django", "Docker"], "responsibilities": ["Desarrollador backend"]}
+    start = time.perf_counter()
+    results = index.search(job_data, 10)
+    print(f"Búsqueda: {(time.perf_counter() - start) * 1000:.1f} ms")
+    assert len(results) == 10
+
+if __name__ == "__main__":
+    test_search_with_real_examples()
+    test_persistence_and_updates()
+    test_shared_folder_between_workers()
+    test_search_50k()
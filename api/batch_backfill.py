@@ -0,0 +1,282 @@
+"""
+Backfill por lotes: re-puntúa Jobs contra CVs (filas de Analysis) o estructura una carpeta de
+PDFs (filas de CV) sin llamadas interactivas a la IA.
+
+Cada ronda recorre las unidades que faltan (un par Job-CV o un PDF) con las respuestas ya
+ingeridas: las completas se guardan en la base de datos y los prompts que aún no tienen
+respuesta se escriben en un archivo de peticiones para la API de Batch de Azure OpenAI.
+Al ingerir el archivo de respuestas se lanza la ronda siguiente, hasta que no quedan
+peticiones. Es reanudable: el estado vive en la carpeta del backfill
+(manifest.json, responses.jsonl, done.jsonl y los archivos de cada ronda).
+
+Uso:
+    python -m api.batch_backfill init backfill/rescore analyses --jobs 3 4
+    python -m api.batch_backfill init backfill/cvs cvs --pdf-dir src/images
+    python -m api.batch_backfill round backfill/rescore
+    python -m api.batch_backfill process backfill/rescore/batch_input_001.jsonl backfill/rescore/batch_output_001.jsonl
+    python -m api.batch_backfill ingest backfill/rescore backfill/rescore/batch_output_001.jsonl
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# src para el cliente de IA compartido
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from api.database import init_db, SessionLocal
+from api.repositories import CVRepository, JobRepository, BULK_CHUNK_SIZE
+from cliente_llm.batch import BatchStore, batch_item, run_local_batch
+
+MANIFEST = "manifest.json"
+RESPONSES = "responses.jsonl"
+DONE = "done.jsonl"
+
+
+class BatchBackfill:
+    """Estado de un backfill por lotes en su carpeta"""
+
+    def __init__(self, run_dir: str, cv_service: Any = None, analysis_service: Any = None, recommendation_service: Any = None):
+        """
+        Args:
+            run_dir (str): Carpeta del backfill
+            cv_service, analysis_service, recommendation_service: Servicios a usar
+                (los de api.services si no se pasan)
+        """
+        if cv_service is None or analysis_service is None or recommendation_service is None:
+            # Import diferido: api.services carga el extractor de PDFs y los comparadores
+            from api.services import CVService, AnalysisService, RecommendationService
+            cv_service = cv_service or CVService()
+            analysis_service = analysis_service or AnalysisService()
+            recommendation_service = recommendation_service or RecommendationService()
+        self.run_dir = run_dir
+        self.cv_service = cv_service
+        self.analysis_service = analysis_service
+        self.recommendation_service = recommendation_service
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.run_dir, name)
+
+    def init(
+        self,
+        db: Any,
+        kind: str,
+        job_ids: Optional[List[int]] = None,
+        cv_ids: Optional[List[int]] = None,
+        pdf_dir: Optional[str] = None,
+        weights: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Crea la carpeta y fija el alcance del backfill (los ids se resuelven una sola vez).
+
+        Args:
+            db: Sesión de BD
+            kind (str): "analyses" o "cvs"
+            job_ids (list): Jobs a re-puntuar (todos si es None)
+            cv_ids (list): CVs a comparar (todos si es None)
+            pdf_dir (str): Carpeta con los PDFs (kind "cvs")
+            weights (dict): Pesos del score (predeterminados si es None)
+
+        Returns:
+            dict: Manifest guardado
+
+        Raises:
+            ValueError: Si la carpeta ya tiene un backfill o faltan argumentos
+        """
+        if os.path.exists(self._path(MANIFEST)):
+            raise ValueError(f"{self.run_dir} ya tiene un backfill; usa 'round' para continuarlo")
+        if kind == "analyses":
+            manifest = {
+                "kind": kind,
+                "job_ids": job_ids or JobRepository.get_ids(db),
+                "cv_ids": cv_ids or CVRepository.get_ids(db),
+                "weights": weights
+            }
+        elif kind == "cvs":
+            if not pdf_dir:
+                raise ValueError("El backfill de CVs necesita --pdf-dir")
+            manifest = {"kind": kind, "pdf_dir": os.path.abspath(pdf_dir)}
+        else:
+            raise ValueError(f"Tipo de backfill no soportado: {kind}")
+        os.makedirs(self.run_dir, exist_ok=True)
+        with open(self._path(MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        return manifest
+
+    def manifest(self) -> Dict[str, Any]:
+        with open(self._path(MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+
+    def done(self) -> set:
+        """Unidades ya guardadas en la BD"""
+        if not os.path.exists(self._path(DONE)):
+            return set()
+        with open(self._path(DONE), encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _mark_done(self, keys: List[str]) -> None:
+        with open(self._path(DONE), "a", encoding="utf-8") as f:
+            f.writelines(f"{key}\n" for key in keys)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _analysis_items(self, db: Any, manifest: Dict[str, Any], done: set) -> Iterator[Tuple[str, Any]]:
+        """(llave, función que devuelve la fila de Analysis) de los pares Job-CV que faltan"""
+        jobs = JobRepository.get_by_ids(db, manifest["job_ids"])
+        for job_id in manifest["job_ids"]:
+            job = jobs.get(job_id)
+            if job is None:
+                continue
+            cv_ids = [cv_id for cv_id in manifest["cv_ids"] if f"{job_id}:{cv_id}" not in done]
+            for start in range(0, len(cv_ids), BULK_CHUNK_SIZE):
+                cvs = CVRepository.get_by_ids(db, cv_ids[start:start + BULK_CHUNK_SIZE])
+                for cv_id in cv_ids[start:start + BULK_CHUNK_SIZE]:
+                    cv = cvs.get(cv_id)
+                    if cv is not None:
+                        yield f"{job_id}:{cv_id}", lambda job=job, cv=cv: self._analysis_row(job, cv, manifest.get("weights"))
+
+    def _analysis_row(self, job: Any, cv: Any, weights: Optional[Dict[str, float]]) -> Dict[str, Any]:
+        start_time = time.time()
+        # Un Job contra muchos CVs: el lado del Job va primero en los prompts
+        resultado = self.recommendation_service.analyze(cv.cv_data, job.job_data, weights, shared_side="job")
+        return {
+            "cv_id": cv.id,
+            "job_id": job.id,
+            "nombre_candidato": cv.nombre,
+            "titulo_trabajo": job.titulo,
+            "score": resultado["score"],
+            "score_breakdown": resultado["score_breakdown"],
+            "resultado_completo": resultado["resultado_completo"],
+            "processing_time": time.time() - start_time
+        }
+
+    def _cv_items(self, manifest: Dict[str, Any], done: set) -> Iterator[Tuple[str, Any]]:
+        """(llave, función que devuelve el CV estructurado) de los PDFs que faltan"""
+        for path in sorted(glob.glob(os.path.join(manifest["pdf_dir"], "*.pdf"))):
+            name = os.path.basename(path)
+            if name not in done:
+                yield name, lambda path=path: self.cv_service.process_cv_from_file(path)
+
+    def _persist(self, db: Any, kind: str, rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Guarda un bloque de unidades completas y las marca como hechas"""
+        if not rows:
+            return
+        if kind == "analyses":
+            # Re-puntuación: reemplaza el análisis anterior de cada par Job-CV
+            self.analysis_service.replace_analyses_bulk(db, [row for _, row in rows])
+        else:
+            self.cv_service.create_cvs_bulk(db, [row for _, row in rows])
+        # Tras el commit: si el proceso se corta antes, el bloque se repite y reemplaza sus propias filas
+        self._mark_done([key for key, _ in rows])
+
+    def round(self, db: Any) -> Dict[str, Any]:
+        """
+        Ejecuta una ronda: guarda las unidades completas y escribe las peticiones pendientes.
+
+        Returns:
+            dict: {"saved", "pending", "requests", "request_files"}
+        """
+        manifest = self.manifest()
+        kind = manifest["kind"]
+        store = BatchStore.load(self._path(RESPONSES))
+        done = self.done()
+        items = self._analysis_items(db, manifest, done) if kind == "analyses" else self._cv_items(manifest, done)
+
+        saved, pending = 0, 0
+        rows = []
+        for key, evaluate in items:
+            try:
+                with batch_item(store) as item:
+                    row = evaluate()
+            except Exception as e:
+                print(f"Error en {key}: {e}")
+                continue
+            if item.pending:
+                pending += 1
+                continue
+            rows.append((key, row))
+            if len(rows) >= BULK_CHUNK_SIZE:
+                self._persist(db, kind, rows)
+                saved += len(rows)
+                rows = []
+        self._persist(db, kind, rows)
+        saved += len(rows)
+
+        request_files = []
+        if store.requests:
+            # batch_input_NNN.jsonl o batch_input_NNN_<parte>.jsonl
+            round_number = len({os.path.basename(p)[12:15] for p in glob.glob(self._path("batch_input_*.jsonl"))}) + 1
+            request_files = store.write_requests(self._path(f"batch_input_{round_number:03d}"))
+        return {"saved": saved, "pending": pending, "requests": len(store.requests), "request_files": request_files}
+
+    def ingest(self, output_path: str) -> Tuple[int, int]:
+        """
+        Agrega un archivo de respuestas al backfill: (respuestas nuevas, respuestas con error).
+        Las que no cumplen el esquema de su petición cuentan como error y se piden de nuevo.
+        """
+        store = BatchStore.load(self._path(RESPONSES))
+        store.load_schemas(self._path("batch_input_*.schemas.json"))
+        return store.ingest(output_path, self._path(RESPONSES))
+
+
+def _print_round(summary: Dict[str, Any]) -> None:
+    print(f"✅ Guardados: {summary['saved']} · pendientes: {summary['pending']} · peticiones: {summary['requests']}")
+    for path in summary["request_files"]:
+        print(f"   Archivo de peticiones: {path}")
+    if not summary["requests"]:
+        print("   Backfill completo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill por lotes de análisis y CVs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = commands.add_parser("init", help="Crea el backfill y ejecuta la primera ronda")
+    init_parser.add_argument("run_dir")
+    init_parser.add_argument("kind", choices=["analyses", "cvs"])
+    init_parser.add_argument("--jobs", type=int, nargs="*", help="IDs de Jobs (todos por defecto)")
+    init_parser.add_argument("--cvs", type=int, nargs="*", help="IDs de CVs (todos por defecto)")
+    init_parser.add_argument("--pdf-dir", help="Carpeta de PDFs (backfill de CVs)")
+    init_parser.add_argument("--weights", type=json.loads, help='Pesos en JSON, p. ej. \'{"experience": 0.3}\'')
+
+    round_parser = commands.add_parser("round", help="Guarda lo completo y escribe las peticiones pendientes")
+    round_parser.add_argument("run_dir")
+
+    ingest_parser = commands.add_parser("ingest", help="Agrega un archivo de respuestas y ejecuta la ronda siguiente")
+    ingest_parser.add_argument("run_dir")
+    ingest_parser.add_argument("output_file")
+
+    process_parser = commands.add_parser("process", help="Procesador local: genera el archivo de respuestas sin red")
+    process_parser.add_argument("input_file")
+    process_parser.add_argument("output_file")
+    process_parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == "process":
+        count = run_local_batch(args.input_file, args.output_file, args.seed)
+        print(f"✅ {count} respuestas escritas en {args.output_file}")
+        return
+
+    init_db()
+    db = SessionLocal()
+    try:
+        backfill = BatchBackfill(args.run_dir)
+        if args.command == "init":
+            manifest = backfill.init(db, args.kind, args.jobs, args.cvs, args.pdf_dir, args.weights)
+            print(f"✅ Backfill de {manifest['kind']} creado en {args.run_dir}")
+        elif args.command == "ingest":
+            stored, errors = backfill.ingest(args.output_file)
+            print(f"✅ Respuestas ingeridas: {stored} nuevas, {errors} con error (se piden de nuevo)")
+        _print_round(backfill.round(db))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
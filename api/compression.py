@@ -0,0 +1,236 @@
+"""
+Columna JSON comprimida para los resultados grandes de los análisis.
+Codifica con zlib y un diccionario compartido entrenado con nuestros propios payloads.
+
+Formato de cada valor: b"Z" + versión del diccionario (1 byte) + datos zlib.
+La versión 0 significa zlib sin diccionario. Los valores sin el prefijo se
+interpretan como JSON plano (filas anteriores a la migración).
+
+La versión con la que se escribe está fijada (ANALYSIS_DICTIONARY_VERSION, 1 por defecto),
+no depende de los archivos de zdicts/ que haya en cada host: una versión nueva se activa
+solo cuando su archivo ya está desplegado en todos.
+"""
+
+import json
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+MAGIC = b"Z"
+COMPRESSION_LEVEL = 6
+MAX_DICTIONARY_SIZE = 32 * 1024  # Máximo útil para zlib (ventana de 32KB)
+
+# Carpeta con los diccionarios entrenados (v2.bin, v3.bin, ...)
+DICTIONARIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zdicts")
+
+# Diccionario semilla (v1): llaves y frases que se repiten en todos los resultados.
+# zlib aprovecha mejor los fragmentos que están al final, por eso lo más frecuente va abajo.
+_SEED_DICTIONARY = (
+    'No se evaluó: Requiere mejorar en varios aspectos clave. Candidato con baja compatibilidad. '
+    'Candidato con potencial. Candidato adecuado. Candidato muy adecuado. Candidato excepcional. '
+    'Destaca en Experiencia, Habilidades Técnicas, Educación, Responsabilidades, Certificaciones, '
+    'Habilidades Blandas, Idiomas y Ubicación. Error en respuesta de IA Error en comparación '
+    '[Skills del CV vs certificaciones requeridas - penalizado 50%] No hay certificaciones adecuadas. '
+    ' | Adicionalmente: No hay ubicación requerida CV no especifica No hay idiomas requeridos '
+    'habilidades técnicas requeridas tienen coincidencias en el CV. coincide con '
+    'El candidato cuenta con experiencia en desarrollo de software, sin embargo no cumple con '
+    'los años de experiencia requeridos. La educación del CV está relacionada con ingeniería de sistemas. '
+    'El CV no menciona certificaciones relacionadas con las requeridas, como '
+    'las habilidades del CV coinciden parcialmente con las requeridas, faltan '
+    '"ignored_aspects":[],"summary":"'
+    '"total_weight":1.0,"used_weight":'
+    '"raw_score":'
+    '"final_score":'
+    '"weights_used":{"experience":0.3,"technical_skills":0.15,"education":0.15,'
+    '"responsibilities":0.15,"certifications":0.1,"soft_skills":0.08,"languages":0.04,"location":0.03},'
+    '"final_score_data":{'
+    '"comparison_results":{'
+    '"ignored":false}'
+    '"ignored":true}'
+    '"contribution":'
+    '"weight":'
+    '"score_breakdown":{'
+    '"experience":{"score":'
+    '"technical_skills":{"score":'
+    '"education":{"score":'
+    '"responsibilities":{"score":'
+    '"certifications":{"score":'
+    '"soft_skills":{"score":'
+    '"languages":{"score":'
+    '"location":{"score":'
+    ',"reason":"El candidato '
+    ',"reason":"'
+).encode("utf-8")
+
+
+def _load_dictionaries() -> Dict[int, bytes]:
+    """Carga el diccionario semilla y los entrenados que existan en DICTIONARIES_DIR"""
+    dictionaries = {1: _SEED_DICTIONARY}
+    if os.path.isdir(DICTIONARIES_DIR):
+        for file_name in os.listdir(DICTIONARIES_DIR):
+            match = re.fullmatch(r"v(\d+)\.bin", file_name)
+            if match and int(match.group(1)) > 1:
+                with open(os.path.join(DICTIONARIES_DIR, file_name), "rb") as f:
+                    dictionaries[int(match.group(1))] = f.read()
+    return dictionaries
+
+
+class UnknownDictionaryError(ValueError):
+    """El valor usa una versión de diccionario que no existe en este host"""
+
+
+def _dictionary(version: int) -> bytes:
+    """Diccionario de una versión, con un error claro si falta su archivo en zdicts/"""
+    if version not in SHARED_DICTIONARIES:
+        raise UnknownDictionaryError(
+            f"Diccionario de compresión v{version} no disponible en este host "
+            f"(hay: {sorted(SHARED_DICTIONARIES)}); despliegue {DICTIONARIES_DIR}/v{version}.bin"
+        )
+    return SHARED_DICTIONARIES[version]
+
+
+SHARED_DICTIONARIES = _load_dictionaries()
+
+# Versión con la que se escriben los valores (0 = sin diccionario)
+CURRENT_DICTIONARY_VERSION = int(os.getenv("ANALYSIS_DICTIONARY_VERSION", "1"))
+if CURRENT_DICTIONARY_VERSION:
+    _dictionary(CURRENT_DICTIONARY_VERSION)
+
+
+def serialize_json(value: Any) -> bytes:
+    """Serialización compacta y estable usada antes de comprimir"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def compress_json(value: Any, dictionary_version: Optional[int] = None) -> bytes:
+    """
+    Comprime un valor JSON.
+
+    Args:
+        value: Valor serializable a JSON
+        dictionary_version: Versión del diccionario (None = CURRENT_DICTIONARY_VERSION, 0 = sin diccionario)
+
+    Returns:
+        bytes: Valor codificado con su cabecera
+    """
+    version = CURRENT_DICTIONARY_VERSION if dictionary_version is None else dictionary_version
+    if version:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=_dictionary(version))
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+    data = compressor.compress(serialize_json(value)) + compressor.flush()
+    return MAGIC + bytes([version]) + data
+
+
+def is_compressed(raw: Any) -> bool:
+    """Indica si un valor crudo de la BD ya está comprimido"""
+    return isinstance(raw, (bytes, bytearray, memoryview)) and bytes(raw[:1]) == MAGIC
+
+
+def decompress_json(raw: Any) -> Any:
+    """
+    Decodifica un valor de la BD.
+    Acepta también JSON plano (str/bytes) de filas aún no migradas.
+
+    Raises:
+        UnknownDictionaryError: Si el valor usa un diccionario que no está en este host
+    """
+    if raw is None:
+        return None
+    if isinstance(raw, (dict, list)):
+        return raw
+    if isinstance(raw, str):
+        return json.loads(raw)
+    raw = bytes(raw)
+    if raw[:1] != MAGIC:
+        return json.loads(raw.decode("utf-8"))
+
+    version = raw[1]
+    if version:
+        decompressor = zlib.decompressobj(zdict=_dictionary(version))
+    else:
+        decompressor = zlib.decompressobj()
+    data = decompressor.decompress(raw[2:]) + decompressor.flush()
+    return json.loads(data.decode("utf-8"))
+
+
+def train_dictionary(payloads: Iterable[Any], max_size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """
+    Entrena un diccionario zlib a partir de payloads reales.
+    Elige los fragmentos (llaves JSON y frases cortas) que más bytes ahorran
+    y deja los de mayor ahorro al final del diccionario.
+
+    Args:
+        payloads: Valores JSON de ejemplo (p.ej. resultado_completo de la BD)
+        max_size: Tamaño máximo del diccionario en bytes
+
+    Returns:
+        bytes: Diccionario listo para zlib
+    """
+    fragment_pattern = re.compile(r'"[^"]{1,60}":\{?|[^\s",{}\[\]:]+(?: [^\s",{}\[\]:]+){0,4}')
+    counts: Counter = Counter()
+    for payload in payloads:
+        text = serialize_json(payload).decode("utf-8")
+        counts.update(fragment_pattern.findall(text))
+
+    ranked = sorted(
+        ((len(fragment.encode("utf-8")) * count, fragment) for fragment, count in counts.items() if count > 1),
+        reverse=True
+    )
+
+    selected = []
+    size = 0
+    for _, fragment in ranked:
+        encoded = fragment.encode("utf-8")
+        if size + len(encoded) > max_size:
+            continue
+        selected.append(encoded)
+        size += len(encoded)
+
+    return b"".join(reversed(selected))
+
+
+def save_dictionary(dictionary: bytes) -> int:
+    """
+    Guarda un diccionario entrenado como la siguiente versión.
+    No la activa: primero se despliega el archivo en todos los hosts y luego se
+    configura ANALYSIS_DICTIONARY_VERSION.
+
+    Returns:
+        int: Versión asignada
+    """
+    version = max(SHARED_DICTIONARIES) + 1
+    if version > 255:
+        raise ValueError("Se alcanzó el máximo de versiones de diccionario")
+    os.makedirs(DICTIONARIES_DIR, exist_ok=True)
+    with open(os.path.join(DICTIONARIES_DIR, f"v{version}.bin"), "wb") as f:
+        f.write(dictionary)
+    return version
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    Tipo de columna JSON comprimido (zlib + diccionario compartido).
+    Se usa igual que JSON: el modelo recibe y entrega dict/list.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_json(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_json(value)
+
+    def result_processor(self, dialect, coltype):
+        # Sin el procesador de LargeBinary: las filas antiguas pueden venir como TEXT (JSON plano)
+        def process(value):
+            return self.process_result_value(value, dialect)
+        return process
@@ -2,17 +2,58 @@
 Configuración de base de datos y modelos.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, JSON
+import os
+from sqlalchemy import create_engine, inspect, Column, Integer, BigInteger, String, Float, DateTime, JSON, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
 
-# Configuración SQLite
-DATABASE_URL = "sqlite:///./cv_system.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+from api.compression import CompressedJSON
+
+# Configuración de la conexión (SQLite local por defecto, PostgreSQL para varios workers/hosts)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./cv_system.db")
+
+# Pool de conexiones para PostgreSQL (ajustable por variables de entorno)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+def is_postgresql(url: str = DATABASE_URL) -> bool:
+    """Indica si la URL apunta a PostgreSQL"""
+    return url.startswith("postgresql")
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    """
+    Crea el engine según el backend configurado.
+    
+    - SQLite: un solo archivo local, se permite compartir la conexión entre hilos.
+    - PostgreSQL: QueuePool con pre-ping y reciclado para varios workers y hosts.
+    """
+    if is_postgresql(url):
+        return create_engine(
+            url,
+            poolclass=QueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True
+        )
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# JSON en SQLite, JSONB (indexable con GIN) en PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 # ==================== MODELOS ====================
 
@@ -25,7 +66,7 @@ class CV(Base):
     email = Column(String)
     telefono = Column(String)
     ubicacion = Column(String)
-    cv_data = Column(JSON)  # CV completo estructurado
+    cv_data = Column(JSONType)  # CV completo estructurado
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
@@ -37,7 +78,7 @@ class JobDescription(Base):
     titulo = Column(String, index=True)
     empresa = Column(String)
     ubicacion = Column(String)
-    job_data = Column(JSON)  # Job completo estructurado
+    job_data = Column(JSONType)  # Job completo estructurado
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
@@ -51,17 +92,145 @@ class Analysis(Base):
     nombre_candidato = Column(String)
     titulo_trabajo = Column(String)
     score = Column(Float)
-    score_breakdown = Column(JSON)  # Desglose del score
-    resultado_completo = Column(JSON)  # Resultado detallado
+    score_breakdown = Column(CompressedJSON)  # Desglose del score (comprimido)
+    resultado_completo = Column(CompressedJSON)  # Resultado detallado (comprimido)
     processing_time = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class CVSkill(Base):
+    """
+    Habilidades normalizadas de un CV (para prefiltrar candidatos en SQL).
+    Una fila por id de concepto de cada habilidad, así "JS" y "javascript" coinciden.
+    """
+    __tablename__ = "cv_skill"
+    
+    id = Column(Integer, primary_key=True)
+    cv_id = Column(Integer, nullable=False, index=True)
+    kind = Column(String, nullable=False)  # technical, soft, certification
+    skill_key = Column(String, nullable=False)  # Llave canónica
+    skill_id = Column(BigInteger)  # Id de concepto (skill_ids)
+    catalog_version = Column(Integer)  # CATALOG_VERSION con la que se calcularon los ids
+    raw = Column(String)  # Texto original
+    
+    __table_args__ = (
+        Index("ix_cv_skill_key_cv", "skill_key", "cv_id"),
+        Index("ix_cv_skill_kind_key", "kind", "skill_key"),
+        Index("ix_cv_skill_id_cv", "skill_id", "cv_id"),
+    )
+
+
+class JobSkill(Base):
+    """Habilidades normalizadas de un Job (una fila por id de concepto)"""
+    __tablename__ = "job_skill"
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, nullable=False, index=True)
+    kind = Column(String, nullable=False)  # technical, soft, certification
+    skill_key = Column(String, nullable=False)  # Llave canónica
+    skill_id = Column(BigInteger)  # Id de concepto (skill_ids)
+    catalog_version = Column(Integer)  # CATALOG_VERSION con la que se calcularon los ids
+    raw = Column(String)  # Texto original
+    
+    __table_args__ = (
+        Index("ix_job_skill_key_job", "skill_key", "job_id"),
+    )
+
+
+class StatCounter(Base):
+    """
+    Contadores incrementales para /stats.
+    Se actualizan en la misma transacción que cada create/delete.
+    
+    Llaves: "cvs", "jobs", "analyses", "score_sum", "hist:{bucket}"
+    y por job: "job:{id}:analyses", "job:{id}:score_sum", "job:{id}:hist:{bucket}".
+    "version:cvs" y "version:jobs" suben con cada alta/baja para que los índices en
+    memoria de cada worker detecten los cambios hechos por los demás.
+    """
+    __tablename__ = "stat_counters"
+    
+    key = Column(String, primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+
+
 # ==================== FUNCIONES AUXILIARES ====================
 
+# Índices GIN sobre los arrays de habilidades (solo PostgreSQL)
+POSTGRES_GIN_INDEXES = {
+    "ix_cvs_technical_skills_gin": "cvs USING gin ((cv_data -> 'technical_skills') jsonb_path_ops)",
+    "ix_cvs_soft_skills_gin": "cvs USING gin ((cv_data -> 'soft_skills') jsonb_path_ops)",
+    "ix_cvs_certifications_gin": "cvs USING gin ((cv_data -> 'certifications') jsonb_path_ops)",
+    "ix_jobs_technical_skills_gin": "jobs USING gin ((job_data -> 'technical_skills') jsonb_path_ops)",
+    "ix_jobs_soft_skills_gin": "jobs USING gin ((job_data -> 'soft_skills') jsonb_path_ops)",
+    "ix_jobs_certifications_gin": "jobs USING gin ((job_data -> 'certifications') jsonb_path_ops)",
+}
+
+
+# Columnas de analyses guardadas con CompressedJSON (bytea en PostgreSQL)
+COMPRESSED_ANALYSIS_COLUMNS = ("score_breakdown", "resultado_completo")
+
+# Llave del advisory lock de los cambios de esquema al iniciar (PostgreSQL)
+SCHEMA_LOCK_KEY = 720_001
+
+
+def ensure_compressed_columns(conn) -> None:
+    """
+    Convierte a bytea las columnas comprimidas que sigan como JSON/JSONB (BD creadas antes
+    de la compresión). Los valores quedan como JSON plano, que CompressedJSON sigue leyendo;
+    api.migrations.compress_analysis_json los comprime después.
+    El advisory lock evita que varios workers hagan el ALTER a la vez (solo PostgreSQL).
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+    for column in COMPRESSED_ANALYSIS_COLUMNS:
+        data_type = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'analyses' AND column_name = :column"
+        ), {"column": column}).scalar()
+        if data_type and data_type != "bytea":
+            print(f"Convirtiendo analyses.{column} de {data_type} a bytea...")
+            conn.execute(text(
+                f"ALTER TABLE analyses ALTER COLUMN {column} TYPE bytea "
+                f"USING convert_to({column}::text, 'UTF8')"
+            ))
+
+
+# Columnas agregadas a las tablas de habilidades después de crearlas
+SKILL_ID_COLUMNS = {"skill_id": "BIGINT", "catalog_version": "INTEGER"}
+
+
+def ensure_skill_id_columns(conn) -> None:
+    """
+    Agrega skill_id y catalog_version a cv_skill/job_skill en BD creadas antes de los ids
+    de concepto. Las filas antiguas quedan con NULL y api.migrations.backfill_skills las rehace.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+    inspector = inspect(conn)
+    for table in ("cv_skill", "job_skill"):
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        for column, column_type in SKILL_ID_COLUMNS.items():
+            if column not in existing:
+                print(f"Agregando {table}.{column}...")
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_cv_skill_id_cv ON cv_skill (skill_id, cv_id)"))
+
+
 def init_db():
     """Inicializa la base de datos"""
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        ensure_skill_id_columns(conn)
+    
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            ensure_compressed_columns(conn)
+            for index_name, definition in POSTGRES_GIN_INDEXES.items():
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {definition}"))
+
+
+def get_database_backend() -> str:
+    """Nombre del backend en uso (para logs y health check)"""
+    return engine.dialect.name
 
 
 def get_db():
@@ -0,0 +1,86 @@
+"""
+Sincronización de los índices en memoria de cada worker con la base de datos.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from api.repositories import CVRepository, JobRepository, StatsRepository
+
+
+class IndexSyncService:
+    """
+    Mantiene al día con la base de datos los índices en memoria de este proceso.
+    
+    Con varios workers cada uno tiene su copia de los índices y solo actualiza la suya al
+    crear/eliminar. Los create/delete suben además el contador "version:cvs"/"version:jobs"
+    en la misma transacción; antes de consultar un índice se lee ese contador (una fila) y,
+    si cambió, se comparan los ids de la tabla con los de cada índice: se cargan solo los
+    registros que faltan y se sacan los eliminados.
+    """
+    
+    _REPOSITORIES = {"cvs": CVRepository, "jobs": JobRepository}
+    _METHODS = {"cvs": ("add_cvs", "remove_cv"), "jobs": ("add_jobs", "remove_job")}
+    
+    def __init__(self, table: str, indexes: List[Any], batch_size: int = 1000):
+        """
+        Args:
+            table (str): "cvs" o "jobs"
+            indexes (list): Servicios de índice con ids() y add_cvs/remove_cv (o add_jobs/remove_job)
+            batch_size (int): Registros cargados por lote
+        """
+        self.table = table
+        self.indexes = list(indexes)
+        self.batch_size = batch_size
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def sync(self, db: Session, force: bool = False) -> Dict[str, int]:
+        """
+        Sincroniza los índices si otra transacción cambió la tabla desde la última vez.
+        
+        Args:
+            db (Session): Sesión de BD
+            force (bool): Compara los ids aunque la versión no haya cambiado (al iniciar)
+        
+        Returns:
+            dict: {"indexados", "agregados", "eliminados"} (vacío si no hubo cambios)
+        """
+        version = StatsRepository.get_version(db, self.table)
+        if not force and version == self._version:
+            return {}
+        with self._lock:
+            if not force and version == self._version:
+                return {}
+            repository = self._REPOSITORIES[self.table]
+            add_method, remove_method = self._METHODS[self.table]
+            
+            db_ids = set(repository.get_ids(db))
+            missing: Dict[int, List[Any]] = {}
+            removed = 0
+            for index in self.indexes:
+                index_ids = set(index.ids())
+                for stale_id in index_ids - db_ids:
+                    getattr(index, remove_method)(stale_id)
+                    removed += 1
+                for missing_id in db_ids - index_ids:
+                    missing.setdefault(missing_id, []).append(index)
+            
+            # Una sola lectura de los registros que faltan, repartida entre los índices
+            batch: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
+            for record_id, data in repository.iter_data_by_ids(db, list(missing), self.batch_size):
+                for index in missing[record_id]:
+                    batch.setdefault(id(index), []).append((record_id, data))
+                if sum(len(items) for items in batch.values()) >= self.batch_size:
+                    self._flush(batch, add_method)
+            self._flush(batch, add_method)
+            
+            self._version = version
+            return {"indexados": len(db_ids), "agregados": len(missing), "eliminados": removed}
+    
+    def _flush(self, batch: Dict[int, List[Tuple[int, Dict[str, Any]]]], add_method: str) -> None:
+        for index in self.indexes:
+            items = batch.pop(id(index), None)
+            if items:
+                getattr(index, add_method)(items)
@@ -3,7 +3,7 @@ CV Recommendation API
 Arquitectura limpia con Services y Repositories
 """
 
-from fastapi import FastAPI, File, UploadFile, Form, Depends, HTTPException, Body
+from fastapi import FastAPI, File, UploadFile, Form, Depends, HTTPException, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict
@@ -11,8 +11,9 @@ from pydantic import BaseModel, Field
 import os
 import time
 
-from api.database import init_db, get_db
-from api.services import CVService, JobService, RecommendationService, AnalysisService
+from api.database import init_db, get_db, get_database_backend, SessionLocal
+from api.services import CVService, JobService, RecommendationService, AnalysisService, CandidateIndexService, VectorIndexService
+from api.services import RecallFeatureService, RankingService, JobMatchService, LLMStatsService, IndexSyncService
 
 
 # ==================== MODELOS PYDANTIC ====================
@@ -68,10 +69,19 @@ app.add_middleware(
 )
 
 # Servicios
-cv_service = CVService()
-job_service = JobService()
+candidate_index_service = CandidateIndexService()
+vector_index_service = VectorIndexService()
+recall_feature_service = RecallFeatureService()
+job_match_service = JobMatchService()
+# Índices en memoria de este worker, al día con los cambios de los demás
+cv_index_sync = IndexSyncService("cvs", [candidate_index_service, recall_feature_service, vector_index_service])
+job_index_sync = IndexSyncService("jobs", [job_match_service])
+cv_service = CVService([candidate_index_service, vector_index_service, recall_feature_service, job_match_service])
+job_service = JobService([job_match_service])
 recommendation_service = RecommendationService()
+ranking_service = RankingService(recommendation_service, recall_feature_service)
 analysis_service = AnalysisService()
+llm_stats_service = LLMStatsService()
 
 # Carpeta temporal
 TEMP_FOLDER = "temp_uploads"
@@ -82,7 +92,24 @@ os.makedirs(TEMP_FOLDER, exist_ok=True)
 def startup():
     """Inicializa BD al iniciar"""
     init_db()
-    print("✅ Base de datos inicializada: cv_system.db")
+    db = SessionLocal()
+    try:
+        analysis_service.ensure_statistics(db)
+        cv_sync = cv_index_sync.sync(db, force=True)
+        vector_index_service.flush()
+        job_sync = job_index_sync.sync(db, force=True)
+    finally:
+        db.close()
+    print(f"✅ Base de datos inicializada: {get_database_backend()}")
+    print(f"✅ Índices de CVs (habilidades, features, vectorial): {cv_sync['indexados']} CVs "
+          f"(+{cv_sync['agregados']} / -{cv_sync['eliminados']})")
+    print(f"✅ Índice de Jobs: {job_sync['indexados']} Jobs")
+
+
+@app.on_event("shutdown")
+def shutdown():
+    """Persiste las altas pendientes del índice vectorial"""
+    vector_index_service.flush()
 
 
 # ==================== ROOT & HEALTH ====================
@@ -101,7 +128,7 @@ def root():
 @app.get("/health")
 def health():
     """Health check"""
-    return {"status": "ok", "database": "connected"}
+    return {"status": "ok", "database": "connected", "backend": get_database_backend()}
 
 
 # ==================== ENDPOINTS DE CVs ====================
@@ -372,6 +399,9 @@ def analizar(
             "score_breakdown": resultado["score_breakdown"],
             "summary": resultado["resultado_completo"].get("final_score_data", {}).get("summary", ""),
             "weights_used": resultado["resultado_completo"].get("final_score_data", {}).get("weights_used", {}),
+            "token_usage": resultado["resultado_completo"].get("token_usage", {}),
+            "degraded": resultado["resultado_completo"].get("degradation", {}).get("degraded", False),
+            "degraded_calls": resultado["resultado_completo"].get("degradation", {}).get("degraded_calls", []),
             "processing_time": round(processing_time, 2)
         }
         
@@ -467,6 +497,224 @@ def top_candidatos(
     } for idx, a in enumerate(analyses)]
 
 
+@app.get("/jobs/{job_id}/candidatos-rapidos")
+def candidatos_rapidos(
+    job_id: int,
+    limit: int = 10,
+    db: Session = Depends(get_db)
+):
+    """
+    Recupera los CVs con mayor coincidencia de habilidades técnicas,
+    certificaciones e idiomas para un Job, sin ejecutar el análisis con IA.
+    
+    Usa el índice invertido en memoria (milisegundos incluso con 100k CVs).
+    El score es la fracción del peso de los requisitos del Job que cubre el CV.
+    """
+    job = job_service.get_job_by_id(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    
+    cv_index_sync.sync(db)
+    matches = candidate_index_service.top_candidates(job.job_data, limit)
+    cvs = cv_service.get_cvs_by_ids(db, [m["id"] for m in matches])
+    return [{
+        "rank": idx + 1,
+        "cv_id": m["id"],
+        "candidato": cvs[m["id"]].nombre if m["id"] in cvs else None,
+        "score_porcentaje": round(m["score"] * 100, 1),
+        "coincidencias": m["matched"]
+    } for idx, m in enumerate(matches)]
+
+
+@app.post("/jobs/{job_id}/ranking")
+def ranking_dos_etapas(
+    job_id: int,
+    k: int = 20,
+    weights: Optional[WeightsRequest] = Body(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Rankea todos los CVs para un Job en dos etapas.
+    
+    1. Puntúa todos los CVs con señales deterministas (habilidades, años de experiencia,
+       nivel educativo, idiomas y ubicación), sin IA.
+    2. Ejecuta el análisis completo con IA solo sobre los `k` mejores y guarda esos análisis.
+    
+    Usa `GET /jobs/{job_id}/ranking/recall` para elegir `k`.
+    """
+    job = job_service.get_job_by_id(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    
+    try:
+        weights_dict = weights.to_dict() if weights else None
+        cv_index_sync.sync(db)
+        ranked = ranking_service.rank(db, job.job_data, k, weights_dict)
+        cvs = cv_service.get_cvs_by_ids(db, [r["id"] for r in ranked])
+        
+        analysis_ids = analysis_service.create_analyses_bulk(db, [{
+            "cv_id": r["id"],
+            "job_id": job_id,
+            "nombre_candidato": cvs[r["id"]].nombre,
+            "titulo_trabajo": job.titulo,
+            "score": r["score"],
+            "score_breakdown": r["recommendation"].get("final_score_data", {}).get("score_breakdown", {}),
+            "resultado_completo": r["recommendation"],
+            "processing_time": r["processing_time"]
+        } for r in ranked])
+        
+        return {
+            "job_id": job_id,
+            "total_cvs": len(recall_feature_service.store),
+            "analizados": len(ranked),
+            "ranking": [{
+                "rank": idx + 1,
+                "analysis_id": analysis_id,
+                "cv_id": r["id"],
+                "candidato": cvs[r["id"]].nombre,
+                "score_porcentaje": round(r["score"] * 100, 1),
+                "score_recall": r["recall_score"],
+                "senales": r["signals"]
+            } for idx, (r, analysis_id) in enumerate(zip(ranked, analysis_ids))]
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/jobs/{job_id}/ranking/recall")
+def recall_ranking(
+    job_id: int,
+    ks: List[int] = Query([5, 10, 20, 50]),
+    top_n: int = 10,
+    db: Session = Depends(get_db)
+):
+    """
+    Reporta qué fracción de los `top_n` mejores CVs según los análisis completos
+    ya guardados del Job habría quedado en una lista corta de tamaño k.
+    
+    Requiere haber analizado con IA un conjunto representativo de CVs para el Job
+    (p.ej. con `benchmarks/eval_two_stage_recall.py`).
+    """
+    job = job_service.get_job_by_id(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    
+    report = ranking_service.recall_report(db, job_id, job.job_data, ks, top_n)
+    return {
+        "job_id": job_id,
+        "cvs_con_analisis": report["n_cvs"],
+        "top_n": report["top_n"],
+        "recall": {str(k): recall for k, recall in report["recall"].items()}
+    }
+
+
+@app.get("/jobs/{job_id}/candidatos-similares")
+def candidatos_similares(
+    job_id: int,
+    limit: int = 10,
+    db: Session = Depends(get_db)
+):
+    """
+    Recupera los CVs cuyo contenido (experiencia, habilidades, educación)
+    es más similar a las responsabilidades y habilidades del Job, sin IA.
+    
+    Usa el índice vectorial TF-IDF en disco (coseno sobre matrices dispersas).
+    """
+    job = job_service.get_job_by_id(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    
+    cv_index_sync.sync(db)
+    matches = vector_index_service.similar_candidates(job.job_data, limit)
+    cvs = cv_service.get_cvs_by_ids(db, [m["id"] for m in matches])
+    return [{
+        "rank": idx + 1,
+        "cv_id": m["id"],
+        "candidato": cvs[m["id"]].nombre if m["id"] in cvs else None,
+        "similitud": m["score"]
+    } for idx, m in enumerate(matches)]
+
+
+@app.get("/cvs/{cv_id}/matching-jobs")
+def matching_jobs(
+    cv_id: int,
+    limit: int = 10,
+    analizar: int = 0,
+    db: Session = Depends(get_db)
+):
+    """
+    Recupera los Jobs que mejor encajan con un CV (matching inverso).
+    
+    - Usa un índice invertido de los requisitos de todos los Jobs: solo se revisan los Jobs
+      que comparten habilidades o certificaciones con el CV.
+    - Los reordena con señales deterministas (habilidades, experiencia, educación, idiomas, ubicación).
+    - Si `analizar` > 0, ejecuta el análisis completo con IA solo sobre esos primeros Jobs
+      (reutiliza el último análisis guardado del par CV-Job si ya existe).
+    
+    Los resultados sin IA se cachean por CV hasta que se crea o elimina un Job.
+    """
+    cv = cv_service.get_cv_by_id(db, cv_id)
+    if not cv:
+        raise HTTPException(status_code=404, detail="CV no encontrado")
+    
+    job_index_sync.sync(db)
+    matches = job_match_service.matching_jobs(cv_id, cv.cv_data, limit)
+    jobs = job_service.get_jobs_by_ids(db, [m["id"] for m in matches])
+    matches = [m for m in matches if m["id"] in jobs]
+    
+    analyses = {}
+    if analizar > 0:
+        to_analyze = [m["id"] for m in matches[:analizar]]
+        analyses = analysis_service.get_latest_analyses(db, cv_id, to_analyze)
+        try:
+            for job_id in to_analyze:
+                if job_id in analyses:
+                    continue
+                start_time = time.time()
+                job = jobs[job_id]
+                # Un CV contra varios Jobs: el CV va primero en los prompts
+                resultado = recommendation_service.analyze(cv.cv_data, job.job_data, shared_side="cv")
+                analyses[job_id] = analysis_service.create_analysis(
+                    db=db,
+                    cv_id=cv_id,
+                    job_id=job_id,
+                    nombre_candidato=cv.nombre,
+                    titulo_trabajo=job.titulo,
+                    score=resultado["score"],
+                    score_breakdown=resultado["score_breakdown"],
+                    resultado_completo=resultado["resultado_completo"],
+                    processing_time=time.time() - start_time
+                )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    
+    resultados = []
+    for idx, m in enumerate(matches):
+        job = jobs[m["id"]]
+        item = {
+            "rank": idx + 1,
+            "job_id": m["id"],
+            "titulo": job.titulo,
+            "empresa": job.empresa,
+            "score_porcentaje": round(m["score"] * 100, 1),
+            "cobertura_habilidades": m["cobertura_habilidades"],
+            "coincidencias": m["matched"],
+            "senales": m["signals"]
+        }
+        if m["id"] in analyses:
+            item["analysis_id"] = analyses[m["id"]].id
+            item["score_ia_porcentaje"] = round(analyses[m["id"]].score * 100, 1)
+        resultados.append(item)
+    
+    if analyses:
+        resultados.sort(key=lambda r: (r.get("score_ia_porcentaje") is None, -(r.get("score_ia_porcentaje") or 0)))
+        for idx, item in enumerate(resultados):
+            item["rank"] = idx + 1
+    
+    return {"cv_id": cv_id, "candidato": cv.nombre, "jobs": resultados}
+
+
 @app.delete("/analyses/{analysis_id}")
 def eliminar_analysis(analysis_id: int, db: Session = Depends(get_db)):
     """Elimina un análisis específico"""
@@ -485,7 +733,36 @@ def estadisticas(db: Session = Depends(get_db)):
         "total_jobs": stats["total_jobs"],
         "total_analyses": stats["total_analyses"],
         "score_promedio": stats["average_score"],
-        "score_promedio_porcentaje": round(stats["average_score"] * 100, 1)
+        "score_promedio_porcentaje": round(stats["average_score"] * 100, 1),
+        "histograma_scores": stats["score_histogram"]
+    }
+
+
+@app.get("/stats/llm")
+def estadisticas_llm():
+    """
+    Contadores de las llamadas a la IA de este proceso, por punto de llamada
+    (comparadores "experience", "multi_aspect", ...; extractores "cv.education", "job.basic_info", ...):
+    llamadas, reintentos, fallos de parseo, violaciones del esquema y fallos definitivos.
+    También el límite de tasa de cada deployment: peticiones, 429, reintentos y segundos de espera,
+    y su circuit breaker: estado, aperturas, llamadas rechazadas, tasa de errores y p95 de latencia.
+    """
+    return llm_stats_service.get_statistics()
+
+
+@app.get("/jobs/{job_id}/stats")
+def estadisticas_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Estadísticas de un Job: número de análisis, score promedio
+    e histograma de scores (10 buckets de 0.1).
+    """
+    stats = analysis_service.get_job_statistics(db, job_id)
+    return {
+        "job_id": job_id,
+        "total_analyses": stats["total_analyses"],
+        "score_promedio": stats["average_score"],
+        "score_promedio_porcentaje": round(stats["average_score"] * 100, 1),
+        "histograma_scores": stats["score_histogram"]
     }
 
 
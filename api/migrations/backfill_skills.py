@@ -0,0 +1,34 @@
+"""
+Migración: puebla las tablas cv_skill y job_skill para los CVs y Jobs existentes
+y guarda los ids canónicos de habilidades ("canonical_skills") en cv_data/job_data
+y el resumen de experiencia ("experience_summary") y el perfil de prompt ("prompt_profile") en cv_data.
+Es reanudable: solo procesa los registros que aún no tienen habilidades indexadas
+por id de concepto con la versión actual del catálogo o cuyos datos precalculados son de otra versión.
+
+Uso:
+    python -m api.migrations.backfill_skills
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from api.database import init_db, SessionLocal
+from api.repositories import SkillRepository
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        cv_count, job_count = SkillRepository.backfill(db)
+        print(f"✅ Habilidades normalizadas: {cv_count} CVs y {job_count} Jobs procesados")
+        cv_count, job_count = SkillRepository.backfill_precomputed(db)
+        print(f"✅ Ids canónicos, resumen de experiencia y perfil de prompt: {cv_count} CVs y {job_count} Jobs actualizados")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
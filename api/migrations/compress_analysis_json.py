@@ -0,0 +1,120 @@
+"""
+Migración: comprime score_breakdown y resultado_completo de la tabla analyses.
+
+- PostgreSQL: convierte las columnas JSONB a bytea antes de reescribir (init_db también
+  lo hace al iniciar la API).
+- SQLite: no necesita cambiar el tipo, solo reescribe los valores.
+
+Es reanudable: las filas ya comprimidas con el diccionario actual se saltan.
+
+Uso:
+    python -m api.migrations.compress_analysis_json
+    python -m api.migrations.compress_analysis_json --train-dictionary 2000
+    ANALYSIS_DICTIONARY_VERSION=2 python -m api.migrations.compress_analysis_json
+"""
+
+import argparse
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+
+from api import compression
+from api.database import engine, ensure_compressed_columns
+
+
+def _needs_rewrite(raw) -> bool:
+    """Una fila se reescribe si no está comprimida o usa un diccionario viejo"""
+    if raw is None:
+        return False
+    if not compression.is_compressed(raw):
+        return True
+    return bytes(raw)[1] != compression.CURRENT_DICTIONARY_VERSION
+
+
+def train_and_save_dictionary(sample_size: int) -> int:
+    """
+    Entrena un diccionario nuevo con los resultados guardados y lo guarda en zdicts/.
+    No se usa para escribir hasta que se configure ANALYSIS_DICTIONARY_VERSION.
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT resultado_completo FROM analyses ORDER BY id DESC LIMIT :n"
+        ), {"n": sample_size}).fetchall()
+    payloads = [compression.decompress_json(row[0]) for row in rows if row[0] is not None]
+    if not payloads:
+        print("No hay análisis para entrenar el diccionario")
+        return compression.CURRENT_DICTIONARY_VERSION
+
+    dictionary = compression.train_dictionary(payloads)
+    version = compression.save_dictionary(dictionary)
+    compression.SHARED_DICTIONARIES[version] = dictionary
+    print(f"Diccionario v{version} entrenado con {len(payloads)} análisis ({len(dictionary)} bytes)")
+    print(f"Despliegue api/zdicts/v{version}.bin en todos los hosts, configure "
+          f"ANALYSIS_DICTIONARY_VERSION={version} y vuelva a correr la migración")
+    return version
+
+
+def migrate(batch_size: int = 500) -> int:
+    """
+    Comprime todas las filas pendientes, en lotes de batch_size (un commit por lote).
+
+    Returns:
+        int: Número de filas reescritas
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            ensure_compressed_columns(conn)
+
+    rewritten = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, score_breakdown, resultado_completo FROM analyses "
+                "WHERE id > :last_id ORDER BY id LIMIT :batch_size"
+            ), {"last_id": last_id, "batch_size": batch_size}).fetchall()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                if any(_needs_rewrite(raw) for raw in (row[1], row[2])):
+                    updates.append({
+                        "id": row[0],
+                        "score_breakdown": None if row[1] is None else compression.compress_json(compression.decompress_json(row[1])),
+                        "resultado_completo": None if row[2] is None else compression.compress_json(compression.decompress_json(row[2]))
+                    })
+            if updates:
+                conn.execute(text(
+                    "UPDATE analyses SET score_breakdown = :score_breakdown, "
+                    "resultado_completo = :resultado_completo WHERE id = :id"
+                ), updates)
+
+            rewritten += len(updates)
+            last_id = rows[-1][0]
+            print(f"  ... hasta id {last_id}: {rewritten} filas comprimidas")
+
+    return rewritten
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprime los JSON grandes de la tabla analyses")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--train-dictionary", type=int, default=0, metavar="N",
+                        help="Solo entrena un diccionario nuevo con los últimos N análisis (no migra)")
+    args = parser.parse_args()
+
+    if args.train_dictionary:
+        train_and_save_dictionary(args.train_dictionary)
+        return
+
+    total = migrate(args.batch_size)
+    print(f"✅ Migración completada: {total} filas comprimidas "
+          f"(diccionario v{compression.CURRENT_DICTIONARY_VERSION})")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,30 +3,94 @@ Repositories - Capa de acceso a datos.
 Maneja todas las operaciones CRUD con la base de datos.
 """
 
+import os
+import sys
+from sqlalchemy import case, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from api.database import CV, JobDescription, Analysis
+from typing import Dict, List, Optional, Tuple
+from api.database import CV, JobDescription, Analysis, StatCounter, CVSkill, JobSkill
+
+# Agregar algoritmo_recomendacion al path para los motores locales
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'algoritmo_recomendacion'))
+from engines.skill_canonicalizer import CATALOG_VERSION, profile_skill_keys, skill_ids, with_canonical_skills
+from engines.experience_parser import with_experience_summary
+from engines.prompt_profile import with_prompt_profile
+
+# Número de buckets del histograma de scores (ancho 0.1)
+SCORE_HISTOGRAM_BUCKETS = 10
+
+# Filas por executemany en las inserciones masivas
+BULK_CHUNK_SIZE = 500
+
+
+def _chunks(items: list, size: int) -> List[list]:
+    """Divide una lista en bloques de tamaño size"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _bulk_insert_returning_ids(db: Session, model, rows: List[dict], chunk_size: int) -> List[int]:
+    """
+    Inserta filas con executemany (insertmanyvalues) y retorna los ids en el mismo orden.
+    No hace commit ni refresh por fila.
+    """
+    ids = []
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    for chunk in _chunks(rows, chunk_size):
+        ids.extend(db.scalars(stmt, chunk).all())
+    return ids
 
 
 class CVRepository:
     """Repository para operaciones con CVs"""
     
+    @staticmethod
+    def _row(cv_data: dict) -> dict:
+        """Columnas de un CV a partir de sus datos estructurados"""
+        personal = cv_data.get("personal", {})
+        return {
+            "nombre": personal.get("name", "Unknown"),
+            "email": personal.get("email", ""),
+            "telefono": personal.get("phone", ""),
+            "ubicacion": personal.get("location", ""),
+            # Normalmente ya vienen de la extracción; se completan si el CV llegó por otra vía
+            "cv_data": CVRepository.with_precomputed(cv_data)
+        }
+    
+    @staticmethod
+    def with_precomputed(cv_data: dict) -> dict:
+        """cv_data con los ids canónicos de habilidades, el resumen de experiencia y el perfil de prompt al día"""
+        return with_prompt_profile(with_experience_summary(with_canonical_skills(cv_data)))
+    
     @staticmethod
     def create(db: Session, cv_data: dict) -> CV:
         """Crea un nuevo CV en la BD"""
-        personal = cv_data.get("personal", {})
-        cv = CV(
-            nombre=personal.get("name", "Unknown"),
-            email=personal.get("email", ""),
-            telefono=personal.get("phone", ""),
-            ubicacion=personal.get("location", ""),
-            cv_data=cv_data
-        )
+        cv = CV(**CVRepository._row(cv_data))
         db.add(cv)
+        db.flush()  # Asigna cv.id para las habilidades normalizadas
+        SkillRepository.add_cv_skills(db, cv.id, cv_data)
+        StatsRepository.increment(db, {"cvs": 1, StatsRepository.version_key("cvs"): 1})
         db.commit()
         db.refresh(cv)
         return cv
     
+    @staticmethod
+    def bulk_create(db: Session, cv_data_list: List[dict], chunk_size: int = BULK_CHUNK_SIZE) -> List[int]:
+        """
+        Crea muchos CVs en una sola transacción.
+        
+        Returns:
+            list: IDs generados, en el mismo orden de cv_data_list
+        """
+        if not cv_data_list:
+            return []
+        ids = _bulk_insert_returning_ids(db, CV, [CVRepository._row(data) for data in cv_data_list], chunk_size)
+        SkillRepository.bulk_add_cv_skills(db, list(zip(ids, cv_data_list)))
+        StatsRepository.increment(db, {"cvs": len(ids), StatsRepository.version_key("cvs"): 1})
+        db.commit()
+        return ids
+    
     @staticmethod
     def get_by_id(db: Session, cv_id: int) -> Optional[CV]:
         """Obtiene un CV por ID"""
@@ -37,6 +101,29 @@ class CVRepository:
         """Obtiene todos los CVs con paginación"""
         return db.query(CV).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_by_ids(db: Session, cv_ids: List[int]) -> Dict[int, CV]:
+        """Obtiene varios CVs por ID en una sola consulta"""
+        if not cv_ids:
+            return {}
+        return {cv.id: cv for cv in db.query(CV).filter(CV.id.in_(cv_ids)).all()}
+    
+    @staticmethod
+    def iter_data(db: Session, batch_size: int = 1000):
+        """Recorre (id, cv_data) de todos los CVs por lotes, sin cargar la tabla completa"""
+        return db.query(CV.id, CV.cv_data).order_by(CV.id).yield_per(batch_size)
+    
+    @staticmethod
+    def get_ids(db: Session) -> List[int]:
+        """IDs de todos los CVs (sin leer cv_data)"""
+        return [row[0] for row in db.query(CV.id).order_by(CV.id)]
+    
+    @staticmethod
+    def iter_data_by_ids(db: Session, cv_ids: List[int], batch_size: int = 1000):
+        """Recorre (id, cv_data) solo de los CVs indicados, por lotes"""
+        for chunk in _chunks(sorted(cv_ids), batch_size):
+            yield from db.query(CV.id, CV.cv_data).filter(CV.id.in_(chunk)).order_by(CV.id)
+    
     @staticmethod
     def search_by_name(db: Session, name: str) -> List[CV]:
         """Busca CVs por nombre"""
@@ -48,6 +135,8 @@ class CVRepository:
         cv = db.query(CV).filter(CV.id == cv_id).first()
         if cv:
             db.delete(cv)
+            db.query(CVSkill).filter(CVSkill.cv_id == cv_id).delete(synchronize_session=False)
+            StatsRepository.increment(db, {"cvs": -1, StatsRepository.version_key("cvs"): 1})
             db.commit()
             return True
         return False
@@ -56,21 +145,45 @@ class CVRepository:
 class JobRepository:
     """Repository para operaciones con Jobs"""
     
+    @staticmethod
+    def _row(job_data: dict) -> dict:
+        """Columnas de un Job a partir de sus datos estructurados"""
+        basic_info = job_data.get("basic_info", {})
+        return {
+            "titulo": basic_info.get("job_title", "Unknown"),
+            "empresa": basic_info.get("company_name", ""),
+            "ubicacion": job_data.get("location", ""),
+            "job_data": with_canonical_skills(job_data)
+        }
+    
     @staticmethod
     def create(db: Session, job_data: dict) -> JobDescription:
         """Crea un nuevo Job en la BD"""
-        basic_info = job_data.get("basic_info", {})
-        job = JobDescription(
-            titulo=basic_info.get("job_title", "Unknown"),
-            empresa=basic_info.get("company_name", ""),
-            ubicacion=job_data.get("location", ""),
-            job_data=job_data
-        )
+        job = JobDescription(**JobRepository._row(job_data))
         db.add(job)
+        db.flush()  # Asigna job.id para las habilidades normalizadas
+        SkillRepository.add_job_skills(db, job.id, job_data)
+        StatsRepository.increment(db, {"jobs": 1, StatsRepository.version_key("jobs"): 1})
         db.commit()
         db.refresh(job)
         return job
     
+    @staticmethod
+    def bulk_create(db: Session, job_data_list: List[dict], chunk_size: int = BULK_CHUNK_SIZE) -> List[int]:
+        """
+        Crea muchos Jobs en una sola transacción.
+        
+        Returns:
+            list: IDs generados, en el mismo orden de job_data_list
+        """
+        if not job_data_list:
+            return []
+        ids = _bulk_insert_returning_ids(db, JobDescription, [JobRepository._row(data) for data in job_data_list], chunk_size)
+        SkillRepository.bulk_add_job_skills(db, list(zip(ids, job_data_list)))
+        StatsRepository.increment(db, {"jobs": len(ids), StatsRepository.version_key("jobs"): 1})
+        db.commit()
+        return ids
+    
     @staticmethod
     def get_by_id(db: Session, job_id: int) -> Optional[JobDescription]:
         """Obtiene un Job por ID"""
@@ -81,6 +194,33 @@ class JobRepository:
         """Obtiene todos los Jobs con paginación"""
         return db.query(JobDescription).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_by_ids(db: Session, job_ids: List[int]) -> Dict[int, JobDescription]:
+        """Obtiene varios Jobs por ID en una sola consulta"""
+        if not job_ids:
+            return {}
+        return {job.id: job for job in db.query(JobDescription).filter(JobDescription.id.in_(job_ids)).all()}
+    
+    @staticmethod
+    def iter_data(db: Session, batch_size: int = 1000):
+        """Recorre (id, job_data) de todos los Jobs por lotes, sin cargar la tabla completa"""
+        return db.query(JobDescription.id, JobDescription.job_data).order_by(JobDescription.id).yield_per(batch_size)
+    
+    @staticmethod
+    def get_ids(db: Session) -> List[int]:
+        """IDs de todos los Jobs (sin leer job_data)"""
+        return [row[0] for row in db.query(JobDescription.id).order_by(JobDescription.id)]
+    
+    @staticmethod
+    def iter_data_by_ids(db: Session, job_ids: List[int], batch_size: int = 1000):
+        """Recorre (id, job_data) solo de los Jobs indicados, por lotes"""
+        for chunk in _chunks(sorted(job_ids), batch_size):
+            yield from (
+                db.query(JobDescription.id, JobDescription.job_data)
+                .filter(JobDescription.id.in_(chunk))
+                .order_by(JobDescription.id)
+            )
+    
     @staticmethod
     def search_by_title(db: Session, title: str) -> List[JobDescription]:
         """Busca Jobs por título"""
@@ -92,11 +232,193 @@ class JobRepository:
         job = db.query(JobDescription).filter(JobDescription.id == job_id).first()
         if job:
             db.delete(job)
+            db.query(JobSkill).filter(JobSkill.job_id == job_id).delete(synchronize_session=False)
+            StatsRepository.increment(db, {"jobs": -1, StatsRepository.version_key("jobs"): 1})
             db.commit()
             return True
         return False
 
 
+class SkillRepository:
+    """
+    Repository para las habilidades normalizadas (tablas cv_skill y job_skill).
+    Permite prefiltrar candidatos por coincidencia de habilidades sin cargar los JSON.
+    Las búsquedas van por id de concepto (skill_ids), así los alias del catálogo coinciden.
+    """
+    
+    @staticmethod
+    def _skill_rows(owner_field: str, owner_id: int, data: dict) -> List[dict]:
+        """Filas de habilidades para un CV (cv_id) o un Job (job_id): una por id de concepto"""
+        return [
+            {
+                owner_field: owner_id, "kind": kind, "skill_key": key, "raw": raw,
+                "skill_id": skill_id, "catalog_version": CATALOG_VERSION
+            }
+            for (kind, key), raw in profile_skill_keys(data or {}).items()
+            for skill_id in sorted(skill_ids(key))
+        ]
+    
+    @staticmethod
+    def _insert_rows(db: Session, model, rows: List[dict]) -> None:
+        """Inserta filas con executemany por bloques (sin commit)"""
+        for chunk in _chunks(rows, BULK_CHUNK_SIZE):
+            db.execute(model.__table__.insert(), chunk)
+    
+    @staticmethod
+    def add_cv_skills(db: Session, cv_id: int, cv_data: dict) -> None:
+        """Inserta las habilidades canónicas de un CV (sin commit)"""
+        SkillRepository._insert_rows(db, CVSkill, SkillRepository._skill_rows("cv_id", cv_id, cv_data))
+    
+    @staticmethod
+    def add_job_skills(db: Session, job_id: int, job_data: dict) -> None:
+        """Inserta las habilidades canónicas de un Job (sin commit)"""
+        SkillRepository._insert_rows(db, JobSkill, SkillRepository._skill_rows("job_id", job_id, job_data))
+    
+    @staticmethod
+    def bulk_add_cv_skills(db: Session, cvs: List[Tuple[int, dict]]) -> None:
+        """Inserta las habilidades de muchos CVs [(cv_id, cv_data)] en un solo executemany por bloque"""
+        rows = [row for cv_id, cv_data in cvs for row in SkillRepository._skill_rows("cv_id", cv_id, cv_data)]
+        SkillRepository._insert_rows(db, CVSkill, rows)
+    
+    @staticmethod
+    def bulk_add_job_skills(db: Session, jobs: List[Tuple[int, dict]]) -> None:
+        """Inserta las habilidades de muchos Jobs [(job_id, job_data)] en un solo executemany por bloque"""
+        rows = [row for job_id, job_data in jobs for row in SkillRepository._skill_rows("job_id", job_id, job_data)]
+        SkillRepository._insert_rows(db, JobSkill, rows)
+    
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 500) -> Tuple[int, int]:
+        """
+        Puebla cv_skill y job_skill para los CVs y Jobs que aún no tienen filas o las tienen
+        de otra versión del catálogo (o de antes de los ids de concepto): borra las filas
+        viejas y las vuelve a calcular. Hace commit por lote, así que se puede interrumpir y volver a correr.
+        
+        Returns:
+            tuple: (CVs procesados, Jobs procesados)
+        """
+        counts = []
+        for model, skill_model, owner_column, data_attr, add_skills in (
+            (CV, CVSkill, CVSkill.cv_id, "cv_data", SkillRepository.bulk_add_cv_skills),
+            (JobDescription, JobSkill, JobSkill.job_id, "job_data", SkillRepository.bulk_add_job_skills),
+        ):
+            indexed = db.query(owner_column).filter(skill_model.catalog_version == CATALOG_VERSION).distinct()
+            processed = 0
+            last_id = 0
+            while True:
+                batch = (
+                    db.query(model)
+                    .filter(model.id > last_id, model.id.notin_(indexed))
+                    .order_by(model.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not batch:
+                    break
+                batch_ids = [record.id for record in batch]
+                db.query(skill_model).filter(owner_column.in_(batch_ids)).delete(synchronize_session=False)
+                add_skills(db, [(record.id, getattr(record, data_attr)) for record in batch])
+                db.commit()
+                processed += len(batch)
+                last_id = batch[-1].id
+            counts.append(processed)
+        
+        return counts[0], counts[1]
+    
+    @staticmethod
+    def backfill_precomputed(db: Session, batch_size: int = 500) -> Tuple[int, int]:
+        """
+        Guarda "canonical_skills" en cv_data/job_data (y "experience_summary" y "prompt_profile" en cv_data)
+        de los registros que no lo tienen o lo tienen de otra versión. Hace commit por lote.
+        
+        Returns:
+            tuple: (CVs actualizados, Jobs actualizados)
+        """
+        counts = []
+        targets = (
+            (CV, "cv_data", CVRepository.with_precomputed),
+            (JobDescription, "job_data", with_canonical_skills)
+        )
+        for model, data_attr, refresh in targets:
+            updated = 0
+            last_id = 0
+            while True:
+                batch = db.query(model).filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+                if not batch:
+                    break
+                for record in batch:
+                    data = getattr(record, data_attr) or {}
+                    refreshed = refresh(data)
+                    if refreshed is not data:
+                        setattr(record, data_attr, refreshed)
+                        updated += 1
+                db.commit()
+                last_id = batch[-1].id
+            counts.append(updated)
+        
+        return counts[0], counts[1]
+    
+    @staticmethod
+    def get_job_skill_keys(db: Session, job_id: int, kinds: Optional[List[str]] = None) -> List[str]:
+        """Llaves canónicas de un Job"""
+        query = db.query(JobSkill.skill_key).filter(JobSkill.job_id == job_id)
+        if kinds:
+            query = query.filter(JobSkill.kind.in_(kinds))
+        return [row[0] for row in query.distinct()]
+    
+    @staticmethod
+    def find_candidate_cv_ids(
+        db: Session,
+        required_skills: List[str],
+        min_overlap: int = 1,
+        limit: int = 100,
+        kinds: Optional[List[str]] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        CVs ordenados por cuántas de las habilidades requeridas tienen (todo en SQL).
+        
+        Args:
+            required_skills: Habilidades requeridas (texto libre o llaves canónicas; los alias cuentan)
+            min_overlap: Mínimo de habilidades en común
+            limit: Máximo de CVs a retornar
+            kinds: Restringir a ciertos tipos ("technical", "soft", "certification")
+            
+        Returns:
+            list: [(cv_id, habilidades en común)] de mayor a menor coincidencia
+        """
+        # Id de concepto -> habilidad requerida, para contar cada requisito una sola vez
+        required = {}
+        for position, skill in enumerate(required_skills):
+            for skill_id in sorted(skill_ids(skill)):
+                required.setdefault(skill_id, position)
+        if not required:
+            return []
+        
+        overlap = func.count(func.distinct(case(required, value=CVSkill.skill_id))).label("overlap")
+        query = db.query(CVSkill.cv_id, overlap).filter(CVSkill.skill_id.in_(list(required)))
+        if kinds:
+            query = query.filter(CVSkill.kind.in_(kinds))
+        rows = (
+            query.group_by(CVSkill.cv_id)
+            .having(overlap >= min_overlap)
+            .order_by(overlap.desc(), CVSkill.cv_id)
+            .limit(limit)
+            .all()
+        )
+        return [(cv_id, count) for cv_id, count in rows]
+    
+    @staticmethod
+    def find_candidate_cv_ids_for_job(
+        db: Session,
+        job_id: int,
+        min_overlap: int = 1,
+        limit: int = 100
+    ) -> List[Tuple[int, int]]:
+        """CVs ordenados por coincidencia con las habilidades de un Job guardado"""
+        return SkillRepository.find_candidate_cv_ids(
+            db, SkillRepository.get_job_skill_keys(db, job_id), min_overlap, limit
+        )
+
+
 class AnalysisRepository:
     """Repository para operaciones con Análisis"""
     
@@ -124,10 +446,80 @@ class AnalysisRepository:
             processing_time=processing_time
         )
         db.add(analysis)
+        StatsRepository.record_analysis(db, job_id, score)
         db.commit()
         db.refresh(analysis)
         return analysis
     
+    @staticmethod
+    def bulk_create(db: Session, analyses: List[dict], chunk_size: int = BULK_CHUNK_SIZE) -> List[int]:
+        """
+        Crea muchos análisis en una sola transacción (executemany por bloques).
+        
+        Args:
+            analyses: Dicts con las mismas llaves que create() (cv_id, job_id, nombre_candidato,
+                      titulo_trabajo, score, score_breakdown, resultado_completo, processing_time)
+            
+        Returns:
+            list: IDs generados, en el mismo orden de analyses
+        """
+        if not analyses:
+            return []
+        ids = _bulk_insert_returning_ids(db, Analysis, analyses, chunk_size)
+        
+        # Un solo upsert por contador para todo el lote
+        deltas: Dict[str, float] = {}
+        for analysis in analyses:
+            for key, delta in StatsRepository.analysis_deltas(analysis["job_id"], analysis["score"]).items():
+                deltas[key] = deltas.get(key, 0) + delta
+        StatsRepository.increment(db, deltas)
+        
+        db.commit()
+        return ids
+    
+    @staticmethod
+    def bulk_replace(db: Session, analyses: List[dict], chunk_size: int = BULK_CHUNK_SIZE) -> List[int]:
+        """
+        Como bulk_create, pero antes elimina los análisis existentes de cada par (job_id, cv_id),
+        así una re-puntuación no deja el mismo CV dos veces en el ranking del Job.
+        
+        Args:
+            analyses: Dicts con las mismas llaves que create()
+            
+        Returns:
+            list: IDs generados, en el mismo orden de analyses
+        """
+        if not analyses:
+            return []
+        cv_ids_by_job: Dict[int, set] = {}
+        for analysis in analyses:
+            cv_ids_by_job.setdefault(analysis["job_id"], set()).add(analysis["cv_id"])
+        
+        # Los análisis reemplazados se descuentan de los contadores en la misma transacción
+        deltas: Dict[str, float] = {}
+        for job_id, cv_ids in cv_ids_by_job.items():
+            for chunk in _chunks(sorted(cv_ids), chunk_size):
+                old = (
+                    db.query(Analysis.id, Analysis.score)
+                    .filter(Analysis.job_id == job_id, Analysis.cv_id.in_(chunk))
+                    .all()
+                )
+                if not old:
+                    continue
+                for _, score in old:
+                    for key, delta in StatsRepository.analysis_deltas(job_id, score, sign=-1).items():
+                        deltas[key] = deltas.get(key, 0) + delta
+                db.query(Analysis).filter(Analysis.id.in_([analysis_id for analysis_id, _ in old])).delete(synchronize_session=False)
+        
+        ids = _bulk_insert_returning_ids(db, Analysis, analyses, chunk_size)
+        for analysis in analyses:
+            for key, delta in StatsRepository.analysis_deltas(analysis["job_id"], analysis["score"]).items():
+                deltas[key] = deltas.get(key, 0) + delta
+        StatsRepository.increment(db, deltas)
+        
+        db.commit()
+        return ids
+    
     @staticmethod
     def get_by_id(db: Session, analysis_id: int) -> Optional[Analysis]:
         """Obtiene un análisis por ID"""
@@ -138,6 +530,19 @@ class AnalysisRepository:
         """Obtiene todos los análisis"""
         return db.query(Analysis).order_by(Analysis.created_at.desc()).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def get_latest_by_cv_and_jobs(db: Session, cv_id: int, job_ids: List[int]) -> Dict[int, Analysis]:
+        """Último análisis de un CV contra cada uno de los Jobs indicados"""
+        if not job_ids:
+            return {}
+        analyses = (
+            db.query(Analysis)
+            .filter(Analysis.cv_id == cv_id, Analysis.job_id.in_(job_ids))
+            .order_by(Analysis.id)
+            .all()
+        )
+        return {analysis.job_id: analysis for analysis in analyses}
+    
     @staticmethod
     def get_by_cv(db: Session, cv_id: int) -> List[Analysis]:
         """Obtiene análisis de un CV específico"""
@@ -148,6 +553,17 @@ class AnalysisRepository:
         """Obtiene análisis de un Job específico"""
         return db.query(Analysis).filter(Analysis.job_id == job_id).order_by(Analysis.score.desc()).all()
     
+    @staticmethod
+    def get_latest_scores_by_job(db: Session, job_id: int) -> Dict[int, float]:
+        """Score del último análisis de cada CV para un Job (sin leer los JSON)"""
+        rows = (
+            db.query(Analysis.cv_id, Analysis.score)
+            .filter(Analysis.job_id == job_id)
+            .order_by(Analysis.id)
+            .all()
+        )
+        return {cv_id: score for cv_id, score in rows}
+    
     @staticmethod
     def get_top_candidates(db: Session, job_id: int, limit: int = 10) -> List[Analysis]:
         """Obtiene los mejores candidatos para un job"""
@@ -161,21 +577,13 @@ class AnalysisRepository:
     
     @staticmethod
     def get_statistics(db: Session) -> dict:
-        """Obtiene estadísticas generales"""
-        total_analyses = db.query(Analysis).count()
-        total_cvs = db.query(CV).count()
-        total_jobs = db.query(JobDescription).count()
-        
-        avg_score = db.query(Analysis).with_entities(
-            db.func.avg(Analysis.score)
-        ).scalar() or 0.0
-        
-        return {
-            "total_analyses": total_analyses,
-            "total_cvs": total_cvs,
-            "total_jobs": total_jobs,
-            "average_score": round(avg_score, 3)
-        }
+        """Obtiene estadísticas generales (O(1), desde los contadores)"""
+        return StatsRepository.get_global(db)
+    
+    @staticmethod
+    def get_job_statistics(db: Session, job_id: int) -> dict:
+        """Obtiene estadísticas de un Job (O(1), desde los contadores)"""
+        return StatsRepository.get_job(db, job_id)
     
     @staticmethod
     def delete(db: Session, analysis_id: int) -> bool:
@@ -183,7 +591,180 @@ class AnalysisRepository:
         analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
         if analysis:
             db.delete(analysis)
+            StatsRepository.record_analysis(db, analysis.job_id, analysis.score, sign=-1)
             db.commit()
             return True
         return False
 
+
+class StatsRepository:
+    """
+    Repository para los contadores incrementales de estadísticas.
+    No hace commit: los cambios viajan en la transacción de quien lo llama.
+    """
+    
+    INITIALIZED_KEY = "initialized"
+    
+    @staticmethod
+    def version_key(table: str) -> str:
+        """Contador que sube con cada alta/baja de la tabla ("cvs" o "jobs"); lo leen los índices de cada worker"""
+        return f"version:{table}"
+    
+    @staticmethod
+    def get_version(db: Session, table: str) -> int:
+        """Versión actual de una tabla (lectura de una sola fila)"""
+        value = db.query(StatCounter.value).filter(StatCounter.key == StatsRepository.version_key(table)).scalar()
+        return int(value or 0)
+    
+    @staticmethod
+    def _score_bucket(score: float) -> int:
+        """Bucket del histograma para un score entre 0 y 1"""
+        score = min(max(score or 0.0, 0.0), 1.0)
+        return min(int(score * SCORE_HISTOGRAM_BUCKETS), SCORE_HISTOGRAM_BUCKETS - 1)
+    
+    @staticmethod
+    def increment(db: Session, deltas: Dict[str, float]) -> None:
+        """Suma los deltas a los contadores (upsert atómico en SQLite y PostgreSQL)"""
+        dialect = db.get_bind().dialect.name
+        for key, delta in deltas.items():
+            if dialect in ("sqlite", "postgresql"):
+                insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+                stmt = insert(StatCounter).values(key=key, value=delta)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[StatCounter.key],
+                    set_={"value": StatCounter.value + stmt.excluded.value}
+                )
+                db.execute(stmt)
+            else:
+                updated = (
+                    db.query(StatCounter)
+                    .filter(StatCounter.key == key)
+                    .update({StatCounter.value: StatCounter.value + delta}, synchronize_session=False)
+                )
+                if not updated:
+                    db.add(StatCounter(key=key, value=delta))
+    
+    @staticmethod
+    def analysis_deltas(job_id: int, score: float, sign: int = 1) -> Dict[str, float]:
+        """Deltas de los contadores que produce un análisis"""
+        score = score or 0.0
+        bucket = StatsRepository._score_bucket(score)
+        return {
+            "analyses": sign,
+            "score_sum": sign * score,
+            f"hist:{bucket}": sign,
+            f"job:{job_id}:analyses": sign,
+            f"job:{job_id}:score_sum": sign * score,
+            f"job:{job_id}:hist:{bucket}": sign
+        }
+    
+    @staticmethod
+    def record_analysis(db: Session, job_id: int, score: float, sign: int = 1) -> None:
+        """Registra (sign=1) o descuenta (sign=-1) un análisis en los contadores"""
+        StatsRepository.increment(db, StatsRepository.analysis_deltas(job_id, score, sign))
+    
+    @staticmethod
+    def _read(db: Session, keys: List[str]) -> Dict[str, float]:
+        """Lee un conjunto fijo de contadores"""
+        rows = db.query(StatCounter).filter(StatCounter.key.in_(keys)).all()
+        return {row.key: row.value for row in rows}
+    
+    @staticmethod
+    def _summary(counters: Dict[str, float], prefix: str = "") -> dict:
+        """Arma total, promedio e histograma a partir de los contadores"""
+        total = int(counters.get(f"{prefix}analyses", 0))
+        score_sum = counters.get(f"{prefix}score_sum", 0.0)
+        return {
+            "total_analyses": total,
+            "average_score": round(score_sum / total, 3) if total > 0 else 0.0,
+            "score_histogram": [
+                int(counters.get(f"{prefix}hist:{bucket}", 0))
+                for bucket in range(SCORE_HISTOGRAM_BUCKETS)
+            ]
+        }
+    
+    @staticmethod
+    def get_global(db: Session) -> dict:
+        """Estadísticas generales"""
+        keys = ["cvs", "jobs", "analyses", "score_sum"]
+        keys += [f"hist:{bucket}" for bucket in range(SCORE_HISTOGRAM_BUCKETS)]
+        counters = StatsRepository._read(db, keys)
+        return {
+            "total_cvs": int(counters.get("cvs", 0)),
+            "total_jobs": int(counters.get("jobs", 0)),
+            **StatsRepository._summary(counters)
+        }
+    
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> dict:
+        """Estadísticas de un Job"""
+        prefix = f"job:{job_id}:"
+        keys = [f"{prefix}analyses", f"{prefix}score_sum"]
+        keys += [f"{prefix}hist:{bucket}" for bucket in range(SCORE_HISTOGRAM_BUCKETS)]
+        counters = StatsRepository._read(db, keys)
+        return {"job_id": job_id, **StatsRepository._summary(counters, prefix)}
+    
+    @staticmethod
+    def _claim_initialization(db: Session) -> bool:
+        """
+        Inserta la llave "initialized" solo si no existe (sin commit).
+        En PostgreSQL el insert de los demás workers espera a que termine la transacción
+        del primero y luego no inserta nada.
+        
+        Returns:
+            bool: True si la llave la insertó esta transacción
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = insert(StatCounter).values(key=StatsRepository.INITIALIZED_KEY, value=1)
+            stmt = stmt.on_conflict_do_nothing(index_elements=[StatCounter.key])
+            return db.execute(stmt).rowcount == 1
+        if db.get(StatCounter, StatsRepository.INITIALIZED_KEY):
+            return False
+        db.add(StatCounter(key=StatsRepository.INITIALIZED_KEY, value=1))
+        db.flush()
+        return True
+    
+    @staticmethod
+    def rebuild(db: Session) -> None:
+        """
+        Recalcula todos los contadores desde las tablas (backfill).
+        Solo se usa al inicializar sobre una BD existente; es la única operación que escanea.
+        """
+        StatsRepository._claim_initialization(db)
+        db.query(StatCounter).filter(StatCounter.key != StatsRepository.INITIALIZED_KEY).delete(synchronize_session=False)
+        
+        counters: Dict[str, float] = {
+            "cvs": db.query(func.count(CV.id)).scalar() or 0,
+            "jobs": db.query(func.count(JobDescription.id)).scalar() or 0
+        }
+        rows = db.query(Analysis.job_id, Analysis.score).yield_per(1000)
+        for job_id, score in rows:
+            score = score or 0.0
+            bucket = StatsRepository._score_bucket(score)
+            for prefix in ("", f"job:{job_id}:"):
+                counters[f"{prefix}analyses"] = counters.get(f"{prefix}analyses", 0) + 1
+                counters[f"{prefix}score_sum"] = counters.get(f"{prefix}score_sum", 0.0) + score
+                counters[f"{prefix}hist:{bucket}"] = counters.get(f"{prefix}hist:{bucket}", 0) + 1
+        
+        db.add_all([StatCounter(key=key, value=value) for key, value in counters.items()])
+        db.commit()
+    
+    @staticmethod
+    def ensure_initialized(db: Session) -> None:
+        """
+        Hace el backfill una sola vez si los contadores aún no existen.
+        Todos los workers lo llaman al iniciar: solo el que inserta la llave "initialized"
+        recalcula; los demás no tocan los contadores.
+        """
+        if db.get(StatCounter, StatsRepository.INITIALIZED_KEY):
+            return
+        try:
+            if StatsRepository._claim_initialization(db):
+                StatsRepository.rebuild(db)
+            else:
+                db.rollback()
+        except IntegrityError:
+            # Otro worker insertó la llave primero (backends sin ON CONFLICT)
+            db.rollback()
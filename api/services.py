@@ -5,7 +5,10 @@ Conecta los endpoints con el core del sistema y los repositories.
 
 import sys
 import os
-from typing import Dict, Any, List, Optional
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 # Agregar paths
@@ -14,15 +17,252 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from main.data_cleaner import DataCleaner
 from main.data_structurer import DataStructurer
 from main.recommendation_engine import RecommendationEngine
-from api.repositories import CVRepository, JobRepository, AnalysisRepository
+from main.two_stage_ranker import TwoStageRanker
+from api.repositories import CVRepository, JobRepository, AnalysisRepository, StatsRepository, SkillRepository
+from api.index_sync import IndexSyncService
+from engines.skill_index import InvertedSkillIndex, match_terms
+from engines.vector_index import CVVectorIndex
+from engines.recall_signals import CVFeatureStore, RecallScorer, cv_features
+from cliente_llm.structured_output import structured_output_stats
+from cliente_llm.rate_limiter import rate_limiter_stats
+from cliente_llm.circuit_breaker import circuit_breaker_stats
+from cliente_llm.single_flight import single_flight_stats
+
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "./vector_index")
+
+
+class CandidateIndexService:
+    """
+    Servicio para el índice invertido en memoria de habilidades de los CVs.
+    Cada proceso de la API mantiene su propia copia; IndexSyncService la carga al
+    iniciar y la pone al día con los cambios de los demás workers.
+    """
+    
+    def __init__(self):
+        self.index = InvertedSkillIndex()
+    
+    def ids(self) -> List[int]:
+        """IDs de los CVs indexados"""
+        return self.index.ids()
+    
+    def add_cv(self, cv_id: int, cv_data: Dict[str, Any]) -> None:
+        """Indexa un CV nuevo"""
+        self.index.add(cv_id, cv_data)
+    
+    def add_cvs(self, items: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Indexa varios CVs nuevos"""
+        for cv_id, cv_data in items:
+            self.index.add(cv_id, cv_data)
+    
+    def remove_cv(self, cv_id: int) -> None:
+        """Saca un CV del índice"""
+        self.index.remove(cv_id)
+    
+    def top_candidates(self, job_data: Dict[str, Any], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        CVs con mayor coincidencia ponderada de habilidades técnicas,
+        certificaciones e idiomas con el Job (sin IA).
+        """
+        return self.index.top_n(job_data, limit)
+
+
+class VectorIndexService:
+    """
+    Servicio para el índice vectorial TF-IDF de los CVs.
+    El índice vive en disco (VECTOR_INDEX_PATH), compartido por los workers; al iniciar
+    IndexSyncService solo vectoriza los CVs que faltan en él y saca los que ya no existen.
+    """
+    
+    def __init__(self, path: Optional[str] = VECTOR_INDEX_PATH):
+        self.index = CVVectorIndex(path)
+    
+    def ids(self) -> List[int]:
+        """IDs indexados, incluidos los que otros workers ya escribieron en disco"""
+        self.index.refresh()
+        return self.index.ids()
+    
+    def add_cv(self, cv_id: int, cv_data: Dict[str, Any]) -> None:
+        """Indexa un CV nuevo"""
+        self.index.add(cv_id, cv_data)
+    
+    def add_cvs(self, items: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Indexa varios CVs nuevos con una sola vectorización"""
+        self.index.add_many(items)
+    
+    def remove_cv(self, cv_id: int) -> None:
+        """Saca un CV del índice"""
+        self.index.remove(cv_id)
+    
+    def flush(self) -> None:
+        """Persiste en disco las altas pendientes"""
+        self.index.flush()
+    
+    def similar_candidates(self, job_data: Dict[str, Any], limit: int = 10) -> List[Dict[str, Any]]:
+        """CVs cuyo contenido es más similar al Job (coseno TF-IDF, sin IA)"""
+        return [
+            {"id": cv_id, "score": score}
+            for cv_id, score in self.index.search(job_data, limit)
+        ]
+
+
+class RecallFeatureService:
+    """
+    Servicio para las features deterministas de todos los CVs (primera etapa del ranking).
+    Se calculan una vez por CV al iniciar o al crearlo, no en cada ranking
+    (IndexSyncService, igual que el índice de habilidades).
+    """
+    
+    def __init__(self):
+        self.store = CVFeatureStore()
+    
+    def ids(self) -> List[int]:
+        """IDs de los CVs con features"""
+        return self.store.ids()
+    
+    def add_cv(self, cv_id: int, cv_data: Dict[str, Any]) -> None:
+        """Calcula las features de un CV nuevo"""
+        self.store.add(cv_id, cv_data)
+    
+    def add_cvs(self, items: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Calcula las features de varios CVs nuevos"""
+        for cv_id, cv_data in items:
+            self.store.add(cv_id, cv_data)
+    
+    def remove_cv(self, cv_id: int) -> None:
+        """Saca un CV"""
+        self.store.remove(cv_id)
+    
+    def items(self) -> List[Tuple[int, Any]]:
+        """(cv_id, CVFeatures) de todos los CVs"""
+        return self.store.items()
+
+
+class JobMatchService:
+    """
+    Servicio para el matching inverso (mejores Jobs para un CV).
+    
+    - Índice invertido de los requisitos de todos los Jobs: solo se revisan los Jobs
+      que comparten alguna habilidad con el CV (no los N).
+    - Scorer determinista precalculado por Job para reordenar los candidatos.
+    - Caché por CV de los resultados, invalidada al crear/eliminar Jobs o eliminar el CV.
+    Los Jobs creados/eliminados en otros workers llegan por IndexSyncService.
+    """
+    
+    def __init__(self, cache_size: int = 1024):
+        self.index = InvertedSkillIndex(terms_fn=match_terms)
+        self._scorers: Dict[int, RecallScorer] = {}
+        self._cache: "OrderedDict[Tuple[int, int, int], List[Dict[str, Any]]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._version = 0
+        self._lock = threading.RLock()
+    
+    def ids(self) -> List[int]:
+        """IDs de los Jobs indexados"""
+        return self.index.ids()
+    
+    def _invalidate(self) -> None:
+        self._version += 1
+        self._cache.clear()
+    
+    def add_job(self, job_id: int, job_data: Dict[str, Any]) -> None:
+        """Indexa un Job nuevo"""
+        with self._lock:
+            self.index.add(job_id, job_data)
+            self._scorers[job_id] = RecallScorer(job_data or {})
+            self._invalidate()
+    
+    def add_jobs(self, items: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Indexa varios Jobs nuevos"""
+        with self._lock:
+            for job_id, job_data in items:
+                self.index.add(job_id, job_data)
+                self._scorers[job_id] = RecallScorer(job_data or {})
+            self._invalidate()
+    
+    def remove_job(self, job_id: int) -> None:
+        """Saca un Job del índice"""
+        with self._lock:
+            self.index.remove(job_id)
+            self._scorers.pop(job_id, None)
+            self._invalidate()
+    
+    # Como índice de CVs (CVService) solo necesita olvidar la caché del CV eliminado
+    def add_cv(self, cv_id: int, cv_data: Dict[str, Any]) -> None:
+        pass
+    
+    def add_cvs(self, items: List[Tuple[int, Dict[str, Any]]]) -> None:
+        pass
+    
+    def remove_cv(self, cv_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == cv_id]:
+                del self._cache[key]
+    
+    def matching_jobs(
+        self,
+        cv_id: int,
+        cv_data: Dict[str, Any],
+        limit: int = 10,
+        candidates: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Jobs que mejor encajan con un CV, sin IA.
+        
+        Args:
+            cv_id (int): ID del CV (llave de la caché)
+            cv_data (dict): CV estructurado
+            limit (int): Número de resultados
+            candidates (int): Jobs recuperados del índice antes de reordenar
+        
+        Returns:
+            list: [{"id", "score", "cobertura_habilidades", "signals", "matched"}] de mayor a menor score
+        """
+        with self._lock:
+            key = (cv_id, limit, candidates)
+            version = self._version
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+            scorers = self._scorers
+        
+        features = cv_features(cv_data or {})
+        results = []
+        for match in self.index.top_n(cv_data, candidates, normalize="document"):
+            scorer = scorers.get(match["id"])
+            if scorer is None:
+                continue
+            score, signals = scorer.score(features)
+            results.append({
+                "id": match["id"],
+                "score": score,
+                "cobertura_habilidades": match["score"],
+                "signals": signals,
+                "matched": match["matched"]
+            })
+        results.sort(key=lambda item: (-item["score"], -item["cobertura_habilidades"], item["id"]))
+        results = results[:limit]
+        
+        with self._lock:
+            if version == self._version:
+                self._cache[key] = results
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return results
 
 
 class CVService:
     """Servicio para procesamiento de CVs"""
     
-    def __init__(self):
+    def __init__(self, indexes: Optional[List[Any]] = None):
+        """
+        Args:
+            indexes (list): Servicios de índice a mantener al crear/eliminar CVs
+                            (cualquier objeto con add_cv, add_cvs y remove_cv)
+        """
         self.cleaner = DataCleaner()
         self.structurer = DataStructurer()
+        self.indexes = list(indexes or [])
     
     def process_cv_from_file(self, file_path: str) -> Dict[str, Any]:
         """
@@ -49,7 +289,18 @@ class CVService:
     
     def create_cv(self, db: Session, cv_data: Dict[str, Any]) -> Any:
         """Crea un CV en la base de datos"""
-        return CVRepository.create(db, cv_data)
+        cv = CVRepository.create(db, cv_data)
+        for index in self.indexes:
+            index.add_cv(cv.id, cv_data)
+        return cv
+    
+    def create_cvs_bulk(self, db: Session, cv_data_list: List[Dict[str, Any]]) -> List[int]:
+        """Crea muchos CVs en una sola transacción, retorna sus IDs"""
+        cv_ids = CVRepository.bulk_create(db, cv_data_list)
+        items = list(zip(cv_ids, cv_data_list))
+        for index in self.indexes:
+            index.add_cvs(items)
+        return cv_ids
     
     def get_cv_by_id(self, db: Session, cv_id: int) -> Optional[Any]:
         """Obtiene un CV por ID"""
@@ -63,17 +314,35 @@ class CVService:
         """Busca CVs por nombre"""
         return CVRepository.search_by_name(db, name)
     
+    def get_cvs_by_ids(self, db: Session, cv_ids: List[int]) -> Dict[int, Any]:
+        """Obtiene varios CVs por ID"""
+        return CVRepository.get_by_ids(db, cv_ids)
+    
     def delete_cv(self, db: Session, cv_id: int) -> bool:
         """Elimina un CV"""
-        return CVRepository.delete(db, cv_id)
+        deleted = CVRepository.delete(db, cv_id)
+        if deleted:
+            for index in self.indexes:
+                index.remove_cv(cv_id)
+        return deleted
+    
+    def find_cv_ids_by_skills(self, db: Session, skills: List[str], min_overlap: int = 1, limit: int = 100) -> List[Any]:
+        """Prefiltra CVs por habilidades requeridas (en SQL)"""
+        return SkillRepository.find_candidate_cv_ids(db, skills, min_overlap, limit)
 
 
 class JobService:
     """Servicio para procesamiento de Jobs"""
     
-    def __init__(self):
+    def __init__(self, indexes: Optional[List[Any]] = None):
+        """
+        Args:
+            indexes (list): Servicios de índice a mantener al crear/eliminar Jobs
+                            (cualquier objeto con add_job, add_jobs y remove_job)
+        """
         self.structurer = DataStructurer()
         self.cleaner = DataCleaner()
+        self.indexes = list(indexes or [])
     def process_job_from_text(self, description: str) -> Dict[str, Any]:
         """
         Procesa una descripción de trabajo.
@@ -97,12 +366,27 @@ class JobService:
     
     def create_job(self, db: Session, job_data: Dict[str, Any]) -> Any:
         """Crea un Job en la base de datos"""
-        return JobRepository.create(db, job_data)
+        job = JobRepository.create(db, job_data)
+        for index in self.indexes:
+            index.add_job(job.id, job_data)
+        return job
+    
+    def create_jobs_bulk(self, db: Session, job_data_list: List[Dict[str, Any]]) -> List[int]:
+        """Crea muchos Jobs en una sola transacción, retorna sus IDs"""
+        job_ids = JobRepository.bulk_create(db, job_data_list)
+        items = list(zip(job_ids, job_data_list))
+        for index in self.indexes:
+            index.add_jobs(items)
+        return job_ids
     
     def get_job_by_id(self, db: Session, job_id: int) -> Optional[Any]:
         """Obtiene un Job por ID"""
         return JobRepository.get_by_id(db, job_id)
     
+    def get_jobs_by_ids(self, db: Session, job_ids: List[int]) -> Dict[int, Any]:
+        """Obtiene varios Jobs por ID"""
+        return JobRepository.get_by_ids(db, job_ids)
+    
     def get_all_jobs(self, db: Session, skip: int = 0, limit: int = 100) -> List[Any]:
         """Obtiene todos los Jobs con paginación"""
         return JobRepository.get_all(db, skip, limit)
@@ -113,7 +397,24 @@ class JobService:
     
     def delete_job(self, db: Session, job_id: int) -> bool:
         """Elimina un Job"""
-        return JobRepository.delete(db, job_id)
+        deleted = JobRepository.delete(db, job_id)
+        if deleted:
+            for index in self.indexes:
+                index.remove_job(job_id)
+        return deleted
+
+
+class LLMStatsService:
+    """Servicio para los contadores del cliente de IA (propios de cada proceso de la API)"""
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Contadores de la salida estructurada y del single-flight (por punto de llamada), del límite de tasa y de los circuit breakers (por deployment)"""
+        return {
+            "structured_output": structured_output_stats(),
+            "single_flight": single_flight_stats(),
+            "rate_limits": rate_limiter_stats(),
+            "circuit_breakers": circuit_breaker_stats()
+        }
 
 
 class RecommendationService:
@@ -126,7 +427,8 @@ class RecommendationService:
         self,
         cv_data: Dict[str, Any],
         job_data: Dict[str, Any],
-        weights: Dict[str, float] = None
+        weights: Dict[str, float] = None,
+        shared_side: str = None
     ) -> Dict[str, Any]:
         """
         Ejecuta el análisis completo CV vs Job.
@@ -136,6 +438,7 @@ class RecommendationService:
             cv_data: Datos estructurados del CV
             job_data: Datos estructurados del Job
             weights: Pesos personalizados (opcional). Si es None o dict vacío, usa predeterminados.
+            shared_side: "job" o "cv" si el análisis es parte de un lote que repite ese lado (orden de los prompts)
         
         Returns:
             dict con score, score_breakdown y resultado_completo
@@ -148,7 +451,8 @@ class RecommendationService:
         recommendation = self.engine.generate_recommendation(
             cv_data=cv_data,
             job_data=job_data,
-            weights=weights
+            weights=weights,
+            shared_side=shared_side
         )
         
         # Extraer información clave
@@ -162,6 +466,80 @@ class RecommendationService:
         }
 
 
+class RankingService:
+    """Servicio para el ranking en dos etapas (recall determinista + comparadores con IA)"""
+    
+    def __init__(self, recommendation_service: RecommendationService, features: RecallFeatureService):
+        self.ranker = TwoStageRanker(recommendation_service.engine)
+        self.features = features
+    
+    def shortlist(
+        self,
+        job_data: Dict[str, Any],
+        k: int,
+        weights: Dict[str, float] = None
+    ) -> List[Dict[str, Any]]:
+        """Primera etapa sobre todos los CVs: [{"id", "score", "signals"}]"""
+        return self.ranker.shortlist(self.features.items(), job_data, k, weights or None)
+    
+    def rank(
+        self,
+        db: Session,
+        job_data: Dict[str, Any],
+        k: int = 20,
+        weights: Dict[str, float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranking completo: lista corta de k CVs y comparadores con IA solo sobre ella.
+        
+        Returns:
+            list: [{"id", "recall_score", "signals", "score", "recommendation", "processing_time"}]
+        """
+        weights = weights or None
+        shortlist = self.shortlist(job_data, k, weights)
+        cvs = CVRepository.get_by_ids(db, [entry["id"] for entry in shortlist])
+        ranked = []
+        for entry in shortlist:
+            cv = cvs.get(entry["id"])
+            if cv is None:
+                continue
+            start_time = time.time()
+            recommendation = self.ranker.engine.generate_recommendation(cv.cv_data, job_data, weights, shared_side="job")
+            ranked.append({
+                "id": entry["id"],
+                "recall_score": entry["score"],
+                "signals": entry["signals"],
+                "score": self.ranker.engine.get_final_score(recommendation),
+                "recommendation": recommendation,
+                "processing_time": time.time() - start_time
+            })
+        ranked.sort(key=lambda item: -item["score"])
+        return ranked
+    
+    def recall_report(
+        self,
+        db: Session,
+        job_id: int,
+        job_data: Dict[str, Any],
+        ks: List[int],
+        top_n: int = 10,
+        weights: Dict[str, float] = None
+    ) -> Dict[str, Any]:
+        """
+        Recall de la lista corta contra los análisis completos ya guardados del Job
+        (el último análisis de cada CV). Sirve para ajustar K sin volver a llamar a la IA.
+        """
+        full_scores = AnalysisRepository.get_latest_scores_by_job(db, job_id)
+        cvs = CVRepository.get_by_ids(db, list(full_scores.keys()))
+        full_scores = {cv_id: score for cv_id, score in full_scores.items() if cv_id in cvs}
+        report = self.ranker.evaluate_recall(
+            {cv_id: cv.cv_data for cv_id, cv in cvs.items()},
+            job_data, ks, top_n, weights or None, full_scores
+        )
+        del report["full_scores"]
+        return report
+
+
 class AnalysisService:
     """Servicio para gestión de análisis"""
     
@@ -193,6 +571,20 @@ class AnalysisService:
             processing_time=processing_time
         )
     
+    def create_analyses_bulk(self, db: Session, analyses: List[Dict[str, Any]]) -> List[int]:
+        """
+        Crea muchos análisis en una sola transacción.
+        Cada dict lleva las mismas llaves que create_analysis.
+        """
+        return AnalysisRepository.bulk_create(db, analyses)
+    
+    def replace_analyses_bulk(self, db: Session, analyses: List[Dict[str, Any]]) -> List[int]:
+        """
+        Guarda muchos análisis reemplazando los existentes de cada par (job_id, cv_id).
+        Cada dict lleva las mismas llaves que create_analysis.
+        """
+        return AnalysisRepository.bulk_replace(db, analyses)
+    
     def get_analysis_by_id(self, db: Session, analysis_id: int) -> Optional[Any]:
         """Obtiene un análisis por ID"""
         return AnalysisRepository.get_by_id(db, analysis_id)
@@ -205,6 +597,10 @@ class AnalysisService:
         """Obtiene todos los análisis de un CV"""
         return AnalysisRepository.get_by_cv(db, cv_id)
     
+    def get_latest_analyses(self, db: Session, cv_id: int, job_ids: List[int]) -> Dict[int, Any]:
+        """Último análisis guardado de un CV contra cada Job ({job_id: análisis})"""
+        return AnalysisRepository.get_latest_by_cv_and_jobs(db, cv_id, job_ids)
+    
     def get_analyses_by_job(self, db: Session, job_id: int) -> List[Any]:
         """Obtiene todos los análisis de un Job"""
         return AnalysisRepository.get_by_job(db, job_id)
@@ -217,6 +613,14 @@ class AnalysisService:
         """Obtiene estadísticas generales del sistema"""
         return AnalysisRepository.get_statistics(db)
     
+    def get_job_statistics(self, db: Session, job_id: int) -> Dict[str, Any]:
+        """Obtiene estadísticas de un Job"""
+        return AnalysisRepository.get_job_statistics(db, job_id)
+    
+    def ensure_statistics(self, db: Session) -> None:
+        """Inicializa los contadores de estadísticas (backfill único)"""
+        StatsRepository.ensure_initialized(db)
+    
     def delete_analysis(self, db: Session, analysis_id: int) -> bool:
         """Elimina un análisis"""
         return AnalysisRepository.delete(db, analysis_id)
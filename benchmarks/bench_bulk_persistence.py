@@ -0,0 +1,86 @@
+"""
+Benchmark de persistencia: create() fila por fila vs bulk_create() en una transacción.
+
+Usa una base SQLite temporal (o la indicada en BENCH_DATABASE_URL).
+
+Uso:
+    python benchmarks/bench_bulk_persistence.py [n_filas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{_tmp_dir}/bench.db")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.database import init_db, SessionLocal
+from api.repositories import CVRepository, AnalysisRepository
+from bench_compressed_json import fake_recommendation
+
+
+def fake_cv(i: int) -> dict:
+    return {
+        "personal": {"name": f"candidato {i}", "email": f"c{i}@mail.com", "phone": "", "location": "bogota"},
+        "technical_skills": ["python", "sql", "docker", "aws"][: 1 + i % 4],
+        "soft_skills": ["trabajo en equipo"],
+        "certifications": [],
+        "experience": [],
+        "education": [],
+        "languages": {}
+    }
+
+
+def fake_analysis(rng: random.Random, cv_id: int) -> dict:
+    recommendation = fake_recommendation(rng)
+    return {
+        "cv_id": cv_id,
+        "job_id": 1,
+        "nombre_candidato": f"candidato {cv_id}",
+        "titulo_trabajo": "desarrollador",
+        "score": recommendation["final_score_data"]["final_score"],
+        "score_breakdown": recommendation["final_score_data"]["score_breakdown"],
+        "resultado_completo": recommendation,
+        "processing_time": 1.0
+    }
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(7)
+    init_db()
+    db = SessionLocal()
+
+    cvs = [fake_cv(i) for i in range(n_rows)]
+    start = time.perf_counter()
+    for cv_data in cvs[: n_rows // 10]:
+        CVRepository.create(db, cv_data)
+    per_row = (time.perf_counter() - start) / (n_rows // 10)
+    print(f"CVRepository.create        {per_row * 1000:>8.2f} ms/fila  (≈{per_row * n_rows:.2f} s para {n_rows})")
+
+    start = time.perf_counter()
+    cv_ids = CVRepository.bulk_create(db, cvs)
+    elapsed = time.perf_counter() - start
+    print(f"CVRepository.bulk_create   {elapsed * 1000 / n_rows:>8.2f} ms/fila  ({elapsed:.3f} s para {n_rows})")
+
+    analyses = [fake_analysis(rng, cv_id) for cv_id in cv_ids]
+    start = time.perf_counter()
+    for analysis in analyses[: n_rows // 10]:
+        AnalysisRepository.create(db, **analysis)
+    per_row = (time.perf_counter() - start) / (n_rows // 10)
+    print(f"AnalysisRepository.create  {per_row * 1000:>8.2f} ms/fila  (≈{per_row * n_rows:.2f} s para {n_rows})")
+
+    start = time.perf_counter()
+    AnalysisRepository.bulk_create(db, analyses)
+    elapsed = time.perf_counter() - start
+    print(f"AnalysisRepository.bulk_create {elapsed * 1000 / n_rows:>4.2f} ms/fila  ({elapsed:.3f} s para {n_rows})")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark de la columna JSON comprimida (api/compression.py).
+
+Compara JSON plano, zlib sin diccionario, zlib con el diccionario semilla y
+zlib con un diccionario entrenado, midiendo:
+- Tamaño por fila
+- Costo de codificar/decodificar
+- Costo de insertar y leer filas en SQLite (en memoria)
+
+Uso:
+    python benchmarks/bench_compressed_json.py [n_filas]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, Column, Integer, JSON
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from api import compression
+from api.compression import CompressedJSON
+
+ASPECTS = ["experience", "technical_skills", "education", "responsibilities",
+           "certifications", "soft_skills", "languages", "location"]
+WEIGHTS = [0.30, 0.15, 0.15, 0.15, 0.10, 0.08, 0.04, 0.03]
+
+REASON_FRAGMENTS = [
+    "El candidato cuenta con experiencia en desarrollo de software",
+    "sin embargo no cumple con los años de experiencia requeridos",
+    "las habilidades del CV coinciden parcialmente con las requeridas",
+    "faltan conocimientos en seguridad de la información y auditorías ti",
+    "La educación del CV está relacionada con ingeniería de sistemas",
+    "El CV no menciona certificaciones relacionadas con las requeridas, como certificados aws",
+    "demuestra manejo de nodejs, express, typescript y postgresql",
+    "la ubicación del candidato coincide con la ciudad requerida",
+    "el nivel de inglés avanzado c1 supera el requerido",
+    "no se evidencia experiencia liderando equipos",
+]
+
+
+def fake_recommendation(rng: random.Random) -> dict:
+    """Genera un resultado_completo con la misma forma que RecommendationEngine"""
+    results = {}
+    breakdown = {}
+    for aspect, weight in zip(ASPECTS, WEIGHTS):
+        score = round(rng.random(), 2)
+        reason = ". ".join(rng.sample(REASON_FRAGMENTS, rng.randint(2, 5))) + "."
+        results[aspect] = {"score": score, "reason": reason}
+        breakdown[aspect] = {"score": score, "weight": weight,
+                             "contribution": round(score * weight, 4), "ignored": False}
+    final = sum(d["contribution"] for d in breakdown.values())
+    return {
+        "comparison_results": results,
+        "final_score_data": {
+            "final_score": round(final, 3),
+            "raw_score": round(final, 3),
+            "weights_used": dict(zip(ASPECTS, WEIGHTS)),
+            "score_breakdown": breakdown,
+            "total_weight": 1.0,
+            "used_weight": 1.0,
+            "ignored_aspects": [],
+            "summary": "Candidato con potencial. Destaca en Experiencia y Educación."
+        }
+    }
+
+
+def bench_codec(payloads, label, encode, decode):
+    start = time.perf_counter()
+    encoded = [encode(p) for p in payloads]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for e in encoded:
+        decode(e)
+    decode_time = time.perf_counter() - start
+    avg_size = sum(len(e) for e in encoded) / len(encoded)
+    n = len(payloads)
+    print(f"{label:<28} {avg_size:>10.0f} B {encode_time / n * 1e6:>10.1f} µs {decode_time / n * 1e6:>10.1f} µs")
+    return avg_size
+
+
+def bench_database(payloads, label, column_type):
+    Base = declarative_base()
+
+    class Row(Base):
+        __tablename__ = "rows"
+        id = Column(Integer, primary_key=True)
+        score_breakdown = Column(column_type)
+        resultado_completo = Column(column_type)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    start = time.perf_counter()
+    db.add_all([Row(score_breakdown=p["final_score_data"]["score_breakdown"], resultado_completo=p)
+                for p in payloads])
+    db.commit()
+    insert_time = time.perf_counter() - start
+    db.close()
+
+    db = Session()
+    start = time.perf_counter()
+    rows = db.query(Row).all()
+    _ = [row.resultado_completo["final_score_data"]["final_score"] for row in rows]
+    read_time = time.perf_counter() - start
+    db.close()
+
+    n = len(payloads)
+    print(f"{label:<28} insert {insert_time / n * 1e6:>8.1f} µs/fila   read {read_time / n * 1e6:>8.1f} µs/fila")
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(42)
+    payloads = [fake_recommendation(rng) for _ in range(n_rows)]
+    train, test = payloads[: n_rows // 2], payloads[n_rows // 2:]
+
+    trained = compression.train_dictionary(train)
+    trained_version = 255
+    compression.SHARED_DICTIONARIES[trained_version] = trained
+
+    print(f"=== CODEC ({len(test)} filas de prueba, diccionario entrenado con {len(train)}) ===")
+    print(f"{'Formato':<28} {'tamaño':>12} {'encode':>13} {'decode':>13}")
+    raw = bench_codec(test, "JSON plano",
+                      lambda p: json.dumps(p, ensure_ascii=False).encode("utf-8"),
+                      lambda b: json.loads(b))
+    for label, version in (("zlib", 0), ("zlib + diccionario semilla", 1),
+                           ("zlib + diccionario entrenado", trained_version)):
+        size = bench_codec(test, label,
+                           lambda p, v=version: compression.compress_json(p, v),
+                           compression.decompress_json)
+        print(f"{'':<28} ratio {raw / size:.1f}x")
+
+    print(f"\n=== BASE DE DATOS (SQLite en memoria, {n_rows} filas) ===")
+    bench_database(payloads, "JSON", JSON)
+    bench_database(payloads, "CompressedJSON", CompressedJSON)
+
+
+if __name__ == "__main__":
+    main()
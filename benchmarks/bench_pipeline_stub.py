@@ -0,0 +1,127 @@
+"""
+Benchmark y prueba de carga del pipeline completo sin red: PDF -> estructura -> análisis -> BD,
+con el proveedor de IA stub (src/cliente_llm/providers.py). Mide el throughput del propio
+código (limpieza, extracción, comparadores, límite de tasa, circuit breaker, persistencia)
+con una latencia y tasa de errores de la IA simuladas.
+
+Usa los PDFs de src/images (en ciclo) y una base SQLite temporal (o BENCH_DATABASE_URL).
+
+Uso:
+    python benchmarks/bench_pipeline_stub.py [--cvs 50] [--workers 8] [--latency lognormal:0.8:0.5] [--error-rate 0.02]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_JOB = "src/descripciones/descripciones_ejemplos/Sezzle Junior Software Engineer (Colombia).txt"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pipeline completo con el proveedor de IA stub")
+    parser.add_argument("--cvs", type=int, default=50, help="CVs a procesar (los PDFs de src/images en ciclo)")
+    parser.add_argument("--workers", type=int, default=8, help="Hilos por etapa")
+    parser.add_argument("--latency", default="lognormal:0.8:0.5", help="Latencia de la IA (ver LLM_STUB_LATENCY)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de llamadas a la IA que fallan")
+    parser.add_argument("--error-status", default="503,429", help="Códigos HTTP de los errores simulados")
+    parser.add_argument("--rpm", type=int, default=1000000, help="Cuota de peticiones por minuto del deployment")
+    parser.add_argument("--tpm", type=int, default=100000000, help="Cuota de tokens por minuto del deployment")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--job", default=DEFAULT_JOB, help="Descripción de trabajo (texto)")
+    return parser.parse_args()
+
+
+def configure(args) -> None:
+    """El proveedor, el límite de tasa y la BD se leen del entorno al importar los módulos"""
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ["LLM_STUB_LATENCY"] = args.latency
+    os.environ["LLM_STUB_ERROR_RATE"] = str(args.error_rate)
+    os.environ["LLM_STUB_ERROR_STATUS"] = args.error_status
+    os.environ["LLM_STUB_SEED"] = str(args.seed)
+    os.environ["LLM_RPM"] = str(args.rpm)
+    os.environ["LLM_TPM"] = str(args.tpm)
+    os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+
+def timed(fn, *fn_args):
+    start = time.perf_counter()
+    result = fn(*fn_args)
+    return result, time.perf_counter() - start
+
+
+def run_stage(name, fn, items, workers):
+    """Ejecuta fn sobre items en paralelo e imprime throughput y latencias"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda item: timed(fn, item), items))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(seconds for _, seconds in results)
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    print(f"{name:<18}{len(items):>6}{elapsed:>10.2f}{len(items) / elapsed:>10.2f}{median(latencies):>10.3f}{p95:>10.3f}")
+    return [result for result, _ in results]
+
+
+def main():
+    args = parse_args()
+    configure(args)
+    sys.path.append(ROOT)
+
+    from api.database import init_db, SessionLocal
+    from api.services import CVService, JobService, RecommendationService, AnalysisService, LLMStatsService
+
+    init_db()
+    db = SessionLocal()
+    cv_service, job_service = CVService(), JobService()
+    recommendation_service, analysis_service = RecommendationService(), AnalysisService()
+
+    pdfs = sorted(os.path.join(ROOT, "src/images", name) for name in os.listdir(os.path.join(ROOT, "src/images")) if name.endswith(".pdf"))
+    with open(os.path.join(ROOT, args.job), encoding="utf-8") as f:
+        description = f.read()
+
+    print(f"IA simulada: latencia {args.latency}, errores {args.error_rate:.0%} ({args.error_status}), {args.workers} hilos\n")
+    print(f"{'etapa':<18}{'items':>6}{'total (s)':>10}{'items/s':>10}{'p50 (s)':>10}{'p95 (s)':>10}")
+
+    job_data, seconds = timed(job_service.process_job_from_text, description)
+    job = job_service.create_job(db, job_data)
+    print(f"{'job':<18}{1:>6}{seconds:>10.2f}")
+
+    cvs = run_stage("estructurar", cv_service.process_cv_from_file, [pdfs[i % len(pdfs)] for i in range(args.cvs)], args.workers)
+    (cv_ids, seconds) = timed(cv_service.create_cvs_bulk, db, cvs)
+    print(f"{'guardar CVs':<18}{len(cv_ids):>6}{seconds:>10.2f}{len(cv_ids) / seconds:>10.1f}")
+
+    results = run_stage("analizar", lambda cv_data: recommendation_service.analyze(cv_data, job.job_data, shared_side="job"), cvs, args.workers)
+    analyses = [{
+        "cv_id": cv_id,
+        "job_id": job.id,
+        "nombre_candidato": cv_data.get("personal", {}).get("name", "Unknown"),
+        "titulo_trabajo": job.titulo,
+        "score": result["score"],
+        "score_breakdown": result["score_breakdown"],
+        "resultado_completo": result["resultado_completo"],
+        "processing_time": 0.0
+    } for cv_id, cv_data, result in zip(cv_ids, cvs, results)]
+    (analysis_ids, seconds) = timed(analysis_service.create_analyses_bulk, db, analyses)
+    print(f"{'guardar análisis':<18}{len(analysis_ids):>6}{seconds:>10.2f}{len(analysis_ids) / seconds:>10.1f}")
+
+    stats = LLMStatsService().get_statistics()
+    calls = sum(site["calls"] for site in stats["structured_output"].values())
+    failures = sum(site["failures"] for site in stats["structured_output"].values())
+    coalesced = sum(site["coalesced"] for site in stats["single_flight"].values())
+    degraded = sum(1 for result in results if result["resultado_completo"].get("degradation", {}).get("degraded"))
+    print(f"\nLlamadas a la IA: {calls} (fallidas tras el reintento: {failures}, coalescidas: {coalesced})")
+    for deployment, limits in stats["rate_limits"].items():
+        print(f"Límite de tasa {deployment}: {limits['throttled']} respuestas 429, {limits['retries']} reintentos, {limits['wait_seconds']} s de espera")
+    for deployment, breaker in stats["circuit_breakers"].items():
+        print(f"Circuit breaker {deployment}: {breaker['state']}, {breaker['trips']} aperturas, {breaker['rejected']} rechazadas")
+    print(f"Análisis degradados: {degraded}/{len(results)}")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
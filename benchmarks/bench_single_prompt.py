@@ -0,0 +1,104 @@
+"""
+Compara los dos modos de ComparatorMain sobre los CVs y Jobs de ejemplo del proyecto:
+- per_aspect: un prompt por aspecto (8 comparadores)
+- single_prompt: un solo prompt con los 8 aspectos y fallback individual por aspecto
+
+Reporta latencia, tokens y llamadas a la IA de cada modo, y el acuerdo de scores
+(diferencia absoluta por aspecto y del score final). Usa Azure OpenAI, igual que /analyze.
+
+Uso:
+    python benchmarks/bench_single_prompt.py [--repeat 1]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from statistics import mean
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "algoritmo_recomendacion"))
+
+from langchain.callbacks import get_openai_callback
+
+from comparator_main import ComparatorMain
+
+CV_FILES = ["exampleReal", "exampleReal2", "exampleReal3", "exampleReal4"]
+JOB_FILES = ["CA_Ejemplo1", "CA_Ejemplo2"]
+
+
+def load_examples():
+    cvs = []
+    for name in CV_FILES:
+        with open(os.path.join(ROOT, "src/estructuracion_CV/CvEjemplos", name + ".json"), encoding="utf-8") as f:
+            cvs.append((name, json.load(f)))
+    jobs = []
+    for name in JOB_FILES:
+        with open(os.path.join(ROOT, "src/estructuracion_Descripcion/DescripcionesEjemplos", name + ".json"), encoding="utf-8") as f:
+            jobs.append((name, json.load(f)))
+    return cvs, jobs
+
+
+def run_mode(comparator, cv_data, job_data):
+    """(resultados, info, segundos, tokens, llamadas) de un par CV/Job"""
+    with get_openai_callback() as cb:
+        start = time.perf_counter()
+        if comparator.mode == "single_prompt":
+            results, info = comparator.run_single_prompt_comparisons(cv_data, job_data)
+        else:
+            results, info = comparator.run_all_comparisons(cv_data, job_data), {"fallback_aspects": []}
+        elapsed = time.perf_counter() - start
+    return results, info, elapsed, cb.total_tokens, cb.successful_requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Un prompt por aspecto vs un solo prompt")
+    parser.add_argument("--repeat", type=int, default=1, help="Veces que se evalúa cada par CV/Job")
+    args = parser.parse_args()
+
+    cvs, jobs = load_examples()
+    per_aspect = ComparatorMain(mode="per_aspect")
+    single_prompt = ComparatorMain(mode="single_prompt")
+
+    stats = {"per_aspect": {"time": [], "tokens": [], "calls": []},
+             "single_prompt": {"time": [], "tokens": [], "calls": []}}
+    aspect_diffs = {}
+    final_diffs = []
+    fallbacks = {}
+
+    for _ in range(args.repeat):
+        for cv_name, cv_data in cvs:
+            for job_name, job_data in jobs:
+                scores = {}
+                for name, comparator in (("per_aspect", per_aspect), ("single_prompt", single_prompt)):
+                    results, info, elapsed, tokens, calls = run_mode(comparator, cv_data, job_data)
+                    stats[name]["time"].append(elapsed)
+                    stats[name]["tokens"].append(tokens)
+                    stats[name]["calls"].append(calls)
+                    scores[name] = (results, comparator.calculate_final_score(results)["final_score"])
+                    for aspect in info["fallback_aspects"]:
+                        fallbacks[aspect] = fallbacks.get(aspect, 0) + 1
+
+                base, base_final = scores["per_aspect"]
+                single, single_final = scores["single_prompt"]
+                for aspect, result in base.items():
+                    aspect_diffs.setdefault(aspect, []).append(
+                        abs(result.get("score", 0.0) - single[aspect].get("score", 0.0)))
+                final_diffs.append(abs(base_final - single_final))
+                print(f"{cv_name} vs {job_name}: final {base_final:.3f} (por aspecto) / {single_final:.3f} (un prompt)")
+
+    pairs = len(final_diffs)
+    print(f"\nPares evaluados: {pairs}")
+    print(f"{'modo':<15}{'latencia (s)':>14}{'tokens':>10}{'llamadas':>10}")
+    for name, values in stats.items():
+        print(f"{name:<15}{mean(values['time']):>14.2f}{mean(values['tokens']):>10.0f}{mean(values['calls']):>10.1f}")
+
+    print("\nDiferencia absoluta de score por aspecto (media / máx):")
+    for aspect, diffs in aspect_diffs.items():
+        print(f"  {aspect:<18}{mean(diffs):.3f} / {max(diffs):.3f}   fallback individual: {fallbacks.get(aspect, 0)}/{pairs}")
+    print(f"\nScore final: diferencia media {mean(final_diffs):.3f}, máxima {max(final_diffs):.3f}")
+
+
+if __name__ == "__main__":
+    main()
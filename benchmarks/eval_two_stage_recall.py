@@ -0,0 +1,84 @@
+"""
+Evalúa el recall de la primera etapa del ranking (señales deterministas)
+contra el ranking completo con IA, para ajustar el tamaño K de la lista corta.
+
+Ejecuta los comparadores con IA sobre una muestra de CVs de la base de datos
+(usa Azure OpenAI, igual que /analyze) y opcionalmente guarda esos análisis
+para que GET /jobs/{job_id}/ranking/recall los reutilice.
+
+Uso:
+    python benchmarks/eval_two_stage_recall.py <job_id> [--sample 100] [--top-n 10] [--ks 5 10 20 50] [--save]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.database import init_db, SessionLocal
+from api.repositories import CVRepository, JobRepository, AnalysisRepository
+from main.two_stage_ranker import TwoStageRanker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@K de la primera etapa del ranking")
+    parser.add_argument("job_id", type=int)
+    parser.add_argument("--sample", type=int, default=100, help="CVs a analizar con IA")
+    parser.add_argument("--top-n", type=int, default=10, help="Mejores CVs del ranking completo que deben quedar")
+    parser.add_argument("--ks", type=int, nargs="+", default=[5, 10, 20, 50])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", action="store_true", help="Guarda los análisis completos en la base de datos")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    job = JobRepository.get_by_id(db, args.job_id)
+    if not job:
+        print(f"Job {args.job_id} no encontrado")
+        return
+
+    cv_data_by_id = dict(CVRepository.iter_data(db))
+    if len(cv_data_by_id) > args.sample:
+        sample_ids = random.Random(args.seed).sample(sorted(cv_data_by_id), args.sample)
+        cv_data_by_id = {cv_id: cv_data_by_id[cv_id] for cv_id in sample_ids}
+
+    ranker = TwoStageRanker()
+    full_scores = {}
+    start = time.perf_counter()
+    for cv_id, cv_data in cv_data_by_id.items():
+        analysis_start = time.perf_counter()
+        recommendation = ranker.engine.generate_recommendation(cv_data, job.job_data, shared_side="job")
+        full_scores[cv_id] = ranker.engine.get_final_score(recommendation)
+        if args.save:
+            AnalysisRepository.create(
+                db=db,
+                cv_id=cv_id,
+                job_id=job.id,
+                nombre_candidato=(cv_data.get("personal") or {}).get("name", ""),
+                titulo_trabajo=job.titulo,
+                score=full_scores[cv_id],
+                score_breakdown=ranker.engine.get_score_breakdown(recommendation),
+                resultado_completo=recommendation,
+                processing_time=time.perf_counter() - analysis_start
+            )
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = ranker.evaluate_recall(cv_data_by_id, job.job_data, args.ks, args.top_n, full_scores=full_scores)
+    recall_time = time.perf_counter() - start
+
+    print(f"Job {job.id}: {job.titulo}")
+    print(f"CVs evaluados: {report['n_cvs']}  |  top-{report['top_n']} del ranking completo")
+    print(f"Ranking completo con IA: {full_time:.1f} s  |  primera etapa: {recall_time * 1000:.1f} ms")
+    print(f"\n{'K':>6} {'recall@K':>10} {'llamadas IA ahorradas':>24}")
+    for k, recall in report["recall"].items():
+        saved = max(0, report["n_cvs"] - k) / report["n_cvs"] if report["n_cvs"] else 0.0
+        print(f"{k:>6} {recall:>10.2f} {saved:>23.0%}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,12 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 from estructuracion_CV.cv_simple_extractor import SimpleCVExtractor
 from estructuracion_Descripcion.job_description_extractor import JobDescriptionExtractor
 
+# Agregar algoritmo_recomendacion al path para el canonicalizador de habilidades
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'algoritmo_recomendacion'))
+from engines.skill_canonicalizer import with_canonical_skills
+from engines.experience_parser import with_experience_summary
+from engines.prompt_profile import with_prompt_profile
+
 
 class DataStructurer:
     """
@@ -37,7 +43,9 @@ class DataStructurer:
         try:
             # Usar el extractor existente para estructurar el CV
             cv_structured = self.cv_extractor.extract_cv_from_text(cv_text)
-            return cv_structured
+            
+            # Ids canónicos de las habilidades y años de experiencia, calculados una sola vez y guardados con el CV
+            return with_prompt_profile(with_experience_summary(with_canonical_skills(cv_structured)))
             
         except Exception as e:
             print(f"Error al estructurar CV: {e}")
@@ -56,7 +64,9 @@ class DataStructurer:
         try:
             # Usar el extractor existente para estructurar la descripción
             job_structured = self.job_extractor.extract_full_job_description(description_text)
-            return job_structured
+            
+            # Ids canónicos de las habilidades, calculados una sola vez y guardados con el Job
+            return with_canonical_skills(job_structured)
             
         except Exception as e:
             print(f"Error al estructurar descripción: {e}")
@@ -9,6 +9,9 @@ import os
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'algoritmo_recomendacion'))
 
 from comparator_main import ComparatorMain
+from engines.token_budget import track_token_usage
+from engines.prompt_layout import current_shared_side, shared_prompt_side
+from cliente_llm.circuit_breaker import track_degradation
 
 
 class RecommendationEngine:
@@ -22,7 +25,7 @@ class RecommendationEngine:
         """
         self.comparator = ComparatorMain()
     
-    def generate_recommendation(self, cv_data: dict, job_data: dict, weights: dict = None) -> dict:
+    def generate_recommendation(self, cv_data: dict, job_data: dict, weights: dict = None, shared_side: str = None) -> dict:
         """
         Genera la recomendación usando ComparatorMain.
         
@@ -30,13 +33,18 @@ class RecommendationEngine:
             cv_data (dict): Datos del CV estructurado
             job_data (dict): Datos de la descripción de trabajo estructurada
             weights (dict): Pesos para el cálculo del score final
+            shared_side (str): Lado que se repite en el lote ("job": un Job contra muchos CVs,
+                "cv": un CV contra muchos Jobs); va primero en los prompts. None usa PROMPT_SHARED_SIDE
             
         Returns:
             dict: Resultados de las comparaciones con score final
         """
         try:
-            # Usar ComparatorMain para ejecutar todas las comparaciones
-            results = self.comparator.run_all_comparisons(cv_data, job_data)
+            # Usar ComparatorMain para ejecutar todas las comparaciones (registrando los tokens
+            # y las llamadas rechazadas por un circuito abierto)
+            with shared_prompt_side(shared_side), track_token_usage() as token_usage, track_degradation() as degradation:
+                results = self.comparator.run_all_comparisons(cv_data, job_data)
+                prompt_layout = current_shared_side()
             
             # Calcular score final
             final_score_data = self.comparator.calculate_final_score(results, weights)
@@ -44,7 +52,9 @@ class RecommendationEngine:
             # Combinar resultados con score final
             recommendation = {
                 'comparison_results': results,
-                'final_score_data': final_score_data
+                'final_score_data': final_score_data,
+                'token_usage': {**token_usage.as_dict(), 'shared_prompt_side': prompt_layout},
+                'degradation': degradation.as_dict()
             }
             
             return recommendation
@@ -0,0 +1,153 @@
+"""
+Ranking en dos etapas de CVs para un Job.
+1. Recall: puntúa todos los CVs con señales deterministas (engines/recall_signals.py).
+2. Rerank: ejecuta los comparadores con IA solo sobre los K mejores.
+"""
+
+import sys
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Agregar el directorio padre y algoritmo_recomendacion al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'algoritmo_recomendacion'))
+
+from engines.recall_signals import RecallScorer, CVFeatures, cv_features
+from main.recommendation_engine import RecommendationEngine
+
+
+def recall_at_k(shortlist_ids: Sequence[int], reference_ids: Sequence[int]) -> float:
+    """
+    Fracción de los CVs de referencia (p.ej. top-N del ranking completo con IA)
+    que quedaron dentro de la lista corta.
+
+    Args:
+        shortlist_ids (list): IDs de la lista corta de la primera etapa
+        reference_ids (list): IDs que debieron quedar en la lista corta
+
+    Returns:
+        float: Recall (0.0 - 1.0); 1.0 si no hay referencia
+    """
+    if not reference_ids:
+        return 1.0
+    shortlist = set(shortlist_ids)
+    return round(sum(1 for cv_id in reference_ids if cv_id in shortlist) / len(reference_ids), 4)
+
+
+class TwoStageRanker:
+    """
+    Rankea CVs para un Job sin ejecutar los comparadores con IA sobre todos.
+    """
+
+    def __init__(self, engine: Optional[RecommendationEngine] = None):
+        """
+        Args:
+            engine (RecommendationEngine): Motor de la segunda etapa (se crea uno si no se pasa)
+        """
+        self.engine = engine or RecommendationEngine()
+
+    @staticmethod
+    def _as_features(items: Iterable[Tuple[int, Any]]) -> List[Tuple[int, CVFeatures]]:
+        """Acepta (id, CVFeatures) precalculadas o (id, cv_data)"""
+        return [
+            (cv_id, data if isinstance(data, CVFeatures) else cv_features(data))
+            for cv_id, data in items
+        ]
+
+    def shortlist(
+        self,
+        items: Iterable[Tuple[int, Any]],
+        job_data: Dict[str, Any],
+        k: int,
+        weights: Dict[str, float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Primera etapa: los k CVs con mejor score determinista.
+
+        Args:
+            items: Iterable de (cv_id, CVFeatures) o (cv_id, cv_data)
+            job_data (dict): Job estructurado
+            k (int): Tamaño de la lista corta
+            weights (dict): Pesos por aspecto (los mismos del análisis; se usan los que tienen señal)
+
+        Returns:
+            list: [{"id", "score", "signals"}] de mayor a menor score
+        """
+        return RecallScorer(job_data, weights).rank(self._as_features(items), k)
+
+    def rank(
+        self,
+        items: Iterable[Tuple[int, Any]],
+        job_data: Dict[str, Any],
+        cv_data_by_id: Dict[int, Dict[str, Any]],
+        k: int = 20,
+        weights: Dict[str, float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranking completo en dos etapas.
+
+        Args:
+            items: Iterable de (cv_id, CVFeatures) o (cv_id, cv_data) de todos los CVs
+            job_data (dict): Job estructurado
+            cv_data_by_id (dict): cv_data de (al menos) los CVs de la lista corta
+            k (int): Tamaño de la lista corta que pasa a los comparadores con IA
+            weights (dict): Pesos para el cálculo del score final
+
+        Returns:
+            list: [{"id", "recall_score", "signals", "score", "recommendation"}] ordenada por score final
+        """
+        ranked = []
+        for entry in self.shortlist(items, job_data, k, weights):
+            recommendation = self.engine.generate_recommendation(
+                cv_data_by_id[entry["id"]], job_data, weights, shared_side="job")
+            ranked.append({
+                "id": entry["id"],
+                "recall_score": entry["score"],
+                "signals": entry["signals"],
+                "score": self.engine.get_final_score(recommendation),
+                "recommendation": recommendation
+            })
+        ranked.sort(key=lambda item: -item["score"])
+        return ranked
+
+    def evaluate_recall(
+        self,
+        cv_data_by_id: Dict[int, Dict[str, Any]],
+        job_data: Dict[str, Any],
+        ks: Sequence[int] = (5, 10, 20, 50),
+        top_n: int = 10,
+        weights: Dict[str, float] = None,
+        full_scores: Optional[Dict[int, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Compara la lista corta contra el ranking completo con IA para ajustar K.
+
+        Args:
+            cv_data_by_id (dict): {cv_id: cv_data} de la muestra a evaluar
+            job_data (dict): Job estructurado
+            ks (list): Tamaños de lista corta a evaluar
+            top_n (int): Cuántos de los mejores del ranking completo deben quedar en la lista corta
+            weights (dict): Pesos para el cálculo del score final
+            full_scores (dict): {cv_id: score} del ranking completo si ya se calculó
+                                (p.ej. análisis guardados); si es None se ejecuta la IA sobre todos
+
+        Returns:
+            dict: {"n_cvs", "top_n", "recall": {k: recall@k}, "full_scores"}
+        """
+        if full_scores is None:
+            full_scores = {
+                cv_id: self.engine.get_final_score(
+                    self.engine.generate_recommendation(cv_data, job_data, weights, shared_side="job"))
+                for cv_id, cv_data in cv_data_by_id.items()
+            }
+        reference = sorted(full_scores, key=lambda cv_id: (-full_scores[cv_id], cv_id))[:top_n]
+
+        features = self._as_features(cv_data_by_id.items())
+        ranking = [entry["id"] for entry in self.shortlist(features, job_data, max(ks), weights)]
+
+        return {
+            "n_cvs": len(cv_data_by_id),
+            "top_n": len(reference),
+            "recall": {k: recall_at_k(ranking[:k], reference) for k in ks},
+            "full_scores": full_scores
+        }
@@ -0,0 +1 @@
+# Cliente de IA compartido por los comparadores y los extractores
@@ -0,0 +1,276 @@
+"""
+Modo de lote para los backfills grandes: en vez de llamar a la IA, cada prompt se escribe como
+una línea de un archivo de peticiones (formato JSONL de la API de Batch de Azure OpenAI) y su
+respuesta se toma después del archivo de respuestas ingerido.
+- Dentro de batch_item() generate_structured busca la respuesta por la llave del prompt (la misma
+  del single-flight). Si aún no está, registra la petición y lanza BatchPendingError.
+- BatchPendingError es un CircuitOpenError: los comparadores usan su fallback y la pasada sigue,
+  así una sola pasada recoge todos los prompts independientes. Los que dependen de otra respuesta
+  (p. ej. los fallbacks del modo single_prompt) salen en la ronda siguiente.
+- Junto a cada archivo de peticiones se guarda el esquema de cada prompt (<archivo>.schemas.json):
+  al ingerir, una respuesta que no lo cumple cuenta como error y el prompt sale de nuevo.
+- run_local_batch es un procesador local que produce el archivo de respuestas a partir del
+  esquema de cada petición, como el proveedor stub (pruebas y ensayos sin red).
+"""
+
+import glob
+import json
+import os
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from cliente_llm.circuit_breaker import CircuitOpenError
+from cliente_llm.providers import sample_content
+from cliente_llm.rate_limiter import deployment_of
+
+# Peticiones por archivo (la API de Batch admite hasta 100.000 por archivo)
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "50000"))
+
+_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+class BatchPendingError(CircuitOpenError):
+    """La respuesta del prompt aún no está en el lote: la petición quedó registrada"""
+
+
+def _role(message: Any) -> str:
+    """Rol de la API para un mensaje de LangChain"""
+    message_type = getattr(message, "type", None) or type(message).__name__.lower().replace("message", "")
+    return _ROLES.get(message_type, "user")
+
+
+def render_request(custom_id: str, llm: Any, messages: List[Any], response_format: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Línea del archivo de peticiones para un prompt.
+
+    Args:
+        custom_id (str): Llave del prompt
+        llm: Modelo de chat de LangChain (deployment, temperature, max_tokens)
+        messages (list): Mensajes de LangChain
+        response_format (dict): response_format de la petición (o None)
+
+    Returns:
+        dict: {"custom_id", "method", "url", "body"}
+    """
+    body = {
+        "model": deployment_of(llm),
+        "messages": [{"role": _role(m), "content": getattr(m, "content", "")} for m in messages],
+    }
+    for param in ("temperature", "max_tokens"):
+        value = getattr(llm, param, None)
+        if value is not None:
+            body[param] = value
+    if response_format:
+        body["response_format"] = response_format
+    return {"custom_id": custom_id, "method": "POST", "url": "/chat/completions", "body": body}
+
+
+class BatchResponse:
+    """Respuesta ingerida de un prompt"""
+
+    def __init__(self, content: str, usage: Optional[Dict[str, Any]] = None):
+        self.content = content
+        self.usage = usage or {}
+
+    def as_result(self) -> Any:
+        """Objeto con la forma de un LLMResult (para registrar los tokens del análisis)"""
+        generation = SimpleNamespace(text=self.content, message=None)
+        return SimpleNamespace(generations=[[generation]], llm_output={"token_usage": self.usage})
+
+
+class BatchStore:
+    """Respuestas ingeridas y peticiones pendientes de un backfill"""
+
+    def __init__(self, responses: Optional[Dict[str, BatchResponse]] = None):
+        self._lock = threading.Lock()
+        self.responses: Dict[str, BatchResponse] = dict(responses or {})
+        self.requests: Dict[str, Dict[str, Any]] = {}
+        # Llave -> {"call_site", "schema", "wrapped"} para validar las respuestas al ingerirlas
+        self.schemas: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "BatchStore":
+        """Carga las respuestas ya ingeridas (responses.jsonl del backfill)"""
+        responses = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        responses[entry["custom_id"]] = BatchResponse(entry["content"], entry.get("usage"))
+        return cls(responses)
+
+    def response(self, key: str) -> Optional[BatchResponse]:
+        return self.responses.get(key)
+
+    def add_request(self, key: str, request: Dict[str, Any], schema: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self.requests.setdefault(key, request)
+            if schema is not None:
+                self.schemas.setdefault(key, schema)
+
+    def load_schemas(self, path_pattern: str) -> None:
+        """Carga los esquemas guardados junto a los archivos de peticiones (p. ej. "backfill/batch_input_*.schemas.json")"""
+        for path in sorted(glob.glob(path_pattern)):
+            with open(path, encoding="utf-8") as f:
+                self.schemas.update(json.load(f))
+
+    def write_requests(self, path_prefix: str, max_requests: int = BATCH_MAX_REQUESTS) -> List[str]:
+        """
+        Escribe las peticiones pendientes en uno o más archivos JSONL.
+
+        Args:
+            path_prefix (str): Ruta sin extensión (p. ej. "backfill/batch_input_001")
+            max_requests (int): Peticiones por archivo
+
+        Returns:
+            list: Rutas escritas (vacía si no hay peticiones)
+        """
+        requests = list(self.requests.values())
+        paths = []
+        for part, start in enumerate(range(0, len(requests), max_requests)):
+            path = f"{path_prefix}.jsonl" if len(requests) <= max_requests else f"{path_prefix}_{part + 1}.jsonl"
+            with open(path, "w", encoding="utf-8") as f:
+                for request in requests[start:start + max_requests]:
+                    f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            paths.append(path)
+        if not requests:
+            return paths
+        with open(f"{path_prefix}.schemas.json", "w", encoding="utf-8") as f:
+            json.dump({key: self.schemas[key] for key in self.requests if key in self.schemas}, f, ensure_ascii=False)
+        return paths
+
+    def _content_error(self, key: str, content: str) -> Optional[str]:
+        """Error de esquema de una respuesta (None si lo cumple o no se conoce su esquema)"""
+        expected = self.schemas.get(key)
+        if expected is None:
+            return None
+        # Import diferido: structured_output importa este módulo
+        from cliente_llm.structured_output import parse_response
+        _, error = parse_response(expected["call_site"], content, expected["schema"], expected.get("wrapped", False))
+        return error
+
+    def ingest(self, output_path: str, store_path: str) -> Tuple[int, int]:
+        """
+        Agrega las respuestas de un archivo de salida de la API de Batch a responses.jsonl.
+        Las respuestas con error o que no cumplen el esquema de su petición no se guardan:
+        el prompt sale de nuevo en la siguiente ronda.
+
+        Args:
+            output_path (str): Archivo de respuestas (JSONL de la API de Batch)
+            store_path (str): responses.jsonl del backfill
+
+        Returns:
+            tuple: (respuestas nuevas guardadas, respuestas con error)
+        """
+        stored, errors = 0, 0
+        with open(output_path, encoding="utf-8") as source, open(store_path, "a", encoding="utf-8") as store:
+            for line in source:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if entry.get("error") or response.get("status_code") != 200:
+                    errors += 1
+                    continue
+                key = entry["custom_id"]
+                if key in self.responses:
+                    continue
+                body = response.get("body") or {}
+                content = body["choices"][0]["message"]["content"]
+                error = self._content_error(key, content)
+                if error is not None:
+                    print(f"Respuesta inválida para {key}: {error}")
+                    errors += 1
+                    continue
+                self.responses[key] = BatchResponse(content, body.get("usage"))
+                store.write(json.dumps({"custom_id": key, "content": content, "usage": body.get("usage")}, ensure_ascii=False) + "\n")
+                stored += 1
+            store.flush()
+            os.fsync(store.fileno())
+        return stored, errors
+
+
+class BatchItem:
+    """Prompts sin respuesta de una unidad del backfill (un análisis, un CV)"""
+
+    def __init__(self, store: BatchStore):
+        self.store = store
+        self._lock = threading.Lock()
+        self.pending = set()
+
+    def add_pending(self, key: str, request: Dict[str, Any], schema: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self.pending.add(key)
+        self.store.add_request(key, request, schema)
+
+
+_current_item: ContextVar[Optional[BatchItem]] = ContextVar("llm_batch_item", default=None)
+
+
+@contextmanager
+def batch_item(store: BatchStore):
+    """
+    Dentro del bloque las llamadas a la IA se resuelven contra el lote
+    (también en los hilos que copian el contexto).
+
+    Yields:
+        BatchItem: Prompts sin respuesta del bloque (si queda alguno, el resultado está incompleto)
+    """
+    item = BatchItem(store)
+    token = _current_item.set(item)
+    try:
+        yield item
+    finally:
+        _current_item.reset(token)
+
+
+def current_batch() -> Optional[BatchItem]:
+    """Unidad del backfill en curso (None fuera de batch_item)"""
+    return _current_item.get()
+
+
+def run_local_batch(input_path: str, output_path: str, seed: int = 0) -> int:
+    """
+    Procesador local: lee un archivo de peticiones y escribe el archivo de respuestas con el
+    formato de la API de Batch, sin red. Cada respuesta depende solo de la semilla y del custom_id.
+
+    Args:
+        input_path (str): Archivo de peticiones
+        output_path (str): Archivo de respuestas a escribir
+        seed (int): Semilla
+
+    Returns:
+        int: Respuestas escritas
+    """
+    count = 0
+    with open(input_path, encoding="utf-8") as source, open(output_path, "w", encoding="utf-8") as output:
+        for line in source:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            body = request["body"]
+            rng = random.Random(f"{seed}:{request['custom_id']}")
+            content = sample_content(body.get("response_format"), rng)
+            prompt_tokens = sum(len(m.get("content") or "") for m in body["messages"]) // 4
+            completion_tokens = len(content) // 4
+            count += 1
+            output.write(json.dumps({
+                "id": f"batch_req_{count}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "object": "chat.completion",
+                        "model": body.get("model"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+                    },
+                },
+                "error": None,
+            }, ensure_ascii=False) + "\n")
+    return count
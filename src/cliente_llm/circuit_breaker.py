@@ -0,0 +1,200 @@
+"""
+Circuit breaker por deployment para las llamadas a la IA.
+Sobre las últimas LLM_BREAKER_WINDOW llamadas:
+- closed: las llamadas pasan; se abre si la tasa de errores (timeouts, conexión, 5xx) o el
+  percentil 95 de la latencia superan su umbral.
+- open: las llamadas se rechazan al instante con CircuitOpenError y los comparadores usan su
+  fallback local; el análisis queda marcado como degradado (también si una llamada falla).
+- half_open: pasado LLM_BREAKER_COOLDOWN deja pasar una sola llamada de prueba; si responde
+  bien vuelve a closed, si falla vuelve a open.
+Los 429 y los errores del cliente (4xx) no cuentan: los maneja el límite de tasa.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+# Segundos; percentil 95 de la latencia de las llamadas exitosas
+LLM_BREAKER_LATENCY_P95 = float(os.getenv("LLM_BREAKER_LATENCY_P95", "20.0"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30.0"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """El deployment tiene el circuito abierto: la llamada no se envió"""
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """Errores que indican que el endpoint falla (no los 429 ni los errores del cliente)"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        return True
+    return status == 408 or status >= 500
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class CircuitBreaker:
+    """Estado del circuito de un deployment, compartido por todos los hilos"""
+
+    def __init__(
+        self,
+        deployment: str,
+        window: int = LLM_BREAKER_WINDOW,
+        min_calls: int = LLM_BREAKER_MIN_CALLS,
+        error_rate: float = LLM_BREAKER_ERROR_RATE,
+        latency_p95: float = LLM_BREAKER_LATENCY_P95,
+        cooldown: float = LLM_BREAKER_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.deployment = deployment
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.latency_p95 = latency_p95
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (éxito, latencia en segundos)
+        self._calls = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.stats = {"trips": 0, "rejected": 0, "probes": 0}
+
+    def allow(self) -> bool:
+        """Si la llamada puede enviarse (en half_open solo una llamada de prueba a la vez)"""
+        with self._lock:
+            if self.state == OPEN and self._clock() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self.stats["probes"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._close()
+                return
+            self._calls.append((True, latency))
+            self._check()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self._calls.append((False, 0.0))
+            self._check()
+
+    def release(self) -> None:
+        """La llamada terminó sin decir nada del endpoint (429, error del cliente): libera la prueba"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _check(self) -> None:
+        if self.state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        errors = sum(1 for ok, _ in self._calls if not ok)
+        latencies = [latency for ok, latency in self._calls if ok]
+        if errors / len(self._calls) >= self.error_rate or (latencies and _percentile(latencies, 0.95) >= self.latency_p95):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = self._clock()
+        self._probe_in_flight = False
+        self.stats["trips"] += 1
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._probe_in_flight = False
+        self._calls.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self._calls)
+            stats = {"state": self.state, **self.stats}
+        latencies = [latency for ok, latency in calls if ok]
+        stats["error_rate"] = round(sum(1 for ok, _ in calls if not ok) / len(calls), 3) if calls else 0.0
+        stats["latency_p95"] = round(_percentile(latencies, 0.95), 3) if latencies else None
+        return stats
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(deployment: str) -> CircuitBreaker:
+    """Circuit breaker del deployment (uno por proceso)"""
+    with _breakers_lock:
+        breaker = _breakers.get(deployment)
+        if breaker is None:
+            breaker = _breakers[deployment] = CircuitBreaker(deployment)
+        return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Estado, aperturas, llamadas rechazadas, tasa de errores y p95 de latencia por deployment"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.deployment: breaker.snapshot() for breaker in breakers}
+
+
+class Degradation:
+    """Puntos de llamada de un análisis sin respuesta de la IA (circuito abierto o error)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.call_sites = set()
+
+    def mark(self, call_site: str) -> None:
+        with self._lock:
+            self.call_sites.add(call_site)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            call_sites = sorted(self.call_sites)
+        return {"degraded": bool(call_sites), "degraded_calls": call_sites}
+
+
+_current_degradation: ContextVar[Optional[Degradation]] = ContextVar("llm_degradation", default=None)
+
+
+@contextmanager
+def track_degradation():
+    """
+    Registra las llamadas sin respuesta de la IA dentro del bloque
+    (también en los hilos que copian el contexto).
+
+    Yields:
+        Degradation: Llamadas degradadas del bloque
+    """
+    degradation = Degradation()
+    token = _current_degradation.set(degradation)
+    try:
+        yield degradation
+    finally:
+        _current_degradation.reset(token)
+
+
+def mark_degraded(call_site: str) -> None:
+    """Marca el análisis en curso como degradado (sin efecto fuera de track_degradation)"""
+    degradation = _current_degradation.get()
+    if degradation is not None:
+        degradation.mark(call_site)
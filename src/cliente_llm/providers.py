@@ -0,0 +1,238 @@
+"""
+Proveedor de los modelos de chat de comparadores y extractores (LLM_PROVIDER):
+- "azure" (por defecto): AzureChatOpenAI, como hasta ahora.
+- "stub": modelo local y determinista, sin red ni tokens. Responde con JSON que cumple el
+  esquema json_schema de cada petición, con latencia y tasa de errores configurables, para
+  medir el throughput del propio código (benchmarks/bench_pipeline_stub.py) y correr las
+  pruebas sin Azure.
+Otros proveedores se agregan con register_provider.
+
+Configuración del stub:
+    LLM_STUB_LATENCY="lognormal:0.8:0.5"  # fixed:<s>, uniform:<min>:<max>, lognormal:<mediana>:<sigma> o none
+    LLM_STUB_ERROR_RATE=0.0               # fracción de llamadas que fallan
+    LLM_STUB_ERROR_STATUS="503,429"       # códigos HTTP de los errores (uno al azar)
+    LLM_STUB_SEED=0
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "azure").lower()
+LLM_STUB_LATENCY = os.getenv("LLM_STUB_LATENCY", "none")
+LLM_STUB_ERROR_RATE = float(os.getenv("LLM_STUB_ERROR_RATE", "0.0"))
+LLM_STUB_ERROR_STATUS = os.getenv("LLM_STUB_ERROR_STATUS", "503")
+LLM_STUB_SEED = int(os.getenv("LLM_STUB_SEED", "0"))
+
+
+def sample_value(schema: Dict[str, Any], rng: random.Random, name: str = "valor") -> Any:
+    """
+    Valor que cumple el esquema. Los números sin rango van entre 0 y 1, como los scores de los
+    comparadores (el esquema que ve el proveedor no lleva minimum/maximum).
+    """
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    expected = schema.get("type")
+    if isinstance(expected, list):
+        expected = expected[0]
+    if expected == "object":
+        value = {key: sample_value(prop, rng, key) for key, prop in schema.get("properties", {}).items()}
+        extra = schema.get("additionalProperties")
+        if isinstance(extra, dict):
+            for i in range(rng.randint(0, 2)):
+                value[f"{name}_{i + 1}"] = sample_value(extra, rng, name)
+        return value
+    if expected == "array":
+        low = schema.get("minItems", 0)
+        count = rng.randint(low, max(low, schema.get("maxItems", 3)))
+        return [sample_value(schema.get("items", {}), rng, name) for _ in range(count)]
+    if expected == "number":
+        return round(rng.uniform(schema.get("minimum", 0.0), schema.get("maximum", 1.0)), 2)
+    if expected == "integer":
+        return rng.randint(schema.get("minimum", 0), schema.get("maximum", 10))
+    if expected == "boolean":
+        return rng.random() < 0.5
+    if expected == "null":
+        return None
+    return f"{name} {rng.randint(0, 9999):04d}"
+
+
+def sample_content(response_format: Optional[Dict[str, Any]], rng: random.Random) -> str:
+    """Contenido de una respuesta: un valor del esquema json_schema, o {} para json_object o sin formato"""
+    response_format = response_format or {}
+    if response_format.get("type") == "json_schema":
+        return json.dumps(sample_value(response_format["json_schema"]["schema"], rng), ensure_ascii=False)
+    return "{}"
+
+
+def latency_sampler(spec: str) -> Callable[[random.Random], float]:
+    """
+    Distribución de latencia a partir de su especificación.
+
+    Args:
+        spec (str): "none", "fixed:<s>", "uniform:<min>:<max>" o "lognormal:<mediana>:<sigma>"
+
+    Returns:
+        callable: rng -> segundos
+
+    Raises:
+        ValueError: Si la especificación no es válida
+    """
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind in ("none", "0", ""):
+        return lambda rng: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Latencia del stub no válida: {spec}")
+
+
+class StubAPIError(Exception):
+    """Error simulado de la API, con status_code como los errores de openai"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Error simulado del stub ({status_code})")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={})
+
+
+class StubChatModel:
+    """
+    Modelo de chat local con la interfaz que usa rate_limiter.limited_generate (generate).
+    La respuesta depende solo de la semilla, el deployment, los mensajes y el response_format;
+    la latencia y los errores salen de un generador con la misma semilla.
+    """
+
+    def __init__(
+        self,
+        deployment: str,
+        temperature: float = 0.0,
+        max_tokens: Optional[int] = None,
+        latency: str = LLM_STUB_LATENCY,
+        error_rate: float = LLM_STUB_ERROR_RATE,
+        error_status: str = LLM_STUB_ERROR_STATUS,
+        seed: int = LLM_STUB_SEED,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.deployment_name = deployment
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.error_rate = error_rate
+        self.error_statuses = [int(status) for status in str(error_status).split(",") if status.strip()]
+        self.seed = seed
+        self._latency = latency_sampler(latency)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _content(self, messages: List[Any], response_format: Optional[Dict[str, Any]]) -> str:
+        payload = json.dumps(
+            [self.seed, self.deployment_name, [getattr(m, "content", "") for m in messages], response_format],
+            ensure_ascii=False, sort_keys=True, default=str,
+        )
+        rng = random.Random(hashlib.sha256(payload.encode("utf-8")).hexdigest())
+        return sample_content(response_format, rng)
+
+    def generate(self, batches: List[List[Any]], response_format: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        """
+        Responde cada lista de mensajes como lo haría el modelo real.
+
+        Returns:
+            Objeto con la forma de un LLMResult (generations, llm_output con token_usage)
+
+        Raises:
+            StubAPIError: Con probabilidad error_rate
+        """
+        with self._lock:
+            self.calls += 1
+            latency = self._latency(self._rng)
+            failed = self._rng.random() < self.error_rate
+            status = self._rng.choice(self.error_statuses) if failed and self.error_statuses else 503
+        self._sleep(latency)
+        if failed:
+            raise StubAPIError(status)
+
+        generations = []
+        prompt_tokens = completion_tokens = 0
+        for messages in batches:
+            content = self._content(messages, response_format)
+            generations.append([SimpleNamespace(text=content, message=None)])
+            prompt_tokens += sum(len(getattr(m, "content", "") or "") for m in messages) // 4
+            completion_tokens += len(content) // 4
+        return SimpleNamespace(generations=generations, llm_output={"token_usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }})
+
+
+def _azure_chat_model(deployment: str, endpoint: str, api_key: Optional[str], api_version: str, temperature: float, max_tokens: int) -> Any:
+    from langchain_openai import AzureChatOpenAI
+    return AzureChatOpenAI(
+        azure_deployment=deployment,
+        azure_endpoint=endpoint,
+        api_key=api_key,
+        api_version=api_version,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        max_retries=0  # los reintentos con backoff los hace src/cliente_llm/rate_limiter.py
+    )
+
+
+def _stub_chat_model(deployment: str, endpoint: str, api_key: Optional[str], api_version: str, temperature: float, max_tokens: int) -> Any:
+    return StubChatModel(deployment, temperature, max_tokens)
+
+
+_providers: Dict[str, Callable[..., Any]] = {"azure": _azure_chat_model, "stub": _stub_chat_model}
+
+
+def register_provider(name: str, factory: Callable[..., Any]) -> None:
+    """
+    Registra un proveedor. factory recibe (deployment, endpoint, api_key, api_version,
+    temperature, max_tokens) y devuelve un modelo con generate([mensajes], **kwargs).
+    """
+    _providers[name.lower()] = factory
+
+
+def create_chat_model(
+    deployment: str,
+    endpoint: str,
+    api_key: Optional[str],
+    api_version: str,
+    temperature: float = 0.1,
+    max_tokens: int = 500,
+    provider: Optional[str] = None,
+) -> Any:
+    """
+    Modelo de chat del proveedor configurado.
+
+    Args:
+        deployment (str): Deployment de Azure OpenAI
+        endpoint (str): Endpoint de Azure OpenAI
+        api_key (str): API key
+        api_version (str): Versión de la API
+        temperature (float): Temperatura
+        max_tokens (int): Tokens máximos de la respuesta
+        provider (str): Proveedor; None usa LLM_PROVIDER
+
+    Returns:
+        Modelo de chat
+
+    Raises:
+        ValueError: Si el proveedor no está registrado
+    """
+    name = (provider or LLM_PROVIDER).lower()
+    if name not in _providers:
+        raise ValueError(f"Proveedor de IA no soportado: {name} (disponibles: {', '.join(sorted(_providers))})")
+    return _providers[name](deployment, endpoint, api_key, api_version, temperature, max_tokens)
@@ -0,0 +1,245 @@
+"""
+Límite de tasa compartido por todas las llamadas a la IA del proceso.
+Cada deployment tiene dos token buckets (peticiones por minuto y tokens por minuto):
+- Antes de cada llamada se reservan 1 petición y los tokens estimados (prompt + max_tokens,
+  como los cuenta Azure OpenAI); si no alcanzan, el hilo espera a que se rellenen.
+- Un 429 pausa el deployment para todos los hilos durante el Retry-After (o el backoff).
+- Los 429, timeouts y errores 5xx se reintentan con backoff exponencial y jitter.
+Los clientes de LangChain se crean con max_retries=0 para que los reintentos ocurran solo aquí.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cliente_llm.circuit_breaker import CircuitOpenError, get_circuit_breaker, is_endpoint_failure
+
+# Cuota por defecto de cada deployment (Azure asigna 6 RPM por cada 1000 TPM)
+LLM_RPM = int(os.getenv("LLM_RPM", "300"))
+LLM_TPM = int(os.getenv("LLM_TPM", "50000"))
+# Cuotas por deployment: "gpt-4o-mini=300:50000,gpt-4o=60:10000" (RPM:TPM)
+LLM_RATE_LIMITS = os.getenv("LLM_RATE_LIMITS", "")
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60.0"))
+
+_RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504)
+_RETRYABLE_ERRORS = ("APITimeoutError", "APIConnectionError", "Timeout", "ConnectionError")
+
+
+def _parse_rate_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """{deployment: (rpm, tpm)} desde LLM_RATE_LIMITS"""
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        deployment, quota = item.split("=", 1)
+        rpm, _, tpm = quota.partition(":")
+        limits[deployment.strip()] = (int(rpm), int(tpm or LLM_TPM))
+    return limits
+
+
+class TokenBucket:
+    """Bucket con capacidad por minuto que se rellena de forma continua"""
+
+    def __init__(self, per_minute: int, now: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Segundos hasta que haya `amount` disponibles (una petición mayor que la capacidad espera el bucket lleno)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class DeploymentLimiter:
+    """Límite de peticiones y tokens por minuto de un deployment, compartido por todos los hilos"""
+
+    def __init__(
+        self,
+        deployment: str,
+        rpm: int,
+        tpm: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.deployment = deployment
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self.requests = TokenBucket(rpm, now)
+        self.tokens = TokenBucket(tpm, now)
+        self.paused_until = 0.0
+        self.stats = {"requests": 0, "throttled": 0, "retries": 0, "wait_seconds": 0.0}
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Reserva una petición y `tokens` tokens, esperando lo necesario.
+
+        Returns:
+            float: Segundos esperados
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    self.stats["requests"] += 1
+                    self.stats["wait_seconds"] += waited
+                    return waited
+            self._sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """Detiene el deployment para todos los hilos (respuesta 429)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, self._clock() + seconds)
+            self.stats["throttled"] += 1
+            self.stats["retries"] += 1
+
+    def backoff(self, seconds: float) -> None:
+        """Espera del hilo que reintenta tras un timeout o error 5xx (no detiene a los demás)"""
+        with self._lock:
+            self.stats["retries"] += 1
+        self._sleep(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats["rpm"] = int(self.requests.capacity)
+        stats["tpm"] = int(self.tokens.capacity)
+        return stats
+
+
+_limiters: Dict[str, DeploymentLimiter] = {}
+_limiters_lock = threading.Lock()
+_rate_limits = _parse_rate_limits(LLM_RATE_LIMITS)
+
+
+def get_rate_limiter(deployment: str) -> DeploymentLimiter:
+    """Limitador del deployment (uno por proceso)"""
+    with _limiters_lock:
+        limiter = _limiters.get(deployment)
+        if limiter is None:
+            rpm, tpm = _rate_limits.get(deployment, (LLM_RPM, LLM_TPM))
+            limiter = _limiters[deployment] = DeploymentLimiter(deployment, rpm, tpm)
+        return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Peticiones, 429, reintentos y segundos de espera por deployment"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.deployment: limiter.snapshot() for limiter in limiters}
+
+
+def deployment_of(llm: Any) -> str:
+    """Nombre del deployment de un modelo de LangChain"""
+    return getattr(llm, "deployment_name", None) or getattr(llm, "model_name", None) or "default"
+
+
+def estimate_tokens(llm: Any, messages: List[Any]) -> int:
+    """Tokens que cuenta la cuota: prompt (aprox. 4 caracteres por token) + max_tokens de la respuesta"""
+    prompt_chars = sum(len(getattr(message, "content", "") or "") for message in messages)
+    return prompt_chars // 4 + (getattr(llm, "max_tokens", None) or 0)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Segundos de los encabezados retry-after-ms / retry-after de la respuesta"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """
+    Espera antes de reintentar una llamada fallida.
+
+    Args:
+        error (Exception): Error de la llamada
+        attempt (int): Número de intento (desde 0)
+
+    Returns:
+        float: Segundos a esperar (Retry-After o backoff exponencial con jitter), o None si no se reintenta
+    """
+    status = getattr(error, "status_code", None)
+    if status not in _RETRYABLE_STATUS and type(error).__name__ not in _RETRYABLE_ERRORS:
+        return None
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        return retry_after + random.uniform(0, LLM_BACKOFF_BASE)
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+
+def limited_generate(llm: Any, messages: List[Any], **kwargs) -> Any:
+    """
+    llm.generate([messages]) dentro del límite del deployment, con reintentos,
+    detrás del circuit breaker del deployment (circuit_breaker.py).
+
+    Args:
+        llm: Modelo de chat de LangChain
+        messages (list): Mensajes de LangChain
+        **kwargs: Parámetros de la petición (p. ej. response_format)
+
+    Returns:
+        LLMResult de la llamada
+
+    Raises:
+        CircuitOpenError: Si el circuito del deployment está abierto (no se envía la llamada)
+        La excepción de la última llamada si no es reintentable o se agotan los reintentos
+    """
+    deployment = deployment_of(llm)
+    limiter = get_rate_limiter(deployment)
+    breaker = get_circuit_breaker(deployment)
+    tokens = estimate_tokens(llm, messages)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuito abierto para {deployment}")
+        limiter.acquire(tokens)
+        started = time.monotonic()
+        try:
+            result = llm.generate([messages], **kwargs)
+        except Exception as e:
+            if is_endpoint_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            delay = retry_delay(e, attempt)
+            if delay is None or attempt == LLM_MAX_RETRIES:
+                raise
+            if getattr(e, "status_code", None) == 429:
+                # El siguiente acquire espera la pausa, igual que los demás hilos
+                limiter.pause(delay)
+            else:
+                limiter.backoff(delay)
+            continue
+        breaker.record_success(time.monotonic() - started)
+        return result
@@ -0,0 +1,124 @@
+"""
+Single-flight de las llamadas a la IA: las peticiones idénticas que están en curso al mismo
+tiempo (mismo deployment, punto de llamada, esquema y mensajes) esperan la respuesta de la
+primera en vez de llamar cada una a la API. Pasa en los lotes concurrentes, p. ej. la ubicación
+de un Job contra varios CVs de la misma ciudad o el mismo par de niveles de idioma.
+Solo se comparten las llamadas simultáneas: no es una caché de respuestas.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List
+
+LLM_SINGLE_FLIGHT = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+
+
+def prompt_key(deployment: str, call_site: str, schema: Dict[str, Any], messages: List[Any], params: Dict[str, Any] = None) -> str:
+    """
+    Hash de una petición: deployment, punto de llamada, esquema, parámetros y mensajes (tipo y contenido).
+
+    Returns:
+        str: sha256 hexadecimal
+    """
+    payload = json.dumps(
+        [deployment, call_site, schema, params or {}, [[type(m).__name__, getattr(m, "content", "")] for m in messages]],
+        ensure_ascii=False, sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Llamadas en curso por llave, con contadores por punto de llamada"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, call_site: str, counter: str) -> None:
+        counts = self._counts.setdefault(call_site, {"requests": 0, "coalesced": 0})
+        counts[counter] += 1
+
+    def do(self, call_site: str, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Ejecuta fn, o espera a la ejecución en curso con la misma llave.
+
+        Args:
+            call_site (str): Punto de llamada (contadores)
+            key (str): Llave de la petición (prompt_key)
+            fn (callable): Llamada real
+
+        Returns:
+            Resultado de fn (copia independiente para las llamadas que esperaron)
+
+        Raises:
+            La excepción de fn, también en las llamadas que esperaron
+        """
+        with self._lock:
+            self._count(call_site, "requests")
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._count(call_site, "coalesced")
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.value)
+
+        try:
+            value = fn()
+            # Copia para las que esperan: el llamador puede modificar el valor que recibe
+            flight.value = copy.deepcopy(value)
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            counts = {site: dict(c) for site, c in sorted(self._counts.items())}
+        for c in counts.values():
+            c["coalesced_ratio"] = round(c["coalesced"] / c["requests"], 3) if c["requests"] else 0.0
+        return counts
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+_single_flight = SingleFlight()
+
+
+def single_flight(call_site: str, key: str, fn: Callable[[], Any]) -> Any:
+    """Ejecuta fn con single-flight del proceso (o directamente si LLM_SINGLE_FLIGHT está desactivado)"""
+    if not LLM_SINGLE_FLIGHT:
+        return fn()
+    return _single_flight.do(call_site, key, fn)
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Peticiones y peticiones coalescidas (sin llamada propia a la API) por punto de llamada"""
+    return _single_flight.snapshot()
+
+
+def reset_single_flight_stats() -> None:
+    """Reinicia los contadores (pruebas y benchmarks)"""
+    _single_flight.reset()
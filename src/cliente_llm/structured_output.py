@@ -0,0 +1,374 @@
+"""
+Salida estructurada de las llamadas a la IA (comparadores y extractores).
+Cada punto de llamada declara el esquema JSON de su respuesta:
+- La petición se envía con response_format "json_schema" estricto; los esquemas que el modo
+  estricto no admite (objetos con llaves libres, como los idiomas) usan "json_object".
+- La respuesta se valida contra el esquema completo (incluidos los rangos que el modo
+  estricto no impone) y, si no lo cumple, se reintenta una sola vez indicando el error.
+- Cada punto de llamada lleva contadores de llamadas, reintentos, fallos de parseo,
+  violaciones del esquema y fallos definitivos.
+Las peticiones idénticas simultáneas se coalescen en una sola (single_flight.py) y pasan por el
+circuit breaker y el límite de tasa del deployment (circuit_breaker.py, rate_limiter.py).
+Dentro de un backfill por lotes las respuestas salen del lote en vez de la API (batch.py).
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from cliente_llm.batch import BatchPendingError, current_batch, render_request
+from cliente_llm.circuit_breaker import mark_degraded
+from cliente_llm.rate_limiter import deployment_of, limited_generate
+from cliente_llm.single_flight import prompt_key, single_flight
+
+# "json_schema" (estricto), "json_object" o "none" (sin response_format, solo validación local)
+STRUCTURED_OUTPUT_MODE = os.getenv("STRUCTURED_OUTPUT_MODE", "json_schema").lower()
+if STRUCTURED_OUTPUT_MODE not in ("json_schema", "json_object", "none"):
+    STRUCTURED_OUTPUT_MODE = "json_schema"
+
+# Reintentos ante una respuesta que no cumple el esquema
+STRUCTURED_OUTPUT_RETRIES = 1
+
+# Palabras clave que se validan localmente pero no se envían al proveedor (no las admite el modo estricto)
+_LOCAL_ONLY_KEYWORDS = ("minimum", "maximum", "minItems", "maxItems")
+
+_COUNTERS = ("calls", "retries", "parse_failures", "schema_violations", "failures")
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+class StructuredOutputError(ValueError):
+    """La respuesta de la IA no cumplió el esquema, ni siquiera tras el reintento"""
+
+
+def object_schema(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Esquema de objeto con todas las propiedades obligatorias y sin llaves extra"""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def array_schema(items: Dict[str, Any]) -> Dict[str, Any]:
+    """Esquema de lista"""
+    return {"type": "array", "items": items}
+
+
+STRING_SCHEMA = {"type": "string"}
+STRING_LIST_SCHEMA = array_schema(STRING_SCHEMA)
+# Objeto de llaves libres con valores string (p. ej. {"inglés": "B2"})
+STRING_MAP_SCHEMA = {"type": "object", "additionalProperties": STRING_SCHEMA}
+# Respuesta de los comparadores: {"score": 0-1, "reason": "..."}
+SCORE_SCHEMA = object_schema({
+    "score": {"type": "number", "minimum": 0, "maximum": 1},
+    "reason": STRING_SCHEMA,
+})
+
+
+def _type_matches(value: Any, expected: str) -> bool:
+    if expected == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if expected == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, _TYPES[expected])
+
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "$") -> Optional[str]:
+    """
+    Valida un valor contra el subconjunto de JSON Schema que usan los puntos de llamada
+    (type, enum, properties, required, additionalProperties, items, minimum, maximum, minItems, maxItems).
+
+    Args:
+        value: Valor ya parseado
+        schema (dict): Esquema
+        path (str): Ruta del valor (para el mensaje de error)
+
+    Returns:
+        str: Descripción de la primera violación, o None si el valor cumple el esquema
+    """
+    expected = schema.get("type")
+    if expected is not None:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_type_matches(value, t) for t in types):
+            return f"{path}: se esperaba {'/'.join(types)}"
+    if "enum" in schema and value not in schema["enum"]:
+        return f"{path}: valor fuera de {schema['enum']}"
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in schema and value < schema["minimum"]:
+            return f"{path}: menor que {schema['minimum']}"
+        if "maximum" in schema and value > schema["maximum"]:
+            return f"{path}: mayor que {schema['maximum']}"
+
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                return f"{path}: falta '{key}'"
+        extra = schema.get("additionalProperties", True)
+        for key, item in value.items():
+            if key in properties:
+                error = validate(item, properties[key], f"{path}.{key}")
+            elif extra is False:
+                error = f"{path}: llave no permitida '{key}'"
+            elif isinstance(extra, dict):
+                error = validate(item, extra, f"{path}.{key}")
+            else:
+                error = None
+            if error:
+                return error
+
+    if isinstance(value, list):
+        if "minItems" in schema and len(value) < schema["minItems"]:
+            return f"{path}: menos de {schema['minItems']} elementos"
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            return f"{path}: más de {schema['maxItems']} elementos"
+        items = schema.get("items")
+        if items:
+            for i, item in enumerate(value):
+                error = validate(item, items, f"{path}[{i}]")
+                if error:
+                    return error
+    return None
+
+
+def _provider_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia del esquema sin las palabras clave que solo se validan localmente"""
+    if isinstance(schema, dict):
+        return {k: _provider_schema(v) for k, v in schema.items() if k not in _LOCAL_ONLY_KEYWORDS}
+    if isinstance(schema, list):
+        return [_provider_schema(v) for v in schema]
+    return schema
+
+
+def _strict_compatible(schema: Dict[str, Any]) -> bool:
+    """El modo estricto exige objetos cerrados con todas sus propiedades obligatorias"""
+    if schema.get("type") == "object":
+        properties = schema.get("properties", {})
+        if schema.get("additionalProperties") is not False or set(schema.get("required", [])) != set(properties):
+            return False
+        return all(_strict_compatible(p) for p in properties.values())
+    if schema.get("type") == "array":
+        return _strict_compatible(schema.get("items", {}))
+    return True
+
+
+def request_format(call_site: str, schema: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    response_format de la petición para un punto de llamada.
+    El modo estricto exige un objeto en la raíz: los esquemas de lista se envuelven en {"result": ...}.
+
+    Args:
+        call_site (str): Nombre del punto de llamada
+        schema (dict): Esquema de la respuesta
+
+    Returns:
+        tuple: (response_format o None, si la respuesta viene envuelta en "result")
+    """
+    if STRUCTURED_OUTPUT_MODE == "none":
+        return None, False
+    wrapped = schema.get("type") != "object"
+    provider_schema = _provider_schema(object_schema({"result": schema}) if wrapped else schema)
+    if STRUCTURED_OUTPUT_MODE == "json_schema" and _strict_compatible(provider_schema):
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": re.sub(r"[^a-zA-Z0-9_-]", "_", call_site),
+                "strict": True,
+                "schema": provider_schema,
+            },
+        }, wrapped
+    # json_object solo garantiza un objeto en la raíz
+    if not wrapped:
+        return {"type": "json_object"}, False
+    return None, False
+
+
+def _strip_fences(text: str) -> str:
+    """Quita un bloque de código markdown alrededor del JSON (modo "none")"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+class _CallSiteStats:
+    """Contadores por punto de llamada, compartidos por todos los hilos del proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def add(self, call_site: str, counter: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(call_site, dict.fromkeys(_COUNTERS, 0))
+            counts[counter] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {site: dict(counts) for site, counts in sorted(self._counts.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+_stats = _CallSiteStats()
+
+
+def structured_output_stats() -> Dict[str, Dict[str, int]]:
+    """Contadores de salida estructurada por punto de llamada"""
+    return _stats.snapshot()
+
+
+def reset_structured_output_stats() -> None:
+    """Reinicia los contadores (pruebas y benchmarks)"""
+    _stats.reset()
+
+
+def parse_response(call_site: str, text: str, schema: Dict[str, Any], wrapped: bool = False) -> Tuple[Any, Optional[str]]:
+    """
+    Parsea y valida el texto de una respuesta, contando los fallos del punto de llamada.
+
+    Args:
+        call_site (str): Nombre del punto de llamada
+        text (str): Contenido de la respuesta
+        schema (dict): Esquema de la respuesta
+        wrapped (bool): Si la respuesta viene envuelta en {"result": ...}
+
+    Returns:
+        tuple: (valor, None) si cumple el esquema; (None, error) si no
+    """
+    try:
+        value = json.loads(_strip_fences(text or ""))
+    except ValueError as e:
+        _stats.add(call_site, "parse_failures")
+        return None, f"JSON inválido: {e}"
+    if wrapped:
+        if not isinstance(value, dict) or "result" not in value:
+            _stats.add(call_site, "schema_violations")
+            return None, "$: falta 'result'"
+        value = value["result"]
+    error = validate(value, schema)
+    if error:
+        _stats.add(call_site, "schema_violations")
+        return None, error
+    return value, None
+
+
+def generate_structured(
+    llm: Any,
+    call_site: str,
+    schema: Dict[str, Any],
+    messages: List[Any],
+    on_result: Optional[Callable[[Any], None]] = None,
+) -> Any:
+    """
+    Ejecuta una llamada a la IA con salida estructurada y devuelve la respuesta validada.
+    Si otra llamada idéntica ya está en curso espera su respuesta en vez de llamar a la API
+    (on_result solo se llama en la llamada que la hizo). Dentro de batch_item() la respuesta
+    sale del lote.
+
+    Args:
+        llm: Modelo de chat de LangChain
+        call_site (str): Nombre del punto de llamada (p. ej. "experience", "cv.education")
+        schema (dict): Esquema de la respuesta
+        messages (list): Mensajes de LangChain
+        on_result (callable): Se llama con cada LLMResult (p. ej. para registrar tokens)
+
+    Returns:
+        Valor de la respuesta que cumple el esquema
+
+    Raises:
+        StructuredOutputError: Si la respuesta no cumple el esquema tras el reintento
+        CircuitOpenError: Si el circuito del deployment está abierto (el análisis queda degradado)
+        BatchPendingError: Si la respuesta aún no está en el lote (la petición queda registrada)
+    """
+    params = {"temperature": getattr(llm, "temperature", None), "max_tokens": getattr(llm, "max_tokens", None), "mode": STRUCTURED_OUTPUT_MODE}
+    key = prompt_key(deployment_of(llm), call_site, schema, messages, params)
+    try:
+        batch = current_batch()
+        if batch is not None:
+            return _from_batch(batch, key, llm, call_site, schema, messages, on_result)
+        return single_flight(call_site, key, lambda: _generate(llm, call_site, schema, messages, on_result))
+    except StructuredOutputError:
+        raise
+    except Exception:
+        # Circuito abierto o error tras los reintentos (también en las llamadas que esperaban):
+        # el llamador usará su fallback
+        mark_degraded(call_site)
+        raise
+
+
+def _from_batch(
+    batch: Any,
+    key: str,
+    llm: Any,
+    call_site: str,
+    schema: Dict[str, Any],
+    messages: List[Any],
+    on_result: Optional[Callable[[Any], None]],
+) -> Any:
+    """Respuesta del lote para el prompt; sin reintento si no cumple el esquema"""
+    response_format, wrapped = request_format(call_site, schema)
+    response = batch.store.response(key)
+    if response is None:
+        batch.add_pending(
+            key, render_request(key, llm, messages, response_format),
+            {"call_site": call_site, "schema": schema, "wrapped": wrapped})
+        raise BatchPendingError(f"{call_site}: respuesta pendiente en el lote")
+    _stats.add(call_site, "calls")
+    if on_result:
+        on_result(response.as_result())
+    value, error = parse_response(call_site, response.content, schema, wrapped)
+    if error is not None:
+        _stats.add(call_site, "failures")
+        raise StructuredOutputError(f"{call_site}: {error}")
+    return value
+
+
+def _generate(
+    llm: Any,
+    call_site: str,
+    schema: Dict[str, Any],
+    messages: List[Any],
+    on_result: Optional[Callable[[Any], None]],
+) -> Any:
+    """Llamada real de generate_structured: petición, validación y reintento"""
+    response_format, wrapped = request_format(call_site, schema)
+    kwargs = {"response_format": response_format} if response_format else {}
+    _stats.add(call_site, "calls")
+
+    attempt_messages = list(messages)
+    error = None
+    for attempt in range(STRUCTURED_OUTPUT_RETRIES + 1):
+        result = limited_generate(llm, attempt_messages, **kwargs)
+        if on_result:
+            on_result(result)
+        text = result.generations[0][0].text
+        value, error = parse_response(call_site, text, schema, wrapped)
+        if error is None:
+            return value
+        if attempt < STRUCTURED_OUTPUT_RETRIES:
+            _stats.add(call_site, "retries")
+            attempt_messages = list(messages) + [
+                AIMessage(content=text),
+                HumanMessage(content=f"La respuesta anterior no cumple el esquema ({error}). Responde de nuevo únicamente con el JSON corregido."),
+            ]
+
+    _stats.add(call_site, "failures")
+    raise StructuredOutputError(f"{call_site}: {error}")
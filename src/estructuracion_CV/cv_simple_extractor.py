@@ -1,25 +1,50 @@
 import json
 import os
+import sys
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-from langchain_openai import AzureChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+# Agregar src al path para el cliente de IA compartido
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cliente_llm.structured_output import (
+    generate_structured, object_schema, array_schema, STRING_SCHEMA, STRING_LIST_SCHEMA, STRING_MAP_SCHEMA
+)
+from cliente_llm.providers import create_chat_model
+
 # Cargar variables de entorno
 load_dotenv()
 
+# Esquema de la respuesta de cada tipo de extracción (salida estructurada)
+CV_EXTRACTION_SCHEMAS = {
+    "personal": object_schema({
+        "name": STRING_SCHEMA, "email": STRING_SCHEMA, "phone": STRING_SCHEMA, "location": STRING_SCHEMA
+    }),
+    "education": array_schema(object_schema({
+        "degree": STRING_SCHEMA, "institution": STRING_SCHEMA, "year": STRING_SCHEMA, "field": STRING_SCHEMA
+    })),
+    "experience": array_schema(object_schema({
+        "position": STRING_SCHEMA, "company": STRING_SCHEMA, "duration": STRING_SCHEMA, "description": STRING_SCHEMA
+    })),
+    "technical_skills": STRING_LIST_SCHEMA,
+    "soft_skills": STRING_LIST_SCHEMA,
+    "certifications": array_schema(object_schema({
+        "name": STRING_SCHEMA, "issuer": STRING_SCHEMA, "year": STRING_SCHEMA
+    })),
+    "languages": STRING_MAP_SCHEMA
+}
+
 class SimpleCVExtractor:
     """
-    Extractor de CV que soporta tanto Azure OpenAI directo como LangChain.
+    Extractor de CV con LangChain sobre el proveedor de IA configurado (Azure OpenAI o stub local).
     """
     
     def __init__(self):
         """
-        Inicializa el extractor con ambas opciones: OpenAI directo y LangChain.
+        Inicializa el extractor con el modelo de chat del proveedor configurado.
         """
         # Configuración de Azure OpenAI (igual que tu plantilla.py)
         self.endpoint = "https://invuniandesai-2.openai.azure.com/"
@@ -28,21 +53,9 @@ class SimpleCVExtractor:
         self.subscription_key = os.getenv("API_TOKEN")
         self.api_version = "2024-12-01-preview"
         
-        # Inicializar cliente de Azure OpenAI (método original)
-        self.client = AzureOpenAI(
-            api_version=self.api_version,
-            azure_endpoint=self.endpoint,
-            api_key=self.subscription_key,
-        )
-        
-        # Inicializar LangChain con Azure OpenAI
-        self.llm = AzureChatOpenAI(
-            azure_deployment=self.deployment,
-            azure_endpoint=self.endpoint,
-            api_key=self.subscription_key,
-            api_version=self.api_version,
-            temperature=0.1,
-            max_tokens=2000
+        # Modelo de chat del proveedor configurado (LLM_PROVIDER: Azure OpenAI o stub local)
+        self.llm = create_chat_model(
+            self.deployment, self.endpoint, self.subscription_key, self.api_version, temperature=0.1, max_tokens=2000
         )
         
     
@@ -167,56 +180,15 @@ class SimpleCVExtractor:
                 ("human", f"{prompts.get(extraction_type)}, Texto del CV:{{text}}")
             ])
             
-            # Crear la cadena
-            chain = prompt | self.llm
-            
-            # Ejecutar la cadena
-            response = chain.invoke({"text": text})
-            
-            # Parsear el JSON usando el método de limpieza
-            result = self._clean_json_response(response.content)
-            return result
+            # Ejecutar con salida estructurada (esquema validado, un reintento si no lo cumple)
+            return generate_structured(
+                self.llm, f"cv.{extraction_type}", CV_EXTRACTION_SCHEMAS[extraction_type], prompt.format_messages(text=text)
+            )
             
         except Exception as e:
             print(f"Error en extracción simple con LangChain: {e}")
             return {}
     
-    def _clean_json_response(self, response_content: str) -> dict:
-        """
-        Limpia y valida la respuesta JSON del modelo.
-        
-        Args:
-            response_content (str): Contenido de la respuesta del modelo
-            
-        Returns:
-            dict: JSON limpio y validado
-        """
-        try:
-            # Limpiar la respuesta removiendo posibles bloques de código markdown
-            cleaned_content = response_content.strip()
-            
-            # Remover bloques de código markdown si existen
-            if cleaned_content.startswith("```json"):
-                cleaned_content = cleaned_content[7:]  # Remover ```json
-            if cleaned_content.startswith("```"):
-                cleaned_content = cleaned_content[3:]   # Remover ```
-            if cleaned_content.endswith("```"):
-                cleaned_content = cleaned_content[:-3]  # Remover ```
-            
-            cleaned_content = cleaned_content.strip()
-            
-            # Intentar parsear el JSON
-            result = json.loads(cleaned_content)
-            return result
-            
-        except json.JSONDecodeError as e:
-            print(f"Error al parsear JSON: {e}")
-            print(f"Contenido problemático: {response_content[:200]}...")
-            return {}
-        except Exception as e:
-            print(f"Error inesperado al limpiar JSON: {e}")
-            return {}
-
     def extract_full_cv_simple(self, text: str) -> dict:
         """
         Extrae todo el CV usando extract_with_simple_chain y devuelve el JSON completo.
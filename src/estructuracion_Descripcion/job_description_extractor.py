@@ -1,14 +1,37 @@
 import json
 import os
+import sys
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-from langchain_openai import AzureChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.prompts import ChatPromptTemplate
 
+# Agregar src al path para el cliente de IA compartido
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cliente_llm.structured_output import (
+    generate_structured, object_schema, STRING_SCHEMA, STRING_LIST_SCHEMA, STRING_MAP_SCHEMA
+)
+from cliente_llm.providers import create_chat_model
+
 # Cargar variables de entorno
 load_dotenv()
 
+# Esquema de la respuesta de cada tipo de extracción (salida estructurada)
+JOB_EXTRACTION_SCHEMAS = {
+    "basic_info": object_schema({
+        "job_title": STRING_SCHEMA, "company_name": STRING_SCHEMA, "work_modality": STRING_SCHEMA,
+        "contract_type": STRING_SCHEMA, "salary": STRING_SCHEMA, "summary": STRING_SCHEMA
+    }),
+    "responsibilities": STRING_LIST_SCHEMA,
+    "location": object_schema({"location": STRING_SCHEMA}),
+    "education": object_schema({"education": STRING_SCHEMA}),
+    "experience": object_schema({"experience": STRING_SCHEMA}),
+    "technical_skills": STRING_LIST_SCHEMA,
+    "soft_skills": STRING_LIST_SCHEMA,
+    "certifications": STRING_LIST_SCHEMA,
+    "languages": STRING_MAP_SCHEMA,
+    "benefits": STRING_LIST_SCHEMA
+}
+
 class JobDescriptionExtractor:
     """
     Extractor de descripciones de trabajo usando Azure OpenAI y LangChain.
@@ -16,7 +39,7 @@ class JobDescriptionExtractor:
     
     def __init__(self):
         """
-        Inicializa el extractor con Azure OpenAI y LangChain.
+        Inicializa el extractor con el modelo de chat del proveedor configurado (Azure OpenAI o stub local).
         """
         # Configuración de Azure OpenAI
         self.endpoint = "https://invuniandesai-2.openai.azure.com/"
@@ -25,21 +48,9 @@ class JobDescriptionExtractor:
         self.subscription_key = os.getenv("API_TOKEN")
         self.api_version = "2024-12-01-preview"
         
-        # Inicializar cliente de Azure OpenAI
-        self.client = AzureOpenAI(
-            api_version=self.api_version,
-            azure_endpoint=self.endpoint,
-            api_key=self.subscription_key,
-        )
-        
-        # Inicializar LangChain con Azure OpenAI
-        self.llm = AzureChatOpenAI(
-            azure_deployment=self.deployment,
-            azure_endpoint=self.endpoint,
-            api_key=self.subscription_key,
-            api_version=self.api_version,
-            temperature=0.1,
-            max_tokens=2000
+        # Modelo de chat del proveedor configurado (LLM_PROVIDER: Azure OpenAI o stub local)
+        self.llm = create_chat_model(
+            self.deployment, self.endpoint, self.subscription_key, self.api_version, temperature=0.1, max_tokens=2000
         )
     
     def create_job_structure(self) -> dict:
@@ -162,56 +173,15 @@ class JobDescriptionExtractor:
                 ("human", f"{prompts.get(extraction_type)}, Texto de la descripción:{{text}}")
             ])
             
-            # Crear la cadena
-            chain = prompt | self.llm
-            
-            # Ejecutar la cadena
-            response = chain.invoke({"text": text})
-            
-            # Parsear el JSON usando el método de limpieza
-            result = self._clean_json_response(response.content)
-            return result
+            # Ejecutar con salida estructurada (esquema validado, un reintento si no lo cumple)
+            return generate_structured(
+                self.llm, f"job.{extraction_type}", JOB_EXTRACTION_SCHEMAS[extraction_type], prompt.format_messages(text=text)
+            )
             
         except Exception as e:
             print(f"Error en extracción simple con LangChain: {e}")
             return {}
     
-    def _clean_json_response(self, response_content: str) -> dict:
-        """
-        Limpia y valida la respuesta JSON del modelo.
-        
-        Args:
-            response_content (str): Contenido de la respuesta del modelo
-            
-        Returns:
-            dict: JSON limpio y validado
-        """
-        try:
-            # Limpiar la respuesta removiendo posibles bloques de código markdown
-            cleaned_content = response_content.strip()
-            
-            # Remover bloques de código markdown si existen
-            if cleaned_content.startswith("```json"):
-                cleaned_content = cleaned_content[7:]  # Remover ```json
-            if cleaned_content.startswith("```"):
-                cleaned_content = cleaned_content[3:]   # Remover ```
-            if cleaned_content.endswith("```"):
-                cleaned_content = cleaned_content[:-3]  # Remover ```
-            
-            cleaned_content = cleaned_content.strip()
-            
-            # Intentar parsear el JSON
-            result = json.loads(cleaned_content)
-            return result
-            
-        except json.JSONDecodeError as e:
-            print(f"Error al parsear JSON: {e}")
-            print(f"Contenido problemático: {response_content[:200]}...")
-            return {}
-        except Exception as e:
-            print(f"Error inesperado al limpiar JSON: {e}")
-            return {}
-    
     def extract_full_job_description(self, text: str) -> dict:
         """
         Extrae toda la descripción de trabajo usando extract_with_simple_chain y devuelve el JSON completo.
@@ -329,17 +299,11 @@ Responde ÚNICAMENTE con un array JSON de strings (nombres de soft skills en esp
 
 Sin bloques de código markdown."""
 
-            response = self.llm.invoke(prompt_text)
-            
-            try:
-                result = self._clean_json_response(response.content)
-                # Validar que sea una lista y no tenga más de 5 elementos
-                if result and isinstance(result, list) and len(result) > 0:
-                    # Limitar a máximo 5 soft skills
-                    return result[:5]
-                return []
-            except:
-                return []
+            result = generate_structured(
+                self.llm, "job.inferred_soft_skills", STRING_LIST_SCHEMA, [HumanMessage(content=prompt_text)]
+            )
+            # Limitar a máximo 5 soft skills
+            return result[:5]
             
         except Exception as e:
             print(f"Error al inferir soft skills de responsabilidades: {e}")
@@ -365,17 +329,9 @@ Texto:
 
 Responde solo con el JSON, sin bloques de código markdown."""
 
-            response = self.llm.invoke(prompt_text)
-            
-            try:
-                result = self._clean_json_response(response.content)
-                if result and isinstance(result, dict) and len(result) > 0:
-                    return result
-            except:
-                pass
-            
-            # Fallback: Si falla, retornar vacío
-            return {}
+            return generate_structured(
+                self.llm, "job.detected_language", STRING_MAP_SCHEMA, [HumanMessage(content=prompt_text)]
+            )
             
         except Exception as e:
             print(f"Error al detectar idioma del texto: {e}")